@@ -58,51 +58,9 @@ print("For .lib file: set the \"characterize = True\" in options.py, invoke Syno
 start_time = datetime.datetime.now()
 print_time("Start",start_time)
 
-# import SRAM test generation
-if OPTS.add_sync_interface:
-    import sync_sram
-    
-    s = sync_sram.sync_sram(word_size=OPTS.word_size,
-                            words_per_row=OPTS.words_per_row, 
-                            num_rows=OPTS.num_rows, 
-                            num_subanks=OPTS.num_subanks, 
-                            branch_factors=OPTS.branch_factors, 
-                            bank_orientations=OPTS.bank_orientations, 
-                            name=OPTS.name)
-
-    s.save_output()
-    
-    if OPTS.create_bist:
-        import bist
-        
-        b = bist.bist(addr_size=s.addr_size, 
-                      data_size=OPTS.word_size, 
-                      delay = 0, 
-                      async_bist=False)
-
-        b.save_output()
-
-else:
-    import sram
-    s = sram.sram(word_size=OPTS.word_size,
-                  words_per_row=OPTS.words_per_row, 
-                  num_rows=OPTS.num_rows, 
-                  num_subanks=OPTS.num_subanks, 
-                  branch_factors=OPTS.branch_factors, 
-                  bank_orientations=OPTS.bank_orientations, 
-                  name=OPTS.name)
-
-    s.save_output()
-    
-    if OPTS.create_bist:
-        import bist
-        
-        b = bist.bist(addr_size=s.addr_size, 
-                      data_size=OPTS.word_size, 
-                      delay = OPTS.bist_delay, 
-                      async_bist=True)
-
-        b.save_output()
+# Generate the SRAM (and BIST) and save the outputs
+import generate
+generate.generate()
 
 
 OPTS.check_lvsdrc = True
@@ -0,0 +1,86 @@
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA. (See LICENSE for licensing information)
+
+
+""" SRAM Compiler client
+A drop-in replacement for AMC.py that sends the compile job to a running
+AMC_daemon.py. It takes the same options and config file as AMC.py and
+falls back to running AMC.py in this process when no daemon is listening.
+"""
+#!/usr/bin/env python3
+
+import os
+import re
+import sys
+import ast
+import importlib
+from globals import *
+
+(OPTS, args) = parse_args()
+
+# Check that we are left with a single configuration file as argument.
+if len(args) != 1:
+    print(USAGE)
+    sys.exit(2)
+
+import daemon
+
+conn = daemon.connect(OPTS.daemon_socket)
+if conn == None:
+    print("No AMC daemon on {0}, running AMC.py instead.".format(OPTS.daemon_socket))
+    amc = os.path.join(os.path.dirname(os.path.abspath(__file__)), "AMC.py")
+    os.execv(sys.executable, [sys.executable, amc] + sys.argv[1:])
+
+# Read the config file the same way read_config does
+config_file = args[0]
+if not os.path.isabs(config_file):
+    config_file = os.getcwd() + "/" +  config_file
+config_file = os.path.expanduser(re.sub(r'\.py$', "", config_file))
+sys.path.insert(0, os.path.dirname(config_file))
+config = importlib.import_module(os.path.basename(config_file))
+
+# Only plain values can be sent to the daemon
+config_values = {}
+for (k,v) in list(config.__dict__.items()):
+    if k.startswith("__"):
+        continue
+    try:
+        if ast.literal_eval(repr(v)) == v:
+            config_values[k] = v
+    except (ValueError, SyntaxError):
+        pass
+
+daemon.send_message(conn, {"command" : "job",
+                           "cwd" : os.getcwd(),
+                           "options" : dict(OPTS.__dict__),
+                           "config" : config_values})
+
+exit_code = 1
+conn_file = conn.makefile("rb")
+while True:
+    message = daemon.read_message(conn_file)
+    if message == None:
+        break
+    if "out" in message:
+        sys.stdout.write(message["out"])
+        sys.stdout.flush()
+    if "err" in message:
+        sys.stderr.write(message["err"])
+        sys.stderr.flush()
+    if "exit" in message:
+        exit_code = message["exit"]
+conn.close()
+
+sys.exit(exit_code)
@@ -0,0 +1,53 @@
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA. (See LICENSE for licensing information)
+
+
+""" SRAM Compiler daemon
+Keeps the technology, library cells and generator modules loaded and
+compiles the jobs sent by AMC_client.py over a Unix domain socket:
+
+AMC_daemon.py [-t tech] [-j jobs] [--socket file] [-n]
+AMC_client.py [options] <config file>
+"""
+#!/usr/bin/env python3
+
+import sys
+from globals import *
+
+(OPTS, args) = parse_args()
+
+# The daemon takes no config file, each job brings its own.
+if len(args) != 0:
+    print("Usage: AMC_daemon.py [options]\nUse -h for help.\n")
+    sys.exit(2)
+
+import debug
+import daemon
+
+check_versions()
+setup_paths()
+import_tech()
+
+OPTS.is_unit_test = False
+print_banner()
+
+server = daemon.daemon(socket_name=OPTS.daemon_socket, num_jobs=OPTS.daemon_jobs)
+server.warm_up()
+try:
+    server.serve()
+except KeyboardInterrupt:
+    pass
+
+end_AMC()
@@ -66,108 +66,255 @@ To run and see results:
 
 calibre -gui -lvs example_lvs_runset -batch
 more cell_6t.lvs.report
+
+Every run has its own directory with its runset and reports (see
+verify_runner), so DRC, LVS and PEX of any number of cells can run at the
+same time with run_checks, and a cell whose layout, netlist and rules
+didn't change is not checked again. The reports are parsed line by line
+(see verify_results).
 """
 
 import os
-import re
-import time
 import debug
-from globals import OPTS
-import subprocess
+from globals import OPTS, get_tool
+import verify_runner
+import verify_results
+
+
+def get_calibre():
+    """ Find the LVS/DRC/PEX tool in the PATH the first time it is needed """
+
+    if getattr(OPTS, "lvsdrc_exe", None) == None:
+        debug.info(2,"Initializing Calibre...")
+        OPTS.lvsdrc_exe = get_tool("LVS/DRC/PEX",["calibre"])
+    return OPTS.lvsdrc_exe[1]
+
+
+class calibre_job(verify_runner.verify_job):
+    """ A Calibre run from a runset file in the run directory. The black
+        boxes are sub-cells verified on their own that the run skips. """
+
+    def __init__(self, cell_name, gds_name, sp_name=None, rules=[], options={}, black_boxes=[]):
+        self.black_boxes = sorted(black_boxes)
+        options = dict(options, black_boxes=tuple(self.black_boxes))
+        verify_runner.verify_job.__init__(self, cell_name, gds_name, sp_name, rules, options)
+
+    def custom_rules(self, custom_file, statement):
+        """ The customization file of the run: the one of the technology
+            and a statement for each black box """
+
+        if not self.black_boxes:
+            return custom_file
+        f = open(self.path(self.kind + "_boxes.svrf"), "w")
+        if custom_file:
+            f.write("INCLUDE {0}\n".format(custom_file))
+        for name in self.black_boxes:
+            f.write(statement.format(name) + "\n")
+        f.close()
+        return self.path(self.kind + "_boxes.svrf")
+
+    def runset(self):
+        return {}
+
+    def write_runset(self):
+        f = open(self.path(self.kind + "_runset"), "w")
+        runset = self.runset()
+        for k in sorted(runset.keys()):
+            f.write("*{0}: {1}\n".format(k, runset[k]))
+        f.close()
+
+    def command(self):
+        return [get_calibre(), "-gui", "-" + self.kind, self.path(self.kind + "_runset"), "-batch"]
+
+    def output(self):
+        """ The standard output of the run """
+
+        return self.path(self.cell_name + "." + self.kind + ".out")
+
+
+class drc_job(calibre_job):
+    """ DRC of a cell """
+
+    kind = "drc"
+
+    def __init__(self, cell_name, gds_name, black_boxes=[]):
+        from tech import drc
+        calibre_job.__init__(self, cell_name, gds_name,
+                             rules=[drc["drc_rules"], drc["drc_custom_rules"], drc["layer_map"]],
+                             options={"custom_options" : drc["custom_options"]},
+                             black_boxes=black_boxes)
+
+    def runset(self):
+        from tech import drc
+        return {
+            'cmnCustomFileName': self.custom_rules(drc["drc_custom_rules"], "EXCLUDE CELL {0}"),
+            'cmnCustomFileOverrideValues' : drc["custom_options"],
+            'cmnUseCustomFile': 1,
+            'drcRulesFile': drc["drc_rules"],
+            'drcRunDir': self.run_dir,
+            'drcLayoutPaths': self.gds_name,
+            'drcExtraLayoutPaths': drc["drcExtraLayoutPaths"],
+            'drcGoldenLayoutPaths': drc["drc_golden"],
+            'drcLayoutPrimary': self.cell_name,
+            'drcLayoutSystem': 'GDSII',
+            'drcResultsformat': 'ASCII',
+            'drcResultsFile': self.path(self.cell_name + ".drc.results"),
+            'drcSummaryFile': self.path(self.cell_name + ".drc.summary"),
+            'cmnFDILayerMapFile': drc["layer_map"],
+            'drcLayoutGetFromViewer': 0,
+            'cmnFDIUseLayerMap': 1,
+            'cmnTranscriptFile': self.path(self.cell_name + "calibredrc.log"),
+            'cmnDRCMaxVertexCount': 199,
+            'drcCellName': 1,
+            'cmnRunHyper': 1,
+            'cmnRunMT': 1,
+            'cmnTranscriptEchoToFile': 1,
+            'cmnSaveTVFRulesToSVRF': 1,
+            'drcUserRecipes': ''}
+
+    def parse(self):
+        return verify_results.parse_drc_summary(self.cell_name,
+                                                self.path(self.cell_name + ".drc.summary"))
+
+
+class lvs_job(calibre_job):
+    """ LVS of a cell. Final verification will ensure that there are no
+        remaining virtual conections. """
+
+    kind = "lvs"
+
+    def __init__(self, cell_name, gds_name, sp_name, final_verification=False, black_boxes=[]):
+        from tech import drc
+        self.final_verification = final_verification
+        calibre_job.__init__(self, cell_name, gds_name, sp_name,
+                             rules=[drc["lvs_rules"], drc["lvs_custom_rules"], drc["layer_map"]],
+                             options={"final_verification" : final_verification},
+                             black_boxes=black_boxes)
+
+    def runset(self):
+        from tech import drc
+        lvs_runset = {
+            'cmnCustomFileName': self.custom_rules(drc["lvs_custom_rules"], "LVS BOX {0}"),
+            'cmnUseCustomFile': 1,
+            'lvsRulesFile': drc["lvs_rules"],
+            'lvsRunDir': self.run_dir,
+            'lvsLayoutPaths': self.gds_name,
+            'lvsLayoutPrimary': self.cell_name,
+            'lvsSourcePath': self.sp_name,
+            'lvsSourcePrimary': self.cell_name,
+            'lvsSourceSystem': 'SPICE',
+            'lvsSpiceFile': self.path("extracted.sp"),
+            'lvsPowerNames': 'vdd',
+            'lvsGroundNames': 'gnd',
+            'lvsIncludeSVRFCmds': 1,
+            'lvsIgnorePorts': 1,
+            'lvsERCDatabase': self.path(self.cell_name + ".erc.results"),
+            'lvsERCSummaryFile': self.path(self.cell_name + ".erc.summary"),
+            'lvsReportFile': self.path(self.cell_name + ".lvs.report"),
+            'lvsMaskDBFile': self.path(self.cell_name + ".maskdb"),
+            'cmnFDILayerMapFile': drc["layer_map"],
+            'cmnFDIUseLayerMap': 1,
+            'lvsRecognizeGates': 'NONE'
+        }
+
+        # This should be removed for final verification
+        if not self.final_verification:
+            lvs_runset['cmnVConnectReport']=1
+            lvs_runset['cmnVConnectNamesState']='SOME'
+            lvs_runset['cmnVConnectNames']='vdd gnd'
+        return lvs_runset
+
+    def parse(self):
+        return verify_results.parse_lvs_report(self.cell_name,
+                                               self.path(self.cell_name + ".lvs.report"),
+                                               self.path(self.cell_name + ".erc.results"),
+                                               self.output())
+
+
+class pex_job(calibre_job):
+    """ Parasitic extraction of a cell into the output netlist """
+
+    kind = "pex"
+
+    # The extracted netlist is written by the run itself
+    cacheable = False
+
+    def __init__(self, cell_name, gds_name, sp_name, output):
+        from tech import drc
+        self.output_name = output
+        calibre_job.__init__(self, cell_name, gds_name, sp_name, rules=[drc["xrc_rules"]])
+
+    def runset(self):
+        from tech import drc
+        return {
+            'pexRulesFile': drc["xrc_rules"],
+            'pexRunDir': self.run_dir,
+            'pexLayoutPaths': self.gds_name,
+            'pexLayoutPrimary': self.cell_name,
+            'pexSourcePath': self.sp_name,
+            'pexSourcePrimary': self.cell_name,
+            'pexReportFile': self.path(self.cell_name + ".lvs.report"),
+            'pexPexNetlistFile': self.output_name,
+            'pexPexReportFile': self.path(self.cell_name + ".pex.report"),
+            'pexMaskDBFile': self.path(self.cell_name + ".maskdb"),
+            'cmnFDIDEFLayoutPath': self.path(self.cell_name + ".def"),
+        }
+
+    def parse(self):
+        return verify_results.parse_output(self.cell_name, self.kind, self.output())
+
+
+def report(job):
+    """ Print the result of a check as it finishes """
+
+    result = job.result
+    source = " (cached)" if job.cached else ""
+    if result["status"] == "FAILED":
+        for e in result["messages"]:
+            debug.error(e)
+        return
+    if job.kind == "drc":
+        # always display this summary
+        summary = "{0}\tGeometries: {1}\tChecks: {2}\tErrors: {3}{4}".format(result["cell"],
+                                                                            result["geometries"],
+                                                                            result["checks"],
+                                                                            result["errors"],
+                                                                            source)
+        if result["errors"] > 0:
+            debug.error(summary)
+            for (rule, count) in sorted(result["rules"].items()):
+                debug.error("{0}\t{1}: {2}".format(result["cell"], rule, count))
+        else:
+            debug.info(1, summary)
+    else:
+        for e in result["messages"]:
+            debug.error(e)
+        for (rule, count) in sorted(result.get("erc", {}).items()):
+            debug.warning("{0}\tERC {1}: {2}".format(result["cell"], rule, count))
+        debug.info(1, "{0}\t{1}: {2}\tErrors: {3}{4}".format(result["cell"], job.kind.upper(),
+                                                            result["status"], result["errors"],
+                                                            source))
 
-import os
-import debug
-from globals import OPTS, find_exe, get_tool
 
+def run_checks(jobs, num_jobs=None, results=None):
+    """ Run DRC/LVS/PEX jobs concurrently, returns their error counts. The
+        results are added to the verify_report results if given. """
 
-debug.info(2,"Initializing Calibre...")
+    verify_runner.run_jobs(jobs, num_jobs, done=report)
+    for job in jobs:
+        if results != None:
+            results.add(job.result, job.cached)
+        if job.result["status"] == "FAILED":
+            debug.error("Unable to retrieve the {0} results of {1}. Is calibre set up?".format(
+                        job.kind.upper(), job.cell_name), 1)
+    return [job.result["errors"] for job in jobs]
 
-if not OPTS.check_lvsdrc:
-    debug.info(1,"LVS/DRC/PEX disabled.")
-    OPTS.lvsdrc_exe = None
-else:
-    OPTS.lvsdrc_exe = get_tool("LVS/DRC/PEX",["calibre"])
 
 def run_drc(cell_name, gds_name):
     """Run DRC check on a given top-level name which is
        implemented in gds_name."""
 
-    # the runset file contains all the options to run calibre
-    from tech import drc
-    drc_runset = {
-        'cmnCustomFileName': drc["drc_custom_rules"],
-        'cmnCustomFileOverrideValues' : drc["custom_options"],
-        'cmnUseCustomFile': 1,
-        'drcRulesFile': drc["drc_rules"],
-        'drcRunDir': OPTS.AMC_temp,
-        'drcLayoutPaths': gds_name,
-        'drcExtraLayoutPaths': drc["drcExtraLayoutPaths"],
-        'drcGoldenLayoutPaths': drc["drc_golden"],
-        'drcLayoutPrimary': cell_name,
-        'drcLayoutSystem': 'GDSII',
-        'drcResultsformat': 'ASCII',
-        'drcResultsFile': OPTS.AMC_temp + cell_name + ".drc.results",
-        'drcSummaryFile': OPTS.AMC_temp + cell_name + ".drc.summary",
-        'cmnFDILayerMapFile': drc["layer_map"],
-        'drcLayoutGetFromViewer': 0,
-        'cmnFDIUseLayerMap': 1,
-        'cmnTranscriptFile': OPTS.AMC_temp + cell_name + "calibredrc.log",
-        'cmnDRCMaxVertexCount': 199,
-        'drcCellName': 1,
-        'cmnRunHyper': 1,
-        'cmnRunMT': 1,
-        'cmnTranscriptEchoToFile': 1,
-        'cmnSaveTVFRulesToSVRF': 1,
-        'drcUserRecipes': ''}
-
-    # write the runset file
-    f = open(OPTS.AMC_temp + "drc_runset", "w")
-    for k in sorted(drc_runset.keys()):
-        f.write("*{0}: {1}\n".format(k, drc_runset[k]))
-    f.close()
-
-    # run drc
-    cwd = os.getcwd()
-    os.chdir(OPTS.AMC_temp)
-    errfile = "{0}{1}.drc.err".format(OPTS.AMC_temp, cell_name)
-    outfile = "{0}{1}.drc.out".format(OPTS.AMC_temp, cell_name)
-
-    cmd = "{0} -gui -drc {1}drc_runset -batch 2> {2} 1> {3}".format(OPTS.lvsdrc_exe[1],
-                                                                    OPTS.AMC_temp,
-                                                                    errfile,
-                                                                    outfile)
-    debug.info(2, cmd)
-    os.system(cmd)
-    os.chdir(cwd)
-
-    # check the result for these lines in the summary:
-    # TOTAL Original Layer Geometries: 106 (157)
-    # TOTAL DRC RuleChecks Executed:   156
-    # TOTAL DRC Results Generated:     0 (0)
-    try:
-        f = open(drc_runset['drcSummaryFile'], "r")
-    except:
-        debug.error("Unable to retrieve DRC results file. Is calibre set up?",1)
-    results = f.readlines()
-    f.close()
-    # those lines should be the last 3
-    results = results[-3:]
-    geometries = int(re.split(r"\W+", results[0])[5])
-    rulechecks = int(re.split(r"\W+", results[1])[4])
-    errors = int(re.split(r"\W+", results[2])[5])
-
-    # always display this summary
-    if errors > 0:
-        debug.error("{0}\tGeometries: {1}\tChecks: {2}\tErrors: {3}".format(cell_name, 
-                                                                            geometries,
-                                                                            rulechecks,
-                                                                            errors))
-    else:
-        debug.info(1, "{0}\tGeometries: {1}\tChecks: {2}\tErrors: {3}".format(cell_name, 
-                                                                              geometries,
-                                                                              rulechecks,
-                                                                              errors))
-    return errors
+    return run_checks([drc_job(cell_name, gds_name)])[0]
 
 
 def run_lvs(cell_name, gds_name, sp_name, final_verification=False):
@@ -175,217 +322,21 @@ def run_lvs(cell_name, gds_name, sp_name, final_verification=False):
     implemented in gds_name and sp_name. Final verification will
     ensure that there are no remaining virtual conections. """
 
-    from tech import drc
-    lvs_rules = drc["lvs_rules"]
-    lvs_runset = {
-        'cmnCustomFileName':drc["lvs_custom_rules"],
-        'cmnUseCustomFile': 1,
-        'lvsRulesFile': lvs_rules,
-        'lvsRunDir': OPTS.AMC_temp,
-        'lvsLayoutPaths': gds_name,
-        'lvsLayoutPrimary': cell_name,
-        'lvsSourcePath': sp_name,
-        'lvsSourcePrimary': cell_name,
-        'lvsSourceSystem': 'SPICE',
-        'lvsSpiceFile': OPTS.AMC_temp + "extracted.sp",
-        'lvsPowerNames': 'vdd',
-        'lvsGroundNames': 'gnd',
-        'lvsIncludeSVRFCmds': 1,
-        'lvsIgnorePorts': 1,
-        'lvsERCDatabase': OPTS.AMC_temp + cell_name + ".erc.results",
-        'lvsERCSummaryFile': OPTS.AMC_temp + cell_name + ".erc.summary",
-        'lvsReportFile': OPTS.AMC_temp + cell_name + ".lvs.report",
-        'lvsMaskDBFile': OPTS.AMC_temp + cell_name + ".maskdb",
-        'cmnFDILayerMapFile': drc["layer_map"],
-        'cmnFDIUseLayerMap': 1,
-        'lvsRecognizeGates': 'NONE'
-    }
-
-    # This should be removed for final verification
-    if not final_verification:
-        lvs_runset['cmnVConnectReport']=1
-        lvs_runset['cmnVConnectNamesState']='SOME'
-        lvs_runset['cmnVConnectNames']='vdd gnd'
-
-
-
-    # write the runset file
-    f = open(OPTS.AMC_temp + "lvs_runset", "w")
-    for k in sorted(lvs_runset.keys()):
-        f.write("*{0}: {1}\n".format(k, lvs_runset[k]))
-    f.close()
-
-    # run LVS
-    cwd = os.getcwd()
-    os.chdir(OPTS.AMC_temp)
-    errfile = "{0}{1}.lvs.err".format(OPTS.AMC_temp, cell_name)
-    outfile = "{0}{1}.lvs.out".format(OPTS.AMC_temp, cell_name)
-
-    cmd = "{0} -gui -lvs {1}lvs_runset -batch 2> {2} 1> {3}".format(OPTS.lvsdrc_exe[1],
-                                                                    OPTS.AMC_temp,
-                                                                    errfile,
-                                                                    outfile)
-    
-    debug.info(2, cmd)
-    os.system(cmd)
-    os.chdir(cwd)
-
-    # check the result for these lines in the summary:
-    f = open(lvs_runset['lvsReportFile'], "r")
-    results = f.readlines()
-    f.close()
-
-    # NOT COMPARED
-    # CORRECT
-    # INCORRECT
-    test = re.compile("#     CORRECT     #")
-    correct = list(filter(test.search, results))
-    test = re.compile("NOT COMPARED")
-    notcompared = list(filter(test.search, results))
-    test = re.compile("#     INCORRECT     #")
-    incorrect = list(filter(test.search, results))
-
-    # Errors begin with "Error:"
-    test = re.compile(r"\s+Error:")
-    errors = list(filter(test.search, results))
-    for e in errors:
-        debug.error(e.strip("\n"))
-
-    summary_errors = len(notcompared) + len(incorrect) + len(errors)
-
-    # also check the extraction summary file
-    f = open(lvs_runset['lvsReportFile'] + ".ext", "r")
-    results = f.readlines()
-    f.close()
-
-    test = re.compile("ERROR:")
-    exterrors = list(filter(test.search, results))
-    for e in exterrors:
-        debug.error(e.strip("\n"))
-
-    test = re.compile("WARNING:")
-    extwarnings = list(filter(test.search, results))
-    #for e in extwarnings:
-        #debug.warning(e.strip("\n"))
-
-    # MRG - 9/26/17 - Change this to exclude warnings because of
-    # multiple labels on different pins in column mux.
-    ext_errors = len(exterrors)
-    ext_warnings = len(extwarnings) 
-
-    # also check the output file
-    f = open(outfile, "r")
-    results = f.readlines()
-    f.close()
-
-    # Errors begin with "ERROR:"
-    test = re.compile("ERROR:")
-    stdouterrors = list(filter(test.search, results))
-    for e in stdouterrors:
-        debug.error(e.strip("\n"))
-
-    out_errors = len(stdouterrors)
-
-    total_errors = summary_errors + out_errors + ext_errors
-    return total_errors
+    return run_checks([lvs_job(cell_name, gds_name, sp_name, final_verification)])[0]
 
 
 def run_pex(cell_name, gds_name, sp_name, output=None):
     """Run pex on a given top-level name which is
        implemented in gds_name and sp_name. """
-    from tech import drc
+
     if output == None:
-        output = name + ".pex.netlist"
-
-    # check if lvs report has been done
-    # if not run drc and lvs
-    if not os.path.isfile(cell_name + ".lvs.report"):
-        run_drc(cell_name, gds_name)
-        run_lvs(cell_name, gds_name, sp_name)
-
-    pex_rules = drc["xrc_rules"]
-    pex_runset = {
-        'pexRulesFile': pex_rules,
-        'pexRunDir': OPTS.AMC_temp,
-        'pexLayoutPaths': gds_name,
-        'pexLayoutPrimary': cell_name,
-        #'pexSourcePath' : OPTS.AMC_temp+"extracted.sp",
-        'pexSourcePath': sp_name,
-        'pexSourcePrimary': cell_name,
-        'pexReportFile': cell_name + ".lvs.report",
-        'pexPexNetlistFile': output,
-        'pexPexReportFile': cell_name + ".pex.report",
-        'pexMaskDBFile': cell_name + ".maskdb",
-        'cmnFDIDEFLayoutPath': cell_name + ".def",
-    }
-
-    # write the runset file
-    f = open(OPTS.AMC_temp + "pex_runset", "w")
-    for k in sorted(pex_runset.keys()):
-        f.write("*{0}: {1}\n".format(k, pex_runset[k]))
-    f.close()
-
-    # run pex
-    cwd = os.getcwd()
-    os.chdir(OPTS.AMC_temp)
-    errfile = "{0}{1}.pex.err".format(OPTS.AMC_temp, cell_name)
-    outfile = "{0}{1}.pex.out".format(OPTS.AMC_temp, cell_name)
-
-    cmd = "{0} -gui -pex {1}pex_runset -batch 2> {2} 1> {3}".format(OPTS.lvsdrc_exe[1],
-                                                                    OPTS.AMC_temp,
-                                                                    errfile,
-                                                                    outfile)
-    debug.info(2, cmd)
-    os.system(cmd)
-    os.chdir(cwd)
-
-    # also check the output file
-    f = open(outfile, "r")
-    results = f.readlines()
-    f.close()
-
-    # Errors begin with "ERROR:"
-    test = re.compile("ERROR:")
-    stdouterrors = list(filter(test.search, results))
-    for e in stdouterrors:
-        debug.error(e.strip("\n"))
-
-    out_errors = len(stdouterrors)
+        output = OPTS.AMC_temp + cell_name + ".pex.netlist"
+
+    # run drc and lvs (concurrently) before the extraction
+    run_checks([drc_job(cell_name, gds_name), lvs_job(cell_name, gds_name, sp_name)])
+    out_errors = run_checks([pex_job(cell_name, gds_name, sp_name, output)])[0]
 
     assert(os.path.isfile(output))
-    correct_port(cell_name, output, sp_name)
+    verify_results.correct_port(cell_name, output, sp_name)
 
     return out_errors
-
-
-def correct_port(name, output_file_name, ref_file_name):
-    pex_file = open(output_file_name, "r")
-    contents = pex_file.read()
-    # locate the start of circuit definition line
-    match = re.search(".subckt " + str(name) + ".*", contents)
-    match_index_start = match.start()
-    pex_file.seek(match_index_start)
-    rest_text = pex_file.read()
-    # locate the end of circuit definition line
-    match = re.search(r"\* \n", rest_text)
-    match_index_end = match.start()
-    # store the unchanged part of pex file in memory
-    pex_file.seek(0)
-    part1 = pex_file.read(match_index_start)
-    pex_file.seek(match_index_start + match_index_end)
-    part2 = pex_file.read()
-    pex_file.close()
-
-    # obtain the correct definition line from the original spice file
-    sp_file = open(ref_file_name, "r")
-    contents = sp_file.read()
-    circuit_title = re.search(".SUBCKT " + str(name) + ".*\n", contents)
-    circuit_title = circuit_title.group()
-    sp_file.close()
-
-    # write the new pex file with info in the memory
-    output_file = open(output_file_name, "w")
-    output_file.write(part1)
-    output_file.write(circuit_title)
-    output_file.write(part2)
-    output_file.close()
@@ -0,0 +1,157 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Compressed output and input files.
+
+An output file whose name ends with .gz or .zst is written through a
+compressor (gzip, or zstd with the zstandard package) running in a
+background thread: the writes only queue blocks of data, so the
+compression of a large netlist or layout overlaps with its generation
+(zlib and zstd release the GIL while they compress). Other names are
+plain files.
+
+An input file is decompressed as it is read when its first bytes are the
+ones of a gzip or zstd stream, whatever its name. """
+
+import io
+import gzip
+import queue
+import threading
+import debug
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Compression by file name extension and by the first bytes of a file
+extensions = {".gz" : "gzip", ".zst" : "zstd"}
+magic_numbers = {b"\x1f\x8b" : "gzip", b"\x28\xb5\x2f\xfd" : "zstd"}
+
+# Size of the blocks handed to the compressor thread
+block_size = 1 << 20
+
+# Blocks waiting for the compressor, a slower compressor blocks the writes
+queue_blocks = 16
+
+gzip_level = 6
+zstd_level = 3
+
+
+def compression(filename):
+    """ "gzip", "zstd" or None from the extension of a file name """
+
+    for (extension, kind) in extensions.items():
+        if str(filename).endswith(extension):
+            return kind
+    return None
+
+
+def file_compression(filename):
+    """ "gzip", "zstd" or None from the first bytes of a file """
+
+    with open(filename, "rb") as f:
+        head = f.read(4)
+    for (number, kind) in magic_numbers.items():
+        if head.startswith(number):
+            return kind
+    return None
+
+
+def check_zstandard(filename):
+    if zstandard == None:
+        debug.error("The zstandard package is needed for {0}".format(filename), -1)
+
+
+class compressed_writer(io.RawIOBase):
+    """ A binary output file compressed by a background thread """
+
+    def __init__(self, filename, kind):
+        io.RawIOBase.__init__(self)
+        self.filename = filename
+        self.file = open(filename, "wb")
+        if kind == "zstd":
+            check_zstandard(filename)
+            compressor = zstandard.ZstdCompressor(level=zstd_level)
+            self.stream = compressor.stream_writer(self.file, closefd=False)
+        else:
+            self.stream = gzip.GzipFile(fileobj=self.file, mode="wb", compresslevel=gzip_level)
+        self.blocks = queue.Queue(queue_blocks)
+        self.error = None
+        self.thread = threading.Thread(target=self.compress, daemon=True)
+        self.thread.start()
+
+    def compress(self):
+        """ Compress the queued blocks until the None that ends the file """
+
+        while True:
+            block = self.blocks.get()
+            if block == None:
+                break
+            if self.error:
+                continue
+            try:
+                self.stream.write(block)
+            except Exception as e:
+                self.error = e
+        try:
+            self.stream.close()
+        except Exception as e:
+            self.error = self.error or e
+        self.file.close()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.error:
+            raise self.error
+        self.blocks.put(bytes(data))
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        io.RawIOBase.close(self)
+        self.blocks.put(None)
+        self.thread.join()
+        if self.error:
+            raise IOError("Unable to write {0}: {1}".format(self.filename, self.error))
+
+
+def open_output(filename, mode="w"):
+    """ A file to write, text ("w") or binary ("wb"), compressed by the
+        extension of its name """
+
+    kind = compression(filename)
+    if kind == None:
+        return open(filename, mode)
+    output = io.BufferedWriter(compressed_writer(filename, kind), block_size)
+    if "b" in mode:
+        return output
+    return io.TextIOWrapper(output)
+
+
+def open_input(filename, mode="r"):
+    """ A file to read, text ("r") or binary ("rb"), decompressed when it
+        is compressed """
+
+    kind = file_compression(filename)
+    if kind == None:
+        return open(filename, mode)
+    if kind == "gzip":
+        return gzip.open(filename, "rb" if "b" in mode else "rt")
+    check_zstandard(filename)
+    reader = zstandard.ZstdDecompressor().stream_reader(open(filename, "rb"), closefd=True)
+    data = io.BufferedReader(reader, block_size)
+    if "b" in mode:
+        return data
+    return io.TextIOWrapper(data)
@@ -196,12 +196,18 @@ class contact(design.design):
                       width=extra_width,
                       height=extra_height)
 
-# This is not instantiated and used for calculations only.
-# These are static 1x1 contacts to reuse in all the design modules.
-well = contact(layer_stack=("active", "contact", "metal1"))
-active = contact(layer_stack=("active", "contact", "metal1"))
-poly = contact(layer_stack=("poly", "contact", "metal1"))
-m1m2 = contact(layer_stack=("metal1", "via1", "metal2"))
-m2m3 = contact(layer_stack=("metal2", "via2", "metal3"))
-m3m4 = contact(layer_stack=("metal3", "via3", "metal4"))
-
+# These are not instantiated and used for calculations only.
+# These are static 1x1 contacts to reuse in all the design modules,
+# each one is created the first time it is used (e.g. contact.m1m2).
+default_contacts = {"well" : ("active", "contact", "metal1"),
+                    "active" : ("active", "contact", "metal1"),
+                    "poly" : ("poly", "contact", "metal1"),
+                    "m1m2" : ("metal1", "via1", "metal2"),
+                    "m2m3" : ("metal2", "via2", "metal3"),
+                    "m3m4" : ("metal3", "via3", "metal4")}
+
+def __getattr__(name):
+    if name not in default_contacts:
+        raise AttributeError("module {0} has no attribute {1}".format(__name__, name))
+    globals()[name] = contact(layer_stack=default_contacts[name])
+    return globals()[name]
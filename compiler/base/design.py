@@ -14,6 +14,8 @@ import hierarchy_spice
 import globals
 import debug
 import os
+import functools
+import profiler
 from globals import OPTS
 from tech import drc, layer
 
@@ -21,6 +23,38 @@ class design(hierarchy_spice.spice, hierarchy_layout.layout):
     """ Design Class for all modules to inherit the base features.
         Class consisting of a set of modules and instances of these modules """
     name_map = []
+    # Nesting depth of the designs being constructed. Names only have to be
+    # unique within one top-level design, so a new one starts a new name map.
+    build_depth = 0
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "__init__" in cls.__dict__:
+            cls.__init__ = design.track_build(cls.__dict__["__init__"])
+
+    @staticmethod
+    def track_build(init):
+        """ Wrap the constructor of a design to know when a top-level design
+            starts and to profile it """
+
+        class_name = init.__qualname__.split(".")[0]
+
+        @functools.wraps(init)
+        def build(self, *args, **kwargs):
+            if design.build_depth == 0:
+                design.name_map = []
+            design.build_depth += 1
+            # Time the construction with --profile
+            running = profiler.current
+            if running:
+                running.enter(class_name, self)
+            try:
+                init(self, *args, **kwargs)
+            finally:
+                design.build_depth -= 1
+                if running:
+                    running.leave(self)
+        return build
 
     def __init__(self, name):
         self.gds_file = OPTS.AMC_tech + "gds_lib/" + name + ".gds"
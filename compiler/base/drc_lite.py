@@ -0,0 +1,495 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" A native DRC of the rules the layouts are generated with.
+
+It is not a signoff DRC, it catches the regressions of the generators
+where Calibre isn't installed. The rules come from tech.drc:
+
+* minwidth_<layer>: width of the merged shapes of a layer,
+* <layer>_to_<layer>: spacing between shapes, and notches inside a shape,
+  except for poly: poly_to_poly is the spacing of the gates (poly over
+  active) as in the signoff decks (Poly.2), field poly has no spacing
+  rule there and the library cells abut field poly closer than it,
+* minarea_<layer>: area of each merged shape,
+* <layer>_enclosure_<via>: enclosure of the contacts and vias on all sides
+  by the layers of their stack (the smallest of the enclosure and extend
+  rules, as contact builds them).
+
+The layout is flattened into rectangles (see flat_gds) in integer
+database units. The touching rectangles of a layer are merged into shapes
+by union-find over a grid index, and each shape is cut into horizontal
+and vertical slabs by a sweep over its edges: a run of a slab narrower
+than the width rule, or a gap between two runs narrower than the spacing
+rule, is a violation. The spacing between shapes is checked between the
+slabs of neighbouring shapes found with the grid index, by euclidean
+distance. All of it is O(n log n) for the local shapes of a layout.
+
+The check can be limited to windows of the layout (the changes of an
+incremental run), with the whole shapes that touch them. The layers are
+checked in parallel processes (OPTS.verify_jobs). The violations are
+written to <name>.drc_lite.results and as marker boxes in
+<name>.drc_lite.gds, one datatype per rule of marker_layer, to open over
+the layout. """
+
+import os
+import datetime
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import debug
+import gdsMill
+from globals import OPTS
+from tech import drc, layer, GDS
+import flat_gds
+
+# The layer of the marker boxes in the overlay GDS
+marker_layer = 255
+
+# The contact and via stacks: (bottom layer, via, top layer)
+layer_stacks = [("active", "contact", "metal1"),
+                ("poly", "contact", "metal1"),
+                ("metal1", "via1", "metal2"),
+                ("metal2", "via2", "metal3"),
+                ("metal3", "via3", "metal4")]
+
+# The rule names of layers that share the rules of another one
+rule_aliases = {"active_contact" : "contact",
+                "nwell" : "well",
+                "pwell" : "well",
+                "pimplant" : "implant",
+                "nimplant" : "implant"}
+
+
+def layer_number(name):
+    """ GDS layer number of a layer, None if the technology doesn't have it """
+
+    if name not in layer or layer[name][0] < 0:
+        return None
+    return layer[name][0]
+
+
+def rule(kind, name, db_per_um):
+    """ A rule of a layer in database units, 0 if there is none """
+
+    for rule_name in [name, rule_aliases.get(name)]:
+        if rule_name == None:
+            continue
+        key = kind.format(rule_name)
+        if key in drc and drc[key]:
+            return int(round(drc[key]*db_per_um))
+    return 0
+
+
+# The layers whose spacing rule only applies where they overlap another
+# one: {layer : (overlapped layer, name of the overlap)}
+overlap_spacing = {"poly" : ("active", "gate")}
+
+
+def layer_rules(db_per_um):
+    """ {layer number : (name, width, space, area)} of the layers with rules """
+
+    rules = {}
+    for name in sorted(layer.keys(), key=str):
+        number = layer_number(name)
+        if number == None or name == "boundary" or name.endswith("pin") or number in rules:
+            continue
+        width = rule("minwidth_{0}", name, db_per_um)
+        space = rule("{0}_to_{0}", name, db_per_um)
+        # The area rules are in um^2
+        area = rule("minarea_{0}", name, db_per_um)*db_per_um
+        if width or space or area:
+            rules[number] = (name, width, space, area)
+    return rules
+
+
+def enclosure_rules(db_per_um):
+    """ [(via name, via layer, enclosing name, enclosing layer, enclosure)] """
+
+    rules = []
+    for (bottom, via, top) in layer_stacks:
+        via_name = "active_" + via if "active" in (bottom, top) else via
+        for outer in (bottom, top):
+            numbers = (layer_number(via_name), layer_number(outer))
+            if None in numbers:
+                continue
+            values = [drc.get("{0}_{1}_{2}".format(outer, kind, via), 0)
+                      for kind in ("enclosure", "extend")]
+            values = [v for v in values if v]
+            if values:
+                rules.append((via_name, numbers[0], outer, numbers[1],
+                              int(round(min(values)*db_per_um))))
+    return rules
+
+
+class grid_index():
+    """ Rectangles binned in a square grid to find their neighbours """
+
+    def __init__(self, size):
+        self.size = max(1, size)
+        self.bins = {}
+
+    def cells(self, rect):
+        s = self.size
+        for i in range(rect[0]//s, rect[2]//s + 1):
+            for j in range(rect[1]//s, rect[3]//s + 1):
+                yield (i, j)
+
+    def insert(self, key, rect):
+        for cell in self.cells(rect):
+            self.bins.setdefault(cell, []).append(key)
+
+    def query(self, rect):
+        """ The keys of the rectangles in the cells of rect (a superset of
+            the ones that touch it) """
+
+        found = set()
+        for cell in self.cells(rect):
+            found.update(self.bins.get(cell, []))
+        return found
+
+
+def bin_size(rects):
+    """ A grid size of a few typical rectangles """
+
+    if not rects:
+        return 1
+    sizes = sorted(max(r[2]-r[0], r[3]-r[1]) for r in rects)
+    return max(1, 4*sizes[len(sizes)//2])
+
+
+def touch(a, b):
+    """ Rectangles that overlap or share a piece of edge (not only a corner) """
+
+    dx = min(a[2], b[2]) - max(a[0], b[0])
+    dy = min(a[3], b[3]) - max(a[1], b[1])
+    return dx >= 0 and dy >= 0 and (dx > 0 or dy > 0)
+
+
+def shapes(rects):
+    """ The rectangles grouped into merged shapes by union-find """
+
+    parent = list(range(len(rects)))
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    index = grid_index(bin_size(rects))
+    for (i, rect) in enumerate(rects):
+        for j in index.query(rect):
+            if touch(rect, rects[j]):
+                (a, b) = (find(i), find(j))
+                if a != b:
+                    parent[a] = b
+        index.insert(i, rect)
+
+    groups = {}
+    for i in range(len(rects)):
+        groups.setdefault(find(i), []).append(rects[i])
+    return list(groups.values())
+
+
+def slabs(rects):
+    """ The union of rectangles as horizontal slabs [(y1, y2, runs)], where
+        runs are the merged [x1, x2] intervals between y1 and y2 """
+
+    ys = sorted(set([r[1] for r in rects] + [r[3] for r in rects]))
+    pending = sorted(rects, key=lambda r: r[1])
+    active = []
+    result = []
+    k = 0
+    for (y1, y2) in zip(ys, ys[1:]):
+        while k < len(pending) and pending[k][1] <= y1:
+            active.append(pending[k])
+            k += 1
+        active = [r for r in active if r[3] > y1]
+        runs = []
+        for (x1, x2) in sorted((r[0], r[2]) for r in active):
+            if runs and x1 <= runs[-1][1]:
+                runs[-1][1] = max(runs[-1][1], x2)
+            else:
+                runs.append([x1, x2])
+        if not runs:
+            continue
+        # Consecutive slabs with the same runs are one slab
+        if result and result[-1][1] == y1 and result[-1][2] == runs:
+            result[-1] = (result[-1][0], y2, runs)
+        else:
+            result.append((y1, y2, runs))
+    return result
+
+
+def transpose(rect):
+    return (rect[1], rect[0], rect[3], rect[2])
+
+
+def shape_violations(name, rects, width, space, area):
+    """ Width, notch and area violations of one merged shape """
+
+    violations = []
+    horizontal = slabs(rects)
+    for vertical in (False, True):
+        cut = slabs([transpose(r) for r in rects]) if vertical else horizontal
+        for (y1, y2, runs) in cut:
+            boxes = []
+            for (x1, x2) in runs:
+                if width and x2 - x1 < width:
+                    boxes.append(("width", (x1, y1, x2, y2)))
+            for (a, b) in zip(runs, runs[1:]):
+                if space and b[0] - a[1] < space:
+                    boxes.append(("space", (a[1], y1, b[0], y2)))
+            for (kind, box) in boxes:
+                violations.append(("{0}.{1}".format(name, kind), transpose(box) if vertical else box))
+    if area:
+        total = sum((y2 - y1)*sum(x2 - x1 for (x1, x2) in runs) for (y1, y2, runs) in horizontal)
+        if total < area:
+            violations.append(("{0}.area".format(name), bounding_box(rects)))
+    return violations
+
+
+def bounding_box(rects):
+    return (min(r[0] for r in rects), min(r[1] for r in rects),
+            max(r[2] for r in rects), max(r[3] for r in rects))
+
+
+def gap(a, b):
+    """ The box between two rectangles and its euclidean length squared """
+
+    (gx1, gx2) = (a[2], b[0]) if a[2] <= b[0] else (b[2], a[0]) if b[2] <= a[0] else \
+                 (max(a[0], b[0]), min(a[2], b[2]))
+    (gy1, gy2) = (a[3], b[1]) if a[3] <= b[1] else (b[3], a[1]) if b[3] <= a[1] else \
+                 (max(a[1], b[1]), min(a[3], b[3]))
+    dx = max(0, b[0] - a[2], a[0] - b[2])
+    dy = max(0, b[1] - a[3], a[1] - b[3])
+    return ((min(gx1, gx2), min(gy1, gy2), max(gx1, gx2), max(gy1, gy2)), dx*dx + dy*dy)
+
+
+def check_layer(name, rects, width, space, area):
+    """ All the width, spacing and area violations of a layer """
+
+    groups = shapes(rects)
+    violations = []
+    pieces = []
+    for (shape, group) in enumerate(groups):
+        violations.extend(shape_violations(name, group, width, space, area))
+        for (y1, y2, runs) in slabs(group):
+            pieces.extend((shape, (x1, y1, x2, y2)) for (x1, x2) in runs)
+
+    # The spacing between the slabs of different shapes
+    if space:
+        index = grid_index(max(space, bin_size([p[1] for p in pieces])))
+        # One marker per pair of shapes, around all of their gaps
+        pairs = {}
+        for (i, (shape, rect)) in enumerate(pieces):
+            halo = (rect[0] - space, rect[1] - space, rect[2] + space, rect[3] + space)
+            for j in index.query(halo):
+                (other, other_rect) = pieces[j]
+                if other == shape:
+                    continue
+                (box, distance) = gap(rect, other_rect)
+                if 0 < distance < space*space:
+                    pair = (min(shape, other), max(shape, other))
+                    pairs[pair] = bounding_box([box, pairs[pair]]) if pair in pairs else box
+            index.insert(i, rect)
+        violations.extend(("{0}.space".format(name), box) for box in pairs.values())
+    return violations
+
+
+def overlaps(rects, others):
+    """ The intersections of the rectangles of two layers """
+
+    index = grid_index(bin_size(others))
+    for (i, rect) in enumerate(others):
+        index.insert(i, rect)
+    result = []
+    for rect in rects:
+        for j in index.query(rect):
+            other = others[j]
+            box = (max(rect[0], other[0]), max(rect[1], other[1]),
+                   min(rect[2], other[2]), min(rect[3], other[3]))
+            if box[0] < box[2] and box[1] < box[3]:
+                result.append(box)
+    return result
+
+
+def clip(rects, windows):
+    """ The merged shapes of rects that touch a window, whole """
+
+    index = grid_index(bin_size(windows))
+    for (i, window) in enumerate(windows):
+        index.insert(i, window)
+    kept = []
+    for group in shapes(rects):
+        if any(touch(rect, windows[i]) or inside(rect, windows[i])
+               for rect in group for i in index.query(rect)):
+            kept.extend(group)
+    return kept
+
+
+def inside(a, b):
+    """ A rectangle (or point) that is within another one """
+
+    return b[0] <= a[0] and b[1] <= a[1] and a[2] <= b[2] and a[3] <= b[3]
+
+
+def check_enclosure(via_name, vias, outer_name, outer, enclosure):
+    """ The vias that are not enclosed by the outer layer on all sides """
+
+    pieces = []
+    for group in shapes(outer):
+        for (y1, y2, runs) in slabs(group):
+            pieces.extend((x1, y1, x2, y2) for (x1, x2) in runs)
+    index = grid_index(bin_size(pieces))
+    for (i, rect) in enumerate(pieces):
+        index.insert(i, rect)
+
+    violations = []
+    for via in set(vias):
+        box = (via[0] - enclosure, via[1] - enclosure, via[2] + enclosure, via[3] + enclosure)
+        # The slabs of the merged shapes don't overlap, so their areas add up
+        covered = 0
+        for j in index.query(box):
+            p = pieces[j]
+            dx = min(box[2], p[2]) - max(box[0], p[0])
+            dy = min(box[3], p[3]) - max(box[1], p[1])
+            if dx > 0 and dy > 0:
+                covered += dx*dy
+        if covered < (box[2] - box[0])*(box[3] - box[1]):
+            violations.append(("{0}.enclosure.{1}".format(via_name, outer_name), box))
+    return violations
+
+
+class drc_lite():
+    """ Width, spacing, enclosure and area checks of a GDS file """
+
+    def __init__(self, cell_name, gds_name, windows=None):
+        self.cell_name = cell_name
+        self.gds_name = gds_name
+        # Check only around these boxes (in microns) if given
+        self.windows = windows
+        self.violations = []
+
+    def tasks(self, layout):
+        """ The (function, arguments) of the checks, one per layer and per
+            enclosure rule """
+
+        tasks = []
+        for (number, (name, width, space, area)) in sorted(layer_rules(layout.db_per_um).items()):
+            if not layout.rects.get(number):
+                continue
+            if name in overlap_spacing:
+                (other, overlap_name) = overlap_spacing[name]
+                other_rects = layout.rects.get(layer_number(other)) or []
+                if space and other_rects:
+                    tasks.append((check_layer, (overlap_name, overlaps(layout.rects[number], other_rects),
+                                                0, space, 0)))
+                space = 0
+            tasks.append((check_layer, (name, layout.rects[number], width, space, area)))
+        for (via_name, via, outer_name, outer, enclosure) in enclosure_rules(layout.db_per_um):
+            if layout.rects.get(via):
+                tasks.append((check_enclosure, (via_name, layout.rects[via], outer_name,
+                                                layout.rects.get(outer, []), enclosure)))
+        return tasks
+
+    def run(self, num_jobs=None):
+        """ Check the layout, returns a result like the ones of verify_runner """
+
+        start_time = datetime.datetime.now()
+        layout = flat_gds.flat_gds(self.gds_name, self.cell_name)
+        self.db_per_um = layout.db_per_um
+        if self.windows != None:
+            windows = [tuple(layout.to_db(c) for c in box) for box in self.windows]
+            layout.rects = dict((number, clip(rects, windows) if windows else [])
+                                for (number, rects) in layout.rects.items())
+        tasks = self.tasks(layout)
+        num_jobs = max(1, min(num_jobs or OPTS.verify_jobs, len(tasks)))
+        if num_jobs == 1:
+            results = [function(*args) for (function, args) in tasks]
+        else:
+            context = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(max_workers=num_jobs, mp_context=context) as pool:
+                futures = [pool.submit(function, *args) for (function, args) in tasks]
+                results = [future.result() for future in futures]
+        self.violations = sorted(v for result in results for v in result)
+        if self.windows != None:
+            self.violations = [(rule_name, box) for (rule_name, box) in self.violations
+                               if any(touch(box, window) or inside(box, window)
+                                      for window in windows)]
+
+        rules = {}
+        for (rule_name, box) in self.violations:
+            rules[rule_name] = rules.get(rule_name, 0) + 1
+        self.write_results()
+        self.write_markers()
+        runtime = (datetime.datetime.now() - start_time).total_seconds()
+        return {"cell" : self.cell_name,
+                "kind" : "drc",
+                "status" : "CLEAN" if not self.violations else "ERRORS",
+                "errors" : len(self.violations),
+                "rules" : rules,
+                "geometries" : layout.count(),
+                "checks" : len(tasks),
+                "messages" : [],
+                "runtime" : runtime}
+
+    def output_name(self, extension):
+        return os.path.splitext(self.gds_name)[0] + ".drc_lite." + extension
+
+    def um(self, box):
+        return tuple(float(c)/self.db_per_um for c in box)
+
+    def write_results(self):
+        """ The violations by rule, with their boxes in microns """
+
+        f = open(self.output_name("results"), "w")
+        f.write("DRC lite results of {0} ({1})\n".format(self.cell_name, self.gds_name))
+        rule_names = sorted(set(r for (r, box) in self.violations))
+        for rule_name in rule_names:
+            boxes = [box for (r, box) in self.violations if r == rule_name]
+            f.write("RULECHECK {0} TOTAL Result Count = {1}\n".format(rule_name, len(boxes)))
+            for box in boxes:
+                f.write("  {0} {1} {2} {3}\n".format(*self.um(box)))
+        f.write("TOTAL DRC Results Generated: {0}\n".format(len(self.violations)))
+        f.close()
+
+    def write_markers(self):
+        """ A GDS of marker boxes to open over the layout, the datatype is
+            the index of the rule in the results file """
+
+        markers = gdsMill.VlsiLayout(name=self.cell_name + "_drc", units=GDS["unit"])
+        rule_names = sorted(set(r for (r, box) in self.violations))
+        for (rule_name, box) in self.violations:
+            (x1, y1, x2, y2) = self.um(box)
+            # Keep zero-width boxes (touching corners) visible
+            markers.addBox(layerNumber=marker_layer, dataType=rule_names.index(rule_name),
+                           offsetInMicrons=(x1, y1), width=max(x2 - x1, 0.001),
+                           height=max(y2 - y1, 0.001))
+            markers.addText(rule_name, layerNumber=marker_layer,
+                            offsetInMicrons=((x1 + x2)/2, (y1 + y2)/2))
+        gdsMill.Gds2writer(markers).writeToFile(self.output_name("gds"))
+
+
+def run_drc(cell_name, gds_name):
+    """ Run the native DRC of a layout, returns the number of violations """
+
+    result = drc_lite(cell_name, gds_name).run()
+    summary = "{0}\tGeometries: {1}\tChecks: {2}\tErrors: {3}".format(cell_name,
+                                                                     result["geometries"],
+                                                                     result["checks"],
+                                                                     result["errors"])
+    if result["errors"] > 0:
+        debug.error(summary)
+        for (rule_name, count) in sorted(result["rules"].items()):
+            debug.error("{0}\t{1}: {2}".format(cell_name, rule_name, count))
+    else:
+        debug.info(1, summary)
+    return result["errors"]
@@ -0,0 +1,182 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" A GDS (or OASIS, .oas) layout flattened into rectangles.
+
+The structures are read with gdsMill and every shape is brought to the
+coordinates of the top structure as integer (x1, y1, x2, y2) rectangles in
+database units, by layer number. Boundaries are cut into rectangles (a
+rectangle stays one), manhattan paths give one rectangle per segment. The
+shapes of a structure are flattened once and then placed by each of its
+references, which are orthogonal (mirror about x, then rotation by a
+multiple of 90 degrees, then offset). """
+
+import debug
+import gdsMill
+from tech import GDS
+
+
+def transform_point(point, mirror, angle, offset):
+    """ A point of a referenced structure in the coordinates of the parent """
+
+    (x, y) = point
+    if mirror:
+        y = -y
+    for i in range((angle//90) % 4):
+        (x, y) = (-y, x)
+    return (x + offset[0], y + offset[1])
+
+
+def transform_rect(rect, mirror, angle, offset):
+    """ A rectangle of a referenced structure in the coordinates of the parent """
+
+    (ax, ay) = transform_point(rect[0:2], mirror, angle, offset)
+    (bx, by) = transform_point(rect[2:4], mirror, angle, offset)
+    return (min(ax, bx), min(ay, by), max(ax, bx), max(ay, by))
+
+
+def polygon_rects(points):
+    """ The rectangles of a rectilinear polygon, cut into horizontal slabs
+        between its distinct y coordinates """
+
+    points = [(int(round(x)), int(round(y))) for (x, y) in points]
+    if points[0] == points[-1]:
+        points = points[:-1]
+    xs = set(x for (x, y) in points)
+    ys = sorted(set(y for (x, y) in points))
+    if len(points) == 4 and len(xs) == 2 and len(ys) == 2:
+        return [(min(xs), ys[0], max(xs), ys[1])]
+
+    edges = [(points[i], points[(i+1) % len(points)]) for i in range(len(points))]
+    if any(a[0] != b[0] and a[1] != b[1] for (a, b) in edges):
+        debug.warning("Non-manhattan polygon, using its bounding box")
+        return [(min(xs), ys[0], max(xs), ys[-1])]
+    vertical = [(a[0], min(a[1], b[1]), max(a[1], b[1])) for (a, b) in edges if a[0] == b[0]]
+    rects = []
+    for (y1, y2) in zip(ys, ys[1:]):
+        # The edges crossing the slab, inside between odd and even crossings
+        crossings = sorted(x for (x, ya, yb) in vertical if ya <= y1 and yb >= y2)
+        for i in range(0, len(crossings) - 1, 2):
+            rects.append((crossings[i], y1, crossings[i+1], y2))
+    return rects
+
+
+def path_rects(points, width, path_type):
+    """ The rectangles of a manhattan path, extended by half of the width at
+        the ends for path type 2 """
+
+    points = [(int(round(x)), int(round(y))) for (x, y) in points]
+    half = int(round(width))//2
+    extend = half if path_type == 2 else 0
+    rects = []
+    for (a, b) in zip(points, points[1:]):
+        if a[1] == b[1]:
+            rects.append((min(a[0], b[0]) - extend, a[1] - half, max(a[0], b[0]) + extend, a[1] + half))
+        elif a[0] == b[0]:
+            rects.append((a[0] - half, min(a[1], b[1]) - extend, a[0] + half, max(a[1], b[1]) + extend))
+        else:
+            debug.warning("Non-manhattan path segment, using its bounding box")
+            rects.append((min(a[0], b[0]), min(a[1], b[1]), max(a[0], b[0]), max(a[1], b[1])))
+    return rects
+
+
+class flat_gds():
+    """ Rectangles and labels of a GDS file by layer number, in the
+        database units of the top structure """
+
+    def __init__(self, gds_name, top=None, flatten=True):
+        self.gds_name = gds_name
+        self.layout = gdsMill.VlsiLayout(units=GDS["unit"])
+        if gds_name.lower().endswith(".oas"):
+            reader = gdsMill.OasisReader(self.layout)
+        else:
+            reader = gdsMill.Gds2reader(self.layout)
+        reader.loadFromFile(gds_name)
+        # The structures by name, without the padding of the odd length names
+        self.structures = dict((name.rstrip("\x00"), structure)
+                               for (name, structure) in self.layout.structures.items())
+        self.top = top
+        if top not in self.structures:
+            self.top = self.layout.rootStructureName.rstrip("\x00")
+        # Database units per micron
+        self.db_per_um = int(round(1.0/GDS["unit"][0]))
+        # Flattened (rects, labels) of each structure by name
+        self.flattened = {}
+        if flatten:
+            (self.rects, self.labels) = self.flatten(self.top)
+
+    def to_db(self, microns):
+        return int(round(microns*self.db_per_um))
+
+    def to_um(self, db):
+        return float(db)/self.db_per_um
+
+    def structure_shapes(self, name):
+        """ The rectangles {layer : rects} and labels [(text, layer, x, y)]
+            drawn in a structure itself """
+
+        structure = self.structures[name]
+        rects = {}
+        for boundary in structure.boundaries:
+            rects.setdefault(boundary.drawingLayer, []).extend(polygon_rects(boundary.coordinates))
+        for path in structure.paths:
+            rects.setdefault(path.drawingLayer, []).extend(path_rects(path.coordinates,
+                                                                     path.pathWidth,
+                                                                     path.pathType))
+        labels = []
+        for text in structure.texts:
+            (x, y) = text.coordinates[0]
+            labels.append((text.textString.strip("\x00").strip(), text.drawingLayer,
+                           int(round(x)), int(round(y))))
+        return (rects, labels)
+
+    def reference(self, sref):
+        """ (mirror, angle, offset) of a structure reference """
+
+        mirror = bool(sref.transFlags[0])
+        angle = int(round(float(sref.rotateAngle or 0))) % 360
+        offset = tuple(int(round(c)) for c in sref.coordinates)
+        return (mirror, angle, offset)
+
+    def flatten(self, name, skip=[]):
+        """ All the rectangles and labels under a structure in its
+            coordinates, without the references to the structures of skip """
+
+        if name in self.flattened and not skip:
+            return self.flattened[name]
+        (rects, labels) = self.structure_shapes(name)
+        structure = self.structures[name]
+        for sref in structure.srefs:
+            child = sref.sName.rstrip("\x00")
+            if child in skip:
+                continue
+            if child not in self.structures:
+                debug.warning("Missing structure {0} referenced in {1}".format(child, name))
+                continue
+            (child_rects, child_labels) = self.flatten(child)
+            (mirror, angle, offset) = self.reference(sref)
+            for (layer, shapes) in child_rects.items():
+                rects.setdefault(layer, []).extend(transform_rect(r, mirror, angle, offset)
+                                                   for r in shapes)
+            for (text, layer, x, y) in child_labels:
+                (x, y) = transform_point((x, y), mirror, angle, offset)
+                labels.append((text, layer, x, y))
+        if structure.arefs:
+            debug.warning("Array references of {0} are not flattened".format(name))
+        if skip:
+            return (rects, labels)
+        self.flattened[name] = (rects, labels)
+        return self.flattened[name]
+
+    def count(self):
+        """ Number of rectangles of all the layers """
+
+        return sum(len(shapes) for shapes in self.rects.values())
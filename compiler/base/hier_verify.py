@@ -0,0 +1,187 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Hierarchical DRC/LVS: every master is verified once.
+
+The design is walked bottom-up through the masters of its instances. A
+master with its own subckt is verified alone, once, however many parents
+instantiate it, and the parents are then checked with the verified masters
+as black boxes (LVS BOX, EXCLUDE CELL), so a bank doesn't check again the
+inverters of its decoder. The masters of one level of the hierarchy are
+checked in parallel once all of their children passed. A parent of a
+failing master is not checked. Masters without a subckt (contacts, ptx,
+wires) are checked as part of their parents.
+
+As the results are cached by content (see verify_runner), a master that
+didn't change since an earlier run is not checked at all. """
+
+import os
+import datetime
+import debug
+from globals import OPTS, print_time
+import calibre
+import verify_results
+
+
+class hier_verify():
+    """ Verify the unique masters of a design bottom-up """
+
+    def __init__(self, design, final_verification=False, num_jobs=None, skip=[]):
+        self.design = design
+        self.final_verification = final_verification
+        self.num_jobs = num_jobs
+        # Masters known to pass (unchanged since an incremental run)
+        self.skip = set(skip)
+        self.work_dir = OPTS.AMC_temp + "hier_verify/"
+        # Unique masters by name, children before parents
+        self.masters = []
+        # Level of each master: 0 for the leaves, 1 + the level of its highest child
+        self.levels = {}
+        # Instances of each master in the flattened design
+        self.occurrences = {}
+        # Masters verified (or failed) by name
+        self.passed = set()
+        self.failed = set()
+        self.results = {}
+        # All the results in one report
+        self.summary = verify_results.verify_report(design.name)
+
+    def verified(self, mod):
+        """ A master with its own subckt, verified alone """
+
+        if hasattr(mod, "spice_device") or not mod.pins:
+            return False
+        return len(mod.insts) > 0 or mod.is_library_cell
+
+    def children(self, mod):
+        """ The unique masters instantiated by mod """
+
+        found = {}
+        for inst in mod.insts:
+            found.setdefault(inst.mod.name, inst.mod)
+        return list(found.values())
+
+    def walk(self):
+        """ Order the masters bottom-up and count their instances """
+
+        counts = {self.design.name : 1}
+        def visit(mod):
+            if mod.name in self.levels:
+                return self.levels[mod.name]
+            level = 0
+            for child in self.children(mod):
+                level = max(level, visit(child) + 1)
+            self.levels[mod.name] = level
+            self.masters.append(mod)
+            return level
+        visit(self.design)
+
+        # The instance count of a master is the sum over its parents (top-down)
+        for mod in reversed(self.masters):
+            for inst in mod.insts:
+                counts[inst.mod.name] = counts.get(inst.mod.name, 0) + counts.get(mod.name, 0)
+        self.occurrences = counts
+        self.masters = [mod for mod in self.masters if self.verified(mod)]
+
+    def write(self, mod):
+        """ GDS and netlist of a master in its own directory """
+
+        mod_dir = self.work_dir + mod.name + "/"
+        os.makedirs(mod_dir, exist_ok=True)
+        gds_name = mod_dir + mod.name + ".gds"
+        sp_name = mod_dir + mod.name + ".sp"
+        mod.gds_write(gds_name)
+        mod.sp_write(sp_name)
+        return (gds_name, sp_name)
+
+    def black_boxes(self, mod):
+        """ The verified masters under mod, at any depth below unverified ones """
+
+        boxes = set()
+        def visit(parent):
+            for child in self.children(parent):
+                if child.name in self.passed:
+                    boxes.add(child.name)
+                else:
+                    visit(child)
+        visit(mod)
+        return boxes
+
+    def blocked(self, mod):
+        """ A master with a failing master under it """
+
+        for child in self.children(mod):
+            if child.name in self.failed:
+                return True
+            if child.name not in self.passed and self.blocked(child):
+                return True
+        return False
+
+    def run(self):
+        """ Verify every master once, returns the total number of errors """
+
+        start_time = datetime.datetime.now()
+        self.walk()
+        errors = 0
+        for level in sorted(set(self.levels[mod.name] for mod in self.masters)):
+            jobs = []
+            for mod in self.masters:
+                if self.levels[mod.name] != level:
+                    continue
+                if mod.name in self.skip:
+                    self.passed.add(mod.name)
+                    continue
+                if self.blocked(mod):
+                    debug.warning("{0} is not verified, a master it uses failed".format(mod.name))
+                    self.failed.add(mod.name)
+                    continue
+                (gds_name, sp_name) = self.write(mod)
+                boxes = self.black_boxes(mod)
+                jobs.append(calibre.lvs_job(mod.name, gds_name, sp_name,
+                                            self.final_verification, boxes))
+                jobs.append(calibre.drc_job(mod.name, gds_name, boxes))
+            if not jobs:
+                continue
+            debug.info(1, "Verifying {0} masters of level {1}".format(len(jobs)//2, level))
+            counts = calibre.run_checks(jobs, self.num_jobs, self.summary)
+            for (job, count) in zip(jobs, counts):
+                self.results.setdefault(job.cell_name, []).append(job)
+                if count > 0:
+                    self.failed.add(job.cell_name)
+                errors += count
+            for job in jobs:
+                if job.cell_name not in self.failed:
+                    self.passed.add(job.cell_name)
+        self.report(start_time)
+        return errors + len([name for name in self.failed if name not in self.results])
+
+    def report(self, start_time):
+        """ Print the number of masters checked and the time saved against
+            checking every instance of them """
+
+        runtime = 0.0
+        saved = 0.0
+        for (name, jobs) in self.results.items():
+            for job in jobs:
+                check_time = job.result.get("runtime", 0.0)
+                # A cached result saved its whole run
+                if job.cached:
+                    saved += check_time
+                else:
+                    runtime += check_time
+                saved += check_time * (self.occurrences.get(name, 1) - 1)
+        print("Hierarchical verification: {0} masters for {1} instances, {2} failed, {3} skipped".format(
+              len(self.masters), sum(self.occurrences.get(mod.name, 1) for mod in self.masters),
+              len(self.failed), len(self.skip & self.passed)))
+        print("Verification time: {0} seconds, about {1} seconds saved".format(
+              round(runtime, 1), round(saved, 1)))
+        self.summary.write(OPTS.output_path + self.design.name + ".verify")
+        print_time("Hierarchical verification", datetime.datetime.now(), start_time)
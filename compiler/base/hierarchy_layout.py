@@ -467,6 +467,16 @@ class layout(lef.lef):
         # self.gds.prepareForWrite()
         writer.writeToFile(gds_name)
 
+    def oasis_write(self, oasis_name):
+        """Write the entire layout of the object to an OASIS file."""
+        
+        debug.info(3, "Writing to {0}".format(oasis_name))
+
+        writer = gdsMill.OasisWriter(self.gds)
+        # recursively create all the remaining objects
+        self.gds_write_file(self.gds)
+        writer.writeToFile(oasis_name)
+
     def get_boundary(self):
         """ Return the lower-left and upper-right coordinates of boundary """
         
@@ -10,6 +10,7 @@
 
 
 import debug
+import compressed
 import re
 import os
 import math
@@ -187,7 +188,7 @@ class spice(verilog.verilog):
     def sp_write(self, spname):
         """Writes the spice to files"""
         debug.info(3, "Writing to {0}".format(spname))
-        spfile = open(spname, 'w')
+        spfile = compressed.open_output(spname)
         spfile.write("*FIRST LINE IS A COMMENT\n")
         usedMODS = list()
         self.sp_write_file(spfile, usedMODS)
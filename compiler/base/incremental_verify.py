@@ -0,0 +1,438 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Incremental DRC/LVS: only the structures that changed are checked again.
+
+A hash of every GDS structure (its own records: shapes, labels and the
+references to its children, not the contents of the children) and of every
+subckt of the netlist is kept with the layout of the last run in
+OPTS.verify_cache_dir. The next run compares them with the new build:
+
+* a structure that is new, whose own hash or subckt changed, or that failed
+  last time is checked again,
+* the changes of a structure (the shapes that were added or removed, and
+  the instances that were added, removed or moved) are placed in its
+  parents. A parent is checked again if they come within a halo (the
+  largest spacing rule, or OPTS.verify_halo) of its own wires or of its
+  other instances, as they may short or violate a spacing rule there. A
+  change inside a child that interacts with nothing of its parent is left
+  to the check of the child, which is black boxed in the parent.
+
+The changes are carried up to the top, where they give the windows of the
+top-level DRC. The structures that aren't checked again are reported as
+skipped, with the reason of every check. """
+
+import os
+import json
+import struct
+import shutil
+import hashlib
+import tempfile
+import datetime
+import debug
+import globals
+from globals import OPTS, print_time
+import flat_gds
+import verify_results
+from drc_lite import grid_index, bin_size, layer_rules, layer_number
+
+# GDS records that start and end a structure and give its name
+BGNSTR = 0x05
+STRNAME = 0x06
+ENDSTR = 0x07
+
+# More changed rectangles than this in a structure are carried up as their
+# bounding box
+max_region_rects = 256
+
+
+def structure_hashes(gds_name):
+    """ {structure name : SHA1 of its records without its time stamps} """
+
+    hashes = {}
+    sha = None
+    name = None
+    with open(gds_name, "rb") as f:
+        while True:
+            header = f.read(4)
+            if len(header) < 4:
+                break
+            (length, record) = struct.unpack(">HB", header[:3])
+            if length < 4:
+                break
+            data = f.read(length - 4)
+            if record == BGNSTR:
+                sha = hashlib.sha1()
+                continue
+            if sha == None:
+                continue
+            if record == STRNAME:
+                name = data.rstrip(b"\x00").decode()
+            elif record == ENDSTR:
+                hashes[name] = sha.hexdigest()
+                sha = None
+                continue
+            sha.update(header)
+            sha.update(data)
+    return hashes
+
+
+def subckt_hashes(sp_name):
+    """ {subckt name : SHA1 of its lines without the extra white space} """
+
+    hashes = {}
+    name = None
+    lines = []
+    with open(sp_name) as f:
+        for line in f:
+            words = line.split()
+            if not words:
+                continue
+            if words[0].upper() == ".SUBCKT" and len(words) > 1:
+                name = words[1]
+                lines = []
+            if name == None:
+                continue
+            lines.append(" ".join(words))
+            if words[0].upper() == ".ENDS":
+                hashes[name] = hashlib.sha1("\n".join(lines).encode()).hexdigest()
+                name = None
+    return hashes
+
+
+def overlap(a, b):
+    """ Rectangles that overlap or touch """
+
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def grow(rect, size):
+    return (rect[0] - size, rect[1] - size, rect[2] + size, rect[3] + size)
+
+
+def enclose(rects):
+    """ The bounding box of rectangles """
+
+    return (min(r[0] for r in rects), min(r[1] for r in rects),
+            max(r[2] for r in rects), max(r[3] for r in rects))
+
+
+def own_shapes(layout, name):
+    """ The set of (layer, rect) drawn in a structure itself, with its
+        labels as points. The boundary of a cell is not a shape. """
+
+    (rects, labels) = layout.structure_shapes(name)
+    boundary = layer_number("boundary")
+    shapes = set((number, rect) for (number, layer_rects) in rects.items()
+                 if number != boundary for rect in layer_rects)
+    shapes.update((number, (x, y, x, y)) for (text, number, x, y) in labels)
+    return shapes
+
+
+def inverse_rect(rect, mirror, angle, offset):
+    """ A rectangle of the parent in the coordinates of a reference """
+
+    rect = (rect[0] - offset[0], rect[1] - offset[1], rect[2] - offset[0], rect[3] - offset[1])
+    rect = flat_gds.transform_rect(rect, False, -angle % 360, (0, 0))
+    if mirror:
+        rect = (rect[0], -rect[3], rect[2], -rect[1])
+    return rect
+
+
+def references(layout, name):
+    """ [(child, mirror, angle, offset)] of the references of a structure """
+
+    refs = []
+    for sref in layout.structures[name].srefs:
+        child = sref.sName.rstrip("\x00")
+        if child in layout.structures:
+            refs.append((child,) + layout.reference(sref))
+    return refs
+
+
+class incremental_verify():
+    """ Check only the structures of a design that changed since the last run """
+
+    def __init__(self, design, final_verification=False, gds_name=None, sp_name=None, halo=None):
+        self.design = design
+        self.final_verification = final_verification
+        if gds_name == None or sp_name == None:
+            work_dir = OPTS.AMC_temp + "incremental/"
+            os.makedirs(work_dir, exist_ok=True)
+            gds_name = work_dir + design.name + ".gds"
+            sp_name = work_dir + design.name + ".sp"
+            design.gds_write(gds_name)
+            design.sp_write(sp_name)
+        self.gds_name = gds_name
+        self.sp_name = sp_name
+        # The halo in microns, the largest spacing rule if not given
+        self.halo = OPTS.verify_halo if halo == None else halo
+        self.state_dir = ""
+        if OPTS.verify_cache_dir:
+            self.state_dir = os.path.join(OPTS.verify_cache_dir, "incremental", design.name)
+        # The structures checked again (children before parents) and the skipped ones
+        self.checked = []
+        self.skipped = []
+        self.reasons = {}
+        # Windows of the top-level DRC in microns, None for the whole layout
+        self.windows = None
+        self.hashes = {}
+
+    def state_file(self):
+        return os.path.join(self.state_dir, "structures.json")
+
+    def previous_gds(self):
+        return os.path.join(self.state_dir, "previous.gds")
+
+    def load(self):
+        """ The hashes of the last run, {} if there is none or it checked
+            with other options """
+
+        if not self.state_dir:
+            return {}
+        try:
+            with open(self.state_file()) as f:
+                state = json.load(f)
+        except (IOError, ValueError):
+            return {}
+        if state.get("final_verification") != self.final_verification or \
+           not os.path.isfile(self.previous_gds()):
+            return {}
+        return state["structures"]
+
+    def order(self, layout):
+        """ The structures under the top, children before parents """
+
+        found = []
+        seen = set()
+        def visit(name):
+            if name in seen:
+                return
+            seen.add(name)
+            for ref in references(layout, name):
+                visit(ref[0])
+            found.append(name)
+        visit(layout.top)
+        return found
+
+    def bounding_box(self, layout, name, boxes):
+        """ The bounding box of everything under a structure, None if it is empty """
+
+        if name in boxes:
+            return boxes[name]
+        rects = [rect for (number, rect) in own_shapes(layout, name)]
+        for (child, mirror, angle, offset) in references(layout, name):
+            box = self.bounding_box(layout, child, boxes)
+            if box:
+                rects.append(flat_gds.transform_rect(box, mirror, angle, offset))
+        boxes[name] = enclose(rects) if rects else None
+        return boxes[name]
+
+    def changes(self, previous, layout, name):
+        """ The rectangles of a structure that changed between the layouts:
+            its own shapes and the instances added, removed or moved """
+
+        rects = [rect for (number, rect) in own_shapes(previous, name) ^ own_shapes(layout, name)]
+        old_refs = set(references(previous, name))
+        new_refs = set(references(layout, name))
+        for (refs, other, source, boxes) in [(old_refs, new_refs, previous, self.old_boxes),
+                                             (new_refs, old_refs, layout, self.new_boxes)]:
+            for (child, mirror, angle, offset) in refs - other:
+                box = self.bounding_box(source, child, boxes)
+                if box:
+                    rects.append(flat_gds.transform_rect(box, mirror, angle, offset))
+        return rects
+
+    def interaction(self, layout, name, refs, moved, halo):
+        """ The children whose changes come within the halo of the own shapes
+            of a structure or of its other instances """
+
+        targets = [(-1, rect) for (number, rect) in own_shapes(layout, name)]
+        for (index, (child, mirror, angle, offset)) in enumerate(refs):
+            box = self.bounding_box(layout, child, self.new_boxes)
+            if box:
+                targets.append((index, flat_gds.transform_rect(box, mirror, angle, offset)))
+        index = grid_index(bin_size([rect for (i, rect) in targets]))
+        for (key, (i, rect)) in enumerate(targets):
+            index.insert(key, rect)
+
+        found = set()
+        for (i, rect) in moved:
+            area = grow(rect, halo)
+            for key in index.query(area):
+                (j, target) = targets[key]
+                if j != i and overlap(area, target):
+                    found.add(refs[i][0])
+                    break
+        return found
+
+    def owners(self, box):
+        """ The structures that hold a box of the top: the top and the
+            instances under it whose bounding box contains the box """
+
+        found = set()
+        def visit(name, rect):
+            found.add(name)
+            for (child, mirror, angle, offset) in references(self.layout, name):
+                inner = inverse_rect(rect, mirror, angle, offset)
+                child_box = self.bounding_box(self.layout, child, self.new_boxes)
+                if child_box and child_box[0] <= inner[0] and child_box[1] <= inner[1] \
+                   and inner[2] <= child_box[2] and inner[3] <= child_box[3]:
+                    visit(child, inner)
+        visit(self.layout.top, box)
+        return found
+
+    def plan(self):
+        """ Sort the structures into checked and skipped """
+
+        layout = flat_gds.flat_gds(self.gds_name, self.design.name, flatten=False)
+        self.layout = layout
+        state = self.load()
+        previous = None
+        if state:
+            previous = flat_gds.flat_gds(self.previous_gds(), self.design.name, flatten=False)
+        self.old_boxes = {}
+        self.new_boxes = {}
+        halo = layout.to_db(self.halo)
+        if halo <= 0:
+            halo = max([space for (name, width, space, area)
+                        in layer_rules(layout.db_per_um).values()] + [0])
+
+        gds_hashes = structure_hashes(self.gds_name)
+        sp_hashes = subckt_hashes(self.sp_name)
+        regions = {}
+        for name in self.order(layout):
+            self.hashes[name] = {"gds" : gds_hashes.get(name, ""),
+                                 "sp" : sp_hashes.get(name, "")}
+            old = state.get(name)
+            reason = None
+            region = []
+            if old == None or name not in previous.structures:
+                reason = "new"
+                box = self.bounding_box(layout, name, self.new_boxes)
+                region = [box] if box else []
+            else:
+                if old["gds"] != self.hashes[name]["gds"]:
+                    reason = "layout changed"
+                    region = self.changes(previous, layout, name)
+                if old["sp"] != self.hashes[name]["sp"]:
+                    reason = "netlist changed" if reason == None else "layout and netlist changed"
+                if reason == None and not old["passed"]:
+                    reason = "failed before"
+
+            # The changes of the children, placed by their references
+            refs = references(layout, name)
+            moved = []
+            for (index, (child, mirror, angle, offset)) in enumerate(refs):
+                for rect in regions.get(child, []):
+                    moved.append((index, flat_gds.transform_rect(rect, mirror, angle, offset)))
+            if reason == None and moved:
+                children = self.interaction(layout, name, refs, moved, halo)
+                if children:
+                    reason = "interacts with " + ", ".join(sorted(children))
+                else:
+                    changed = sorted(set(refs[index][0] for (index, rect) in moved))
+                    self.reasons[name] = "no interaction with " + ", ".join(changed)
+            region.extend(rect for (index, rect) in moved)
+            if len(region) > max_region_rects:
+                region = [enclose(region)]
+            regions[name] = region
+
+            if reason:
+                self.checked.append(name)
+                self.reasons[name] = reason
+            else:
+                self.skipped.append(name)
+                self.reasons.setdefault(name, "unchanged")
+
+        # The top-level DRC is needed around the changes only
+        top_reason = self.reasons[layout.top]
+        if top_reason not in ["new", "failed before"]:
+            self.windows = [tuple(layout.to_um(c) for c in grow(rect, halo))
+                            for rect in regions[layout.top]]
+        return self.checked
+
+    def save(self, failed=[]):
+        """ Keep the hashes and the layout of this run for the next one """
+
+        if not self.state_dir:
+            return
+        os.makedirs(self.state_dir, exist_ok=True)
+        structures = {}
+        for (name, hashes) in self.hashes.items():
+            structures[name] = dict(hashes, passed=(name not in failed))
+        state = {"final_verification" : self.final_verification,
+                 "structures" : structures}
+        # Write and rename so that a failed run never leaves a partial state
+        (fd, temp_name) = tempfile.mkstemp(dir=self.state_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        shutil.copyfile(self.gds_name, self.previous_gds())
+        os.replace(temp_name, self.state_file())
+
+    def report(self):
+        """ Print the checked structures with their reason and the skipped ones """
+
+        print("Incremental verification: {0} structures checked, {1} skipped".format(
+              len(self.checked), len(self.skipped)))
+        for name in self.checked:
+            print("  checked {0}: {1}".format(name, self.reasons[name]))
+        for name in self.skipped:
+            debug.info(1, "  skipped {0}: {1}".format(name, self.reasons[name]))
+        if self.windows != None:
+            print("Top-level DRC in {0} windows".format(len(self.windows)))
+
+    def run_native(self):
+        """ The native connectivity check of the checked masters and DRC of
+            the windows, returns (errors, failed structures) """
+
+        import lvs_lite
+        import drc_lite
+
+        summary = verify_results.verify_report(self.design.name)
+        checker = lvs_lite.lvs_lite(self.design, self.final_verification, self.gds_name,
+                                    masters=set(self.checked))
+        result = checker.run()
+        summary.add(result)
+        for message in result["messages"]:
+            debug.error(message)
+        errors = result["errors"]
+        failed = set(checker.errors.keys())
+        if self.windows != []:
+            drc = drc_lite.drc_lite(self.design.name, self.gds_name, self.windows)
+            result = drc.run()
+            summary.add(result)
+            for (rule_name, count) in sorted(result["rules"].items()):
+                debug.error("{0}\t{1}: {2}".format(self.design.name, rule_name, count))
+            errors += result["errors"]
+            # A violation of the flat DRC fails the structures that hold it
+            for (rule_name, box) in drc.violations:
+                failed.update(self.owners(box))
+        summary.write(OPTS.output_path + self.design.name + ".verify")
+        return (errors, failed)
+
+    def run(self):
+        """ Check the structures that changed, returns the number of errors """
+
+        start_time = datetime.datetime.now()
+        self.plan()
+        if globals.find_exe("calibre") == None:
+            (errors, failed) = self.run_native()
+        else:
+            import hier_verify
+            verifier = hier_verify.hier_verify(self.design, self.final_verification,
+                                               skip=self.skipped)
+            errors = verifier.run()
+            failed = verifier.failed
+        self.save(failed)
+        self.report()
+        print_time("Incremental verification", datetime.datetime.now(), start_time)
+        return errors
@@ -14,6 +14,7 @@ import tech
 import globals
 import math
 import debug
+import compressed
 import datetime
 from collections import defaultdict
 
@@ -38,7 +39,7 @@ class lef:
 
         self.indent = "" # To maintain the indent level easily
 
-        self.lef  = open(lef_name,"w")
+        self.lef  = compressed.open_output(lef_name)
         self.lef_write_header()
         for pin in self.pins:
             self.lef_write_pin(pin)
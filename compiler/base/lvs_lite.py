@@ -0,0 +1,710 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" A native connectivity check of the layout against the netlist.
+
+It is not a signoff LVS, there is no device extraction: it checks that the
+wires of every module connect the pins of its instances the way its conns
+say, where Calibre isn't installed. The masters are extracted bottom-up,
+each one once:
+
+* the own shapes of a master (its wires, contacts, vias and ports) are
+  flattened from the GDS without the structures of its instances, and the
+  extracted shapes of its instances are placed by their references, tagged
+  with the instance and the net of the instance they belong to,
+* the touching shapes of each conducting layer and the shapes overlapped
+  by a contact or via of their stack are merged by union-find over a grid
+  index (see drc_lite),
+* the pieces of the same net of an instance are connected (inside the
+  instance), and so are the pieces of the vdd and gnd ports unless
+  final_verification (as Calibre's virtual connect),
+* a piece with the pins of two nets is a short, a net on more than one
+  piece is an open. The pins of equivalent_pins of a master (D and S of a
+  ptx) are matched either way.
+
+The shapes of the master are then named by the port on their piece, or as
+internal nets, for the checks of its parents. The masters of one level of
+the hierarchy are extracted in parallel processes (OPTS.verify_jobs), the
+shorts and opens are reported by net name with the instance pins on them. """
+
+import datetime
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import debug
+from globals import OPTS
+import flat_gds
+from drc_lite import grid_index, bin_size, touch, layer_number, layer_stacks
+
+# The layers that connect pins, active is left out as it would short the
+# source and drain of the transistors
+conductors = ["poly", "metal1", "metal2", "metal3", "metal4"]
+
+# The ports connected by name unless final_verification
+supplies = ["vdd", "gnd"]
+
+# The layout, the masters and the extracted shapes of the masters of the
+# lower levels for the worker processes, set before they are forked
+checked_layout = None
+checked_masters = {}
+extracted = {}
+# The names of the masters to check, all of them if None
+checked_names = None
+
+
+def overlap(a, b):
+    """ Rectangles that share some area """
+
+    return min(a[2], b[2]) > max(a[0], b[0]) and min(a[3], b[3]) > max(a[1], b[1])
+
+
+def via_stacks():
+    """ [(bottom, via, top)] layer numbers of the contacts and vias between
+        conducting layers """
+
+    stacks = []
+    for (bottom, via, top) in layer_stacks:
+        numbers = tuple(layer_number(name) for name in (bottom, via, top))
+        if bottom in conductors and top in conductors and None not in numbers:
+            stacks.append(numbers)
+    return stacks
+
+
+def connected_layers():
+    """ The layer numbers of the conducting layers and of their vias """
+
+    numbers = set(layer_number(name) for name in conductors) - set([None])
+    numbers.update(via for (bottom, via, top) in via_stacks())
+    return numbers
+
+
+class union_find():
+    """ Disjoint sets of integers """
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i, j):
+        (a, b) = (self.find(i), self.find(j))
+        if a != b:
+            self.parent[a] = b
+
+
+def connect(shapes):
+    """ Union-find of the shapes [(layer, rect, tag)] that touch on a
+        conducting layer, or that are overlapped by a contact or via of
+        their stack """
+
+    sets = union_find(len(shapes))
+    by_layer = {}
+    for (i, shape) in enumerate(shapes):
+        by_layer.setdefault(shape[0], []).append(i)
+
+    indices = {}
+    for (number, members) in by_layer.items():
+        index = grid_index(bin_size([shapes[i][1] for i in members]))
+        for i in members:
+            rect = shapes[i][1]
+            for j in index.query(rect):
+                if touch(rect, shapes[j][1]):
+                    sets.union(i, j)
+            index.insert(i, rect)
+        indices[number] = index
+
+    for (bottom, via, top) in via_stacks():
+        for i in by_layer.get(via, []):
+            rect = shapes[i][1]
+            for number in (bottom, top):
+                if number not in indices:
+                    continue
+                for j in indices[number].query(rect):
+                    if overlap(rect, shapes[j][1]):
+                        sets.union(i, j)
+    return sets
+
+
+def pin_shapes(pins, layout):
+    """ (layer number, rect) of pin_layouts in the database units of layout,
+        the pins on the layers that don't conduct (a label on a well) are
+        left out """
+
+    shapes = []
+    layers = connected_layers()
+    for pin in pins:
+        number = layer_number(pin.layer)
+        if number not in layers:
+            continue
+        (ll, ur) = pin.rect
+        shapes.append((number, (layout.to_db(ll.x), layout.to_db(ll.y),
+                                layout.to_db(ur.x), layout.to_db(ur.y))))
+    return shapes
+
+
+def connected_insts(mod):
+    """ The indices of the instances of a module that are in its netlist """
+
+    return [index for (index, conns) in enumerate(mod.conns) if conns]
+
+
+def module_shapes(mod, layout):
+    """ The shapes [(layer, rect, tag)] of a module. The tag of a shape of an
+        instance is (instance index, net of the instance), ("port", pin name)
+        for a port, None for a wire. """
+
+    layers = connected_layers()
+    boxes = set(mod.insts[index].mod.name for index in connected_insts(mod))
+    (rects, labels) = layout.flatten(mod.name, boxes)
+    shapes = [(number, rect, None) for number in layers for rect in rects.get(number, [])]
+
+    # The instances by master and offset, to find the one of each reference
+    placed = {}
+    for index in connected_insts(mod):
+        inst = mod.insts[index]
+        key = (inst.mod.name, layout.to_db(inst.offset.x), layout.to_db(inst.offset.y))
+        placed.setdefault(key, []).append(index)
+    for sref in layout.structures[mod.name].srefs:
+        child = sref.sName.rstrip("\x00")
+        if child not in boxes:
+            continue
+        (mirror, angle, offset) = layout.reference(sref)
+        indices = placed.get((child, offset[0], offset[1]))
+        if not indices:
+            debug.warning("No instance of {0} at {1} in {2}".format(child, offset, mod.name))
+            continue
+        index = indices.pop(0)
+        for (number, rect, net) in extracted[child]:
+            shapes.append((number, flat_gds.transform_rect(rect, mirror, angle, offset),
+                           (index, net)))
+
+    for pin_name in mod.pins:
+        if pin_name in mod.pin_map:
+            for (number, rect) in pin_shapes(mod.get_pins(pin_name), layout):
+                shapes.append((number, rect, ("port", pin_name)))
+    return shapes
+
+
+def pin_classes(mod):
+    """ {pin : class} of the pins of a master, the pins of its
+        equivalent_pins are of the same class """
+
+    classes = {}
+    for (a, b) in getattr(mod, "equivalent_pins", []):
+        classes[a] = classes[b] = a + "|" + b
+    return classes
+
+
+def devices(mod):
+    """ The netlist of a master flattened to the masters without instances:
+        [(master, {pin : net})], the ports keep their names """
+
+    found = []
+    def visit(parent, nets, prefix):
+        for index in connected_insts(parent):
+            inst = parent.insts[index]
+            inst_nets = [nets.get(net, prefix + net) for net in parent.conns[index]]
+            pins = dict(zip(inst.mod.pins, inst_nets))
+            if connected_insts(inst.mod):
+                visit(inst.mod, pins, prefix + inst.name + "/")
+            else:
+                found.append((inst.mod, pins))
+    visit(mod, dict((pin, pin) for pin in mod.pins), "")
+    return found
+
+
+def refine(graph, anchors):
+    """ Labels of the devices and nets of a graph [(master name, [(pin class,
+        net)])] refined by their neighbours until they don't split any more,
+        from the anchors {net : label}. Two graphs with the same multisets of
+        labels are the same circuit (but for rare regular graphs). """
+
+    label = {}
+    on_net = {}
+    for (d, (name, pins)) in enumerate(graph):
+        for (pin_class, net) in pins:
+            label[net] = str(anchors.get(net, ""))
+            on_net.setdefault(net, []).append((d, pin_class))
+    distinct = -1
+    while True:
+        device_labels = [hash((name, tuple(sorted((pin_class, label[net]) for (pin_class, net) in pins))))
+                         for (name, pins) in graph]
+        label = dict((net, hash((label[net], tuple(sorted((device_labels[d], pin_class)
+                                                          for (d, pin_class) in on_net[net])))))
+                     for net in label)
+        count = len(set(device_labels)) + len(set(label.values()))
+        if count == distinct:
+            break
+        distinct = count
+    return (sorted(device_labels), sorted(label.values()))
+
+
+# The permutations of pins of the masters found to be symmetries or not
+symmetries = {}
+
+# The permutations of the pins of an instance tried against its netlist
+max_permutation_tries = 64
+
+
+def symmetric(mod, permutation):
+    """ The pins of a master can be permuted {pin : pin it takes the net of}
+        without changing its circuit """
+
+    key = (mod.name, tuple(sorted(permutation.items())))
+    if key not in symmetries:
+        equivalent = getattr(mod, "equivalent_pins", [])
+        if all((a, b) in equivalent or (b, a) in equivalent for (a, b) in permutation.items()):
+            symmetries[key] = True
+        elif not connected_insts(mod):
+            symmetries[key] = False
+        else:
+            graph = []
+            for (master, pins) in devices(mod):
+                classes = pin_classes(master)
+                graph.append((master.name, [(classes.get(pin, pin), net) for (pin, net) in pins.items()]))
+            anchors = dict((pin, pin) for pin in mod.pins)
+            permuted = dict((pin, permutation.get(pin, pin)) for pin in mod.pins)
+            symmetries[key] = (refine(graph, anchors) == refine(graph, permuted))
+    return symmetries[key]
+
+
+def follow(mod, permutation, free):
+    """ A permutation of the pins of a master extended to its free pins (the
+        ones with nothing around them in the layout): the instances of the
+        moved pins are swapped as a whole, so a free pin goes to the pin on
+        the same pin of the other instance (the D of a merge cell follows
+        its Q) """
+
+    # The instance and the instance pin of each port
+    on = {}
+    for index in connected_insts(mod):
+        inst = mod.insts[index]
+        for (pin, net) in zip(inst.mod.pins, mod.conns[index]):
+            if net in mod.pins and net not in supplies:
+                on.setdefault(net, (index, pin))
+    port_at = dict((place, port) for (port, place) in on.items())
+
+    swapped = {}
+    for (a, b) in permutation.items():
+        if a in on and b in on and on[a][1] == on[b][1] and \
+           mod.insts[on[a][0]].mod.name == mod.insts[on[b][0]].mod.name:
+            swapped[on[a][0]] = on[b][0]
+    extended = dict(permutation)
+    for pin in free:
+        if pin in on and on[pin][0] in swapped:
+            other = port_at.get((swapped[on[pin][0]], on[pin][1]))
+            if other != None and other != pin:
+                extended[pin] = other
+    return extended
+
+
+class extraction():
+    """ The pieces of the shapes of a module and the nets on them """
+
+    def __init__(self, mod, layout, final_verification=False):
+        self.mod = mod
+        self.shapes = module_shapes(mod, layout)
+        self.sets = connect(self.shapes)
+        self.final_verification = final_verification
+        # The net of each pin of each instance, pins of equivalent_pins may swap
+        self.inst_nets = {}
+        for index in connected_insts(mod):
+            inst = mod.insts[index]
+            self.inst_nets[index] = dict(zip(inst.mod.pins, mod.conns[index]))
+        self.merge()
+
+    def merge(self):
+        """ Connect the pieces of the same net of an instance, and the
+            supply ports unless final_verification """
+
+        first = {}
+        for (i, (number, rect, tag)) in enumerate(self.shapes):
+            if tag == None:
+                continue
+            if tag[0] == "port" and (tag[1] not in supplies or self.final_verification):
+                continue
+            if tag in first:
+                self.sets.union(i, first[tag])
+            else:
+                first[tag] = i
+        # The instance nets on every piece
+        self.pieces = {}
+        for (i, (number, rect, tag)) in enumerate(self.shapes):
+            if tag != None:
+                self.pieces.setdefault(self.sets.find(i), set()).add(tag)
+        self.piece_of = {}
+        for (piece, tags) in self.pieces.items():
+            for tag in tags:
+                self.piece_of.setdefault(tag, set()).add(piece)
+
+    def net_of(self, tag):
+        """ The net of the module of a tag, None for an internal net of an
+            instance """
+
+        (index, name) = tag
+        if index == "port":
+            return name
+        return self.inst_nets[index].get(name)
+
+    def around(self, index, pin_name, fixed):
+        """ The nets of the other pins on the pieces of a pin, as
+            (nets of the fixed ones, nets of all of them) """
+
+        nets = ([], [])
+        for piece in self.piece_of.get((index, pin_name), set()):
+            for tag in self.pieces[piece]:
+                if tag[0] != index:
+                    net = self.net_of(tag)
+                    nets[1].append(net)
+                    if fixed(tag):
+                        nets[0].append(net)
+        return nets
+
+    def swap(self, index, a, b, fixed):
+        """ Swap the nets of pins a and b of an instance if more of the pins
+            around them agree, the fixed ones first """
+
+        nets = self.inst_nets[index]
+        if a not in nets or b not in nets or nets[a] == nets[b]:
+            return False
+        (around_a, around_b) = (self.around(index, a, fixed), self.around(index, b, fixed))
+        kept = tuple(around_a[k].count(nets[a]) + around_b[k].count(nets[b]) for k in (0, 1))
+        swapped = tuple(around_a[k].count(nets[b]) + around_b[k].count(nets[a]) for k in (0, 1))
+        if swapped > kept:
+            (nets[a], nets[b]) = (nets[b], nets[a])
+            return True
+        return False
+
+    def match_pins(self):
+        """ Swap the nets of the pins that the layout connects the other way
+            when they can be swapped: the pins of equivalent_pins, and the
+            pins of the instances of a short or an open that can be permuted
+            in their netlist. The ports and the other pins are taken as
+            right, a few passes match the chains. """
+
+        declared = [index for index in connected_insts(self.mod)
+                    if getattr(self.mod.insts[index].mod, "equivalent_pins", [])]
+        fixed = lambda tag: tag[0] not in declared
+        for i in range(len(declared) + 1):
+            changed = False
+            for index in declared:
+                for (a, b) in self.mod.insts[index].mod.equivalent_pins:
+                    changed |= self.swap(index, a, b, fixed)
+            if not changed:
+                break
+
+        for i in range(4):
+            suspects = set(tag[0] for (kind, nets, tags) in self.conflicts()
+                           for tag in (tags if kind == "shorts" else sum(tags, []))
+                           if tag[0] != "port" and tag[0] not in declared)
+            changed = False
+            for index in sorted(suspects):
+                changed |= self.permute(index)
+            if not changed:
+                break
+
+    def permute(self, index):
+        """ Give the pins of an instance the nets the pins around them have,
+            if it is a symmetry of the netlist of the instance (the bl and br
+            of a precharge, the two ends of a transistor stack) """
+
+        nets = self.inst_nets[index]
+        pins_of = {}
+        for (pin, net) in nets.items():
+            pins_of.setdefault(net, []).append(pin)
+        # The pins each pin can take the net of, and the free pins that
+        # have nothing around them
+        choices = []
+        free = []
+        for pin in sorted(nets):
+            # The ports around a pin, or all the pins if there is none
+            (ports, nearby) = self.around(index, pin, lambda tag: tag[0] == "port")
+            around = [net for net in (ports or nearby) if net in pins_of]
+            if around:
+                net = max(sorted(set(around)), key=around.count)
+                choices.append((pin, pins_of[net]))
+            else:
+                choices.append((pin, [pin]))
+                if not nearby:
+                    free.append(pin)
+        if all(nets[others[0]] == nets[pin] for (pin, others) in choices):
+            return False
+
+        # The first permutation among the choices that is a symmetry, the
+        # free pins follow the instances of the moved ones
+        mod = self.mod.insts[index].mod
+        tries = [max_permutation_tries]
+        def search(k, taken, permutation):
+            if k == len(choices):
+                tries[0] -= 1
+                moved = dict((a, b) for (a, b) in permutation.items() if a != b)
+                if moved and symmetric(mod, moved):
+                    return moved
+                moved = follow(mod, moved, free)
+                return moved if moved and symmetric(mod, moved) else None
+            (pin, others) = choices[k]
+            for other in others:
+                if other in taken or tries[0] <= 0:
+                    continue
+                permutation[pin] = other
+                taken.add(other)
+                found = search(k + 1, taken, permutation)
+                taken.discard(other)
+                del permutation[pin]
+                if found:
+                    return found
+            return None
+        permutation = search(0, set(), {})
+        if not permutation:
+            return False
+        old = dict(nets)
+        for (pin, other) in permutation.items():
+            nets[pin] = old[other]
+        return True
+
+    def conflicts(self):
+        """ The shorts as ("shorts", nets, tags) and the opens as ("opens",
+            [net], tags of each piece) """
+
+        found = []
+        nets = {}
+        for (piece, tags) in sorted(self.pieces.items()):
+            by_net = {}
+            for tag in tags:
+                net = self.net_of(tag)
+                if net != None:
+                    by_net.setdefault(net, []).append(tag)
+            for net in by_net:
+                nets.setdefault(net, []).append(by_net[net])
+            if len(by_net) > 1:
+                found.append(("shorts", sorted(by_net.keys()),
+                              [tag for net_tags in by_net.values() for tag in net_tags]))
+        for (net, pieces) in sorted(nets.items()):
+            if len(pieces) > 1:
+                found.append(("opens", [net], pieces))
+        return found
+
+    def graphs(self):
+        """ The layout and netlist graphs of the instances, with the pieces
+            and the nets of the module as their nets """
+
+        layout_graph = []
+        netlist_graph = []
+        for index in connected_insts(self.mod):
+            inst = self.mod.insts[index]
+            classes = pin_classes(inst.mod)
+            pins = [pin for pin in inst.mod.pins if (index, pin) in self.piece_of]
+            layout_graph.append((inst.mod.name, [(classes.get(pin, pin), min(self.piece_of[(index, pin)]))
+                                                 for pin in pins]))
+            netlist_graph.append((inst.mod.name, [(classes.get(pin, pin), self.mod.conns[index][inst.mod.pins.index(pin)])
+                                                  for pin in pins]))
+        layout_anchors = {}
+        for (piece, tags) in self.pieces.items():
+            ports = sorted(name for (index, name) in tags if index == "port")
+            if ports:
+                layout_anchors[piece] = "|".join(ports)
+        netlist_anchors = dict((pin, pin) for pin in self.mod.pins)
+        return (refine(layout_graph, layout_anchors), refine(netlist_graph, netlist_anchors))
+
+    def pin_text(self, tag):
+        """ instance.pin of a tag for the messages """
+
+        (index, name) = tag
+        if index == "port":
+            return "port " + name
+        return "{0}.{1}".format(self.mod.insts[index].name, name)
+
+    def errors(self):
+        """ The shorts and opens as (rule, nets, pins). A layout that is the
+            same circuit as the netlist with the instances of a master
+            permuted (the transistors of a precharge) has none. """
+
+        self.match_pins()
+        found = self.conflicts()
+        if not found:
+            return []
+        (layout_labels, netlist_labels) = self.graphs()
+        if layout_labels == netlist_labels:
+            return []
+        errors = []
+        for (kind, nets, tags) in found:
+            if kind == "shorts":
+                errors.append((kind, nets, sorted(self.pin_text(tag) for tag in tags)))
+            else:
+                errors.append((kind, nets, sorted(", ".join(sorted(self.pin_text(tag) for tag in piece))
+                                                  for piece in tags)))
+        return errors
+
+    def named_shapes(self):
+        """ The shapes [(layer, rect, net)] named by the port on their piece,
+            #<n> for the internal nets """
+
+        names = {}
+        for (piece, tags) in self.pieces.items():
+            ports = sorted(name for (index, name) in tags if index == "port")
+            if ports:
+                names[piece] = ports[0]
+        named = []
+        for (i, (number, rect, tag)) in enumerate(self.shapes):
+            piece = self.sets.find(i)
+            named.append((number, rect, names.get(piece, "#{0}".format(piece))))
+        return named
+
+
+def extract_master(name, final_verification):
+    """ The errors and the named shapes of a master in a worker process. The
+        masters without instances (library cells, ptx) are not checked, and
+        neither are the ones left out of checked_names. """
+
+    mod = checked_masters[name]
+    result = extraction(mod, checked_layout, final_verification)
+    errors = []
+    if connected_insts(mod) and (checked_names == None or name in checked_names):
+        errors = result.errors()
+    return (errors, result.named_shapes())
+
+
+def levels(design):
+    """ The masters of the instances of a design, with the design, by level:
+        0 for the ones without instances, 1 + the highest child level """
+
+    found = {}
+    def visit(mod):
+        if mod.name in found:
+            return found[mod.name][0]
+        level = 0
+        for index in connected_insts(mod):
+            level = max(level, visit(mod.insts[index].mod) + 1)
+        found[mod.name] = (level, mod)
+        return level
+    visit(design)
+    by_level = {}
+    for (name, (level, mod)) in found.items():
+        by_level.setdefault(level, {})[name] = mod
+    return [by_level[level] for level in sorted(by_level.keys())]
+
+
+class lvs_lite():
+    """ Connectivity check of every master of a design """
+
+    def __init__(self, design, final_verification=False, gds_name=None, masters=None):
+        self.design = design
+        self.final_verification = final_verification
+        self.gds_name = gds_name
+        # The names of the masters to check, the others are only extracted
+        self.masters = masters
+        self.errors = {}
+
+    def tied(self, name, error, masters):
+        """ A short between ports of a master that all of its parents
+            connect together anyway (the source of the first transistor of
+            a stack and the supply), which a flat LVS doesn't see """
+
+        (kind, nets, pins) = error
+        mod = masters[name]
+        if kind != "shorts" or any(net not in mod.pins for net in nets):
+            return False
+        parents = 0
+        for parent in masters.values():
+            for index in connected_insts(parent):
+                if parent.insts[index].mod.name != name:
+                    continue
+                parents += 1
+                conns = parent.conns[index]
+                if len(set(conns[mod.pins.index(net)] for net in nets)) > 1:
+                    return False
+        if parents:
+            debug.info(2, "{0}: {1} are tied by all of its parents".format(name, ", ".join(nets)))
+        return parents > 0
+
+    def run(self, num_jobs=None):
+        """ Check the masters, returns a result like the ones of verify_runner """
+
+        global checked_layout, checked_masters, extracted, checked_names
+
+        start_time = datetime.datetime.now()
+        if self.gds_name == None:
+            self.gds_name = OPTS.AMC_temp + self.design.name + ".lvs_lite.gds"
+            self.design.gds_write(self.gds_name)
+        checked_layout = flat_gds.flat_gds(self.gds_name, self.design.name, flatten=False)
+        extracted = {}
+        checked_names = self.masters
+        checked = 0
+        everyone = {}
+        for masters in levels(self.design):
+            everyone.update(masters)
+            checked_masters = masters
+            names = sorted(masters.keys())
+            jobs = max(1, min(num_jobs or OPTS.verify_jobs, len(names)))
+            if jobs == 1:
+                results = [extract_master(name, self.final_verification) for name in names]
+            else:
+                context = multiprocessing.get_context("fork")
+                with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+                    futures = [pool.submit(extract_master, name, self.final_verification)
+                               for name in names]
+                    results = [future.result() for future in futures]
+            for (name, (errors, shapes)) in zip(names, results):
+                extracted[name] = shapes
+                if errors:
+                    self.errors[name] = errors
+                if connected_insts(masters[name]) and (self.masters == None or name in self.masters):
+                    checked += 1
+        extracted = {}
+        checked_names = None
+        for name in list(self.errors.keys()):
+            self.errors[name] = [error for error in self.errors[name]
+                                 if not self.tied(name, error, everyone)]
+            if not self.errors[name]:
+                del self.errors[name]
+
+        rules = {}
+        messages = []
+        for (name, errors) in sorted(self.errors.items()):
+            for (kind, nets, pins) in errors:
+                rules[kind] = rules.get(kind, 0) + 1
+                if kind == "shorts":
+                    messages.append("{0}: short between {1} ({2})".format(
+                                    name, ", ".join(nets), ", ".join(pins)))
+                else:
+                    messages.append("{0}: open net {1} in {2} pieces ({3})".format(
+                                    name, nets[0], len(pins), "; ".join(pins)))
+        runtime = (datetime.datetime.now() - start_time).total_seconds()
+        return {"cell" : self.design.name,
+                "kind" : "lvs",
+                "status" : "CLEAN" if not rules else "ERRORS",
+                "errors" : sum(rules.values()),
+                "rules" : rules,
+                "masters" : checked,
+                "messages" : messages,
+                "runtime" : runtime}
+
+
+def run_lvs(design, final_verification=False, gds_name=None):
+    """ Run the native connectivity check of a design, returns the number
+        of shorts and opens """
+
+    result = lvs_lite(design, final_verification, gds_name).run()
+    summary = "{0}\tMasters: {1}\tShorts: {2}\tOpens: {3}".format(design.name,
+                                                                  result["masters"],
+                                                                  result["rules"].get("shorts", 0),
+                                                                  result["rules"].get("opens", 0))
+    if result["errors"] > 0:
+        debug.error(summary)
+        for message in result["messages"]:
+            debug.error(message)
+    else:
+        debug.info(1, summary)
+    return result["errors"]
@@ -0,0 +1,163 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Merge the identical masters of a design before it is written.
+
+Every generator picks a unique name, so different parents often build
+masters that are the same under different names (drivers with the same
+rows and sizes, split arrays, gates). The masters are compared bottom-up
+by a hash of their contents without their name: the shapes and labels
+they draw, the references to their children (already merged) with their
+placement, their subckt (ports, instance names, connections) and their
+size. The instances and submodules of a duplicate's parents then point to
+the first master with the same contents, so the duplicate is written
+neither in the netlist nor in the layout.
+
+The library cells are kept as they are. The layouts already built for an
+earlier write (and its checks) are cleared to be rebuilt with the merged
+references. """
+
+import io
+import hashlib
+import debug
+import gdsMill
+from tech import GDS
+
+
+class merge_masters():
+    """ Merge the identical masters under a design """
+
+    def __init__(self, design):
+        self.design = design
+        # The master kept for each hash of contents
+        self.canonical = {}
+        # Duplicates by name: the name of the master that replaces them
+        self.merged = {}
+        # Bytes of the structure and the subckt of every master by name
+        self.gds_bytes = {}
+        self.sp_bytes = {}
+        # Masters under the design, children before parents
+        self.masters = []
+
+    def walk(self):
+        """ The masters under the design, children before parents """
+
+        seen = set()
+        def visit(mod):
+            if id(mod) in seen:
+                return
+            seen.add(id(mod))
+            for child in [inst.mod for inst in mod.insts] + mod.mods:
+                visit(child)
+            self.masters.append(mod)
+        visit(self.design)
+
+    def layout(self, mod):
+        """ The structure of a master alone: its shapes, pins and references """
+
+        layout = gdsMill.VlsiLayout(name=mod.name, units=GDS["unit"])
+        for obj in mod.objs:
+            obj.gds_write_file(layout)
+        for pin_name in mod.pin_map:
+            for pin in mod.pin_map[pin_name]:
+                pin.gds_write_file(layout)
+        for inst in mod.insts:
+            layout.addInstance(inst.mod.gds, offsetInMicrons=inst.offset,
+                               mirror=inst.mirror, rotate=inst.rotate)
+        return layout
+
+    def subckt(self, mod):
+        """ The subckt of a master alone, its children are not written """
+
+        sp = io.StringIO()
+        mod.sp_write_file(sp, list(mod.mods) + [inst.mod for inst in mod.insts])
+        return sp.getvalue()
+
+    def contents(self, mod):
+        """ Hash of a master without its name """
+
+        layout = self.layout(mod)
+        structure = layout.structures[layout.rootStructureName]
+        writer = gdsMill.Gds2writer(layout)
+        writer.fileHandle = io.BytesIO()
+        writer.writeNextStructure(layout.rootStructureName)
+        self.gds_bytes[mod.name] = len(writer.fileHandle.getvalue())
+        subckt = self.subckt(mod)
+        self.sp_bytes[mod.name] = len(subckt)
+
+        point = lambda p: (int(round(p[0])), int(round(p[1])))
+        shapes = sorted((str(b.drawingLayer), str(b.dataType), tuple(point(p) for p in b.coordinates))
+                        for b in structure.boundaries)
+        labels = sorted((t.textString, str(t.drawingLayer), str(t.purposeLayer), point(t.coordinates[0]))
+                        for t in structure.texts)
+        # The children are already merged, their names are the kept ones
+        references = sorted((s.sName, point(s.coordinates), tuple(bool(f) for f in s.transFlags),
+                             str(s.rotateAngle)) for s in structure.srefs)
+        subckt = subckt.replace(".SUBCKT {0} ".format(mod.name), ".SUBCKT ", 1)
+        subckt = subckt.replace(".ENDS {0}\n".format(mod.name), ".ENDS\n", 1)
+        size = (str(mod.width), str(mod.height))
+        device = getattr(mod, "spice_device", "")
+        contents = repr((type(mod).__name__, size, device, shapes, labels, references, subckt))
+        return hashlib.sha1(contents.encode()).hexdigest()
+
+    def replace(self, mod, masters):
+        """ Make the instances and submodules of a master use the kept masters """
+
+        for inst in mod.insts:
+            kept = masters.get(id(inst.mod), inst.mod)
+            inst.mod = kept
+            inst.gds = kept.gds
+        mods = []
+        for child in mod.mods:
+            kept = masters.get(id(child), child)
+            if all(kept is not m for m in mods):
+                mods.append(kept)
+        mod.mods = mods
+
+    def run(self):
+        """ Merge the masters, return the number of merged ones """
+
+        self.walk()
+        # The kept master of each merged one
+        masters = {}
+        for mod in self.masters:
+            self.replace(mod, masters)
+            if mod.is_library_cell or mod is self.design:
+                continue
+            key = self.contents(mod)
+            kept = self.canonical.setdefault(key, mod)
+            if kept is not mod and kept.name != mod.name:
+                masters[id(mod)] = kept
+                self.merged[mod.name] = kept.name
+
+        # The layouts are built again with the merged references
+        for mod in self.masters:
+            if not mod.is_library_cell and id(mod) not in masters:
+                mod.gds = gdsMill.VlsiLayout(name=mod.name, units=GDS["unit"])
+                mod.visited = False
+                for inst in mod.insts:
+                    inst.gds = inst.mod.gds
+        return len(self.merged)
+
+    def saved(self):
+        """ (structures, GDS bytes, spice bytes) left out by the merge """
+
+        return (len(self.merged),
+                sum(self.gds_bytes[name] for name in self.merged),
+                sum(self.sp_bytes[name] for name in self.merged))
+
+    def report(self):
+        (structures, gds_bytes, sp_bytes) = self.saved()
+        names = len(set(mod.name for mod in self.masters))
+        for (name, kept) in sorted(self.merged.items()):
+            debug.info(1, "{0} is the same as {1}".format(name, kept))
+        print("Merged {0} of {1} masters into identical ones: {2} GDS bytes and {3} "
+              "spice bytes less".format(structures, names, gds_bytes, sp_bytes))
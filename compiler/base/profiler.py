@@ -0,0 +1,157 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Construction profiler of the design modules (the --profile option).
+
+Every design class constructor is wrapped by design.track_build, which
+calls enter/leave of the running profiler around it. For every class the
+profiler records the number of constructions, the inclusive and exclusive
+wall time, the rectangles, instances, pins and vias it created and the
+growth of the peak memory (max RSS) during its construction. Other phases
+(e.g. writing the outputs) can be timed with section().
+
+The report is a JSON file and a collapsed-stack file (one "sram;bank;pinv
+<microseconds>" line per call stack) for flame graph tools, e.g.
+flamegraph.pl sram.profile.folded > sram.svg
+"""
+
+import json
+import time
+import resource
+import contextlib
+import debug
+
+# The running profiler, None when not profiling
+current = None
+
+
+def start():
+    """ Start profiling the constructions """
+
+    global current
+    current = profiler()
+    return current
+
+
+def stop():
+    """ Stop profiling and return the profiler with its results """
+
+    global current
+    (result, current) = (current, None)
+    return result
+
+
+@contextlib.contextmanager
+def section(name):
+    """ Time a phase that is not a design construction """
+
+    if current == None:
+        yield
+        return
+    current.enter(name)
+    try:
+        yield
+    finally:
+        current.leave(None)
+
+
+def max_rss():
+    """ Peak resident memory of the process in bytes """
+
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class profiler():
+    """ Call stack of the constructions and the statistics per class """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.start_rss = max_rss()
+        # Frames of the constructions in progress: [name, object, start time,
+        # time of the children, peak memory at the start]
+        self.stack = []
+        # Statistics by class name
+        self.classes = {}
+        # Exclusive time by call stack, e.g. "sram;bank;pinv"
+        self.stacks = {}
+
+    def enter(self, name, obj=None):
+        self.stack.append([name, obj, time.perf_counter(), 0.0, max_rss()])
+
+    def leave(self, obj):
+        end_time = time.perf_counter()
+        path = ";".join(frame[0] for frame in self.stack)
+        (name, obj, start_time, child_time, start_rss) = self.stack.pop()
+        inclusive = end_time - start_time
+        exclusive = inclusive - child_time
+        if self.stack:
+            self.stack[-1][3] += inclusive
+        self.stacks[path] = self.stacks.get(path, 0.0) + exclusive
+
+        stats = self.classes.setdefault(name, {"count" : 0,
+                                               "inclusive" : 0.0,
+                                               "exclusive" : 0.0,
+                                               "rects" : 0,
+                                               "insts" : 0,
+                                               "pins" : 0,
+                                               "vias" : 0,
+                                               "memory" : 0})
+        stats["count"] += 1
+        stats["exclusive"] += exclusive
+        stats["memory"] += max_rss() - start_rss
+        # A constructor called from the constructor of a subclass is part of it
+        if not any(frame[0] == name for frame in self.stack):
+            stats["inclusive"] += inclusive
+        if obj != None and not (self.stack and self.stack[-1][1] is obj):
+            self.count_shapes(obj, stats)
+
+    def count_shapes(self, obj, stats):
+        """ Add the shapes made by the constructor of obj """
+
+        import geometry
+        stats["rects"] += len([o for o in obj.objs if isinstance(o, geometry.rectangle)])
+        for inst in obj.insts:
+            if inst.mod.__class__.__name__ == "contact":
+                stats["vias"] += 1
+            else:
+                stats["insts"] += 1
+        stats["pins"] += sum(len(pins) for pins in obj.pin_map.values())
+
+    def report(self):
+        """ Statistics sorted by exclusive time """
+
+        total = time.perf_counter() - self.start_time
+        classes = sorted(self.classes.items(), key=lambda item: -item[1]["exclusive"])
+        return {"total_time" : total,
+                "peak_memory" : max_rss(),
+                "memory_growth" : max_rss() - self.start_rss,
+                "classes" : dict(classes)}
+
+    def write(self, base_name):
+        """ Write base_name.profile.json and base_name.profile.folded """
+
+        report = self.report()
+        json_name = base_name + ".profile.json"
+        with open(json_name, "w") as f:
+            json.dump(report, f, indent=2)
+
+        folded_name = base_name + ".profile.folded"
+        with open(folded_name, "w") as f:
+            for (path, exclusive) in sorted(self.stacks.items()):
+                f.write("{0} {1}\n".format(path, int(round(exclusive*1e6))))
+
+        print("\n Profile: Writing to {0} and {1}".format(json_name, folded_name))
+        debug.info(1, "{0:<30} {1:>6} {2:>10} {3:>10}".format("class", "count", "incl (s)", "excl (s)"))
+        for (name, stats) in list(report["classes"].items())[:20]:
+            debug.info(1, "{0:<30} {1:>6} {2:>10.3f} {3:>10.3f}".format(name, stats["count"],
+                       stats["inclusive"], stats["exclusive"]))
+        return report
@@ -26,6 +26,9 @@ class ptx(design.design):
         transistors of the given width. Total width is therefore mults*width.  Options allow you 
         to connect the fingered gates and active for parallel devices. """
 
+    # Pins that can be swapped without changing the circuit
+    equivalent_pins = [("D", "S")]
+
     def __init__(self, width=drc["minwidth_tx"], mults=1, tx_type="nmos", connect_active=False, 
                        connect_poly=False, num_contacts=None, min_area=True, dummy_poly=True):
         
@@ -68,16 +68,28 @@ def auto_measure_libcell(pin_list, name, units, layer):
         cell[str(pin)] = pin_center(boundary)
     return cell
 
+# Library cell layouts that were read from GDS, by file name and units
+libcell_layouts = {}
+
+def load_libcell(name, units):
+    """ Open the GDS file of a library cell. Each file is only read once,
+        the measurements of a cell are all done on the same layout. """
+
+    cell_gds = OPTS.AMC_tech + "gds_lib/" + str(name) + ".gds"
+    key = (cell_gds, tuple(units))
+    if key not in libcell_layouts:
+        cell_vlsi = gdsMill.VlsiLayout(units=units)
+        reader = gdsMill.Gds2reader(cell_vlsi)
+        reader.loadFromFile(cell_gds)
+        libcell_layouts[key] = cell_vlsi
+    return libcell_layouts[key]
+
+
 def get_libcell_size(name, units, layer):
     """ Open a GDS file and return the library cell size from either the
         bounding box or a border layer. """
     
-    cell_gds = OPTS.AMC_tech + "gds_lib/" + str(name) + ".gds"
-    cell_vlsi = gdsMill.VlsiLayout(units=units)
-    reader = gdsMill.Gds2reader(cell_vlsi)
-    reader.loadFromFile(cell_gds)
-
-    cell = {}
+    cell_vlsi = load_libcell(name, units)
     measure_result = cell_vlsi.getLayoutBorder(layer)
     if measure_result == None:
         measure_result = cell_vlsi.measureSize(name)
@@ -88,11 +100,7 @@ def get_libcell_pins(pin_list, name, units):
     """ Open a GDS file and find the pins in pin_list as text on a given layer.
         Return these as a rectangle layer pair for each pin. """
     
-    cell_gds = OPTS.AMC_tech + "gds_lib/" + str(name) + ".gds"
-    cell_vlsi = gdsMill.VlsiLayout(units=units)
-    reader = gdsMill.Gds2reader(cell_vlsi)
-    reader.loadFromFile(cell_gds)
-
+    cell_vlsi = load_libcell(name, units)
     cell = {}
     for pin in pin_list:
         cell[str(pin)]=[]
@@ -105,5 +113,51 @@ def get_libcell_pins(pin_list, name, units):
     return cell
 
 
+class libcell_attribute():
+    """ Class attribute of a library cell (width, height or pin_map) that is
+        measured in its GDS file the first time it is used instead of when the
+        class is defined. It is then replaced by its value. """
+
+    # All the attributes that are not measured yet
+    pending = []
+
+    def __init__(self, cell_name, pin_names, field):
+        self.cell_name = cell_name
+        self.pin_names = pin_names
+        self.field = field
+        libcell_attribute.pending.append(self)
+
+    def __set_name__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __get__(self, obj, cls=None):
+        if self.field == "pin_map":
+            value = get_libcell_pins(self.pin_names, self.cell_name, tech.GDS["unit"])
+        else:
+            size = get_libcell_size(self.cell_name, tech.GDS["unit"], tech.layer["boundary"])
+            value = size[["width", "height"].index(self.field)]
+        setattr(self.owner, self.name, value)
+        if self in libcell_attribute.pending:
+            libcell_attribute.pending.remove(self)
+        return value
+
+
+def lazy_libcell(cell_name, pin_names):
+    """ Size and pins of a library cell, measured on first use:
+        (width, height, pin_map) = lazy_libcell("cell_6t", pin_names) """
+    
+    return (libcell_attribute(cell_name, pin_names, "width"),
+            libcell_attribute(cell_name, pin_names, "height"),
+            libcell_attribute(cell_name, pin_names, "pin_map"))
+
+
+def load_libcells():
+    """ Measure all the library cells imported so far (e.g. before forking) """
+    
+    for attribute in list(libcell_attribute.pending):
+        getattr(attribute.owner, attribute.name)
+
+
 
 
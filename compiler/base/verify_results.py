@@ -0,0 +1,330 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Results of the DRC/LVS/ERC/PEX runs.
+
+The reports of the tools are parsed line by line as they are read, so a
+multi-GB LVS report, results database or extracted netlist is never loaded
+whole, and only the first max_messages messages of a check are kept (the
+counts are always complete). The parsers return the results of
+verify_runner: a dictionary with the cell, the kind of check, its status,
+its error count, the counts by rule and the messages.
+
+verify_report gathers the results of many cells checked at the same time
+into one JSON and HTML report, with the error counts by rule over all the
+cells, and adds these counts to a history file (one JSON line per run) to
+follow them from run to run. """
+
+import os
+import re
+import json
+import html
+import datetime
+import tempfile
+import debug
+
+# Messages kept per check
+max_messages = 100
+
+drc_rulecheck = re.compile(r"RULECHECK\s+(\S+)\s+\.*\s*TOTAL Result Count\s*=\s*(\d+)")
+drc_totals = {"geometries" : re.compile(r"TOTAL Original Layer Geometries:\s*(\d+)"),
+              "checks" : re.compile(r"TOTAL DRC RuleChecks Executed:\s*(\d+)"),
+              "errors" : re.compile(r"TOTAL DRC Results Generated:\s*(\d+)")}
+
+# The lines of an LVS report and of its extraction report
+lvs_patterns = {"correct" : re.compile("#     CORRECT     #"),
+                "not_compared" : re.compile("NOT COMPARED"),
+                "incorrect" : re.compile("#     INCORRECT     #"),
+                "compare_errors" : re.compile(r"\s+Error:")}
+ext_patterns = {"extraction_errors" : re.compile("ERROR:"),
+                "extraction_warnings" : re.compile("WARNING:")}
+tool_error = re.compile("ERROR:")
+
+# A result of an ASCII results database: "p <ordinal> <vertices>" or "e <ordinal> <vertices>"
+db_result = re.compile(r"^([pe])\s+\d+\s+(\d+)")
+
+
+def lines(filename):
+    """ The lines of a file, read as they are used. A missing optional
+        file has none. """
+
+    if not filename or not os.path.isfile(filename):
+        return
+    with open(filename, "r", errors="replace") as f:
+        for line in f:
+            yield line
+
+
+def grep(filename, patterns, messages=None):
+    """ {name : number of lines} of the patterns in a file. The matching
+        lines of the patterns in messages are kept, up to max_messages. """
+
+    counts = dict((name, 0) for name in patterns)
+    for line in lines(filename):
+        for (name, pattern) in patterns.items():
+            if pattern.search(line):
+                counts[name] += 1
+                if messages != None and name in messages.get("patterns", []) and \
+                   len(messages["lines"]) < max_messages:
+                    messages["lines"].append(line.strip())
+    return counts
+
+
+def parse_drc_summary(cell_name, filename):
+    """ The result of a DRC summary: the count of every rule with results
+        and the totals at its end """
+
+    rules = {}
+    totals = {}
+    for line in lines(filename):
+        match = drc_rulecheck.search(line)
+        if match:
+            if int(match.group(2)) > 0:
+                rules[match.group(1)] = int(match.group(2))
+            continue
+        for (name, pattern) in drc_totals.items():
+            match = pattern.search(line)
+            if match:
+                totals[name] = int(match.group(1))
+    if "errors" not in totals:
+        raise ValueError("No DRC totals in {0}".format(filename))
+    return {"cell" : cell_name,
+            "kind" : "drc",
+            "status" : "CLEAN" if totals["errors"] == 0 else "ERRORS",
+            "errors" : totals["errors"],
+            "rules" : rules,
+            "geometries" : totals.get("geometries", 0),
+            "checks" : totals.get("checks", 0),
+            "messages" : []}
+
+
+def parse_results_db(filename):
+    """ {rule : result count} of an ASCII results database (DRC results,
+        ERC database). The geometries of the results are skipped. """
+
+    rules = {}
+    source = lines(filename)
+    # The first line is the top cell and the precision
+    if next(source, None) == None:
+        return rules
+    for line in source:
+        words = line.split()
+        match = db_result.match(line)
+        if match:
+            # A polygon has one line per vertex, an edge one line
+            skip = int(match.group(2)) if match.group(1) == "p" else 1
+            for i in range(skip):
+                next(source, None)
+            continue
+        if len(words) != 1 or words[0][0].isdigit():
+            continue
+        # A rule: its name, then its counts and number of lines of text
+        counts = next(source, "").split()
+        if len(counts) < 3 or not counts[0].isdigit():
+            continue
+        rules[words[0]] = rules.get(words[0], 0) + int(counts[0])
+        for i in range(int(counts[2])):
+            next(source, None)
+    return rules
+
+
+def parse_lvs_report(cell_name, report, erc_results=None, output=None):
+    """ The result of an LVS report, its extraction report (report.ext),
+        the ERC database and the standard output of the run """
+
+    messages = {"patterns" : ["compare_errors", "extraction_errors"], "lines" : []}
+    if not os.path.isfile(report):
+        raise IOError("No LVS report {0}".format(report))
+    counts = grep(report, lvs_patterns, messages)
+    counts.update(grep(report + ".ext", ext_patterns, messages))
+    messages["patterns"].append("tool_errors")
+    counts.update(grep(output, {"tool_errors" : tool_error}, messages))
+    erc = parse_results_db(erc_results)
+
+    if counts["incorrect"]:
+        status = "INCORRECT"
+    elif counts["not_compared"]:
+        status = "NOT COMPARED"
+    elif counts["correct"]:
+        status = "CORRECT"
+    else:
+        status = "UNKNOWN"
+    correct = counts.pop("correct")
+    errors = sum(counts[name] for name in ["not_compared", "incorrect", "compare_errors",
+                                           "extraction_errors", "tool_errors"])
+    return {"cell" : cell_name,
+            "kind" : "lvs",
+            "status" : status,
+            "errors" : errors,
+            "rules" : counts,
+            "erc" : erc,
+            "messages" : messages["lines"]}
+
+
+def parse_output(cell_name, kind, output):
+    """ The result of a run that only reports errors on its standard
+        output (PEX) """
+
+    messages = {"patterns" : ["tool_errors"], "lines" : []}
+    counts = grep(output, {"tool_errors" : tool_error}, messages)
+    return {"cell" : cell_name,
+            "kind" : kind,
+            "status" : "ERRORS" if counts["tool_errors"] else "CLEAN",
+            "errors" : counts["tool_errors"],
+            "rules" : {},
+            "messages" : messages["lines"]}
+
+
+def correct_port(name, output_file_name, ref_file_name):
+    """ Replace the definition line of the subckt of an extracted netlist
+        (up to the "* " line after it) by the one of the reference netlist,
+        line by line into a new file """
+
+    title = re.compile(".SUBCKT " + str(name) + ".*")
+    circuit_title = None
+    for line in lines(ref_file_name):
+        match = title.search(line)
+        if match:
+            circuit_title = match.group() + "\n"
+            break
+    if circuit_title == None:
+        debug.error("No subckt {0} in {1}".format(name, ref_file_name), -1)
+
+    start = re.compile(".subckt " + str(name) + ".*")
+    (fd, temp_name) = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_file_name)),
+                                       suffix=".tmp")
+    # Copying, skipping the old definition, then copying the rest
+    state = "before"
+    with os.fdopen(fd, "w") as output_file:
+        for line in lines(output_file_name):
+            if state == "before":
+                match = start.search(line)
+                if not match:
+                    output_file.write(line)
+                    continue
+                output_file.write(line[:match.start()])
+                output_file.write(circuit_title)
+                line = line[match.start():]
+                state = "definition"
+            if state == "definition":
+                end = line.find("* \n")
+                if end < 0:
+                    continue
+                line = line[end:]
+                state = "after"
+            output_file.write(line)
+    if state != "after":
+        os.remove(temp_name)
+        debug.error("No subckt {0} in {1}".format(name, output_file_name), -1)
+    os.replace(temp_name, output_file_name)
+
+
+class verify_report():
+    """ The results of the checks of many cells in one report """
+
+    def __init__(self, name):
+        self.name = name
+        self.date = datetime.datetime.now()
+        self.results = []
+
+    def add(self, result, cached=False):
+        """ Add the result of a check (a verify_runner result) """
+
+        result = dict(result)
+        result["cached"] = cached
+        self.results.append(result)
+
+    def rule_counts(self):
+        """ {kind : {rule : count}} over all the cells, with the ERC rules
+            as the kind "erc" """
+
+        counts = {}
+        for result in self.results:
+            kinds = [(result["kind"], result.get("rules", {})), ("erc", result.get("erc", {}))]
+            for (kind, rules) in kinds:
+                for (rule_name, count) in rules.items():
+                    if count:
+                        by_rule = counts.setdefault(kind, {})
+                        by_rule[rule_name] = by_rule.get(rule_name, 0) + count
+        return counts
+
+    def errors(self):
+        return sum(result["errors"] for result in self.results)
+
+    def failed(self):
+        """ The cells with errors """
+
+        return sorted(set(result["cell"] for result in self.results if result["errors"]))
+
+    def summary(self):
+        """ The report as a dictionary """
+
+        return {"name" : self.name,
+                "date" : self.date.isoformat(timespec="seconds"),
+                "checks" : len(self.results),
+                "cells" : len(set(result["cell"] for result in self.results)),
+                "errors" : self.errors(),
+                "failed" : self.failed(),
+                "rules" : self.rule_counts(),
+                "results" : sorted(self.results, key=lambda r: (r["cell"], r["kind"]))}
+
+    def write_json(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.summary(), f, indent=1, sort_keys=True)
+
+    def write_html(self, filename):
+        """ A page with the totals by rule and a table of the checks """
+
+        summary = self.summary()
+        e = lambda value: html.escape(str(value))
+        f = open(filename, "w")
+        f.write("<html><head><title>{0} verification</title></head><body>\n".format(e(self.name)))
+        f.write("<h1>{0} verification, {1}</h1>\n".format(e(self.name), e(summary["date"])))
+        f.write("<p>{0} checks of {1} cells, {2} errors</p>\n".format(summary["checks"],
+                                                                    summary["cells"],
+                                                                    summary["errors"]))
+        f.write("<h2>Errors by rule</h2>\n<table border=\"1\">\n")
+        f.write("<tr><th>Check</th><th>Rule</th><th>Count</th></tr>\n")
+        for (kind, rules) in sorted(summary["rules"].items()):
+            for (rule_name, count) in sorted(rules.items()):
+                f.write("<tr><td>{0}</td><td>{1}</td><td>{2}</td></tr>\n".format(
+                        e(kind.upper()), e(rule_name), count))
+        f.write("</table>\n<h2>Checks</h2>\n<table border=\"1\">\n")
+        f.write("<tr><th>Cell</th><th>Check</th><th>Status</th><th>Errors</th>"
+                "<th>Runtime (s)</th><th>Messages</th></tr>\n")
+        for result in summary["results"]:
+            runtime = round(result.get("runtime", 0.0), 1)
+            if result["cached"]:
+                runtime = "{0} (cached)".format(runtime)
+            f.write("<tr><td>{0}</td><td>{1}</td><td>{2}</td><td>{3}</td><td>{4}</td>"
+                    "<td>{5}</td></tr>\n".format(e(result["cell"]), e(result["kind"].upper()),
+                                                 e(result["status"]), result["errors"],
+                                                 e(runtime),
+                                                 "<br>".join(e(m) for m in result["messages"])))
+        f.write("</table>\n</body></html>\n")
+        f.close()
+
+    def append_history(self, filename):
+        """ Add the counts by rule of this run to a history file """
+
+        summary = self.summary()
+        entry = dict((key, summary[key]) for key in ["name", "date", "checks", "errors", "rules"])
+        with open(filename, "a") as f:
+            f.write(json.dumps(entry, sort_keys=True) + "\n")
+
+    def write(self, prefix):
+        """ <prefix>.json, <prefix>.html and a line in <prefix>.history """
+
+        self.write_json(prefix + ".json")
+        self.write_html(prefix + ".html")
+        self.append_history(prefix + ".history")
+        print("Verification report: {0} checks, {1} errors in {2}.html".format(
+              len(self.results), self.errors(), prefix))
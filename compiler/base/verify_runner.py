@@ -0,0 +1,260 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Runner of the DRC/LVS/PEX jobs.
+
+Every check runs in its own directory under OPTS.AMC_temp with its own
+runset and reports, so any number of checks can run at the same time. Up
+to OPTS.verify_jobs tool processes run concurrently, each one under
+subprocess with a timeout of OPTS.verify_timeout seconds. The result of a
+check is a dictionary with its total error count, the error counts by rule
+(DRC) or the mismatch summary (LVS).
+
+The results are kept in OPTS.verify_cache_dir by a hash of the layout
+(without the time stamps of the GDS), the netlist, the rule decks and the
+options of the check, so a cell that didn't change is never checked again.
+An empty verify_cache_dir turns the cache off. """
+
+import os
+import json
+import struct
+import hashlib
+import tempfile
+import datetime
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import debug
+from globals import OPTS
+
+# GDS records with time stamps (BGNLIB, BGNSTR), only their type is hashed
+gds_dated_records = [0x01, 0x05]
+
+
+def file_hash(filename):
+    """ SHA1 of the contents of a file """
+
+    sha = hashlib.sha1()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def gds_hash(filename):
+    """ SHA1 of the records of a GDS file without their time stamps, so the
+        same layout written at another time has the same hash """
+
+    sha = hashlib.sha1()
+    with open(filename, "rb") as f:
+        while True:
+            header = f.read(4)
+            if len(header) < 4:
+                break
+            (length, record) = struct.unpack(">HB", header[:3])
+            if length < 4:
+                break
+            data = f.read(length - 4)
+            sha.update(header)
+            if record not in gds_dated_records:
+                sha.update(data)
+    return sha.hexdigest()
+
+
+def input_hash(filename):
+    """ Hash of an input of a check, "" if there is none """
+
+    if not filename or not os.path.isfile(filename):
+        return ""
+    if filename.lower().endswith(".gds"):
+        return gds_hash(filename)
+    return file_hash(filename)
+
+
+class verify_job():
+    """ One check of a cell. The tool interface writes the runset, gives the
+        command and parses the reports in the run directory. """
+
+    # "drc", "lvs" or "pex"
+    kind = ""
+
+    # Checks with outputs besides their result (extracted netlists) always run
+    cacheable = True
+
+    def __init__(self, cell_name, gds_name, sp_name=None, rules=[], options={}):
+        self.cell_name = cell_name
+        self.gds_name = gds_name
+        self.sp_name = sp_name
+        # The rule decks and the options the result depends on
+        self.rules = [r for r in rules if r]
+        self.options = options
+        self.run_dir = None
+        self.returncode = None
+        self.timed_out = False
+        self.runtime = 0.0
+        self.result = None
+        self.cached = False
+
+    def key(self):
+        """ Hash of everything the result depends on """
+
+        sha = hashlib.sha1()
+        sha.update(repr((self.kind, self.cell_name, sorted(self.options.items()))).encode())
+        for filename in [self.gds_name, self.sp_name] + self.rules:
+            sha.update(input_hash(filename).encode())
+        return sha.hexdigest()
+
+    def write_runset(self):
+        pass
+
+    def command(self):
+        return []
+
+    def parse(self):
+        return self.failed("no report parser")
+
+    def failed(self, reason):
+        """ The result of a check that didn't produce its reports """
+
+        return {"cell" : self.cell_name,
+                "kind" : self.kind,
+                "status" : "FAILED",
+                "errors" : 1,
+                "rules" : {},
+                "messages" : [reason]}
+
+    def path(self, name):
+        """ A file of the run directory """
+
+        return os.path.join(self.run_dir, name)
+
+    def run(self, timeout=None):
+        """ Run the tool in a new directory and parse its reports """
+
+        os.makedirs(verify_dir(), exist_ok=True)
+        self.run_dir = tempfile.mkdtemp(prefix="{0}_{1}_".format(self.cell_name, self.kind),
+                                        dir=verify_dir())
+        self.write_runset()
+        stdout_log = self.path(self.cell_name + "." + self.kind + ".out")
+        stderr_log = self.path(self.cell_name + "." + self.kind + ".err")
+        command = self.command()
+        debug.info(2, "{0} in {1}".format(" ".join(command), self.run_dir))
+
+        start_time = datetime.datetime.now()
+        with open(stdout_log, "w") as stdout, open(stderr_log, "w") as stderr:
+            try:
+                self.returncode = subprocess.run(command, cwd=self.run_dir, stdout=stdout,
+                                                 stderr=stderr, timeout=timeout).returncode
+            except subprocess.TimeoutExpired:
+                self.timed_out = True
+        self.runtime = (datetime.datetime.now() - start_time).total_seconds()
+
+        if self.timed_out:
+            self.result = self.failed("{0} timed out after {1} seconds in {2}".format(
+                                      self.kind.upper(), timeout, self.run_dir))
+        else:
+            try:
+                self.result = self.parse()
+            except (IOError, IndexError, ValueError):
+                self.result = self.failed("Unable to read the {0} reports of {1}, see {2}".format(
+                                          self.kind.upper(), self.cell_name, stdout_log))
+        self.result["runtime"] = self.runtime
+        return self
+
+
+def verify_dir():
+    """ The directory of the run directories """
+
+    return OPTS.AMC_temp + "verify/"
+
+
+class verify_cache():
+    """ Results of the checks by the hash of their inputs """
+
+    def __init__(self, cache_dir=None):
+        if cache_dir == None:
+            cache_dir = OPTS.verify_cache_dir
+        self.cache_dir = cache_dir
+        self.enabled = (cache_dir != "")
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def entry_file(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, key, name=None):
+        """ The cached result of a key, None on a miss """
+
+        if not self.enabled:
+            return None
+        try:
+            with open(self.entry_file(key)) as f:
+                result = json.load(f)
+        except (IOError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        debug.info(1, "Cache hit for {0} ({1})".format(name or "check", key[:12]))
+        return result
+
+    def put(self, key, result):
+        """ Store the result of a check. Failed runs of the tool are not stored. """
+
+        if not self.enabled or result["status"] == "FAILED":
+            return
+        # Write and rename so that concurrent runs never read a partial entry
+        (fd, temp_name) = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(result, f)
+        os.replace(temp_name, self.entry_file(key))
+
+    def report(self):
+        """ Print the hits and misses of this run """
+
+        if self.enabled and self.hits + self.misses > 0:
+            print("Verification cache: {0} hits, {1} checked ({2})".format(
+                  self.hits, self.misses, self.cache_dir))
+
+
+def run_jobs(jobs, num_jobs=None, done=None, cache=None):
+    """ Run the jobs with at most num_jobs tool processes at the same time.
+        Cached results are used without running. done(job) is called as
+        soon as the result of each one is known. """
+
+    num_jobs = max(1, num_jobs or OPTS.verify_jobs)
+    if cache == None:
+        cache = verify_cache()
+
+    todo = []
+    for job in jobs:
+        job.cache_key = job.key() if job.cacheable else None
+        result = cache.get(job.cache_key, "{0} of {1}".format(job.kind.upper(), job.cell_name)) \
+                 if job.cacheable else None
+        if result != None:
+            job.result = result
+            job.cached = True
+            if done:
+                done(job)
+        else:
+            todo.append(job)
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=min(num_jobs, len(todo))) as pool:
+            futures = [pool.submit(job.run, OPTS.verify_timeout) for job in todo]
+            for finished in as_completed(futures):
+                job = finished.result()
+                if job.cacheable:
+                    cache.put(job.cache_key, job.result)
+                if done:
+                    done(job)
+    cache.report()
+    return jobs
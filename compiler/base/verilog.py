@@ -21,14 +21,20 @@
 
 
 import debug
+from globals import OPTS
 
 class verilog:
     """ Create a behavioral Verilog file for simulation."""
 
     
-    def verilog_write(self,verilog_name):
-        """ Write a behavioral Verilog model. """
+    def verilog_write(self,verilog_name, timing=None):
+        """ Write a behavioral Verilog model. The sparse model takes its delays
+            (ns) from timing, see lib.verilog_timing(). """
         
+        if OPTS.verilog_model == "sparse":
+            self.sparse_verilog_write(verilog_name, timing)
+            return
+
         self.vf = open(verilog_name, "w")
 
         self.vf.write("// AMC SRAM model\n")
@@ -151,3 +157,154 @@ class verilog:
         self.vf.write("endmodule\n")
         self.vf.close()
         
+
+    def sparse_verilog_write(self, verilog_name, timing=None):
+        """ Write a behavioral Verilog model for large memories: only the
+            written words are stored (SystemVerilog associative array), a reset
+            starts a new generation of words instead of clearing them and the
+            accesses are only logged when compiled with AMC_LOG defined.
+            AMC_DENSE stores the words in a plain Verilog array for the
+            simulators without associative arrays. """
+        
+        if timing == None:
+            timing = {"read_delay" : 1, "write_delay" : 1}
+
+        self.vf = open(verilog_name, "w")
+
+        self.vf.write("// AMC SRAM model with sparse storage\n")
+        self.vf.write("// Addr size: {0}\n".format(self.addr_size))
+        self.vf.write("// Word size: {0}\n".format(self.w_size))
+        self.vf.write("// Define AMC_LOG to display every access and AMC_DENSE for a\n")
+        self.vf.write("// simulator without associative arrays (e.g. iverilog -DAMC_DENSE)\n\n")
+        self.vf.write("`timescale 1ns/1ps\n\n")
+    
+        self.vf.write("module {0}(data_in, data_out, addr, ".format(self.name))
+        if self.mask:
+            self.vf.write("bm_in, ")
+        self.vf.write("reset, r, w,  rw, rreq, wreq, ack, rack, wack")
+        if self.power_gate:
+            self.vf.write(",sleep);\n")
+        else:
+            self.vf.write(");\n")
+
+        self.vf.write("\n")
+        self.vf.write("  parameter DATA_WIDTH = {0} ;\n".format(self.w_size))
+        self.vf.write("  parameter ADDR_WIDTH = {0} ;\n".format(self.addr_size))
+        self.vf.write("  parameter GEN_WIDTH = 32 ;\n")
+        self.vf.write("  parameter DELAY = 1 ;\n")
+        self.vf.write("  parameter READ_DELAY = {0} ;\n".format(timing["read_delay"]))
+        self.vf.write("  parameter WRITE_DELAY = {0} ;\n".format(timing["write_delay"]))
+        self.vf.write("\n")    
+        self.vf.write("  input [DATA_WIDTH-1:0] data_in;\n")
+        self.vf.write("  output [DATA_WIDTH-1:0] data_out;\n")
+        self.vf.write("  input [ADDR_WIDTH-1:0] addr;\n")
+        if self.mask:
+            self.vf.write("  input [DATA_WIDTH-1:0] bm_in;\n")
+        self.vf.write("  input reset;            // active low reset\n")
+        self.vf.write("  input r;                // active high read enable\n")
+        self.vf.write("  input w;                // active high write enable\n")
+        self.vf.write("  input rw;               // active high read_modify_write enable\n")
+        self.vf.write("  input rreq;             // active high read_request\n")
+        self.vf.write("  input wreq;             // active high write_request\n")
+        if self.power_gate:
+            self.vf.write("  input sleep;             // active low power_gate\n")
+        self.vf.write("  output ack;             // address_acknowlede\n")
+        self.vf.write("  output rack;            // read_acknowledge\n")
+        self.vf.write("  output wack;            // write_acknowledge\n")
+        self.vf.write("\n")
+        self.vf.write("  reg ack;\n")
+        self.vf.write("  reg rack;\n")
+        self.vf.write("  reg wack;\n")
+        self.vf.write("  reg wreqM = 1'b0;\n")
+        self.vf.write("  reg [DATA_WIDTH-1:0] data_out;\n")
+        self.vf.write("\n")
+        self.vf.write("  // A word is stored with the generation (number of resets) it was\n")
+        self.vf.write("  // written in, the words of an older generation read as zero\n")
+        self.vf.write("  reg [GEN_WIDTH-1:0] generation = 0;\n")
+        self.vf.write("`ifdef AMC_DENSE\n")
+        self.vf.write("  reg [GEN_WIDTH+DATA_WIDTH-1:0] mem [0:(1<<ADDR_WIDTH)-1];\n")
+        self.vf.write("`else\n")
+        self.vf.write("  logic [GEN_WIDTH+DATA_WIDTH-1:0] mem [bit [ADDR_WIDTH-1:0]];\n")
+        self.vf.write("`endif\n")
+        self.vf.write("\n")
+
+        self.vf.write("  function [DATA_WIDTH-1:0] read_word;\n")
+        self.vf.write("    input [ADDR_WIDTH-1:0] a;\n")
+        self.vf.write("    reg [GEN_WIDTH+DATA_WIDTH-1:0] entry;\n")
+        self.vf.write("    begin\n")
+        self.vf.write("`ifdef AMC_DENSE\n")
+        self.vf.write("      entry = mem[a];\n")
+        self.vf.write("`else\n")
+        self.vf.write("      entry = mem.exists(a) ? mem[a] : {(GEN_WIDTH+DATA_WIDTH){1'bx}};\n")
+        self.vf.write("`endif\n")
+        self.vf.write("      if (entry[GEN_WIDTH+DATA_WIDTH-1:DATA_WIDTH] === generation)\n")
+        self.vf.write("        read_word = entry[DATA_WIDTH-1:0];\n")
+        self.vf.write("      else if (generation == 0)\n")
+        self.vf.write("        read_word = {DATA_WIDTH{1'bx}};   // never written nor reset\n")
+        self.vf.write("      else\n")
+        self.vf.write("        read_word = {DATA_WIDTH{1'b0}};\n")
+        self.vf.write("    end\n")
+        self.vf.write("  endfunction\n\n")
+        
+        self.vf.write("  // Memory Reset Block\n")
+        self.vf.write("  // Reset Operation : When reset = 1\n")
+        self.vf.write("  always @ (posedge reset)\n")
+        self.vf.write("  begin : MEM_RESET\n")
+        self.vf.write("    generation = generation + 1;\n")
+        self.vf.write("`ifdef AMC_LOG\n")
+        self.vf.write("    $display($time,\" Reseting MEM\");\n")
+        self.vf.write("`endif\n")
+        self.vf.write("  end\n\n")
+        
+        if self.power_gate:    
+            self.vf.write("  always @ (negedge sleep) begin\n")
+            self.vf.write("        rack <= #(DELAY) 1'b0;\n")
+            self.vf.write("        wack <= #(DELAY) 1'b0;\n")
+            self.vf.write("        ack <= #(DELAY) 1'b0;\n")
+            self.vf.write("  end\n\n")
+
+        self.vf.write("  always @ (posedge ack) begin\n")
+        self.vf.write("        rack <= #(DELAY) 1'b0;\n")
+        self.vf.write("        wack <= #(DELAY) 1'b0;\n")
+        self.vf.write("        ack <= #(DELAY) 1'b0;\n")
+        self.vf.write("        wreqM <= #(DELAY) 1'b0;\n")
+        self.vf.write("  end\n\n")
+
+        self.vf.write("  // Memory Write Block\n")
+        self.vf.write("  // Write Operation : When wreq = 1\n")
+        self.vf.write("  always @ (posedge (w || wreqM))\n")
+        self.vf.write("      if (!reset) begin : MEM_WRITE\n")
+        self.vf.write("          if ((w && wreq) || (rw && wreqM)) begin\n")
+        if self.mask:
+            self.vf.write("              // Only the bits enabled by bm_in are written\n")
+            self.vf.write("              mem[addr] = {generation, (read_word(addr) & ~bm_in) | (data_in & bm_in)};\n")
+        else:
+            self.vf.write("              mem[addr] = {generation, data_in};\n")
+        self.vf.write("              wack <= #(WRITE_DELAY) 1'b1;\n")
+        self.vf.write("              ack <= #(WRITE_DELAY) 1'b1;\n")
+        self.vf.write("`ifdef AMC_LOG\n")
+        self.vf.write("              $display($time,\" Writing %m ADDR=%b DATA_IN=%b\",addr,data_in);\n")
+        self.vf.write("`endif\n")
+        self.vf.write("          end\n")
+        self.vf.write("      end\n\n")
+        
+        self.vf.write("  // Memory Read Block\n")
+        self.vf.write("  // Read Operation : When rreq = 1\n")
+        self.vf.write("  always @ (posedge (r || rw))\n")
+        self.vf.write("  if (!reset) begin : MEM_READ\n")
+        self.vf.write("      if ((r || rw) && rreq) begin\n")
+        self.vf.write("          data_out <= #(READ_DELAY) read_word(addr);\n")
+        self.vf.write("          rack <= #(READ_DELAY) 1'b1;\n")
+        self.vf.write("`ifdef AMC_LOG\n")
+        self.vf.write("          $display($time,\" reading %m ADDR=%b DATAOUT=%b\",addr,read_word(addr));\n")
+        self.vf.write("`endif\n")
+        self.vf.write("          if (rw) begin\n")
+        self.vf.write("               wreqM <= #(READ_DELAY) 1'b1;\n")
+        self.vf.write("          end\n")
+        self.vf.write("          if (r) begin\n")
+        self.vf.write("               ack <= #(READ_DELAY) 1'b1;\n")
+        self.vf.write("          end\n")
+        self.vf.write("      end\n")
+        self.vf.write("  end\n\n")
+        self.vf.write("endmodule\n")
+        self.vf.close()
@@ -26,6 +26,7 @@ import getpass
 import design
 from globals import OPTS, print_time
 import debug
+import compressed
 import contact
 import math
 from vector import vector
@@ -44,7 +45,6 @@ class bist(design.design):
     def __init__(self, addr_size, data_size, delay = 0, async_bist = True, name="AMC_BIST"):
         """ Constructor """
 
-        design.design.name_map=[]
         start_time = datetime.datetime.now()
         design.design.__init__(self, name)
         debug.info(1, "Creating {}".format(name))
@@ -519,7 +519,7 @@ class bist(design.design):
 
     def sp_write(self, sp_name):
         """ Write the entire spice of the object to the file """
-        sp = open(sp_name, 'w')
+        sp = compressed.open_output(sp_name)
 
         sp.write("**************************************************\n")
         sp.write("* AMC generated BIST.\n")
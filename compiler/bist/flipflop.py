@@ -32,8 +32,7 @@ class flipflop(design.design):
     the technology library."""
 
     pin_names = ["in", "out", "out_bar", "clk", "rst0", "rst1", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("flipflop", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "flipflop", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("flipflop", pin_names)
 
     def __init__(self):
         design.design.__init__(self, "flipflop")
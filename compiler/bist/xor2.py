@@ -32,8 +32,7 @@ class xor2(design.design):
     the technology library."""
 
     pin_names = ["A", "B", "Z", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("xor2", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "xor2", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("xor2", pin_names)
 
     def __init__(self):
         design.design.__init__(self, "xor2")
@@ -18,19 +18,21 @@ debug.info(2,"Initializing characterizer...")
 OPTS.spice_exe = ""
 
 
-if OPTS.spice_name != "":
-    OPTS.spice_exe=find_exe(OPTS.spice_name)
-    if OPTS.spice_exe=="":
-        debug.error("{0} not found. Unable to perform characterization.".format(OPTS.spice_name),1)
-else:
-    (OPTS.spice_name, OPTS.spice_exe) = get_tool("spice",["finesim", "vcs"])
-
-# set the input dir for spice files if using ngspice 
-if OPTS.spice_name == "ngspice":
-    os.environ["NGSPICE_INPUT_DIR"] = "{0}".format(OPTS.AMC_temp)
-    
-if OPTS.spice_exe == "":
-    debug.error("No recognizable spice version found. Unable to perform characterization.",1)
-
-
-
+def find_simulator():
+    """ The path of the simulator, looked up when the first simulation is
+        prepared so that the netlist tools of the characterizer (spice_netlist,
+        trim_spice) and the analytical backend import without one """
+
+    if OPTS.spice_exe and os.path.basename(OPTS.spice_exe) == OPTS.spice_name:
+        return OPTS.spice_exe
+    if OPTS.spice_name != "":
+        OPTS.spice_exe=find_exe(OPTS.spice_name)
+        # find_exe returns None when the simulator isn't in the PATH
+        if OPTS.spice_exe==None:
+            debug.error("{0} not found. Unable to perform characterization.".format(OPTS.spice_name),1)
+    else:
+        (OPTS.spice_name, OPTS.spice_exe) = get_tool("spice",["finesim", "vcs", "ngspice", "Xyce"])
+
+    if not OPTS.spice_exe:
+        debug.error("No recognizable spice version found. Unable to perform characterization.",1)
+    return OPTS.spice_exe
@@ -0,0 +1,411 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Analytical characterization of the SRAM without a simulator.
+
+The transistors of a bank (all but the bitcell arrays) are flattened from
+the SPICE netlist into a graph of nets: a transistor connects its gate to
+its drain and source, and its drain to its source. Switching a net through
+a transistor takes 0.69*R*C (Elmore), with R the effective resistance of
+the transistor (tech.spice["nmos_res"], ["pmos_res"] scaled by its size)
+and C the gate, diffusion and wire capacitance of the net. The control
+logic, decoder, wordline driver, delay chain, sense amplifier, write driver
+and completion detection paths are the shortest arrival times between the
+ports of the bank control logic, the wordlines and the bitlines. The
+bitcell itself is not in the graph, its read is the time to discharge the
+bitline by the sense swing through the access and pulldown transistors.
+
+A handshake cycle (what functional_test measures from a request to the next
+one) is the forward path of the operation, the return to zero of the
+request (precharge) and the two edges of the request and acknowledge,
+with the input slew and the output load. The power is the switched
+capacitance of the paths, the bitlines and the loads per cycle plus the
+leakage of the transistor width. Each measurement is finally multiplied by
+the factor of the technology fitted against SPICE results (see calibrate). """
+
+import os
+import json
+import math
+import heapq
+import debug
+import tech
+from globals import OPTS
+from . import spice_netlist
+
+# Swing of the bitlines (fraction of the supply) the sense amplifier needs
+sense_swing = 0.1
+
+# Velocity saturation exponent of the alpha-power law
+alpha = 1.3
+
+# Drive resistance of the slow, typical and fast transistors
+process_skew = {"S" : 1.15, "T" : 1.0, "F" : 0.87}
+
+
+def corner_scale(corner):
+    """ Transistor resistance at a corner relative to the nominal one: the
+        alpha-power law in the supply, the mobility in the temperature and
+        the skew of the n and p transistors in the process """
+
+    (process, voltage, temperature) = corner
+    (vdd, vth) = (tech.spice["nom_supply_voltage"], tech.spice["vth"])
+    supply = (voltage/(voltage - vth)**alpha) / (vdd/(vdd - vth)**alpha)
+    kelvin = ((temperature + 273.15)/(tech.spice["nom_temperature"] + 273.15))**1.5
+    skews = [process_skew.get(c, 1.0) for c in str(process).upper()[:2]]
+    skew = sum(skews)/len(skews) if skews else 1.0
+    return supply*kelvin*skew
+
+
+def calibration_file():
+    """ Factors of the technology fitted against SPICE results """
+
+    return os.path.join(OPTS.char_cache_dir, "{0}_analytical.json".format(tech.info["name"]))
+
+
+def load_calibration():
+    """ The calibration factors of the measurements, 1 if not calibrated """
+
+    if OPTS.char_cache_dir == "" or not os.path.exists(calibration_file()):
+        return {}
+    with open(calibration_file()) as f:
+        return json.load(f)
+
+
+class analytical():
+    """ Estimates the measurements of functional_test from the netlist """
+
+    def __init__(self, sram, netlist, bitcell_array="bitcell_ary", control_logic="bank_control_logic"):
+        self.sram = sram
+        self.netlist = spice_netlist.spice_netlist(netlist)
+        self.bitcell_array = bitcell_array
+        self.control_logic = control_logic
+        self.calibration = load_calibration()
+        self.extract()
+
+    def extract(self):
+        """ Read the bank, its arrays and its control logic from the netlist """
+
+        arrays = self.netlist.instances_of(self.bitcell_array)
+        if not arrays:
+            debug.error("No {0} in {1}, unable to estimate the timing.".format(
+                        self.bitcell_array, self.netlist.sp_file), -1)
+        (self.bank, (inst_name, nets, master)) = arrays[0]
+        ports = dict(zip(self.netlist.subckts[master]["ports"], nets))
+        self.rows = len([p for p in ports if p.startswith("wl[")])
+        self.cols = len([p for p in ports if p.startswith("bl[")])
+        self.wl_net = ports["wl[0]"]
+        self.bl_net = ports["bl[0]"]
+
+        from bitcell import bitcell
+        self.wl_wire = self.cols*float(bitcell.width)
+        self.bl_wire = self.rows*float(bitcell.height)
+        # Wire capacitance of the wordlines and bitlines of every bitcell array
+        self.wire_caps = {}
+        for (inst_name, nets, master) in self.netlist.subckts[self.bank]["insts"]:
+            if master == self.bitcell_array:
+                for (port, net) in zip(self.netlist.subckts[master]["ports"], nets):
+                    if port.startswith("wl["):
+                        self.wire_caps[net] = self.wl_wire*tech.spice["wire_cap"]
+                    elif port.startswith("bl[") or port.startswith("br["):
+                        self.wire_caps[net] = self.bl_wire*tech.spice["wire_cap"]
+
+        ctrl = [inst for inst in self.netlist.subckts[self.bank]["insts"] if inst[2] == self.control_logic]
+        if ctrl:
+            self.ctrl_ports = dict(zip(self.netlist.subckts[self.control_logic]["ports"], ctrl[0][1]))
+        else:
+            self.ctrl_ports = {}
+        self.build_graph()
+        self.cell_resistance = self.bitcell_read_resistance(self.bitcell_array)
+        self.leakage_width = self.total_width(self.netlist.top())
+        self.arrivals = {}
+        self.warned = set()
+        debug.info(1,"Analytical model of {0}: {1} rows, {2} columns, {3} transistors in the timing graph".format(
+                   self.bank, self.rows, self.cols, len(self.transistors)))
+
+    def build_graph(self):
+        """ Flatten the bank but the bitcell arrays into a graph of nets """
+
+        self.transistors = []
+        for (inst_name, nets, master) in self.netlist.subckts[self.bank]["insts"]:
+            if master != self.bitcell_array and master in self.netlist.subckts:
+                self.transistors.extend(self.netlist.flatten(master, nets, inst_name + "."))
+
+        supplies = set(self.netlist.supplies)
+        self.edges = {}
+        caps = {}
+        for (index, (drain, gate, source, pmos, w, l)) in enumerate(self.transistors):
+            caps[gate] = caps.get(gate, 0.0) + tech.spice["gate_cap"]*w*l
+            for net in (drain, source):
+                caps[net] = caps.get(net, 0.0) + tech.spice["drain_cap"]*w
+            for net in (drain, source):
+                if net not in supplies:
+                    self.edges.setdefault(gate, []).append((net, index))
+            if drain not in supplies and source not in supplies:
+                self.edges.setdefault(drain, []).append((source, index))
+                self.edges.setdefault(source, []).append((drain, index))
+
+        # The nets of the bank are loaded by the bitcells and the wires too
+        bank_nets = set(n for inst in self.netlist.subckts[self.bank]["insts"] for n in inst[1])
+        self.caps = {}
+        for net in caps:
+            if net in bank_nets:
+                self.caps[net] = self.netlist.net_cap(self.bank, net) + self.wire_caps.get(net, 0.0)
+            else:
+                self.caps[net] = caps[net]
+
+    def resistance(self, pmos, w, l):
+        """ Nominal effective resistance (ohm) of a transistor """
+
+        unit = tech.spice["pmos_res"] if pmos else tech.spice["nmos_res"]
+        return unit*l/(tech.drc["minlength_channel"]*max(w, 1e-3))
+
+    def stage_delay(self, index, net):
+        """ Nominal time (ns) for transistor index to switch a net """
+
+        (drain, gate, source, pmos, w, l) = self.transistors[index]
+        return 0.69*self.resistance(pmos, w, l)*self.caps.get(net, 0.0)*1e-6
+
+    def arrival(self, source):
+        """ Shortest nominal arrival times (ns) and predecessors from a net """
+
+        if source not in self.arrivals:
+            times = {source : 0.0}
+            previous = {}
+            heap = [(0.0, source)]
+            while heap:
+                (time, net) = heapq.heappop(heap)
+                if time > times[net]:
+                    continue
+                for (next_net, index) in self.edges.get(net, []):
+                    t = time + self.stage_delay(index, next_net)
+                    if t < times.get(next_net, float("inf")):
+                        times[next_net] = t
+                        previous[next_net] = net
+                        heapq.heappush(heap, (t, next_net))
+            self.arrivals[source] = (times, previous)
+        return self.arrivals[source]
+
+    def path(self, source, target):
+        """ Nominal delay (ns) and nets of the path between two nets """
+
+        (times, previous) = self.arrival(source)
+        if target not in times:
+            # Two inverter delays when the path isn't in the netlist
+            if (source, target) not in self.warned:
+                debug.warning("No path from {0} to {1} in {2}, using an estimate.".format(
+                              source, target, self.bank))
+                self.warned.add((source, target))
+            return (2*tech.spice["inv_delay"], [])
+        nets = [target]
+        while nets[-1] != source:
+            nets.append(previous[nets[-1]])
+        return (times[target], nets)
+
+    def port(self, name):
+        """ Net of the bank of a port of the control logic """
+
+        return self.ctrl_ports.get(name, name)
+
+    def driver(self, net, pmos):
+        """ Resistance of the strongest transistor of a type that drives a net """
+
+        drivers = [self.resistance(p, w, l) for (d, g, s, p, w, l) in self.transistors
+                   if p == pmos and net in (d, s)]
+        if not drivers:
+            return self.resistance(pmos, tech.drc["minwidth_tx"], tech.drc["minlength_channel"])
+        return min(drivers)
+
+    def bitcell_read_resistance(self, array):
+        """ Resistance of the access and pulldown transistors of a bitcell """
+
+        (inst_name, nets, cell) = self.netlist.subckts[array]["insts"][0]
+        ports = dict(zip(nets, self.netlist.subckts[cell]["ports"]))
+        (bl, wl) = (ports.get("bl[0]", "bl"), ports.get("wl[0]", "wl"))
+        transistors = self.netlist.flatten(cell)
+        access = [t for t in transistors if not t[3] and t[1] == wl and bl in (t[0], t[2])]
+        if not access:
+            return 2*self.resistance(False, tech.drc["minwidth_tx"], tech.drc["minlength_channel"])
+        (drain, gate, source, pmos, w, l) = access[0]
+        node = source if drain == bl else drain
+        pulldown = [self.resistance(p, pw, pl) for (d, g, s, p, pw, pl) in transistors
+                    if not p and node in (d, s) and g != wl]
+        return self.resistance(pmos, w, l) + min(pulldown or [0.0])
+
+    def total_width(self, name, widths=None):
+        """ Total transistor width (um) of the flattened subckt name """
+
+        if widths == None:
+            widths = {}
+        if name not in widths:
+            subckt = self.netlist.subckts[name]
+            total = sum(self.netlist.device_size(d)[0] for d in subckt["devices"]
+                        if self.netlist.is_transistor(d))
+            for (inst_name, nets, master) in subckt["insts"]:
+                if master in self.netlist.subckts:
+                    total += self.total_width(master, widths)
+            widths[name] = total
+        return widths[name]
+
+    def path_cap(self, nets):
+        """ Capacitance (fF) switched along the nets of a path """
+
+        return sum(self.caps.get(net, 0.0) for net in nets)
+
+    def read(self, request):
+        """ Nominal time (ns) from a request to the read data and the switched
+            capacitance, with the bitline swing (fraction of the supply) """
+
+        (t_wl, wl_nets) = self.path(request, self.wl_net)
+        # The wordline is a distributed RC line
+        t_wl += 0.38*self.wl_wire*tech.spice["wire_res"]*self.wl_wire*tech.spice["wire_cap"]*1e-6
+        (t_sen, sen_nets) = self.path(request, self.port("sen"))
+        bl_cap = self.caps.get(self.bl_net, 0.0)
+        t_bl = self.cell_resistance*bl_cap*sense_swing*1e-6
+        # The bitline keeps discharging until the sense amplifier is enabled
+        swing = min(1.0, max(sense_swing, (t_sen - t_wl)/(self.cell_resistance*bl_cap*1e-6)))
+        (t_ready, ready_nets) = self.path(self.port("sen"), self.port("data_ready[0]"))
+        time = max(t_wl + t_bl, t_sen) + t_ready
+        return (time, self.path_cap(wl_nets + sen_nets + ready_nets), swing)
+
+    def bitline(self, request, enable, pmos):
+        """ Nominal time (ns) from a request to the bitline through the enable
+            of the precharge (pmos) or write driver (nmos) and the path nets """
+
+        (t_enable, nets) = self.path(request, self.port(enable))
+        bl_cap = self.caps.get(self.bl_net, 0.0)
+        return (t_enable + 0.69*self.driver(self.bl_net, pmos)*bl_cap*1e-6, nets)
+
+    def write(self, request, wordline=True):
+        """ Nominal time (ns) from a request to the write completion and the
+            switched capacitance. The wordline of a read-write is already on. """
+
+        (t_wl, wl_nets) = self.path(request, self.wl_net) if wordline else (0.0, [])
+        (t_drive, drive_nets) = self.bitline(request, "wen", False)
+        # Flipping the cell, one stage of its inverters
+        t_flip = tech.spice["inv_delay"]
+        (t_complete, complete_nets) = self.path(self.bl_net, self.port("write_complete[0]"))
+        time = max(t_wl, t_drive) + t_flip + t_complete
+        return (time, self.path_cap(wl_nets + drive_nets + complete_nets))
+
+    def handshake(self, request, done):
+        """ Nominal time (ns) from the done signal to the acknowledge, of the
+            return to zero of the request (precharge and acknowledge reset)
+            and the switched capacitance """
+
+        (t_ack, ack_nets) = self.path(done, self.port("ack"))
+        (t_pchg, pchg_nets) = self.bitline(request, "pchg", True)
+        (t_reset, reset_nets) = self.path(request, self.port("ack"))
+        return (t_ack, max(t_pchg, t_reset), self.path_cap(ack_nets + pchg_nets + reset_nets))
+
+    def phases(self, corner):
+        """ Time (ns) from the request to the acknowledge and of the return to
+            zero of the read, write and read-write at a corner. The read-write
+            has the time of its read (to the read acknowledge) first. """
+
+        scale = corner_scale(corner)
+        (t_read, c_read, swing) = self.read(self.port("r"))
+        (t_ack, t_return, c_ack) = self.handshake(self.port("r"), self.port("data_ready[0]"))
+        read = ((t_read + t_ack)*scale, t_return*scale)
+        (t_write, c_write) = self.write(self.port("w"))
+        (t_ack, t_return, c_ack) = self.handshake(self.port("w"), self.port("write_complete[0]"))
+        write = ((t_write + t_ack)*scale, t_return*scale)
+        (t_rw_read, c_rw_read, rw_swing) = self.read(self.port("rw"))
+        (t_rack, rack_nets) = self.path(self.port("data_ready[0]"), self.port("rack"))
+        (t_rw_write, c_rw_write) = self.write(self.port("rack"), False)
+        (t_ack, t_return, c_ack) = self.handshake(self.port("rw"), self.port("write_complete[0]"))
+        read_write = ((t_rw_read + t_rack)*scale, (t_rw_write + t_ack)*scale, t_return*scale)
+        return {"r" : read, "w" : write, "rw" : read_write}
+
+    def point(self, corner, slew, load):
+        """ The measurements (ns, mW) of a (corner, slew, load) point like
+            functional_test.convert_measures """
+
+        (process, voltage, temperature) = corner
+        scale = corner_scale(corner)
+        bl_cap = self.caps.get(self.bl_net, 0.0)
+        ack = self.port("ack")
+        (rise, fall) = (self.driver(ack, True), self.driver(ack, False))
+        ack_cap = self.caps.get(ack, 0.0) + load
+        # Both edges of the acknowledge drive the load, a ramp input adds
+        # the part of its transition before the switching threshold
+        edges = 0.69*(rise + fall)*load*1e-6*scale + 2*slew*(0.5 - tech.spice["vth"]/voltage)
+
+        (t_read, c_read, swing) = self.read(self.port("r"))
+        (t_ack, t_return, c_ack) = self.handshake(self.port("r"), self.port("data_ready[0]"))
+        read_delay = (t_read + t_ack + t_return)*scale + edges
+        (t_write, c_write) = self.write(self.port("w"))
+        (t_ack, t_return, c_wack) = self.handshake(self.port("w"), self.port("write_complete[0]"))
+        write_delay = (t_write + t_ack + t_return)*scale + edges
+        (t_rw_read, c_rw_read, rw_swing) = self.read(self.port("rw"))
+        (t_rw_write, c_rw_write) = self.write(self.port("rack"), False)
+        (t_ack, t_return, c_rw_ack) = self.handshake(self.port("rw"), self.port("write_complete[0]"))
+        read_write_delay = (t_rw_read + t_rw_write + t_ack + t_return)*scale + edges
+
+        # Switched capacitance (fF) of a cycle: the paths, the bitlines of the
+        # row (the written columns full swing) and the loads of the outputs
+        words = self.sram.word_size
+        read_cap = c_read + c_ack + self.cols*bl_cap*swing + (words/2 + 1)*load
+        write_cap = c_write + c_wack + words*bl_cap + (self.cols - words)*bl_cap*swing + load
+        read_write_cap = c_rw_read + c_rw_write + c_rw_ack + self.cols*bl_cap*rw_swing + \
+                         words*bl_cap + (words/2 + 1)*load
+
+        # Half of the transistors are off, the leakage doubles every 10C
+        leakage = 0.5*self.leakage_width*tech.spice["leakage_current"]*voltage*1e3* \
+                  2**((temperature - tech.spice["nom_temperature"])/10.0)
+        # fF*V^2/ns is uW
+        power = lambda cap, delay: cap*voltage**2/delay*1e-3 + leakage
+
+        result = {"write_delay_lh" : write_delay,
+                  "write_delay_hl" : write_delay,
+                  "read_delay_lh" : read_delay,
+                  "read_delay_hl" : read_delay,
+                  "read_write_delay_lh" : read_write_delay,
+                  "read_write_delay_hl" : read_write_delay,
+                  "slew_lh" : 2.2*rise*ack_cap*1e-6*scale,
+                  "slew_hl" : 2.2*fall*ack_cap*1e-6*scale,
+                  "leakage_power" : leakage,
+                  "read_power" : power(read_cap, read_delay),
+                  "write_power" : power(write_cap, write_delay),
+                  "read_write_power" : power(read_write_cap, read_write_delay)}
+        return {m : v*self.calibration.get(m, 1.0) for (m, v) in result.items()}
+
+    def table(self, corner, slews, loads, measures):
+        """ Full tables {measure : values} of a corner, slews major, as lib writes them """
+
+        tables = {m : [] for m in measures}
+        for slew in slews:
+            for load in loads:
+                result = self.point(corner, float(slew), float(load))
+                for m in measures:
+                    tables[m].append(result[m])
+        return tables
+
+    def calibrate(self, corner_tables, slews, loads):
+        """ Fit the factor of each measurement to SPICE tables {corner : tables}
+            (least squares of the ratio) and store it for the technology """
+
+        self.calibration = {}
+        sums = {}
+        for (corner, tables) in corner_tables.items():
+            estimate = self.table(corner, slews, loads, list(tables.keys()))
+            for (m, values) in tables.items():
+                for (spice, model) in zip(values, estimate[m]):
+                    if math.isnan(spice) or model <= 0:
+                        continue
+                    (num, den) = sums.get(m, (0.0, 0.0))
+                    sums[m] = (num + spice*model, den + model*model)
+        self.calibration = {m : num/den for (m, (num, den)) in sums.items() if den > 0}
+        if OPTS.char_cache_dir != "":
+            os.makedirs(OPTS.char_cache_dir, exist_ok=True)
+            with open(calibration_file(), "w") as f:
+                json.dump(self.calibration, f, indent=2, sort_keys=True)
+            debug.info(1,"Wrote the analytical calibration to {0}".format(calibration_file()))
+        return self.calibration
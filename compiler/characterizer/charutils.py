@@ -10,9 +10,38 @@
 
 
 import re
+import math
 import debug
 from globals import OPTS
 
+# Scale of the SPICE unit suffixes (case insensitive, "meg" before "m")
+unit_scales = [("meg", 1e6),
+               ("mil", 25.4e-6),
+               ("t", 1e12),
+               ("g", 1e9),
+               ("k", 1e3),
+               ("m", 1e-3),
+               ("u", 1e-6),
+               ("n", 1e-9),
+               ("p", 1e-12),
+               ("f", 1e-15),
+               ("a", 1e-18)]
+
+number_re = re.compile(r"^([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)([a-zA-Z]*)$")
+
+
+class failed_measure(float):
+    """ A measurement the simulator couldn't make: a NaN that keeps the reason,
+        so it propagates through the arithmetic instead of raising. """
+
+    def __new__(cls, reason):
+        value = float.__new__(cls, "nan")
+        value.reason = reason
+        return value
+
+    def __repr__(self):
+        return "failed_measure({0!r})".format(self.reason)
+
         
 def relative_compare(value1,value2,error_tolerance=0.001):
     """ This is used to compare relative values for convergence. """
@@ -20,25 +49,92 @@ def relative_compare(value1,value2,error_tolerance=0.001):
     return (abs(value1 - value2) / max(value1,value2) <= error_tolerance)
 
 
-def parse_output(filename, key):
-    """Parses a spice output file for a key value"""
-    
-    full_filename="{0}{1}.mt0".format(OPTS.AMC_temp, filename)
+def parse_measurements(filename):
+    """ Read all the measurements of a simulation in one pass. Returns one
+        dictionary {measure : value} per row: a single row, or one per .alter
+        or sweep point. Failed measurements are failed_measure (NaN) values.
+        This reads the HSPICE/FineSim table format (.mt0, a $DATA/.TITLE
+        header, the measure names up to alter# and then the rows of values)
+        and the "name = value" lines of FineSim and ngspice, where a name
+        seen again starts the next row. """
 
     try:
-        f = open(full_filename, "r")
+        f = open(filename, "r")
     except IOError:
-        debug.error("Unable to open spice output file: {0}".format(full_filename),1)
-    
-    contents = f.read()
+        debug.error("Unable to open spice output file: {0}".format(filename),1)
+    lines = f.read().split("\n")
     f.close()
-    val = re.search(r"{0}\s*=\s*(-?\d+.?\d*[e]?[-+]?[0-9]*\S*)\s+.*".format(key), contents)
-    
-    if val != None:
-        debug.info(4, "Key = " + key + " Val = " + val.group(1))
-        return convert_to_float(val.group(1))
+
+    if any(line.startswith("$DATA") or line.startswith(".TITLE") for line in lines[:5]):
+        rows = parse_table(lines)
     else:
-        return "Failed"
+        rows = parse_assignments(lines)
+    debug.info(4, "Measurements of {0}: {1}".format(filename, rows))
+    return rows
+
+
+def parse_table(lines):
+    """ Rows of the HSPICE table format """
+
+    tokens = []
+    for line in lines:
+        if line.startswith("$") or line.startswith(".TITLE"):
+            continue
+        tokens.extend(line.split())
+
+    names = []
+    for token in tokens:
+        names.append(token.lower())
+        if token.lower() == "alter#":
+            break
+    values = tokens[len(names):]
+
+    rows = []
+    for i in range(0, len(values) - len(names) + 1, len(names)):
+        row = {}
+        for (name, value) in zip(names, values[i:i+len(names)]):
+            row[name] = convert_measure(value)
+        rows.append(row)
+    return rows
+
+
+def parse_assignments(lines):
+    """ Rows of "name = value" lines """
+
+    rows = [{}]
+    for line in lines:
+        m = re.match(r"\s*(\w+)\s*=\s*(\S+)", line)
+        if m == None:
+            continue
+        name = m.group(1).lower()
+        # The trig/targ times of a delay measurement are not measurements
+        if name in ["trig", "targ", "from", "to"]:
+            continue
+        if name in rows[-1]:
+            rows.append({})
+        rows[-1][name] = convert_measure(m.group(2))
+    return rows
+
+
+def convert_measure(value):
+    """ A measured value, or failed_measure if the simulator reports a failure """
+
+    if value.lower() in ["failed", "fail", "nan", "error"]:
+        return failed_measure("{0} reported by the simulator".format(value))
+    try:
+        return convert_to_float(value)
+    except ValueError as e:
+        return failed_measure(str(e))
+
+
+def parse_output(filename, key, work_dir=None):
+    """Parses a spice output file (in the temp dir by default) for a key value"""
+    
+    full_filename="{0}{1}.mt0".format(work_dir or OPTS.AMC_temp, filename)
+    rows = parse_measurements(full_filename)
+    if key.lower() in rows[0]:
+        return rows[0][key.lower()]
+    return failed_measure("{0} not found in {1}".format(key, full_filename))
     
 def round_time(time,time_precision=3):
     """ times are in ns, so this is how many digits of precision: 3 digits=1ps, 4digits=0.1ps, etc.""" 
@@ -51,36 +147,16 @@ def round_voltage(voltage,voltag_precision=5):
     return round(voltage, voltage_precision)
 
 def convert_to_float(number):
-    """Converts a string into a (float) number; also converts units (m,u,n,p)"""
-    
-    if number == "Failed":
-        return False
+    """Converts a string into a (float) number; also converts units (m,u,n,p,f,meg,...)"""
     
-    # start out with a binary value
-    float_value = False
-    try:  
-        # checks if string is a float without letter units
-        float_value = float(number)
-    except ValueError:
-        
-        # see if it is in scientific notation
-        unit = re.search(r"(-?\d+\.?\d*)e(\-?\+?\d+)", number)
-        if unit != None:
-            float_value=float(unit.group(1)) * (10 ^ float(unit.group(2)))
-            
-        # see if it is in spice notation
-        unit = re.search(r"(-?\d+\.?\d*)(m?u?n?p?f?)", number)
-        if unit != None:
-            float_value = {
-                'm': lambda x: x * 0.001,  # milli
-                'u': lambda x: x * 0.000001,  # micro
-                'n': lambda x: x * 0.000000001,  # nano
-                'p': lambda x: x * 0.000000000001,  # pico
-                'f': lambda x: x * 0.000000000000001  # femto
-                }[unit.group(2)](float(unit.group(1)))
-
-    # if we weren't able to convert it to a float then error out
-    if not type(float_value)==float:
-        debug.error("Invalid number: {0}".format(number),1)
-
-    return float_value
+    m = number_re.match(number.strip())
+    if m == None:
+        raise ValueError("Invalid number: {0}".format(number))
+    (value, suffix) = m.groups()
+    value = float(value)
+    suffix = suffix.lower()
+    for (unit, scale) in unit_scales:
+        if suffix.startswith(unit):
+            return value * scale
+    # No scale, or only a unit name (e.g. s, v)
+    return value
@@ -26,22 +26,25 @@ simulations as well. """
 
 import tech
 import debug
-import subprocess
 import os, sys, shutil
 from os import path
 from . import charutils 
 import numpy as np
 from globals import OPTS, get_tool
-import time
 import design
 import math
 from . import trim_spice
+from . import sim_runner
+from . import find_simulator
 
 
 class functional_test():
     """ Class for providing stimuli and decks for functional verification """
 
-    def __init__(self, size, corner, name, w_per_row, num_rows, mask, power_gate, load=tech.spice["input_cap"], slew=tech.spice["rise_time"]):
+    # The deck can simulate a sweep of (slew, load) points with .alter
+    supports_sweep = True
+
+    def __init__(self, size, corner, name, w_per_row, num_rows, mask, power_gate, load=tech.spice["input_cap"], slew=tech.spice["rise_time"], work_dir=None, run=True, sweep=None):
         self.vdd_name = tech.spice["vdd_name"]
         self.gnd_name = tech.spice["gnd_name"]
         self.voltage = tech.spice["nom_supply_voltage"]
@@ -50,20 +53,26 @@ class functional_test():
         self.num_rows = num_rows
         self.mask = mask
         self.power_gate = power_gate
-
+        # (slew, load) points simulated by one deck with .alter, the first
+        # point is the main simulation
+        self.sweep = sweep
+        if sweep:
+            (slew, load) = sweep[0]
+
+        # All the files of a simulation are in its work directory (with the
+        # SRAM netlist) so that simulations of different points can overlap
+        self.work_dir = work_dir or OPTS.AMC_temp
         self.deck_file = "test.sp"
-        self.test = open(OPTS.AMC_temp+"test.v", "w")
-        self.dut = open(OPTS.AMC_temp+"dut.sp", "w")
-        self.deck = open(OPTS.AMC_temp+"test.sp", "w")
-        self.source = open(OPTS.AMC_temp+"source.v", "w")
-        self.cosim = open(OPTS.AMC_temp+"setup.init", "w")
-        self.make = open(OPTS.AMC_temp+"Makefile", "w")
+        self.dut = open(self.work_dir+"dut.sp", "w")
+        self.deck = open(self.work_dir+"test.sp", "w")
         
         (self.addr_bit, self.data_bit) = size
         (self.process, self.voltage, self.temperature) = corner
         self.device_models = tech.SPICE_MODEL_DIR
         
-        self.run_sim(load, slew)
+        self.write_files(load, slew)
+        if run:
+            self.run_sim()
     
     def inst_sram(self, abits, dbits, suffix, sram_name):
         """ Function to instatiate an SRAM subckt. """
@@ -97,12 +106,13 @@ class functional_test():
         spice_name=sram_name
 
         self.dut.write("\n ")
-        #Don't trim the netlist for power calculations
-        #if OPTS.trim_netlist:
-            #filename="{0}{1}".format(OPTS.AMC_temp, "{0}.sp".format(sram_name))
-            #reduced_file="{0}{1}".format(OPTS.AMC_temp, "reduced.sp")
-            #trim_spice.trim_spice(filename, reduced_file, dbits, w_per_row, num_rows, "1"*abits, "0"*abits)
-            #spice_name="reduced"
+        # The trimmed netlist keeps the cells of the two addresses of the stimulus,
+        # the leakage power of the removed cells is not simulated
+        if OPTS.trim_netlist:
+            filename="{0}{1}".format(self.work_dir, "{0}.sp".format(sram_name))
+            reduced_file="{0}{1}".format(self.work_dir, "reduced.sp")
+            trim_spice.trim_spice(filename, reduced_file, dbits, w_per_row, num_rows, "1"*abits, "0"*abits)
+            spice_name="reduced"
         
         self.dut.write(".inc {0}.sp\n\n".format(spice_name))
         #self.dut.write("V{0} {0} 0 dc {1}v\n".format("test"+self.vdd_name, self.voltage))
@@ -194,9 +204,12 @@ class functional_test():
         """ Function to write the Finesim spice deck. """
         
         self.deck.write("* SPICE DECK for slew = {0} and load = {1}\n\n".format(slew, load))
+        if self.sweep:
+            self.deck.write(".param load={0}f slew={1}n\n".format(load, slew))
         self.deck.write(".global {0} {1}\n".format(self.vdd_name, self.gnd_name))
         self.deck.write("vpwr0 {0} 0 dc {1}v\n".format(self.vdd_name, self.voltage))
         self.deck.write("vpwr1 {0} 0 dc {1}v\n\n".format(self.gnd_name, 0))
+        self.deck.write(".temp {0}\n".format(self.temperature))
         if tech.info["name"]=="tsmc65nm":
             self.deck.write(".lib {0} {1}\n".format(self.device_models, self.process))
             
@@ -247,6 +260,12 @@ class functional_test():
         self.deck.write(".measure read_power param=V(vdd)*read_current\n")
         self.deck.write(".measure read_write_power param=V(vdd)*read_write_current\n")
         
+        # The other points only change the parameters, the simulator writes
+        # the measurements of the i-th .alter to test.mt<i>
+        if self.sweep:
+            for (i, (slew, load)) in enumerate(self.sweep[1:], 1):
+                self.deck.write("\n.alter point{0}\n".format(i))
+                self.deck.write(".param load={0}f slew={1}n\n".format(load, slew))
         self.deck.write(".end\n")
         self.deck.close()
         
@@ -557,9 +576,13 @@ class functional_test():
         self.cosim.write("    set bus_format <%d>;\n")
         self.cosim.close()
 
-    def run_sim(self, load, slew):
-        """Run Finesim & VCS in batch mode and output rawfile to parse."""
+    def write_files(self, load, slew):
+        """ Write the netlists, stimulus and Makefile of the simulation. """
         
+        self.test = open(self.work_dir+"test.v", "w")
+        self.source = open(self.work_dir+"source.v", "w")
+        self.cosim = open(self.work_dir+"setup.init", "w")
+        self.make = open(self.work_dir+"Makefile", "w")
         self.dut_generator(self.addr_bit, self.data_bit, load, self.name, self.w_per_row, self.num_rows)
         self.spice_deck(slew, load)
         self.verilog_testbench(self.addr_bit, self.data_bit)
@@ -582,61 +605,93 @@ class functional_test():
         if tech.info["tx_is_subckt"]:
             for myfile in ["test.sp", "dut.sp", self.name+".sp"]:
                 self.edit_netlist(myfile)
+            if OPTS.trim_netlist:
+                self.edit_netlist("reduced.sp")
+
 
-       
         for myfile in ["setup.init", "test.sp", "test.v", "source.v", "dut.sp", "Makefile", self.name+".sp"]:
-            filename="{0}{1}".format(OPTS.AMC_temp, myfile)
-            while not path.exists(filename):
-                time.sleep(1)
-            else:
-                os.chmod(filename, 0o777)
-        
-        os.chdir(OPTS.AMC_temp)
-        spice_stdout = open("{0}spice_stdout.log".format(OPTS.AMC_temp), 'w')
-        spice_stderr = open("{0}spice_stderr.log".format(OPTS.AMC_temp), 'w')
-
-
-        retcode = subprocess.call("make", shell=True, stdout=spice_stdout, stderr=spice_stderr)
-        spice_stdout.close()
-        spice_stderr.close()
-
-        if (retcode > 1):
-            debug.error("Spice simulation error: ", -1)
-
-
-        filename="{0}{1}".format(OPTS.AMC_temp, "test.mt0")
-        while not path.exists(filename):
-                time.sleep(1)
-        
-        #Parse the test.mt0 file to repoert delay and power values.
-        write_delay = charutils.parse_output("test", "write_delay")
-        read_delay = charutils.parse_output("test", "read_delay")
-        read_write_delay = charutils.parse_output("test", "read_write_delay")
-        slew_hl = charutils.parse_output("test", "slew_hl")
-        slew_lh = charutils.parse_output("test", "slew_lh")
-        leakage_power = charutils.parse_output("test", "leakage_power")
-        write_power = charutils.parse_output("test", "write_power")
-        read_power = charutils.parse_output("test", "read_power")
-        read_write_power = charutils.parse_output("test", "read_write_power")
-        
-        self.result = {"write_delay_lh" : write_delay*(10**9),
-                       "write_delay_hl" : write_delay*(10**9),
-                       "read_delay_lh" : read_delay*(10**9),
-                       "read_delay_hl" : read_delay*(10**9),
-                       "read_write_delay_lh" : read_write_delay*(10**9),
-                       "read_write_delay_hl" : read_write_delay*(10**9),
-                       "slew_hl" : slew_hl*(10**9),
-                       "slew_lh" : slew_lh*1e9,
-                       "leakage_power" : leakage_power*(10**3),
-                       "read_power" : read_power*(10**3),
-                       "write_power" : write_power*(10**3),
-                       "read_write_power" : read_write_power*(10**3)}
+            os.chmod("{0}{1}".format(self.work_dir, myfile), 0o777)
+
+    def sim_job(self):
+        """ The simulator process of this test (VCS and Finesim under make) """
+
+        find_simulator()
+        return sim_runner.sim_job(["make"], self.work_dir, OPTS.char_timeout)
+
+    def run_sim(self):
+        """Run Finesim & VCS in batch mode and output rawfile to parse."""
+        
+        job = sim_runner.run_jobs([self.sim_job()], 1)[0]
+        if not job.ok():
+            debug.error(job.error_message(), -1)
+        return self.parse_results()
+
+    def parse_results(self):
+        """ Parse the test.mt0 file to report delay and power values. """
+
+        filename="{0}{1}".format(self.work_dir, "test.mt0")
+        if not path.exists(filename):
+            debug.error("Simulation in {0} finished without writing {1}".format(self.work_dir, filename), -1)
+        
+        measures = charutils.parse_measurements(filename)[0]
+        self.result = self.convert_measures(measures)
         return self.result
+
+    def parse_sweep_results(self):
+        """ The results of every point of the sweep, from test.mt0, test.mt1, ...
+            or from the rows of test.mt0 """
+
+        rows = []
+        for i in range(len(self.sweep)):
+            filename="{0}test.mt{1}".format(self.work_dir, i)
+            if not path.exists(filename):
+                break
+            rows.extend(charutils.parse_measurements(filename))
+        if len(rows) != len(self.sweep):
+            debug.error("Simulation in {0} has {1} results for {2} points".format(
+                        self.work_dir, len(rows), len(self.sweep)), -1)
+        return [self.convert_measures(measures) for measures in rows]
+
+    def convert_measures(self, measures):
+        """ The results (ns, mW) of the measurements (s, W) of a simulation """
+
+        def measure(name):
+            if name not in measures:
+                value = charutils.failed_measure("{0} is not in the output".format(name))
+            else:
+                value = measures[name]
+            if math.isnan(value):
+                debug.warning("Measurement {0} failed in {1}: {2}".format(name, self.work_dir,
+                              getattr(value, "reason", "nan")))
+            return value
+
+        write_delay = measure("write_delay")
+        read_delay = measure("read_delay")
+        read_write_delay = measure("read_write_delay")
+        slew_hl = measure("slew_hl")
+        slew_lh = measure("slew_lh")
+        leakage_power = measure("leakage_power")
+        write_power = measure("write_power")
+        read_power = measure("read_power")
+        read_write_power = measure("read_write_power")
+        
+        return {"write_delay_lh" : write_delay*(10**9),
+                "write_delay_hl" : write_delay*(10**9),
+                "read_delay_lh" : read_delay*(10**9),
+                "read_delay_hl" : read_delay*(10**9),
+                "read_write_delay_lh" : read_write_delay*(10**9),
+                "read_write_delay_hl" : read_write_delay*(10**9),
+                "slew_hl" : slew_hl*(10**9),
+                "slew_lh" : slew_lh*1e9,
+                "leakage_power" : leakage_power*(10**3),
+                "read_power" : read_power*(10**3),
+                "write_power" : write_power*(10**3),
+                "read_write_power" : read_write_power*(10**3)}
     
     def edit_netlist(self, myfile):
         """ Edit the SPICE netlist if transistor is a subckt and should start with letter X instead of M"""
         
-        filename="{0}{1}".format(OPTS.AMC_temp, myfile)
+        filename="{0}{1}".format(self.work_dir, myfile)
         edited_spfile=filename
 
         debug.info(1,"Editing transistor name to start with X instaed of M")
@@ -707,5 +762,8 @@ class functional_test():
         """Adds capacitor load to top level signal that is in signal_list (only for sim purposes)"""
         
         for signal in signal_list:
-            self.dut.write("C{0} {0} 0 {1}fF\n".format(signal, load))
+            if self.sweep:
+                self.dut.write("C{0} {0} 0 'load'\n".format(signal))
+            else:
+                self.dut.write("C{0} {0} 0 {1}fF\n".format(signal, load))
 
@@ -10,13 +10,26 @@
 
 
 import os,sys,re
+import hashlib
 import debug
 from . import charutils
 from . import functional_test
+from . import scheduler
+from . import lut_sampler
+from . import analytical
 import tech
 import numpy as np
 from globals import OPTS
 
+# The measurements of a point, in the order of the table values
+measures = ["write_delay_lh", "write_delay_hl", "read_delay_lh", "read_delay_hl", 
+            "read_write_delay_lh", "read_write_delay_hl", "slew_lh", "slew_hl", 
+            "leakage_power", "read_power", "write_power", "read_write_power"]
+
+# Results of the simulated corners by (netlist hash, corner, (slews, loads)),
+# kept for the whole run (e.g. a session or a daemon job)
+corner_cache = {}
+
 class lib():
     """ lib file generation."""
     
@@ -32,16 +45,21 @@ class lib():
     def prepare_tables(self):
         """ Determine the load/slews if they aren't specified in the config file. """
         
-        # These are the parameters to determine the table sizes
-        #self.load_scales = np.array([0.1, 0.25, 0.5, 1, 2, 4, 8])
-        self.load_scales = np.array([0.25, 1, 8])
+        # These are the parameters to determine the table sizes. The adaptive
+        # sampling only simulates a part of the 7x7 table and interpolates the rest.
+        if OPTS.adaptive_lut:
+            self.load_scales = np.array([0.1, 0.25, 0.5, 1, 2, 4, 8])
+        else:
+            self.load_scales = np.array([0.25, 1, 8])
         
         self.load = tech.spice["input_cap"]
         self.loads = self.load_scales*self.load
         debug.info(1,"Loads: {0}".format(self.loads))
         
-        #self.slew_scales = np.array([0.1, 0.25, 0.5, 1, 2, 4, 8])
-        self.slew_scales = np.array([0.25, 1, 8])        
+        if OPTS.adaptive_lut:
+            self.slew_scales = np.array([0.1, 0.25, 0.5, 1, 2, 4, 8])
+        else:
+            self.slew_scales = np.array([0.25, 1, 8])        
         self.slew = tech.spice["rise_time"]        
         self.slews = self.slew_scales*self.slew
         debug.info(1,"Slews: {0}".format(self.slews))
@@ -54,23 +72,30 @@ class lib():
         self.supply_voltages = OPTS.supply_voltages
         self.process_corners = OPTS.process_corners
 
-        # Enumerate all possible corners
+        # Enumerate all possible corners, each one once
         self.corners = []
+        self.corner_names = []
         self.lib_files = []
         for proc in self.process_corners:
             for temp in self.temperatures:
                 for volt in self.supply_voltages:
-                    self.corner_name = "{0}_{1}_{2}V_{3}C".format(self.sram.name, proc, volt, temp)
-                    self.corner_name = self.corner_name.replace(".","p") # Remove decimals (point)
-                    lib_name = self.out_dir+"{}.lib".format(self.corner_name)
-                    
                     # A corner is a tuple of PVT
+                    if (proc, volt, temp) in self.corners:
+                        continue
+                    corner_name = "{0}_{1}_{2}V_{3}C".format(self.sram.name, proc, volt, temp)
+                    corner_name = corner_name.replace(".","p") # Remove decimals (point)
+                    lib_name = self.out_dir+"{}.lib".format(corner_name)
+                    
                     self.corners.append((proc, volt, temp))
+                    self.corner_names.append(corner_name)
                     self.lib_files.append(lib_name)
         
     def characterize_corners(self):
         """ Characterize the list of corners. """
-        for (self.corner,lib_name) in zip(self.corners,self.lib_files):
+
+        # All the corners are simulated first, so their points run together
+        self.corner_results = self.simulate_corners(self.corners)
+        for (self.corner, self.corner_name, lib_name) in zip(self.corners, self.corner_names, self.lib_files):
             debug.info(1,"Corner: " + str(self.corner))
             (self.process, self.voltage, self.temperature) = self.corner
             self.lib = open(lib_name, "w")
@@ -408,26 +433,81 @@ class lib():
         
         
     def compute_delay(self):
-        """ Do the analysis if we haven't characterized the SRAM yet """
-
-        size = (self.sram.addr_size, self.sram.word_size)
-        corner = (OPTS.process_corners[0], OPTS.supply_voltages[0], OPTS.temperatures[0])
-        self.results  = self.delay_power(size, corner, self.name, self.loads , self.slews)
-
-    def delay_power(self, size, corner, name, loads , slews):
-        """ Measure the delay, slew and power for all slew/load pairs """
-
-        char_data = {}
-        for m in ["write_delay_lh", "write_delay_hl", "read_delay_lh", "read_delay_hl", 
-                  "read_write_delay_lh", "read_write_delay_hl", "slew_lh", "slew_hl", 
-                  "leakage_power", "read_power", "write_power", "read_write_power"]:
-            char_data[m]=[]
-
-        for slew in slews:
-            for load in loads:
-                d = functional_test.functional_test(size, corner, name, self.sram.w_per_row, 
-                                                    self.sram.num_rows, load ,slew)
-                q = d.result
-                for k,v in list(q.items()):
-                    char_data[k].append(v)
-        return char_data
+        """ Results of the current corner """
+
+        self.results = self.corner_results[self.corner]
+
+    def verilog_timing(self):
+        """ Read and write delays (ns) of the behavioral Verilog model: the
+            slowest edge of all the corners at the nominal slew and load """
+
+        slew = list(self.slew_scales).index(1)
+        load = list(self.load_scales).index(1)
+        point = slew*len(self.loads) + load
+        timing = {}
+        for kind in ["read_delay", "write_delay"]:
+            values = [results[kind+edge][point] for results in self.corner_results.values()
+                      for edge in ["_lh", "_hl"]]
+            timing[kind] = charutils.round_time(max(values))
+        return timing
+
+    def simulate_corners(self, corners):
+        """ Measure the delay, slew and power of all slew/load pairs of the corners.
+            The corners share the SRAM netlist and the stimulus, their decks only
+            differ by the models, supply and temperature. Corners already simulated
+            with the same netlist and table are reused, so adding a corner only
+            simulates the new one. With OPTS.adaptive_lut only the points that
+            the interpolation of the table needs are simulated. The analytical
+            backend estimates every point of the tables instead. """
+
+        netlist = self.netlist()
+        if OPTS.char_backend == "analytical":
+            model = analytical.analytical(self.sram, netlist)
+            return {corner : model.table(corner, self.slews, self.loads, measures) for corner in corners}
+
+        with open(netlist, "rb") as f:
+            netlist_hash = hashlib.sha1(f.read()).hexdigest()
+        table = (tuple(self.slews), tuple(self.loads), OPTS.adaptive_lut and OPTS.lut_tolerance)
+
+        samplers = {}
+        for corner in corners:
+            if (netlist_hash, corner, table) in corner_cache:
+                debug.info(1,"Reusing the results of corner {0}".format(corner))
+            elif corner not in samplers:
+                samplers[corner] = lut_sampler.lut_sampler(self.slews, self.loads, OPTS.lut_tolerance)
+                if not OPTS.adaptive_lut:
+                    samplers[corner].slew_indices = list(range(len(self.slews)))
+                    samplers[corner].load_indices = list(range(len(self.loads)))
+
+        # The slew/load points of the new corners are simulated concurrently,
+        # in rounds until the interpolation of every table is accurate enough
+        pending = dict(samplers)
+        while pending:
+            jobs = scheduler.scheduler(self.sram, netlist)
+            needed = []
+            for (corner, sampler) in pending.items():
+                for index in sampler.needed():
+                    needed.append((sampler, index))
+                    jobs.add(corner, *sampler.point(index))
+            for ((sampler, index), result) in zip(needed, jobs.run()):
+                sampler.add(index, result)
+            pending = {corner : sampler for (corner, sampler) in pending.items()
+                       if OPTS.adaptive_lut and sampler.refine()}
+
+        for (corner, sampler) in samplers.items():
+            debug.info(1,"Corner {0}: simulated {1} of {2} table points".format(corner,
+                       len(sampler.values), len(self.slews)*len(self.loads)))
+            corner_cache[(netlist_hash, corner, table)] = sampler.table(measures)
+
+        results = {corner : corner_cache[(netlist_hash, corner, table)] for corner in corners}
+        if OPTS.char_calibrate:
+            analytical.analytical(self.sram, netlist).calibrate(results, self.slews, self.loads)
+        return results
+
+    def netlist(self):
+        """ SPICE netlist of the SRAM for the simulations """
+
+        spname = OPTS.AMC_temp + self.name + ".sp"
+        if not os.path.exists(spname):
+            self.sram.sp_write(spname)
+        return spname
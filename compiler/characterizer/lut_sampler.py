@@ -0,0 +1,158 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Adaptive sampling of the (slew, load) lookup tables.
+
+Only a sub-grid of the full table is simulated: the first, middle and last
+slews and loads at the start. The table axes are geometric, but delays,
+slews and power are close to linear in the slew and the load (exactly
+bilinear for an RC stage), so the rest of the table is filled by bilinear
+interpolation of the values on the slew and load axes. Between two
+simulated slews (or loads) the interpolation error is estimated by the
+distance between the straight line through them and the parabola through
+them and the next simulated one. Where it is above the tolerance the slew
+(load) in the middle of the interval is added to the sub-grid and
+simulated in the next round, until the estimate is within the tolerance
+everywhere or the whole table is simulated. """
+
+import math
+
+
+def lerp(x, x0, x1, y0, y1):
+    """ Linear interpolation of y at x between (x0,y0) and (x1,y1) """
+
+    if x1 == x0:
+        return y0
+    return y0 + (y1 - y0)*(x - x0)/(x1 - x0)
+
+
+def parabola(x, xs, ys):
+    """ Value at x of the parabola through the three points (xs, ys) """
+
+    (x0, x1, x2) = xs
+    (y0, y1, y2) = ys
+    return y0*(x-x1)*(x-x2)/((x0-x1)*(x0-x2)) + \
+           y1*(x-x0)*(x-x2)/((x1-x0)*(x1-x2)) + \
+           y2*(x-x0)*(x-x1)/((x2-x0)*(x2-x1))
+
+
+def initial_indices(size):
+    """ First, middle and last index of an axis """
+
+    return sorted(set([0, (size-1)//2, size-1]))
+
+
+class lut_sampler():
+    """ Simulated sub-grid and interpolation of a table of one corner """
+
+    def __init__(self, slews, loads, tolerance):
+        self.slews = list(slews)
+        self.loads = list(loads)
+        self.tolerance = tolerance
+        self.x = [float(v) for v in self.slews]
+        self.y = [float(v) for v in self.loads]
+        # Simulated indices of each axis, the sub-grid is their product
+        self.slew_indices = initial_indices(len(self.slews))
+        self.load_indices = initial_indices(len(self.loads))
+        # Measurements by (slew index, load index)
+        self.values = {}
+
+    def needed(self):
+        """ The (slew, load) index pairs of the sub-grid not simulated yet """
+
+        return [(i, j) for i in self.slew_indices for j in self.load_indices
+                if (i, j) not in self.values]
+
+    def point(self, index):
+        (i, j) = index
+        return (self.slews[i], self.loads[j])
+
+    def add(self, index, result):
+        self.values[index] = result
+
+    def refine(self):
+        """ Add the middle of the intervals where the interpolation error is
+            above the tolerance. Returns True if there are new points. """
+
+        new_slews = self.refine_axis(self.slew_indices, self.load_indices, self.x,
+                                     lambda i, j: self.values[(i, j)])
+        new_loads = self.refine_axis(self.load_indices, self.slew_indices, self.y,
+                                     lambda j, i: self.values[(i, j)])
+        self.slew_indices = sorted(set(self.slew_indices) | new_slews)
+        self.load_indices = sorted(set(self.load_indices) | new_loads)
+        return len(self.needed()) > 0
+
+    def refine_axis(self, indices, other_indices, axis, value):
+        """ Indices to add on one axis, checked along every simulated line
+            of the other axis """
+
+        new = set()
+        for k in range(len(indices)-1):
+            (a, b) = (indices[k], indices[k+1])
+            if b - a < 2:
+                continue
+            # The parabola uses the next simulated index (the previous one at the end)
+            c = indices[k+2] if k+2 < len(indices) else indices[k-1] if k > 0 else None
+            if c == None:
+                continue
+            for o in other_indices:
+                results = [value(n, o) for n in (a, b, c)]
+                if max(self.error(axis, (a, b, c), m, results) for m in range(a+1, b)) > self.tolerance:
+                    new.add((a + b)//2)
+                    break
+        return new
+
+    def error(self, axis, points, m, results):
+        """ Largest relative distance over the measures between the line and
+            the parabola at index m of the axis """
+
+        (a, b, c) = points
+        xs = sorted([(axis[n], r) for (n, r) in zip(points, results)], key=lambda p: p[0])
+        worst = 0.0
+        for measure in results[0]:
+            ys = [r[measure] for (x, r) in xs]
+            if any(math.isnan(y) for y in ys):
+                continue
+            line = lerp(axis[m], axis[a], axis[b], results[0][measure], results[1][measure])
+            curve = parabola(axis[m], [x for (x, r) in xs], ys)
+            scale = max(abs(line), abs(curve), max(abs(y) for y in ys)*1e-3, 1e-30)
+            worst = max(worst, abs(curve - line)/scale)
+        return worst
+
+    def table(self, measures):
+        """ Full tables {measure : values}, slews major, as lib writes them """
+
+        tables = {m : [] for m in measures}
+        for i in range(len(self.slews)):
+            for j in range(len(self.loads)):
+                for m in measures:
+                    tables[m].append(self.interpolate(i, j, m))
+        return tables
+
+    def interpolate(self, i, j, measure):
+        """ Bilinear interpolation in the simulated sub-grid """
+
+        if (i, j) in self.values:
+            return self.values[(i, j)][measure]
+        (i0, i1) = self.bracket(self.slew_indices, i)
+        (j0, j1) = self.bracket(self.load_indices, j)
+        v = lambda a, b: self.values[(a, b)][measure]
+        low = lerp(self.y[j], self.y[j0], self.y[j1], v(i0, j0), v(i0, j1))
+        high = lerp(self.y[j], self.y[j0], self.y[j1], v(i1, j0), v(i1, j1))
+        return lerp(self.x[i], self.x[i0], self.x[i1], low, high)
+
+    def bracket(self, indices, n):
+        """ The simulated indices around n """
+
+        for k in range(len(indices)-1):
+            if indices[k] <= n <= indices[k+1]:
+                return (indices[k], indices[k+1])
+        return (indices[0], indices[0])
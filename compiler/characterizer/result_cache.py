@@ -0,0 +1,168 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Persistent store of the characterization results.
+
+A simulation point is identified by a hash of everything its measurements
+depend on: the SRAM netlist, the deck and stimulus written by
+functional_test (test.sp, dut.sp, reduced.sp, test.v, source.v,
+setup.init, Makefile), the device model file, the corner, slew, load and
+the simulator. The measurements of a point are kept in OPTS.char_cache_dir
+as one JSON file per key, so a later run with the same inputs reads them
+instead of simulating again. Entries record their corner and netlist hash so that they
+can be invalidated by corner or by netlist. An empty char_cache_dir turns
+the cache off. """
+
+import os
+import json
+import math
+import hashlib
+import tempfile
+import debug
+import tech
+from globals import OPTS
+
+# The files of a work directory the measurements depend on (with the SRAM netlist)
+deck_files = ["test.sp", "dut.sp", "reduced.sp", "test.v", "source.v", "setup.init", "Makefile"]
+
+# Digests of the model files and simulators by (path, size, mtime)
+file_digests = {}
+
+
+def file_hash(filename):
+    """ SHA1 of the contents of a file """
+
+    sha = hashlib.sha1()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def stamp_hash(path):
+    """ Hash of a big file (model, simulator) that doesn't change during a run,
+        read once per (path, size, mtime). A directory hashes its files. """
+
+    if not path or not os.path.exists(path):
+        return str(path)
+    if os.path.isdir(path):
+        return hashlib.sha1("".join(stamp_hash(os.path.join(path, name))
+                                    for name in sorted(os.listdir(path))).encode()).hexdigest()
+    stat = os.stat(path)
+    stamp = (path, stat.st_size, stat.st_mtime)
+    if stamp not in file_digests:
+        file_digests[stamp] = file_hash(path)
+    return file_digests[stamp]
+
+
+class result_cache():
+    """ Measurement dictionaries of simulated points by their hash """
+
+    def __init__(self, cache_dir=None):
+        if cache_dir == None:
+            cache_dir = OPTS.char_cache_dir
+        self.cache_dir = cache_dir
+        self.enabled = (cache_dir != "")
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, work_dir, netlist_name, corner, slew, load):
+        """ Hash of a point whose files are written in work_dir """
+
+        sha = hashlib.sha1()
+        for name in [netlist_name] + deck_files:
+            filename = work_dir + name
+            if os.path.exists(filename):
+                sha.update(name.encode())
+                sha.update(file_hash(filename).encode())
+        sha.update(stamp_hash(tech.SPICE_MODEL_DIR).encode())
+        sha.update(repr((tuple(corner), float(slew), float(load))).encode())
+        sha.update(self.simulator().encode())
+        return sha.hexdigest()
+
+    def simulator(self):
+        """ Name and version (executable hash) of the simulator """
+
+        spice_exe = getattr(OPTS, "spice_exe", "")
+        return "{0}:{1}".format(OPTS.spice_name, stamp_hash(spice_exe))
+
+    def entry_file(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, key, point=None):
+        """ The cached measurements of a key, None on a miss """
+
+        if not self.enabled:
+            return None
+        try:
+            with open(self.entry_file(key)) as f:
+                result = json.load(f)["result"]
+        except (IOError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        debug.info(1, "Cache hit for {0} ({1})".format(point or "point", key[:12]))
+        return result
+
+    def put(self, key, result, corner, netlist_hash, slew, load):
+        """ Store the measurements of a point. Failed measurements are not stored. """
+
+        if not self.enabled:
+            return
+        if any(math.isnan(v) for v in result.values()):
+            return
+        entry = {"result" : result,
+                 "corner" : list(corner),
+                 "netlist" : netlist_hash,
+                 "slew" : float(slew),
+                 "load" : float(load),
+                 "simulator" : self.simulator()}
+        # Write and rename so that concurrent runs never read a partial entry
+        (fd, temp_name) = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(temp_name, self.entry_file(key))
+
+    def invalidate(self, corner=None, netlist=None):
+        """ Remove the entries of a corner and/or a netlist (a .sp file or its
+            hash), or all of them if neither is given. Returns the number removed. """
+
+        if not self.enabled or not os.path.isdir(self.cache_dir):
+            return 0
+        if netlist != None and os.path.exists(netlist):
+            netlist = file_hash(netlist)
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            filename = os.path.join(self.cache_dir, name)
+            try:
+                with open(filename) as f:
+                    entry = json.load(f)
+            except (IOError, ValueError):
+                entry = {}
+            if corner != None and tuple(entry.get("corner", [])) != tuple(corner):
+                continue
+            if netlist != None and entry.get("netlist") != netlist:
+                continue
+            os.remove(filename)
+            removed += 1
+        debug.info(1, "Removed {0} cached characterization results".format(removed))
+        return removed
+
+    def report(self):
+        """ Print the hits and misses of this run """
+
+        if self.enabled and self.hits + self.misses > 0:
+            print("Characterization cache: {0} hits, {1} simulated ({2})".format(
+                  self.hits, self.misses, self.cache_dir))
@@ -0,0 +1,197 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Scheduler of the characterization simulations.
+
+Every (corner, slew, load) point of a table is simulated in its own work
+directory with its own copy of the SRAM netlist, so the simulations of a
+table can run at the same time. The decks are written first and the points
+found in the result cache are not simulated again. Then up to
+OPTS.char_jobs simulations run concurrently under sim_runner and their
+results are parsed as they finish, with the progress and the estimated
+time left.
+
+With OPTS.char_batch the points of a corner are simulated by one deck
+instead, the first point as the main simulation and the others as .alter
+blocks that only change the load and slew parameters, so the simulator
+starts and reads the netlist once per corner. The ngspice/Xyce decks of
+spice_test have one point each. """
+
+import os
+import shutil
+import datetime
+import debug
+from globals import OPTS
+from . import charutils
+from . import functional_test
+from . import spice_test
+from . import result_cache
+from . import sim_runner
+from . import find_simulator
+
+
+def corner_name(corner):
+    """ Name of a (process, voltage, temperature) corner in file names """
+
+    (process, voltage, temperature) = corner
+    name = "{0}_{1}V_{2}C".format(process, voltage, temperature)
+    return name.replace(".", "p").replace("-", "m")
+
+
+def test_class():
+    """ The deck of the simulator: VCS co-simulation, or ngspice/Xyce only """
+
+    if OPTS.spice_name.lower() in spice_test.simulators:
+        return spice_test.spice_test
+    return functional_test.functional_test
+
+
+def point_name(corner, slew, load):
+    """ Name of the work directory of a simulation point """
+
+    name = "{0}_slew{1}_load{2}".format(corner_name(corner), slew, load)
+    return name.replace(".", "p").replace("-", "m")
+
+
+def failed_results(reason):
+    """ The results of a point whose simulation output couldn't be parsed,
+        every measurement failed for the reason """
+
+    # lib imports the scheduler
+    from .lib import measures
+    return dict((name, charutils.failed_measure(reason)) for name in measures)
+
+
+class scheduler():
+    """ Run the simulations of many (corner, slew, load) points concurrently """
+
+    def __init__(self, sram, netlist, num_jobs=None, cache=None):
+        # The cache keys hash the simulator
+        find_simulator()
+        self.sram = sram
+        self.netlist = netlist
+        self.cache = cache or result_cache.result_cache()
+        self.num_jobs = max(1, num_jobs or OPTS.char_jobs)
+        self.work_root = OPTS.AMC_temp + "char/"
+        # The points to simulate: (corner, slew, load)
+        self.points = []
+
+    def add(self, corner, slew, load):
+        """ Add a point, returns its index in the results """
+
+        self.points.append((corner, slew, load))
+        return len(self.points)-1
+
+    def prepare(self, corner, slew, load, sweep=None):
+        """ Write the simulation of a point (or of a sweep of points) in its own
+            work directory """
+
+        if sweep:
+            work_dir = self.work_root + corner_name(corner) + "_sweep/"
+        else:
+            work_dir = self.work_root + point_name(corner, slew, load) + "/"
+        os.makedirs(work_dir, exist_ok=True)
+        # The deck includes the SRAM netlist from the work directory
+        shutil.copy(self.netlist, work_dir + self.sram.name + ".sp")
+        size = (self.sram.addr_size, self.sram.word_size)
+        return test_class()(size, corner, self.sram.name,
+                            self.sram.w_per_row, self.sram.num_rows,
+                            getattr(self.sram, "mask", False),
+                            getattr(self.sram, "power_gate", False),
+                            load=load, slew=slew, work_dir=work_dir, run=False,
+                            sweep=sweep)
+
+    def batch(self):
+        """ Simulate the points of a corner with one deck """
+
+        return OPTS.char_batch and test_class().supports_sweep
+
+    def simulations(self):
+        """ The indices of the points of each simulation: one point each, or
+            all the points of a corner with OPTS.char_batch """
+
+        if not self.batch():
+            return [[index] for index in range(len(self.points))]
+        corners = {}
+        for (index, (corner, slew, load)) in enumerate(self.points):
+            corners.setdefault(corner, []).append(index)
+        return list(corners.values())
+
+    def run(self):
+        """ Simulate all the points, returns their results in the order they were added """
+
+        groups = self.simulations()
+        tests = []
+        for group in groups:
+            (corner, slew, load) = self.points[group[0]]
+            if self.batch():
+                sweep = [self.points[index][1:] for index in group]
+                tests.append(self.prepare(corner, slew, load, sweep))
+            else:
+                tests.append(self.prepare(corner, slew, load))
+        results = [None]*len(self.points)
+
+        netlist_hash = result_cache.file_hash(self.netlist)
+        keys = [None]*len(self.points)
+        for (test, group) in zip(tests, groups):
+            for index in group:
+                keys[index] = self.cache.key(test.work_dir, self.sram.name + ".sp", *self.points[index])
+                results[index] = self.cache.get(keys[index], point_name(*self.points[index]))
+        todo = [g for g in range(len(groups)) if any(results[index] == None for index in groups[g])]
+        debug.info(1, "Simulating {0} of {1} points in {2} simulations with {3} jobs".format(
+                   sum(len(groups[g]) for g in todo), len(self.points), len(todo), self.num_jobs))
+
+        start_time = datetime.datetime.now()
+        finished = []
+        failed = []
+        def done(count, job):
+            # Called by the runner as each simulation exits
+            g = todo[count]
+            finished.append(g)
+            self.report_progress(len(finished), len(todo), start_time, self.points[groups[g][0]])
+            if not job.ok():
+                failed.append(job.error_message())
+                return
+            try:
+                if tests[g].sweep:
+                    group_results = tests[g].parse_sweep_results()
+                else:
+                    group_results = [tests[g].parse_results()]
+            except Exception as e:
+                # An output that can't be parsed fails this simulation only,
+                # as a simulator that can't start, the others are still parsed
+                reason = "could not parse the measurements"
+                # debug.error has already printed its message
+                if str(e):
+                    reason += ": " + str(e)
+                failed.append("Simulation in {0} {1}".format(tests[g].work_dir, reason))
+                for index in groups[g]:
+                    results[index] = failed_results(reason)
+                return
+            for (index, result) in zip(groups[g], group_results):
+                results[index] = result
+                (corner, slew, load) = self.points[index]
+                self.cache.put(keys[index], result, corner, netlist_hash, slew, load)
+
+        sim_runner.run_jobs([tests[g].sim_job() for g in todo], self.num_jobs, done)
+        if failed:
+            debug.error("{0} of {1} simulations failed:\n{2}".format(len(failed), len(todo),
+                                                                     "\n".join(failed)), -1)
+        self.cache.report()
+        return results
+
+    def report_progress(self, done, total, start_time, point):
+        """ Print the number of finished points and the estimated time left """
+
+        elapsed = (datetime.datetime.now() - start_time).total_seconds()
+        eta = elapsed/done*(total-done)
+        print("Characterization: {0}/{1} simulations done ({2}), {3} seconds, ETA {4} seconds".format(
+              done, total, point_name(*point), round(elapsed, 1), round(eta, 1)))
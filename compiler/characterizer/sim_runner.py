@@ -0,0 +1,122 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Asynchronous runner of the simulator processes.
+
+Every simulation is a subprocess started in its own work directory (no
+chdir of the compiler) with its output captured to spice_stdout.log and
+spice_stderr.log there. Up to num_jobs processes run at the same time and
+all of them are supervised from one event loop: a simulation is done when
+its process exits, so nothing polls the file system, and a simulation that
+runs longer than its timeout is killed instead of hanging the run. """
+
+import os
+import asyncio
+import datetime
+import debug
+from globals import OPTS
+
+
+class sim_job():
+    """ One simulator process and its outcome """
+
+    def __init__(self, command, work_dir, timeout=None):
+        self.command = command
+        self.work_dir = work_dir
+        self.timeout = timeout
+        self.returncode = None
+        self.timed_out = False
+        self.start_error = None
+        self.runtime = 0.0
+        self.stdout_log = os.path.join(work_dir, "spice_stdout.log")
+        self.stderr_log = os.path.join(work_dir, "spice_stderr.log")
+
+    def ok(self):
+        return self.returncode == 0 and not self.timed_out
+
+    def error_message(self):
+        """ Why the job failed with the end of its error log """
+
+        if self.start_error:
+            return "Simulation in {0} {1}".format(self.work_dir, self.start_error)
+        if self.timed_out:
+            reason = "timed out after {0} seconds".format(self.timeout)
+        else:
+            reason = "returned {0}".format(self.returncode)
+        message = "Simulation in {0} {1}, see {2}".format(self.work_dir, reason, self.stdout_log)
+        try:
+            with open(self.stderr_log) as f:
+                tail = f.read()[-2000:]
+        except IOError:
+            tail = ""
+        if tail.strip():
+            message += "\n" + tail
+        return message
+
+    async def run(self):
+        """ Start the process and wait for it to exit or time out """
+
+        start_time = datetime.datetime.now()
+        with open(self.stdout_log, "w") as stdout, open(self.stderr_log, "w") as stderr:
+            try:
+                process = await asyncio.create_subprocess_exec(*self.command, cwd=self.work_dir,
+                                                               stdout=stdout, stderr=stderr,
+                                                               start_new_session=True)
+            except OSError as e:
+                # A missing or non executable simulator fails only this job,
+                # the reason is left in its error log
+                self.start_error = "could not start {0}: {1}".format(self.command[0], e.strerror)
+                stderr.write(self.start_error + "\n")
+                self.returncode = 127
+                return self
+            try:
+                self.returncode = await asyncio.wait_for(process.wait(), self.timeout)
+            except asyncio.TimeoutError:
+                self.timed_out = True
+                # The simulator runs under make, kill the whole process group
+                try:
+                    os.killpg(process.pid, 9)
+                except ProcessLookupError:
+                    pass
+                self.returncode = await process.wait()
+        self.runtime = (datetime.datetime.now() - start_time).total_seconds()
+        debug.info(2, "{0} in {1} returned {2} in {3} seconds".format(
+                   " ".join(self.command), self.work_dir, self.returncode, round(self.runtime, 1)))
+        return self
+
+
+def run_jobs(jobs, num_jobs=None, done=None):
+    """ Run the jobs with at most num_jobs processes at the same time.
+        done(index, job) is called as soon as each one finishes. """
+
+    num_jobs = max(1, num_jobs or OPTS.char_jobs)
+
+    async def supervise():
+        slots = asyncio.Semaphore(num_jobs)
+
+        async def run_one(index, job):
+            async with slots:
+                await job.run()
+            return (index, job)
+
+        tasks = [asyncio.ensure_future(run_one(index, job)) for (index, job) in enumerate(jobs)]
+        for finished in asyncio.as_completed(tasks):
+            (index, job) = await finished
+            if done:
+                done(index, job)
+
+    if jobs:
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(supervise())
+        finally:
+            loop.close()
+    return jobs
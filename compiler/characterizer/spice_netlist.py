@@ -0,0 +1,211 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+import re
+import tech
+import compressed
+
+class spice_netlist():
+    """ The subckts of a SPICE netlist read as a graph: the ports, the
+        instances (name, nets, master) and the devices of every subckt.
+        Used by the netlist trimming and the analytical characterization.
+        The netlist may be compressed (gzip or zstd). """
+
+    def __init__(self, spfile):
+        self.sp_file = spfile
+
+        # Load the file into a buffer for performance
+        sp = compressed.open_input(self.sp_file)
+        self.spice = sp.readlines()
+        sp.close()
+        for i in range(len(self.spice)):
+            self.spice[i] = self.spice[i].rstrip(" \n")
+
+        self.supplies = [tech.spice["vdd_name"], tech.spice["gnd_name"], "0"]
+        self.pin_caps = {}
+        self.parse()
+
+    def parse(self):
+        """ Read the subckts: ports, instances (name, nets, master) and devices """
+
+        self.subckts = {}
+        # The order of the subckts in the file, to write them back
+        self.order = []
+        lines = []
+        for line in self.spice:
+            if line.startswith("+") and lines:
+                lines[-1] += " " + line[1:]
+            else:
+                lines.append(line)
+
+        current = None
+        for line in lines:
+            words = line.split()
+            if not words or words[0].startswith("*"):
+                continue
+            keyword = words[0].upper()
+            if keyword == ".SUBCKT":
+                current = {"name" : words[1],
+                           "ports" : words[2:],
+                           "insts" : [],
+                           "devices" : []}
+                self.subckts[words[1]] = current
+                self.order.append(words[1])
+            elif keyword == ".ENDS":
+                current = None
+            elif current == None:
+                continue
+            elif keyword.startswith("X") and not self.is_transistor(words):
+                nets = [w for w in words[1:] if "=" not in w]
+                current["insts"].append((words[0], nets[:-1], nets[-1]))
+            else:
+                current["devices"].append(words)
+
+    def top(self):
+        """ The top level subckt, the last one of the file """
+
+        return self.order[-1]
+
+    def is_transistor(self, words):
+        """ A MOSFET line (M..., or X... when the transistors are subckts) """
+
+        if words[0][0].upper() == "M":
+            return True
+        return any(w.lower().startswith("w=") for w in words) and \
+               any(w.lower().startswith("l=") for w in words)
+
+    def is_pmos(self, words):
+        """ A transistor of the pmos model """
+
+        return len(words) > 5 and words[5] == tech.spice["pmos"]
+
+    def is_array(self, name):
+        """ A subckt made of two or more instances of the same cell """
+
+        subckt = self.subckts.get(name)
+        if subckt == None or subckt["devices"] or len(subckt["insts"]) < 2:
+            return False
+        return len(set(inst[2] for inst in subckt["insts"])) == 1
+
+    def instances_of(self, master):
+        """ The (parent, instance) pairs that instantiate master """
+
+        found = []
+        for parent in self.order:
+            for inst in self.subckts[parent]["insts"]:
+                if inst[2] == master:
+                    found.append((parent, inst))
+        return found
+
+    def device_size(self, words):
+        """ Width (times the multiplier) and length of a transistor in um """
+
+        size = {"w" : 0.0, "l" : 0.0, "m" : 1.0}
+        scale = {"u" : 1.0, "n" : 1e-3, "m" : 1e3, "" : 1e6}
+        for word in words:
+            m = re.match(r"([wl])=([-+\d.eE]+)([unm]?)$", word.lower())
+            if m:
+                size[m.group(1)] = float(m.group(2)) * scale[m.group(3)]
+            m = re.match(r"m=(\d+)$", word.lower())
+            if m:
+                size["m"] = float(m.group(1))
+        return (size["w"]*size["m"], size["l"])
+
+    def pin_cap(self, master, port):
+        """ Gate and diffusion capacitance (fF) a cell puts on one of its pins """
+
+        key = (master, port)
+        if key in self.pin_caps:
+            return self.pin_caps[key]
+        cap = 0.0
+        subckt = self.subckts.get(master)
+        if subckt != None:
+            for words in subckt["devices"]:
+                if not self.is_transistor(words):
+                    continue
+                (drain, gate, source) = words[1:4]
+                (w, l) = self.device_size(words)
+                if gate == port:
+                    cap += tech.spice["gate_cap"] * w * l
+                if drain == port:
+                    cap += tech.spice["drain_cap"] * w
+                if source == port:
+                    cap += tech.spice["drain_cap"] * w
+            for (inst_name, nets, inst_master) in subckt["insts"]:
+                if inst_master in self.subckts:
+                    for (sub_port, net) in zip(self.subckts[inst_master]["ports"], nets):
+                        if net == port:
+                            cap += self.pin_cap(inst_master, sub_port)
+        self.pin_caps[key] = cap
+        return cap
+
+    def net_cap(self, name, net):
+        """ Capacitance (fF) of the devices and instances of subckt name on a net """
+
+        subckt = self.subckts[name]
+        cap = 0.0
+        for words in subckt["devices"]:
+            if self.is_transistor(words):
+                (w, l) = self.device_size(words)
+                cap += tech.spice["gate_cap"] * w * l * (words[2] == net)
+                cap += tech.spice["drain_cap"] * w * ((words[1] == net) + (words[3] == net))
+        for (inst_name, nets, master) in subckt["insts"]:
+            if master in self.subckts:
+                for (port, inst_net) in zip(self.subckts[master]["ports"], nets):
+                    if inst_net == net:
+                        cap += self.pin_cap(master, port)
+        return cap
+
+    def flatten(self, name, nets=None, prefix=""):
+        """ The transistors of subckt name with the nets of the flat netlist:
+            (drain, gate, source, pmos, width, length). Internal nets are
+            named by their instance path. """
+
+        subckt = self.subckts[name]
+        if nets == None:
+            nets = subckt["ports"]
+        port_map = dict(zip(subckt["ports"], nets))
+        def flat(net):
+            if net in port_map:
+                return port_map[net]
+            if net in self.supplies:
+                return net
+            return prefix + net
+
+        transistors = []
+        for words in subckt["devices"]:
+            if self.is_transistor(words):
+                (w, l) = self.device_size(words)
+                transistors.append((flat(words[1]), flat(words[2]), flat(words[3]),
+                                    self.is_pmos(words), w, l))
+        for (inst_name, inst_nets, master) in subckt["insts"]:
+            if master in self.subckts:
+                transistors.extend(self.flatten(master, [flat(n) for n in inst_nets],
+                                                prefix + inst_name + "."))
+        return transistors
+
+    def count_devices(self, trimmed={}, name=None):
+        """ Number of transistors of the flattened top level subckt (or of
+            subckt name), without the instances removed from the subckts of trimmed """
+
+        counts = {}
+        def count(name):
+            if name not in counts:
+                subckt = self.subckts[name]
+                total = len([d for d in subckt["devices"] if self.is_transistor(d)])
+                for (inst, nets, master) in subckt["insts"]:
+                    if name in trimmed and inst not in trimmed[name]:
+                        continue
+                    if master in self.subckts:
+                        total += count(master)
+                counts[name] = total
+            return counts[name]
+        return count(name or self.top())
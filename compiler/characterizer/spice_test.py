@@ -0,0 +1,301 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Simulation of the SRAM with ngspice or Xyce only, without co-simulation.
+
+The operations of the Verilog source of functional_test (four writes,
+three reads and three read-writes, plus a last read that checks the data)
+are written as PWL sources of the deck. The stimulus can't react to the
+acknowledge, so every phase of the four-phase handshake is given twice the
+time the analytical model estimates for it: the request rises and is held
+for its forward phase, falls and the next request starts after its return
+to zero phase. The handshake delays are measured on the acknowledge
+instead: a cycle is the request to acknowledge time of both edges plus the
+response time of the environment (tech.spice["inv_delay"], like the #delay
+of source.v). The power is the supply energy of the operations, without
+the leakage of the idle time between the phases, over their cycles. The
+read data is checked against the written data. """
+
+import os
+import math
+import tech
+import debug
+from globals import OPTS
+from . import charutils
+from . import functional_test
+from . import analytical
+from . import sim_runner
+from . import find_simulator
+
+# The simulators of this deck (lower case)
+simulators = ["ngspice", "xyce"]
+
+# Time of a handshake phase relative to its estimate
+margin = 2.0
+
+# Time (ns) the SRAM is in reset at the start, the leakage is measured in it
+reset_time = 5.0
+
+
+class spice_test(functional_test.functional_test):
+    """ Deck with the stimulus of functional_test as PWL sources """
+
+    # The PWL times depend on the slew, a sweep needs a deck per point
+    supports_sweep = False
+
+    def write_files(self, load, slew):
+        """ Write the netlists and the deck of the simulation. """
+
+        if self.sweep:
+            debug.error("{0} can't simulate a sweep of points in one deck.".format(OPTS.spice_name), -1)
+        self.simulator = OPTS.spice_name.lower()
+        self.dut_generator(self.addr_bit, self.data_bit, load, self.name, self.w_per_row, self.num_rows)
+        self.schedule(slew)
+        self.spice_deck(slew, load)
+
+        #if n/p transistor is a subcircuit in this technology, replace M to X for transistor names in spice files
+        if tech.info["tx_is_subckt"]:
+            for myfile in ["test.sp", "dut.sp", self.name+".sp"]:
+                self.edit_netlist(myfile)
+            if OPTS.trim_netlist:
+                self.edit_netlist("reduced.sp")
+
+    def operations(self):
+        """ The operations of the source of functional_test: (request,
+            address, data), data is the data bus during the operation """
+
+        (a0, a1) = ("0"*self.addr_bit, "1"*self.addr_bit)
+        (d0, d1) = ("0"*self.data_bit, "1"*self.data_bit)
+        return [("w", a0, d0), ("w", a0, d0), ("w", a1, d1), ("w", a0, d1),
+                ("r", a1, d1), ("r", a1, d1), ("r", a1, d1),
+                ("rw", a0, d1), ("rw", a1, d0), ("rw", a0, d0),
+                ("r", a1, d0)]
+
+    def schedule(self, slew):
+        """ Times (ns) of the operations and the waveforms of the inputs """
+
+        netlist = self.work_dir + self.name + ".sp"
+        corner = (self.process, self.voltage, self.temperature)
+        phases = analytical.analytical(None, netlist).phases(corner)
+        # A 10-90% slew is 80% of the ramp
+        self.ramp = slew/0.8
+        self.delay = tech.spice["inv_delay"]
+
+        inputs = ["reset", "r", "w", "rw", "rreq", "wreq"]
+        inputs += ["DIN{0}".format(i) for i in range(self.data_bit)]
+        inputs += ["ADDR{0}".format(i) for i in range(self.addr_bit)]
+        if self.mask:
+            inputs += ["BM{0}".format(i) for i in range(self.data_bit)]
+        if self.power_gate:
+            inputs.append("sleep")
+        # Everything is low in the reset but the reset and the bit mask
+        self.waves = {name : [(0.0, int(name == "reset" or name.startswith("BM")))] for name in inputs}
+
+        # (request, start, fall, end, expected read data) of every operation
+        self.times = []
+        memory = {}
+        time = reset_time
+        self.drive("reset", time, 0)
+        for (request, addr, data) in self.operations():
+            # The address and data are set one response time before the request
+            self.drive_bus("ADDR", time, addr)
+            self.drive_bus("DIN", time, data)
+            start = time + self.delay + self.ramp
+            requests = [request, "rreq" if request in ["r", "rw"] else "wreq"]
+            for name in requests:
+                self.drive(name, start, 1)
+            if request == "rw":
+                (read, write, back) = phases["rw"]
+                self.drive("wreq", start + margin*read, 1)
+                requests.append("wreq")
+                forward = margin*(read + write)
+            else:
+                (forward, back) = phases[request]
+                forward = margin*forward
+            fall = start + max(forward, self.delay + self.ramp)
+            for name in requests:
+                self.drive(name, fall, 0)
+            time = fall + self.ramp + margin*back + self.delay
+            expected = memory.get(addr) if request in ["r", "rw"] else None
+            if request in ["w", "rw"]:
+                memory[addr] = data
+            self.times.append((request, start, fall, time, expected))
+        self.stop = time + self.delay
+
+    def drive(self, name, time, level):
+        """ Ramp an input to a level at a time """
+
+        wave = self.waves[name]
+        if wave[-1][1] != level:
+            wave.append((time, wave[-1][1]))
+            wave.append((time + self.ramp, level))
+
+    def drive_bus(self, name, time, bits):
+        """ Ramp the bits of a bus, the first bit is the most significant """
+
+        for (i, bit) in enumerate(reversed(bits)):
+            self.drive("{0}{1}".format(name, i), time, int(bit))
+
+    def spice_deck(self, slew, load):
+        """ Function to write the ngspice or Xyce deck. """
+
+        self.deck.write("* SPICE DECK for slew = {0} and load = {1}\n\n".format(slew, load))
+        self.deck.write(".global {0} {1}\n".format(self.vdd_name, self.gnd_name))
+        self.deck.write("vpwr0 {0} 0 dc {1}v\n".format(self.vdd_name, self.voltage))
+        self.deck.write("vpwr1 {0} 0 dc {1}v\n\n".format(self.gnd_name, 0))
+        if self.simulator == "xyce":
+            self.deck.write(".options device temp={0}\n".format(self.temperature))
+        else:
+            self.deck.write(".temp {0}\n".format(self.temperature))
+        if tech.info["name"]=="tsmc65nm":
+            self.deck.write(".lib {0} {1}\n".format(self.device_models, self.process))
+        else:
+            self.deck.write(".include {0}\n".format(self.device_models))
+        self.deck.write(".include dut.sp\n\n")
+
+        self.write_sources()
+        self.deck.write("\nXwrapper ")
+        for name in ["DIN", "DOUT", "ADDR"] + (["BM"] if self.mask else []):
+            for i in range(self.addr_bit if name == "ADDR" else self.data_bit):
+                self.deck.write("{0}{1} ".format(name, i))
+        for i in ["reset", "r", "w", "rw", "ack", "rack", "rreq", "wreq", "wack"]:
+            self.deck.write("{0} ".format(i))
+        if self.power_gate:
+            self.deck.write("sleep ")
+        self.deck.write("wrapper\n\n")
+
+        self.deck.write(".tran 10p {0}n\n\n".format(round(self.stop, 3)))
+        self.write_measures()
+        self.deck.write(".end\n")
+        self.deck.close()
+
+    def write_sources(self):
+        """ One PWL source per input """
+
+        for (name, wave) in sorted(self.waves.items()):
+            points = " ".join("{0}n {1}".format(round(t, 4), level*self.voltage) for (t, level) in wave)
+            self.deck.write("V{0} {0} 0 PWL({1})\n".format(name, points))
+
+    def write_measures(self):
+        """ The forward and return to zero time of the second operation of
+            each kind (the second to last for the writes, like functional_test),
+            the acknowledge slews, the supply current and the read data """
+
+        half = 0.5*self.voltage
+        requests = [t[0] for t in self.times]
+        for (name, request, count) in [("write", "w", 3), ("read", "r", 2), ("read_write", "rw", 2)]:
+            index = [i for (i, r) in enumerate(requests) if r == request][count-1]
+            self.meas_delay(name+"_fwd", request, half, "RISE", count, "ack", half, "RISE", index+1)
+            self.meas_delay(name+"_rtz", request, half, "FALL", count, "ack", half, "FALL", index+1)
+        self.meas_delay("slew_lh", "ack", 0.1*self.voltage, "RISE", 1, "ack", 0.9*self.voltage, "RISE", 1)
+        self.meas_delay("slew_hl", "ack", 0.9*self.voltage, "FALL", 1, "ack", 0.1*self.voltage, "FALL", 1)
+
+        self.meas_average("leakage_current", 1.0, reset_time - 1.0)
+        for (name, request) in [("write", "w"), ("read", "r"), ("read_write", "rw")]:
+            (start, end) = self.window(request)
+            self.meas_average(name+"_current", start, end)
+
+        # The read data is sampled before the request falls
+        for (index, (request, start, fall, end, expected)) in enumerate(self.times):
+            if request == "r" and expected != None:
+                for i in range(self.data_bit):
+                    self.deck.write(".meas tran dout{0}_{1} FIND v(DOUT{1}) AT={2}n\n".format(
+                                    index, i, round(fall, 4)))
+
+    def meas_delay(self, name, trig, trig_val, trig_dir, trig_num, targ, targ_val, targ_dir, targ_num):
+        """ .measure of the time between two crossings """
+
+        if self.simulator == "xyce":
+            form = ".meas tran {0} TRIG v({1})={2} {3}={4} TARG v({5})={6} {7}={8}\n"
+        else:
+            form = ".meas tran {0} TRIG v({1}) VAL={2} {3}={4} TARG v({5}) VAL={6} {7}={8}\n"
+        self.deck.write(form.format(name, trig, trig_val, trig_dir, trig_num,
+                                    targ, targ_val, targ_dir, targ_num))
+
+    def meas_average(self, name, start, stop):
+        """ .measure of the average supply current """
+
+        self.deck.write(".meas tran {0} AVG i(vpwr0) FROM={1}n TO={2}n\n".format(
+                        name, round(start, 4), round(stop, 4)))
+
+    def window(self, request):
+        """ Start and end time (ns) of the consecutive operations of a kind """
+
+        ops = [(start, end) for (r, start, fall, end, expected) in self.times[:-1] if r == request]
+        return (ops[0][0] - self.delay - self.ramp, ops[-1][1])
+
+    def sim_job(self):
+        """ The simulator process in batch mode """
+
+        find_simulator()
+        if self.simulator == "xyce":
+            command = [OPTS.spice_exe, self.deck_file]
+        else:
+            command = [OPTS.spice_exe, "-b", "-o", "test.log", self.deck_file]
+        return sim_runner.sim_job(command, self.work_dir, OPTS.char_timeout)
+
+    def output_file(self):
+        """ ngspice prints the measurements in its log, Xyce in a .mt0 file """
+
+        if self.simulator == "xyce":
+            return self.work_dir + self.deck_file + ".mt0"
+        return self.work_dir + "test.log"
+
+    def parse_results(self):
+        """ Parse the measurements to report delay and power values. """
+
+        filename = self.output_file()
+        if not os.path.exists(filename):
+            debug.error("Simulation in {0} finished without writing {1}".format(self.work_dir, filename), -1)
+        measures = charutils.parse_measurements(filename)[0]
+        self.result = self.convert_measures(self.cycle_measures(measures))
+        return self.result
+
+    def cycle_measures(self, measures):
+        """ The measurements of functional_test (s, W) from the phases """
+
+        def measure(name):
+            if name not in measures:
+                return charutils.failed_measure("{0} is not in the output".format(name))
+            return measures[name]
+
+        response = 2*self.delay*1e-9
+        leakage = -self.voltage*measure("leakage_current")
+        cycles = {"leakage_power" : leakage,
+                  "slew_lh" : measure("slew_lh"),
+                  "slew_hl" : measure("slew_hl")}
+        for (name, request) in [("write", "w"), ("read", "r"), ("read_write", "rw")]:
+            cycle = measure(name+"_fwd") + measure(name+"_rtz") + response
+            (start, end) = self.window(request)
+            window = (end - start)*1e-9
+            count = len([t for t in self.times[:-1] if t[0] == request])
+            energy = (-self.voltage*measure(name+"_current") - leakage)*window
+            cycles[name+"_delay"] = cycle
+            cycles[name+"_power"] = energy/(count*cycle) + leakage
+
+        errors = self.check_data(measures)
+        if errors:
+            debug.warning("Read data errors in {0}: {1}".format(self.work_dir, ", ".join(errors)))
+            cycles["read_delay"] = charutils.failed_measure("wrong read data")
+        return cycles
+
+    def check_data(self, measures):
+        """ The bits of the reads that don't have the written data """
+
+        errors = []
+        for (index, (request, start, fall, end, expected)) in enumerate(self.times):
+            if request != "r" or expected == None:
+                continue
+            for (i, bit) in enumerate(reversed(expected)):
+                value = measures.get("dout{0}_{1}".format(index, i), float("nan"))
+                if math.isnan(value) or (value > 0.5*self.voltage) != (bit == "1"):
+                    errors.append("DOUT{0} of read {1} is {2}V".format(i, index, value))
+        return errors
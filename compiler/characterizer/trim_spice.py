@@ -1,34 +1,44 @@
 ############################################################################
 #
 # BSD 3-Clause License (See LICENSE.OR for licensing information)
-# Copyright (c) 2016-2019 Regents of the University of California 
-# and The Board of Regents for the Oklahoma Agricultural and 
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
 # Mechanical College (acting for and on behalf of Oklahoma State University)
 # All rights reserved.
 #
 ############################################################################
 
 
+import re
 import debug
 from math import log
+from . import spice_netlist
 
-class trim_spice():
-    """ A utility to trim redundant parts of an SRAM spice netlist. 
+class trim_spice(spice_netlist.spice_netlist):
+    """ A utility to trim redundant parts of an SRAM spice netlist.
         Input is an SRAM spice file. Output is an equivalent netlist
-        that works for a single address and range of data bits. """
+        that works for a single address and range of data bits.
 
-    def __init__(self, spfile, reduced_spfile, word_size, w_per_row, num_rows, 
-                 addr1, addr2):
-        self.sp_file = spfile
-        self.reduced_spfile = reduced_spfile        
+        The netlist is read as a graph of subckts, instances and nets. Only
+        the regular arrays (subckts made of many instances of one cell: the
+        bitcell, precharge, column mux, sense amp, write driver and wordline
+        driver arrays) are trimmed. Starting from the wordlines of the kept
+        rows and the bitlines of the kept columns in the banks, the cells of
+        an array are kept if they are on a kept net, and the nets of a kept
+        cell are kept in turn (e.g. the wordline driver of a kept row and the
+        column mux select of a kept word), until nothing changes. A bitcell
+        is kept only on a kept row and a kept column. The gate and diffusion
+        capacitance that the removed cells put on the nets still in use
+        (wordlines, bitlines, enables) is added back as one lumped capacitor
+        per net, so the loading of the critical paths is preserved. """
 
+    def __init__(self, spfile, reduced_spfile, word_size, w_per_row, num_rows,
+                 addr1, addr2, bitcell_array="bitcell_ary"):
         debug.info(1,"Trimming non-critical cells to speed-up characterization")
-        
-        # Load the file into a buffer for performance
-        sp = open(self.sp_file, "r")
-        self.spice = sp.readlines()
-        for i in range(len(self.spice)):
-            self.spice[i] = self.spice[i].rstrip(" \n")
+
+        spice_netlist.spice_netlist.__init__(self, spfile)
+        self.reduced_spfile = reduced_spfile
+        self.bitcell_array = bitcell_array
         self.sp_buffer = self.spice
 
         #Set the configuration of SRAM sizes that we are simulating.
@@ -38,90 +48,240 @@ class trim_spice():
 
         self.row_addr_size = int(log(self.num_rows, 2))
         self.col_addr_size = int(log(self.w_per_row, 2))
+
         self.trim(addr1, addr2)
 
+    def shared_nets(self, name):
+        """ Nets that reach every cell of an array (supplies, enables) """
+
+        insts = self.subckts[name]["insts"]
+        shared = set(insts[0][1])
+        for inst in insts[1:]:
+            shared &= set(inst[1])
+        return shared | set(self.supplies)
+
+    def decoded_rows(self, addresses):
+        """ The rows (wordlines) of row addresses. The decoder output of an
+            address goes into the in[] port of the wordline driver array with
+            the same index, and a driver cell drives outN from inN, but the
+            mirrored drivers take the rows of their group in reverse order
+            (see wordline_driver_array). The row is found by following the
+            decoder output through the driver arrays (the global and the
+            local wordline drivers of the subanks) to a bitcell wordline. """
+
+        rows = {}
+        for parent in self.order:
+            insts = self.subckts[parent]["insts"]
+            wordlines = {}
+            for (inst_name, nets, master) in insts:
+                if master != self.bitcell_array:
+                    continue
+                for (port, net) in zip(self.subckts[master]["ports"], nets):
+                    wl = re.match(r"wl\[(\d+)\]$", port)
+                    if wl:
+                        wordlines[net] = int(wl.group(1))
+            if not wordlines:
+                continue
+
+            # The net driven from each input net of a driver cell, and the
+            # in[] index of the input nets
+            links = {}
+            inputs = {}
+            for (inst_name, nets, master) in insts:
+                if not self.is_array(master):
+                    continue
+                outputs = dict(zip(self.subckts[master]["ports"], nets))
+                for (cell, cell_nets, cell_master) in self.subckts[master]["insts"]:
+                    ports = dict(zip(self.subckts.get(cell_master, {}).get("ports", []), cell_nets))
+                    for (port, net) in ports.items():
+                        pin = re.match(r"in(\d+)$", port)
+                        address = re.match(r"in\[(\d+)\]$", net)
+                        if pin == None or address == None:
+                            continue
+                        out = outputs.get(ports.get("out" + pin.group(1)))
+                        if out != None:
+                            links[outputs[net]] = out
+                            inputs[outputs[net]] = int(address.group(1))
+
+            driven = set(links.values())
+            for (net, address) in inputs.items():
+                if net in driven:
+                    continue
+                for i in range(len(links)):
+                    if net in wordlines or net not in links:
+                        break
+                    net = links[net]
+                if net in wordlines:
+                    rows[address] = wordlines[net]
+            if rows:
+                break
+        return [rows.get(address, address) for address in addresses]
+
     def trim(self, addr1, addr2):
         """ Reduce the spice netlist but KEEP the given bits at the
             address (and things that will add capacitive load!)"""
 
-        # Always start fresh if we do multiple reductions
-        self.sp_buffer = self.spice
-
         # Split up the address and convert to an int
-        wl_addr1 = int(addr1[0:self.row_addr_size],2)
-        wl_addr2 = int(addr2[0:self.row_addr_size],2)
-        if self.w_per_row>1:
-            col_addr1 = int(addr1[self.row_addr_size:self.row_addr_size+int(log(self.w_per_row,2))],2)
-            col_addr2 = int(addr2[self.row_addr_size:self.row_addr_size+int(log(self.w_per_row,2))],2)
-        else:
-            col_addr1 = 0
-            col_addr2 = 0
-
-        # 1. Keep cells in the bitcell array based on WL and BL (first BL from each word for write_complete)
-        bl_name1 = "bl[{0}]".format(col_addr1*self.word_size)
-        bl_name2 = "bl[{0}]".format(col_addr2*self.word_size)
-        wl_name1 = "wl[{0}]".format(wl_addr1)
-        wl_name2 = "wl[{0}]".format(wl_addr2)
-
-
-        # Prepend info about the trimming
-        addr_msg = "Keeping {} address".format(addr1)
-        self.sp_buffer.insert(0, "* "+addr_msg)
-        debug.info(1,addr_msg)
-        addr_msg = "Keeping {} address".format(addr2)
-        self.sp_buffer.insert(0, "* "+addr_msg)
-        debug.info(1,addr_msg)
-        
-        bl_msg = "Keeping {} (trimming other BLs)".format(bl_name1)
-        self.sp_buffer.insert(0, "* "+bl_msg)
-        debug.info(1,bl_msg)
-        bl_msg = "Keeping {} (trimming other BLs)".format(bl_name2)
-        self.sp_buffer.insert(0, "* "+bl_msg)
-        debug.info(1,bl_msg)
-
-        wl_msg = "Keeping {} (trimming other WLs)".format(wl_name1)
-        self.sp_buffer.insert(0, "* "+wl_msg)
-        debug.info(1,wl_msg)
-        wl_msg = "Keeping {} (trimming other WLs)".format(wl_name2)
-        self.sp_buffer.insert(0, "* "+wl_msg)
-        debug.info(1,wl_msg)
-
-        self.sp_buffer.insert(0, "* It should NOT be used for LVS!!")
-        self.sp_buffer.insert(0, "* WARNING: This is a TRIMMED NETLIST.")
-        
-        self.remove_insts("bitcell_ary",[wl_name1, bl_name1])
-        self.remove_insts("bitcell_ary",[wl_name2, bl_name2])
-
-        # Everything else isn't worth removing. :)
-        
+        rows = []
+        cols = []
+        for addr in [addr1, addr2]:
+            rows.append(int(addr[0:self.row_addr_size],2))
+            if self.w_per_row>1:
+                col_addr = int(addr[self.row_addr_size:self.row_addr_size+self.col_addr_size],2)
+            else:
+                col_addr = 0
+            # The bits of the words in a row are interleaved (see column_mux_array)
+            cols.extend(bit*self.w_per_row + col_addr for bit in range(self.word_size))
+        rows = sorted(set(self.decoded_rows(rows)))
+        cols = sorted(set(cols))
+        self.rows = rows
+
+        # The kept cells of every array subckt
+        self.kept = {}
+        # Removed cells and lumped loads of every trimmed array
+        self.removed = {}
+        for parent in self.order:
+            for (inst_name, nets, master) in self.subckts[parent]["insts"]:
+                if master == self.bitcell_array:
+                    self.trim_scope(parent, rows, cols)
+                    break
+
+        header = ["* WARNING: This is a TRIMMED NETLIST.",
+                  "* It should NOT be used for LVS!!"]
+        for addr in [addr1, addr2]:
+            header.append("* Keeping {} address".format(addr))
+        header.append("* Keeping wl{} and bl/br{} (trimming other rows and columns)".format(rows, cols))
+        for line in header[2:]:
+            debug.info(1,line[2:])
+
+        self.sp_buffer = header + self.write_subckts()
+        self.report()
+
         # Finally, write out the buffer as the new reduced file
         sp = open(self.reduced_spfile, "w")
         sp.write("\n".join(self.sp_buffer))
+        sp.close()
 
-        
-    def remove_insts(self, subckt_name, keep_inst_list):
-        """This will remove all of the instances in the list from the named subckt that DO NOT contain 
-           a term in the list. It just does a match of the line with a term so you can search for a 
-           single net connection, the instance name, anything."""
-        
-        start_name = ".SUBCKT {}".format(subckt_name)
-        end_name = ".ENDS {}".format(subckt_name)
-
-        in_subckt=False
-        new_buffer=[]
-        for line in self.sp_buffer:
-            if start_name in line:
-                new_buffer.append(line)
-                in_subckt=True
-            elif end_name in line:
-                new_buffer.append(line)
-                in_subckt=False
-            elif in_subckt:
-                for k in keep_inst_list:
-                    if k in line:
-                        new_buffer.append(line)
-                        break
-            else:
-                new_buffer.append(line)
+    def trim_scope(self, parent, rows, cols):
+        """ Keep the cells of the arrays in parent (a bank) that are connected
+            to the kept rows and columns of its bitcell arrays """
+
+        insts = self.subckts[parent]["insts"]
+        arrays = [inst for inst in insts if self.is_array(inst[2])]
+
+        # Nets of the parent used by the other (non-array) instances, e.g. the
+        # bitline of the write complete detection, are kept too
+        pinned = set()
+        for (inst_name, nets, master) in insts:
+            if not self.is_array(master):
+                pinned.update(nets)
+
+        # The kept nets of the parent and the array instance that kept them
+        # (None for the rows and columns themselves)
+        row_nets = set()
+        active = {}
+        for (inst_name, nets, master) in insts:
+            if master != self.bitcell_array:
+                continue
+            ports = dict(zip(self.subckts[master]["ports"], nets))
+            row_nets.update(ports["wl[{}]".format(r)] for r in rows if "wl[{}]".format(r) in ports)
+            for c in range(len(ports)):
+                for bl in ["bl[{}]".format(c), "br[{}]".format(c)]:
+                    if bl in ports and (c in cols or ports[bl] in pinned):
+                        active[ports[bl]] = None
+        for net in row_nets:
+            active[net] = None
+        for net in self.supplies:
+            active.pop(net, None)
+
+        # Propagate through the kept cells until no new net is kept. A net
+        # only keeps cells of the other arrays than the one that kept it, so
+        # e.g. the output of a kept column mux doesn't keep the muxes of the
+        # other words on the same output.
+        changed = True
+        while changed:
+            changed = False
+            for (inst_name, nets, master) in arrays:
+                to_port = {}
+                for (port, net) in zip(self.subckts[master]["ports"], nets):
+                    to_port.setdefault(net, []).append(port)
+                from_port = dict(zip(self.subckts[master]["ports"], nets))
+                active_ports = set(p for (net, source) in active.items() if source != inst_name
+                                   for p in to_port.get(net, []))
+                row_ports = set(p for net in row_nets for p in to_port.get(net, []))
+                shared = self.shared_nets(master)
+                kept = self.kept.setdefault(master, set())
+
+                for (cell, cell_nets, cell_master) in self.subckts[master]["insts"]:
+                    selective = [n for n in cell_nets if n not in shared]
+                    if master == self.bitcell_array:
+                        keep = any(n in row_ports for n in selective) and \
+                               any(n in active_ports and n not in row_ports for n in selective)
+                    else:
+                        keep = any(n in active_ports for n in selective)
+                    if not keep:
+                        continue
+                    kept.add(cell)
+                    if master == self.bitcell_array:
+                        continue
+                    for n in selective:
+                        net = from_port.get(n)
+                        if net != None and net not in active and net not in self.supplies:
+                            active[net] = inst_name
+                            changed = True
+
+    def write_subckts(self):
+        """ The netlist with the removed cells of the arrays replaced by their load """
+
+        buffer = []
+        in_trimmed = False
+        for line in self.spice:
+            words = line.split()
+            keyword = words[0].upper() if words else ""
+            if keyword == ".SUBCKT" and words[1] in self.kept:
+                in_trimmed = True
+                buffer.append(line)
+                buffer.extend(self.trimmed_body(words[1]))
+            elif keyword == ".ENDS":
+                in_trimmed = False
+                buffer.append(line)
+            elif not in_trimmed:
+                buffer.append(line)
+        return buffer
+
+    def trimmed_body(self, name):
+        """ The kept cells of an array and one capacitor per net for the removed ones """
+
+        subckt = self.subckts[name]
+        kept = self.kept[name]
+        kept_nets = set(n for (cell, nets, master) in subckt["insts"] if cell in kept for n in nets)
+        live_nets = (kept_nets | self.shared_nets(name)) - set(self.supplies)
+
+        body = []
+        loads = {}
+        for (cell, nets, master) in subckt["insts"]:
+            if cell in kept:
+                body.append("{0} {1} {2}".format(cell, " ".join(nets), master))
+                continue
+            ports = self.subckts[master]["ports"] if master in self.subckts else []
+            for (port, net) in zip(ports, nets):
+                if net in live_nets:
+                    loads[net] = loads.get(net, 0.0) + self.pin_cap(master, port)
+
+        for (net, cap) in sorted(loads.items()):
+            if cap > 0:
+                cap_name = "Ctrim_" + re.sub(r"\W", "_", net)
+                body.append("{0} {1} 0 {2}f".format(cap_name, net, round(cap, 4)))
+        self.removed[name] = (len(subckt["insts"]) - len(kept), len(loads))
+        return body
+
+    def report(self):
+        """ Print the reduction of the netlist, the simulation time roughly
+            scales with the number of devices """
 
-        self.sp_buffer = new_buffer
+        before = self.count_devices(set())
+        after = self.count_devices(self.kept)
+        loads = sum(caps for (cells, caps) in self.removed.values())
+        debug.info(1,"Trimmed netlist: {0} of {1} transistors kept ({2}x fewer), {3} lumped loads".format(
+                   after, before, round(before/max(after,1), 1), loads))
+        self.stats = {"devices" : before, "kept_devices" : after, "loads" : loads}
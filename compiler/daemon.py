@@ -0,0 +1,251 @@
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA. (See LICENSE for licensing information)
+
+
+""" Compiler daemon and its job protocol.
+
+The daemon (AMC_daemon.py) imports the technology, the library cells and
+all the generator modules once and then waits for compile jobs on a Unix
+domain socket. Every job runs in a worker process forked from the warm
+daemon, so a job starts with everything already loaded and never sees
+the global state (OPTS, name map, temp files) of another job.
+
+A job is sent by AMC_client.py as one message with the options given on
+its command line, the contents of its config file and its working
+directory. The worker streams the compiler output back to the client and
+the daemon sends the exit code of the worker as the last message.
+
+Messages are Python literals (dicts) written one per line so that tuples
+in the config (e.g. branch_factors) survive the round trip. They are read
+back with ast.literal_eval and never executed.
+"""
+
+import os
+import sys
+import ast
+import socket
+import datetime
+import tempfile
+import threading
+import traceback
+import multiprocessing
+import debug
+import globals
+from globals import OPTS
+
+
+def send_message(conn, message):
+    """ Send a message (a dict) over the socket """
+
+    conn.sendall((repr(message) + "\n").encode())
+
+def read_message(conn_file):
+    """ Read the next message from a socket file, None at the end of stream """
+
+    line = conn_file.readline()
+    if not line:
+        return None
+    return ast.literal_eval(line.decode())
+
+def connect(socket_name):
+    """ Connect to a running daemon, returns None if there is none """
+
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(socket_name)
+    except (FileNotFoundError, ConnectionRefusedError):
+        conn.close()
+        return None
+    return conn
+
+
+class job_stream:
+    """ File-like object that forwards the output of a job to the client """
+
+    def __init__(self, conn, key):
+        self.conn = conn
+        self.key = key
+
+    def write(self, text):
+        if text:
+            send_message(self.conn, {self.key: text})
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+class daemon():
+    """ Serve compile jobs from a warm compiler process. """
+
+    def __init__(self, socket_name, num_jobs):
+        self.socket_name = socket_name
+        self.num_jobs = max(1, num_jobs)
+        self.slots = threading.BoundedSemaphore(self.num_jobs)
+        self.context = multiprocessing.get_context("fork")
+        self.running = True
+
+        # These are the options of the daemon itself, every job starts from them
+        self.server_opts = {"AMC_tech" : OPTS.AMC_tech,
+                            "AMC_temp" : OPTS.AMC_temp,
+                            "tech_name" : OPTS.tech_name}
+
+    def warm_up(self):
+        """ Import everything a compile job needs, read the library cells from
+            GDS and build the default contacts, so that a worker only generates. """
+
+        start_time = datetime.datetime.now()
+        import sram
+        import sync_sram
+        import power_gate_sram
+        import bist
+        import utils
+        import contact
+        utils.load_libcells()
+        for name in contact.default_contacts:
+            getattr(contact, name)
+        if OPTS.check_lvsdrc:
+            import calibre
+        globals.print_time("Warm up", datetime.datetime.now(), start_time)
+
+    def serve(self):
+        """ Accept jobs until a shutdown request arrives. """
+
+        if connect(self.socket_name):
+            debug.error("A daemon is already listening on {0}".format(self.socket_name), -1)
+        if os.path.exists(self.socket_name):
+            os.remove(self.socket_name)
+
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_name)
+        # Jobs run with the permissions of the daemon, so keep the socket private
+        os.chmod(self.socket_name, 0o600)
+        self.server.listen()
+        print("Listening on {0} with {1} job slot(s)".format(self.socket_name, self.num_jobs))
+
+        try:
+            while self.running:
+                (conn, address) = self.server.accept()
+                if not self.running:
+                    conn.close()
+                    break
+                handler = threading.Thread(target=self.handle, args=(conn,), daemon=True)
+                handler.start()
+        finally:
+            self.server.close()
+            if os.path.exists(self.socket_name):
+                os.remove(self.socket_name)
+
+    def shutdown(self):
+        """ Stop accepting jobs """
+
+        self.running = False
+        # Closing the socket does not wake up accept(), a connection does
+        wake_up = connect(self.socket_name)
+        if wake_up:
+            wake_up.close()
+
+    def handle(self, conn):
+        """ Read one request from a client and run it """
+
+        try:
+            request = read_message(conn.makefile("rb"))
+            if request == None:
+                return
+            command = request.get("command", "job")
+            if command == "ping":
+                send_message(conn, {"exit": 0})
+            elif command == "shutdown":
+                send_message(conn, {"out": "Shutting down the AMC daemon\n"})
+                send_message(conn, {"exit": 0})
+                self.shutdown()
+            elif command == "job":
+                self.run(conn, request)
+            else:
+                send_message(conn, {"err": "Unknown request {0}\n".format(command)})
+                send_message(conn, {"exit": 2})
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away, its worker (if any) is already finished
+            pass
+        finally:
+            conn.close()
+
+    def run(self, conn, request):
+        """ Run a compile job in a worker process once a job slot is free """
+
+        if not self.slots.acquire(blocking=False):
+            send_message(conn, {"out": "Waiting for a free job slot...\n"})
+            self.slots.acquire()
+        try:
+            start_time = datetime.datetime.now()
+            worker = self.context.Process(target=self.run_job, args=(conn, request))
+            worker.start()
+            worker.join()
+            debug.info(1, "Job from {0} finished with exit code {1} in {2} seconds".format(
+                request.get("cwd"), worker.exitcode,
+                round((datetime.datetime.now()-start_time).total_seconds(),1)))
+            send_message(conn, {"exit": worker.exitcode})
+        finally:
+            self.slots.release()
+
+    def run_job(self, conn, request):
+        """ Body of the worker process: compile one SRAM with the options of
+            the request. This mirrors AMC.py. """
+
+        sys.stdout = job_stream(conn, "out")
+        sys.stderr = job_stream(conn, "err")
+        try:
+            self.setup_job(request)
+
+            globals.print_banner()
+            globals.report_status()
+            start_time = datetime.datetime.now()
+            globals.print_time("Start",start_time)
+
+            import generate
+            generate.generate()
+
+            globals.end_AMC()
+            globals.print_time("End",datetime.datetime.now(), start_time)
+        except SystemExit:
+            raise
+        except BaseException:
+            traceback.print_exc()
+            sys.exit(1)
+        finally:
+            sys.stdout.flush()
+
+    def setup_job(self, request):
+        """ Set the options of a job: command line options of the client first,
+            then the config file on top, as read_config does. """
+
+        os.chdir(request["cwd"])
+        OPTS.__dict__.clear()
+        OPTS.__dict__.update(request.get("options", {}))
+
+        config_tech = request["config"].get("tech_name", OPTS.__dict__.get("tech_name"))
+        if config_tech not in [None, self.server_opts["tech_name"]]:
+            debug.error("This daemon serves {0}, not {1}.".format(self.server_opts["tech_name"],
+                                                                   config_tech), -1)
+        OPTS.__dict__.update(self.server_opts)
+
+        # Each job has its own temp directory so concurrent jobs don't collide
+        OPTS.AMC_temp = tempfile.mkdtemp(prefix="job_", dir=self.server_opts["AMC_temp"]) + "/"
+
+        globals.apply_config(request["config"], is_unit_test=False)
+        globals.set_tech_defaults()
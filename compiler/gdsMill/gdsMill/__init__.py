@@ -6,6 +6,8 @@ GDS Mill is a Python package for the creation and manipulation of binary GDS2 la
 
 from .gds2reader import *
 from .gds2writer import *
+from .oasisReader import *
+from .oasisWriter import *
 #from .pdfLayout import *
 from .vlsiLayout import *
 from .gdsStreamer import *
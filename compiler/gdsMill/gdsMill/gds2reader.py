@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 import struct
+import compressed
 from .gdsPrimitives import *
 
 class Gds2reader:
@@ -362,17 +363,21 @@ class Gds2reader:
                 thisAref.rotateAngle=rotateAngle                
                 if(self.debugToTerminal==1):
                     print("\t\t\tRotate Angle (CCW):"+str(rotateAngle))
+            elif(idBits==b'\x13\x02'):  #Columns and Rows
+                (columns,rows)=struct.unpack(">hh",record[2:6])
+                thisAref.columns=columns
+                thisAref.rows=rows
+                if(self.debugToTerminal==1):
+                    print("\t\t\tColumns: "+str(columns)+" Rows: "+str(rows))
             elif(idBits==b'\x10\x03'):  #XY Data Points
-                index=2
-                topLeftX=struct.unpack(">i",record[index:index+4])[0]
-                topLeftY=struct.unpack(">i",record[index+4:index+8])[0]
-                rightMostX=struct.unpack(">i",record[index+8:index+12])[0]
-                bottomMostY=struct.unpack(">i",record[index+12:index+16])[0]
-                thisAref.coordinates=[(topLeftX,topLeftY),(rightMostX,topLeftY),(topLeftX,bottomMostY)]
-                if(self.debugToTerminal==1):
-                    print("\t\t\tTop Left Point: "+str(topLeftX)+","+str(topLeftY))
-                    print("\t\t\t\tArray Width: "+str(rightMostX-topLeftX))
-                    print("\t\t\t\tArray Height: "+str(topLeftY-bottomMostY))
+                #the origin, the displacement of all the columns and of all the rows
+                thisAref.coordinates=[]
+                for index in range(2,len(record),8):
+                    x=struct.unpack(">i",record[index:index+4])[0]
+                    y=struct.unpack(">i",record[index+4:index+8])[0]
+                    thisAref.coordinates+=[(x,y)]
+                    if(self.debugToTerminal==1):
+                        print("\t\t\tXY Point: "+str(x)+","+str(y))
             elif(idBits==b'\x11\x00'):  #End Of Element
                 break;
         return thisAref
@@ -628,7 +633,7 @@ class Gds2reader:
             print("There was an error parsing the GDS header.  Aborting...")
             
     def loadFromFile(self, fileName):
-        self.fileHandle = open(fileName,"rb")
+        self.fileHandle = compressed.open_input(fileName,"rb")
         self.readGds2()
         self.fileHandle.close()
         self.layoutObject.initialize()
@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 import struct
+import compressed
 from .gdsPrimitives import *
 
 class Gds2writer:
@@ -326,10 +327,11 @@ class Gds2writer:
             self.writeRecord(idBits+plex)
         if(thisAref.aName):
             idBits=b'\x12\x06'
-            if (len(thisAref.aName) % 2 != 0):
-                aName = thisAref.aName+"\0"
-            else:
-                aName = thisAref.aName
+            aName = thisAref.aName
+            if isinstance(aName,str):
+                aName = aName.encode()
+            if (len(aName) % 2 != 0):
+                aName = aName+b"\0"
             self.writeRecord(idBits+aName)
         if(thisAref.transFlags):
             idBits=b'\x1A\x01'
@@ -346,6 +348,10 @@ class Gds2writer:
             idBits=b'\x1C\x05'            
             rotateAngle=self.ibmDataFromIeeeDouble(thisAref.rotateAngle)
             self.writeRecord(idBits+rotateAngle)
+        if(thisAref.columns):
+            idBits=b'\x13\x02' #Columns and Rows
+            colRow=struct.pack(">hh",int(thisAref.columns),int(thisAref.rows))
+            self.writeRecord(idBits+colRow)
         if(thisAref.coordinates):
             idBits=b'\x10\x03' #XY Data Points
             coordinateRecord = idBits
@@ -553,6 +559,6 @@ class Gds2writer:
         self.writeRecord(idBits)
         
     def writeToFile(self,fileName):
-        self.fileHandle = open(fileName,"wb")
+        self.fileHandle = compressed.open_output(fileName,"wb")
         self.writeGds2()
         self.fileHandle.close()
@@ -135,6 +135,8 @@ class GdsAref:
         self.transFlags=[0,0,0]
         self.magFactor=""
         self.rotateAngle=""
+        self.columns=""
+        self.rows=""
         self.coordinates=""
 
 class GdsText:
@@ -0,0 +1,390 @@
+#!/usr/bin/env python
+import struct
+import zlib
+import compressed
+from datetime import *
+from .gdsPrimitives import *
+from .oasisWriter import directions
+
+# g-delta directions of the point lists, by their code
+vectors = dict((code, vector) for (vector, code) in directions.items())
+
+class OasisReader:
+    """Class to read in a file in OASIS format and populate a layout class with it
+
+    The cells become structures with the same primitives as a GDSII file:
+    rectangles and polygons are boundaries, paths are paths, placements are
+    srefs and texts are texts. The repetitions are expanded into one primitive
+    per position. The properties, layer names and trapezoids are not read."""
+
+    def __init__(self,layoutObject,debugToTerminal = 0):
+        self.data = b""
+        self.index = 0
+        self.layoutObject = layoutObject
+        self.debugToTerminal=debugToTerminal
+        self.cellNames = {}
+        self.textStrings = {}
+
+    def readByte(self):
+        byte = self.data[self.index]
+        self.index += 1
+        return byte
+
+    def readUnsignedInteger(self):
+        value = 0
+        shift = 0
+        while True:
+            byte = self.readByte()
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            if not byte & 0x80:
+                return value
+
+    def readSignedInteger(self):
+        value = self.readUnsignedInteger()
+        if value & 1:
+            return -(value >> 1)
+        return value >> 1
+
+    def readReal(self):
+        realType = self.readUnsignedInteger()
+        if realType in [0, 1]:
+            value = self.readUnsignedInteger()
+            return -value if realType else value
+        if realType in [2, 3]:
+            value = 1.0/self.readUnsignedInteger()
+            return -value if realType == 3 else value
+        if realType in [4, 5]:
+            value = self.readUnsignedInteger()/self.readUnsignedInteger()
+            return -value if realType == 5 else value
+        if realType == 6:
+            value = struct.unpack("<f", self.data[self.index:self.index+4])[0]
+            self.index += 4
+            return value
+        value = struct.unpack("<d", self.data[self.index:self.index+8])[0]
+        self.index += 8
+        return value
+
+    def readString(self):
+        length = self.readUnsignedInteger()
+        value = self.data[self.index:self.index+length]
+        self.index += length
+        return value.decode()
+
+    def readGDelta(self):
+        value = self.readUnsignedInteger()
+        if value & 1:
+            dx = value >> 2
+            if value & 2:
+                dx = -dx
+            return (dx, self.readSignedInteger())
+        (dx, dy) = vectors[(value >> 1) & 7]
+        return (dx*(value >> 4), dy*(value >> 4))
+
+    def readPointList(self, polygon=False):
+        """The points of a point list, starting at (0,0)"""
+        listType = self.readUnsignedInteger()
+        count = self.readUnsignedInteger()
+        deltas = []
+        for i in range(count):
+            if listType in [0, 1]:
+                # Alternating horizontal and vertical, starting horizontal (0) or vertical (1)
+                value = self.readSignedInteger()
+                deltas.append((value, 0) if (i + listType) % 2 == 0 else (0, value))
+            elif listType == 2:
+                value = self.readUnsignedInteger()
+                (dx, dy) = vectors[value & 3]
+                deltas.append((dx*(value >> 2), dy*(value >> 2)))
+            elif listType == 3:
+                value = self.readUnsignedInteger()
+                (dx, dy) = vectors[value & 7]
+                deltas.append((dx*(value >> 3), dy*(value >> 3)))
+            else:
+                deltas.append(self.readGDelta())
+        if listType == 5:
+            # Each delta is the difference from the previous one
+            for i in range(1, len(deltas)):
+                deltas[i] = (deltas[i][0] + deltas[i-1][0], deltas[i][1] + deltas[i-1][1])
+        points = [(0, 0)]
+        for (dx, dy) in deltas:
+            points.append((points[-1][0] + dx, points[-1][1] + dy))
+        if polygon and listType in [0, 1]:
+            # The corner implied before going back to the first point
+            if (count + listType) % 2 == 0:
+                points.append((0, points[-1][1]))
+            else:
+                points.append((points[-1][0], 0))
+        return points
+
+    def readRepetition(self):
+        """The displacements of the positions of a repetition"""
+        repetitionType = self.readUnsignedInteger()
+        if repetitionType == 0:
+            return self.repetition
+        if repetitionType == 1:
+            columns = self.readUnsignedInteger() + 2
+            rows = self.readUnsignedInteger() + 2
+            xSpace = self.readUnsignedInteger()
+            ySpace = self.readUnsignedInteger()
+            offsets = [(i*xSpace, j*ySpace) for j in range(rows) for i in range(columns)]
+        elif repetitionType in [2, 3, 4, 5, 6, 7]:
+            count = self.readUnsignedInteger() + 2
+            if repetitionType in [2, 3]:
+                spaces = [self.readUnsignedInteger()]*(count - 1)
+            else:
+                grid = self.readUnsignedInteger() if repetitionType in [5, 7] else 1
+                spaces = [grid*self.readUnsignedInteger() for i in range(count - 1)]
+            positions = [0]
+            for space in spaces:
+                positions.append(positions[-1] + space)
+            if repetitionType in [2, 4, 5]:
+                offsets = [(p, 0) for p in positions]
+            else:
+                offsets = [(0, p) for p in positions]
+        elif repetitionType == 8:
+            columns = self.readUnsignedInteger() + 2
+            rows = self.readUnsignedInteger() + 2
+            columnStep = self.readGDelta()
+            rowStep = self.readGDelta()
+            offsets = [(i*columnStep[0] + j*rowStep[0], i*columnStep[1] + j*rowStep[1])
+                       for j in range(rows) for i in range(columns)]
+        elif repetitionType == 9:
+            count = self.readUnsignedInteger() + 2
+            step = self.readGDelta()
+            offsets = [(i*step[0], i*step[1]) for i in range(count)]
+        else:
+            count = self.readUnsignedInteger() + 2
+            grid = self.readUnsignedInteger() if repetitionType == 11 else 1
+            offsets = [(0, 0)]
+            for i in range(count - 1):
+                (dx, dy) = self.readGDelta()
+                offsets.append((offsets[-1][0] + grid*dx, offsets[-1][1] + grid*dy))
+        self.repetition = offsets
+        return offsets
+
+    def readModal(self, info, bit, name, read):
+        """A field of a record, or its modal value when it is left out"""
+        if info & bit:
+            self.modal[name] = read()
+        return self.modal[name]
+
+    def readPosition(self, info, prefix, xBit, yBit):
+        position = []
+        for (axis, bit) in [("-x", xBit), ("-y", yBit)]:
+            if info & bit:
+                value = self.readSignedInteger()
+                if self.xyRelative:
+                    value += self.modal[prefix + axis]
+                self.modal[prefix + axis] = value
+            position.append(self.modal[prefix + axis])
+        return position
+
+    def readOffsets(self, info, bit):
+        if info & bit:
+            return self.readRepetition()
+        return [(0, 0)]
+
+    def addBoundary(self, layer, dataType, points, offsets):
+        for (dx, dy) in offsets:
+            thisBoundary = GdsBoundary()
+            thisBoundary.drawingLayer = layer
+            thisBoundary.purposeLayer = 0
+            thisBoundary.dataType = dataType
+            thisBoundary.coordinates = [(x + dx, y + dy) for (x, y) in points + points[:1]]
+            self.structure.boundaries += [thisBoundary]
+
+    def readRectangle(self):
+        info = self.readByte()
+        layer = self.readModal(info, 0x01, "layer", self.readUnsignedInteger)
+        dataType = self.readModal(info, 0x02, "datatype", self.readUnsignedInteger)
+        width = self.readModal(info, 0x40, "geometry-w", self.readUnsignedInteger)
+        if info & 0x80:
+            height = width
+            self.modal["geometry-h"] = height
+        else:
+            height = self.readModal(info, 0x20, "geometry-h", self.readUnsignedInteger)
+        (x, y) = self.readPosition(info, "geometry", 0x10, 0x08)
+        offsets = self.readOffsets(info, 0x04)
+        self.addBoundary(layer, dataType, [(x, y), (x + width, y), (x + width, y + height),
+                                           (x, y + height)], offsets)
+
+    def readPolygon(self):
+        info = self.readByte()
+        layer = self.readModal(info, 0x01, "layer", self.readUnsignedInteger)
+        dataType = self.readModal(info, 0x02, "datatype", self.readUnsignedInteger)
+        points = self.readModal(info, 0x20, "polygon-point-list",
+                                lambda: self.readPointList(polygon=True))
+        (x, y) = self.readPosition(info, "geometry", 0x10, 0x08)
+        offsets = self.readOffsets(info, 0x04)
+        self.addBoundary(layer, dataType, [(x + px, y + py) for (px, py) in points], offsets)
+
+    def readPath(self):
+        info = self.readByte()
+        layer = self.readModal(info, 0x01, "layer", self.readUnsignedInteger)
+        dataType = self.readModal(info, 0x02, "datatype", self.readUnsignedInteger)
+        halfWidth = self.readModal(info, 0x40, "path-halfwidth", self.readUnsignedInteger)
+        if info & 0x80:
+            scheme = self.readUnsignedInteger()
+            # The explicit start and end extensions are read but not kept
+            for shift in [2, 0]:
+                if (scheme >> shift) & 3 == 3:
+                    self.readSignedInteger()
+            self.modal["path-extension"] = scheme
+        scheme = self.modal.get("path-extension", 0)
+        points = self.readModal(info, 0x20, "path-point-list", self.readPointList)
+        (x, y) = self.readPosition(info, "geometry", 0x10, 0x08)
+        offsets = self.readOffsets(info, 0x04)
+        for (dx, dy) in offsets:
+            thisPath = GdsPath()
+            thisPath.drawingLayer = layer
+            thisPath.purposeLayer = 0
+            thisPath.dataType = dataType
+            thisPath.pathWidth = 2*halfWidth
+            # Extended by the half width (2) or flush ends
+            thisPath.pathType = 2 if scheme & 3 == 2 else 0
+            thisPath.coordinates = [(x + px + dx, y + py + dy) for (px, py) in points]
+            self.structure.paths += [thisPath]
+
+    def readCellReference(self, info):
+        if info & 0x40:
+            # A number, named at the end when its CELLNAME comes after
+            return self.readUnsignedInteger()
+        return self.layoutObject.padText(self.readString())
+
+    def readPlacement(self, recordType):
+        info = self.readByte()
+        name = self.readModal(info, 0x80, "placement-cell", lambda: self.readCellReference(info))
+        magnification = 1
+        angle = 90*((info >> 1) & 3)
+        if recordType == 18:
+            magnification = self.readReal() if info & 0x04 else 1
+            angle = self.readReal() if info & 0x02 else 0
+        (x, y) = self.readPosition(info, "placement", 0x20, 0x10)
+        offsets = self.readOffsets(info, 0x08)
+        for (dx, dy) in offsets:
+            thisSref = GdsSref()
+            thisSref.sName = name
+            thisSref.coordinates = (x + dx, y + dy)
+            thisSref.transFlags = [bool(info & 0x01), False, False]
+            if angle:
+                thisSref.rotateAngle = float(angle)
+            if magnification != 1:
+                thisSref.magFactor = float(magnification)
+            self.structure.srefs += [thisSref]
+
+    def readText(self):
+        info = self.readByte()
+        if info & 0x40:
+            if info & 0x20:
+                self.modal["text-string"] = self.textStrings[self.readUnsignedInteger()]
+            else:
+                self.modal["text-string"] = self.readString()
+        textString = self.modal["text-string"]
+        layer = self.readModal(info, 0x01, "textlayer", self.readUnsignedInteger)
+        textType = self.readModal(info, 0x02, "texttype", self.readUnsignedInteger)
+        (x, y) = self.readPosition(info, "text", 0x10, 0x08)
+        offsets = self.readOffsets(info, 0x04)
+        for (dx, dy) in offsets:
+            thisText = GdsText()
+            thisText.drawingLayer = layer
+            thisText.purposeLayer = textType
+            thisText.dataType = 0
+            thisText.transFlags = [False, False, False]
+            thisText.coordinates = [(x + dx, y + dy)]
+            thisText.textString = self.layoutObject.padText(textString)
+            self.structure.texts += [thisText]
+
+    def newStructure(self, name):
+        modDate = datetime.now()
+        date = (modDate.year, modDate.month, modDate.day,
+                modDate.hour, modDate.minute, modDate.second)
+        self.structure = GdsStructure()
+        self.structure.name = name
+        self.structure.createDate = date
+        self.structure.modDate = date
+        self.layoutObject.structures[self.layoutObject.padText(name)] = self.structure
+        # The positions start at 0 in every cell, the other modal variables are undefined
+        self.modal = dict((name, 0) for name in ["geometry-x", "geometry-y", "placement-x",
+                                                 "placement-y", "text-x", "text-y"])
+        self.xyRelative = False
+
+    def readOasis(self):
+        if not self.data.startswith(b"%SEMI-OASIS\r\n"):
+            print("There was an error parsing the OASIS header.  Aborting...")
+            return
+        self.index = len(b"%SEMI-OASIS\r\n")
+        # The cells and strings defined by reference numbers
+        names = {3 : self.cellNames, 5 : self.textStrings}
+        cells = []
+        while self.index < len(self.data):
+            recordType = self.readUnsignedInteger()
+            if recordType == 0:
+                continue
+            elif recordType == 1:
+                self.readString()
+                self.unit = self.readReal()
+                if self.readUnsignedInteger() == 0:
+                    for i in range(12):
+                        self.readUnsignedInteger()
+            elif recordType == 2:
+                break
+            elif recordType in [3, 4, 5, 6]:
+                table = names[3 if recordType in [3, 4] else 5]
+                value = self.readString()
+                number = self.readUnsignedInteger() if recordType in [4, 6] else len(table)
+                table[number] = value
+            elif recordType in [13, 14]:
+                if recordType == 13:
+                    cells.append(self.readUnsignedInteger())
+                    self.newStructure(str(cells[-1]))
+                else:
+                    self.newStructure(self.readString())
+            elif recordType in [15, 16]:
+                self.xyRelative = recordType == 16
+            elif recordType in [17, 18]:
+                self.readPlacement(recordType)
+            elif recordType == 19:
+                self.readText()
+            elif recordType == 20:
+                self.readRectangle()
+            elif recordType == 21:
+                self.readPolygon()
+            elif recordType == 22:
+                self.readPath()
+            elif recordType == 34:
+                self.readCompressedBlock()
+            else:
+                print("Unsupported OASIS record "+str(recordType)+".  Aborting...")
+                return
+        # The cells and placements by reference number take their names
+        for structure in self.layoutObject.structures.values():
+            for sref in structure.srefs:
+                if isinstance(sref.sName, int):
+                    sref.sName = self.layoutObject.padText(self.cellNames[sref.sName])
+        for number in cells:
+            structure = self.layoutObject.structures.pop(self.layoutObject.padText(str(number)))
+            structure.name = self.cellNames[number]
+            self.layoutObject.structures[self.layoutObject.padText(self.cellNames[number])] = structure
+        if self.debugToTerminal==1:
+            print("End of OASIS file.")
+
+    def readCompressedBlock(self):
+        """Replace a block compressed with DEFLATE by its records"""
+        self.readUnsignedInteger()
+        self.readUnsignedInteger()
+        size = self.readUnsignedInteger()
+        records = zlib.decompress(self.data[self.index:self.index+size], -15)
+        self.data = self.data[:self.index] + records + self.data[self.index+size:]
+
+    def loadFromFile(self, fileName):
+        fileHandle = compressed.open_input(fileName,"rb")
+        self.data = fileHandle.read()
+        fileHandle.close()
+        self.readOasis()
+        units = self.layoutObject.units
+        if getattr(self, "unit", None):
+            # The database unit in meters and its size in user units (microns)
+            units = (1.0/self.unit, 1e-6*(1.0/self.unit))
+        self.layoutObject.units = units
+        self.layoutObject.info["units"] = units
+        self.layoutObject.initialize()
@@ -0,0 +1,447 @@
+#!/usr/bin/env python
+import struct
+import compressed
+import collections
+from .gdsPrimitives import *
+
+# Record types
+PAD = 0
+START = 1
+END = 2
+CELLNAME = 3
+CELL_REFNUM = 13
+PLACEMENT = 17
+PLACEMENT_TRANSFORM = 18
+TEXT = 19
+RECTANGLE = 20
+POLYGON = 21
+PATH = 22
+
+# Point list of any angle, as g-deltas
+POINT_LIST_ALL_ANGLE = 4
+
+# The END record is padded to this length
+END_RECORD_LENGTH = 256
+
+# g-delta directions of the first form (octangular)
+directions = {(1, 0) : 0, (0, 1) : 1, (-1, 0) : 2, (0, -1) : 3,
+              (1, 1) : 4, (-1, 1) : 5, (-1, -1) : 6, (1, -1) : 7}
+
+
+def unsignedInteger(value):
+    """7 bits per byte, least significant first, the high bit continues"""
+    value = int(value)
+    data = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            data.append(byte | 0x80)
+        else:
+            data.append(byte)
+            return bytes(data)
+
+def signedInteger(value):
+    """The sign in the lowest bit of the magnitude"""
+    value = int(value)
+    return unsignedInteger((abs(value) << 1) | (1 if value < 0 else 0))
+
+def real(value):
+    """A positive or negative integer when it is one, a double otherwise"""
+    if value == int(value):
+        if value >= 0:
+            return unsignedInteger(0) + unsignedInteger(value)
+        return unsignedInteger(1) + unsignedInteger(-value)
+    return unsignedInteger(7) + struct.pack("<d", value)
+
+def string(value):
+    if isinstance(value, str):
+        value = value.encode()
+    return unsignedInteger(len(value)) + value
+
+def gDelta(dx, dy):
+    """A displacement: direction and magnitude when it is octangular,
+    x and y otherwise"""
+    dx = int(dx)
+    dy = int(dy)
+    if dx == 0 or dy == 0 or abs(dx) == abs(dy):
+        magnitude = max(abs(dx), abs(dy))
+        if magnitude:
+            direction = directions[(dx//magnitude, dy//magnitude)]
+            return unsignedInteger((magnitude << 4) | (direction << 1))
+    return unsignedInteger((abs(dx) << 2) | (2 if dx < 0 else 0) | 1) + signedInteger(dy)
+
+def pointList(points):
+    """The displacements from the first point to the next ones"""
+    data = unsignedInteger(POINT_LIST_ALL_ANGLE) + unsignedInteger(len(points) - 1)
+    for (a, b) in zip(points, points[1:]):
+        data += gDelta(b[0] - a[0], b[1] - a[1])
+    return data
+
+def arithmeticRuns(values):
+    """Sorted values cut into runs of the same step, as (first, count, step)"""
+    runs = []
+    i = 0
+    while i < len(values):
+        if i + 1 == len(values):
+            runs.append((values[i], 1, 0))
+            break
+        step = values[i+1] - values[i]
+        j = i + 1
+        while j + 1 < len(values) and values[j+1] - values[j] == step:
+            j += 1
+        runs.append((values[i], j - i + 1, step))
+        i = j + 1
+    return runs
+
+def repetitions(positions):
+    """Positions cut into regular arrays [(x, y, columns, rows, x space, y space)]:
+    runs of the same pitch along x in each row, then the identical runs
+    stacked at the same pitch along y. A position given twice is in two arrays."""
+    arrays = []
+    counts = collections.Counter(positions)
+    while counts:
+        arrays += uniqueRepetitions(counts)
+        counts = collections.Counter(dict((p, c - 1) for (p, c) in counts.items() if c > 1))
+    return arrays
+
+def uniqueRepetitions(positions):
+    rows = {}
+    for (x, y) in positions:
+        rows.setdefault(y, []).append(x)
+    runs = {}
+    for (y, xs) in rows.items():
+        for (x, count, step) in arithmeticRuns(sorted(xs)):
+            runs.setdefault((x, count, step), []).append(y)
+    arrays = []
+    for ((x, columns, xSpace), ys) in sorted(runs.items()):
+        for (y, rowCount, ySpace) in arithmeticRuns(sorted(ys)):
+            arrays.append((x, y, columns, rowCount, xSpace, ySpace))
+    return arrays
+
+def repetition(columns, rows, xSpace, ySpace):
+    """A uniform repetition of columns and rows"""
+    if columns > 1 and rows > 1:
+        return unsignedInteger(1) + unsignedInteger(columns - 2) + unsignedInteger(rows - 2) + \
+               unsignedInteger(xSpace) + unsignedInteger(ySpace)
+    if columns > 1:
+        return unsignedInteger(2) + unsignedInteger(columns - 2) + unsignedInteger(xSpace)
+    return unsignedInteger(3) + unsignedInteger(rows - 2) + unsignedInteger(ySpace)
+
+def stripName(name):
+    if isinstance(name, bytes):
+        name = name.decode()
+    return name.rstrip("\x00")
+
+def integer(value, default=0):
+    if type(value) == tuple:
+        # A layer given with its purpose
+        value = value[0]
+    if value == "" or value == None:
+        return default
+    return int(value)
+
+class OasisWriter:
+    """Class to take a populated layout class and write it to a file in OASIS format
+
+    The structures are written as cells with the same records as GDSII:
+    boundaries as rectangles or polygons, paths, placements of the srefs and
+    arefs and texts. The identical rectangles, polygons and placements of a
+    structure at regular positions (arrays of bitcells, columns) are written
+    once with a repetition, and the modal variables leave out the fields
+    that are the same as in the previous record (layer, datatype, size).
+    Paths of odd width or with round ends, that OASIS doesn't have, are
+    written as the rectangles of their segments. The magnification and
+    rotation of the texts are not kept."""
+
+    def __init__(self,layoutObject):
+        self.fileHandle = 0
+        self.layoutObject = layoutObject
+        self.cellNumbers = {}
+
+    def write(self, data):
+        self.fileHandle.write(data)
+
+    def resetModal(self):
+        """The positions start at 0 in every cell, the other modal variables are undefined"""
+        self.modal = dict((name, 0) for name in ["geometry-x", "geometry-y", "placement-x",
+                                                 "placement-y", "text-x", "text-y"])
+
+    def modalField(self, name, value, encoding):
+        """The bytes of a field and whether it is written, left out when it
+        is the modal value"""
+        if self.modal.get(name) == value:
+            return (b"", False)
+        self.modal[name] = value
+        return (encoding(value), True)
+
+    def dbPerMicron(self):
+        units = self.layoutObject.info.get("units", self.layoutObject.units)
+        return int(round(1e-6/units[1]))
+
+    def writeStart(self):
+        self.write(b"%SEMI-OASIS\r\n")
+        # Version, unit and the six (flag, offset) of the absent name tables
+        self.write(unsignedInteger(START) + string("1.0") + real(self.dbPerMicron()) +
+                   unsignedInteger(0) + unsignedInteger(0)*12)
+
+    def writeEnd(self):
+        length = END_RECORD_LENGTH - 2
+        padding = length - len(unsignedInteger(length))
+        padding = length - len(unsignedInteger(padding))
+        self.write(unsignedInteger(END) + string(b"\x00"*padding) + unsignedInteger(0))
+
+    def writeCellNames(self):
+        for (number, name) in enumerate(self.layoutObject.structures):
+            self.cellNumbers[stripName(name)] = number
+            self.write(unsignedInteger(CELLNAME) + string(stripName(name)))
+
+    def writeRectangle(self, layer, dataType, x, y, width, height, rep=None):
+        info = 0
+        data = b""
+        for (name, value, bit, encoding) in [("layer", layer, 0x01, unsignedInteger),
+                                             ("datatype", dataType, 0x02, unsignedInteger)]:
+            (field, written) = self.modalField(name, value, encoding)
+            if written:
+                info |= bit
+                data += field
+        if width == height:
+            # A square has its width only
+            info |= 0x80
+            (field, written) = self.modalField("geometry-w", width, unsignedInteger)
+            if written:
+                info |= 0x40
+                data += field
+            self.modal["geometry-h"] = height
+        else:
+            for (name, value, bit) in [("geometry-w", width, 0x40), ("geometry-h", height, 0x20)]:
+                (field, written) = self.modalField(name, value, unsignedInteger)
+                if written:
+                    info |= bit
+                    data += field
+        data += self.position("geometry", x, y, 0x10, 0x08)
+        info |= self.positionInfo
+        if rep:
+            data += rep
+            info |= 0x04
+        self.write(unsignedInteger(RECTANGLE) + bytes([info]) + data)
+
+    def position(self, prefix, x, y, xBit, yBit):
+        """The coordinates of a record, leaving out the modal ones"""
+        data = b""
+        self.positionInfo = 0
+        for (name, value, bit) in [(prefix + "-x", x, xBit), (prefix + "-y", y, yBit)]:
+            (field, written) = self.modalField(name, value, signedInteger)
+            if written:
+                self.positionInfo |= bit
+                data += field
+        return data
+
+    def writePolygon(self, layer, dataType, points, rep=None):
+        info = 0
+        data = b""
+        for (name, value, bit, encoding) in [("layer", layer, 0x01, unsignedInteger),
+                                             ("datatype", dataType, 0x02, unsignedInteger)]:
+            (field, written) = self.modalField(name, value, encoding)
+            if written:
+                info |= bit
+                data += field
+        # The points relative to the first one, the polygon is closed implicitly
+        relative = tuple((p[0] - points[0][0], p[1] - points[0][1]) for p in points)
+        (field, written) = self.modalField("polygon-point-list", relative, pointList)
+        if written:
+            info |= 0x20
+            data += field
+        data += self.position("geometry", points[0][0], points[0][1], 0x10, 0x08)
+        info |= self.positionInfo
+        if rep:
+            data += rep
+            info |= 0x04
+        self.write(unsignedInteger(POLYGON) + bytes([info]) + data)
+
+    def writePath(self, thisPath):
+        layer = integer(thisPath.drawingLayer)
+        dataType = integer(thisPath.dataType)
+        width = integer(thisPath.pathWidth)
+        pathType = integer(thisPath.pathType)
+        points = [(int(round(x)), int(round(y))) for (x, y) in thisPath.coordinates]
+        if width % 2 or pathType not in [0, 2]:
+            for rect in self.pathRectangles(points, width, pathType):
+                self.writeRectangle(layer, dataType, rect[0], rect[1],
+                                    rect[2] - rect[0], rect[3] - rect[1])
+            return
+        info = 0
+        data = b""
+        for (name, value, bit, encoding) in [("layer", layer, 0x01, unsignedInteger),
+                                             ("datatype", dataType, 0x02, unsignedInteger),
+                                             ("path-halfwidth", width//2, 0x40, unsignedInteger)]:
+            (field, written) = self.modalField(name, value, encoding)
+            if written:
+                info |= bit
+                data += field
+        # Both ends flush (1) or extended by the half width (2)
+        scheme = 2 if pathType == 2 else 1
+        (field, written) = self.modalField("path-extension", (scheme << 2) | scheme,
+                                           unsignedInteger)
+        if written:
+            info |= 0x80
+            data += field
+        relative = tuple((p[0] - points[0][0], p[1] - points[0][1]) for p in points)
+        (field, written) = self.modalField("path-point-list", relative, pointList)
+        if written:
+            info |= 0x20
+            data += field
+        data += self.position("geometry", points[0][0], points[0][1], 0x10, 0x08)
+        info |= self.positionInfo
+        self.write(unsignedInteger(PATH) + bytes([info]) + data)
+
+    def pathRectangles(self, points, width, pathType):
+        """The rectangles of the manhattan segments of a path"""
+        half = width//2
+        extend = half if pathType else 0
+        rects = []
+        for (a, b) in zip(points, points[1:]):
+            if a[1] == b[1]:
+                rects.append((min(a[0], b[0]) - extend, a[1] - half,
+                              max(a[0], b[0]) + extend, a[1] - half + width))
+            else:
+                rects.append((a[0] - half, min(a[1], b[1]) - extend,
+                              a[0] - half + width, max(a[1], b[1]) + extend))
+        return rects
+
+    def writePlacement(self, name, x, y, mirror, angle, magnification, rep=None):
+        info = 0
+        data = b""
+        (field, written) = self.modalField("placement-cell", name,
+                                           lambda n: unsignedInteger(self.cellNumbers[n]))
+        if written:
+            # Explicit cell by reference number
+            info |= 0xc0
+            data += field
+        positionData = self.position("placement", x, y, 0x20, 0x10)
+        info |= self.positionInfo
+        if mirror:
+            info |= 0x01
+        recordType = PLACEMENT
+        if angle % 90 == 0 and magnification == 1:
+            info |= ((int(angle)//90) % 4) << 1
+        else:
+            recordType = PLACEMENT_TRANSFORM
+            info |= 0x04 | 0x02
+            data += real(magnification) + real(angle)
+        data += positionData
+        if rep:
+            data += rep
+            info |= 0x08
+        self.write(unsignedInteger(recordType) + bytes([info]) + data)
+
+    def writeText(self, thisText):
+        info = 0
+        data = b""
+        (field, written) = self.modalField("text-string", stripName(thisText.textString), string)
+        if written:
+            info |= 0x40
+            data += field
+        for (name, value, bit) in [("textlayer", integer(thisText.drawingLayer), 0x01),
+                                   ("texttype", integer(thisText.purposeLayer), 0x02)]:
+            (field, written) = self.modalField(name, value, unsignedInteger)
+            if written:
+                info |= bit
+                data += field
+        (x, y) = thisText.coordinates[0]
+        data += self.position("text", int(round(x)), int(round(y)), 0x10, 0x08)
+        info |= self.positionInfo
+        self.write(unsignedInteger(TEXT) + bytes([info]) + data)
+
+    def boundaryShape(self, thisBoundary):
+        """("rect", (x, y, width, height)) of a rectangle, ("polygon", points) otherwise"""
+        points = [(int(round(x)), int(round(y))) for (x, y) in thisBoundary.coordinates]
+        if len(points) > 1 and points[0] == points[-1]:
+            points = points[:-1]
+        xs = sorted(set(p[0] for p in points))
+        ys = sorted(set(p[1] for p in points))
+        if len(points) == 4 and len(xs) == 2 and len(ys) == 2 and \
+           all(points[i][0] == points[(i+1) % 4][0] or points[i][1] == points[(i+1) % 4][1]
+               for i in range(4)):
+            return ("rect", (xs[0], ys[0], xs[1] - xs[0], ys[1] - ys[0]))
+        return ("polygon", tuple(points))
+
+    def writeArrays(self, shapes, writeOne):
+        """Write the shapes of the same kind by groups of regular positions"""
+        for (key, positions) in shapes.items():
+            for (x, y, columns, rows, xSpace, ySpace) in repetitions(positions):
+                rep = None
+                if columns > 1 or rows > 1:
+                    rep = repetition(columns, rows, xSpace, ySpace)
+                writeOne(key, x, y, rep)
+
+    def writeNextStructure(self, structureName):
+        thisStructure = self.layoutObject.structures[structureName]
+        self.resetModal()
+        self.write(unsignedInteger(CELL_REFNUM) +
+                   unsignedInteger(self.cellNumbers[stripName(structureName)]))
+
+        # The identical shapes by their positions
+        rectangles = {}
+        polygons = {}
+        for boundary in thisStructure.boundaries:
+            layer = integer(boundary.drawingLayer)
+            dataType = integer(boundary.dataType)
+            (kind, shape) = self.boundaryShape(boundary)
+            if kind == "rect":
+                (x, y, width, height) = shape
+                rectangles.setdefault((layer, dataType, width, height), []).append((x, y))
+            else:
+                relative = tuple((p[0] - shape[0][0], p[1] - shape[0][1]) for p in shape)
+                polygons.setdefault((layer, dataType, relative), []).append(shape[0])
+        self.writeArrays(rectangles, lambda key, x, y, rep:
+                         self.writeRectangle(key[0], key[1], x, y, key[2], key[3], rep))
+        self.writeArrays(polygons, lambda key, x, y, rep:
+                         self.writePolygon(key[0], key[1],
+                                           [(x + dx, y + dy) for (dx, dy) in key[2]], rep))
+        for path in thisStructure.paths:
+            self.writePath(path)
+
+        placements = {}
+        for sref in thisStructure.srefs:
+            (x, y) = sref.coordinates
+            key = (stripName(sref.sName), bool(sref.transFlags[0]),
+                   float(sref.rotateAngle or 0) % 360, float(sref.magFactor or 1))
+            placements.setdefault(key, []).append((int(round(x)), int(round(y))))
+        self.writeArrays(placements, lambda key, x, y, rep:
+                         self.writePlacement(key[0], x, y, key[1], key[2], key[3], rep))
+        for aref in thisStructure.arefs:
+            self.writeAref(aref)
+        for text in thisStructure.texts:
+            self.writeText(text)
+
+    def writeAref(self, thisAref):
+        """An array reference as a placement with a repetition of its
+        column and row displacements"""
+        columns = integer(thisAref.columns, 1)
+        rows = integer(thisAref.rows, 1)
+        (origin, columnEnd, rowEnd) = [(int(round(x)), int(round(y))) for (x, y) in thisAref.coordinates]
+        columnStep = ((columnEnd[0] - origin[0])//columns, (columnEnd[1] - origin[1])//columns)
+        rowStep = ((rowEnd[0] - origin[0])//rows, (rowEnd[1] - origin[1])//rows)
+        rep = unsignedInteger(8) + unsignedInteger(max(columns, 2) - 2) + \
+              unsignedInteger(max(rows, 2) - 2) + gDelta(*columnStep) + gDelta(*rowStep)
+        if columns < 2 or rows < 2:
+            # One column or one row: a vector of displacements
+            (count, step) = (rows, rowStep) if columns < 2 else (columns, columnStep)
+            rep = unsignedInteger(9) + unsignedInteger(max(count, 2) - 2) + gDelta(*step)
+            if count < 2:
+                rep = None
+        self.writePlacement(stripName(thisAref.aName), origin[0], origin[1],
+                            bool(thisAref.transFlags[0]), float(thisAref.rotateAngle or 0) % 360,
+                            float(thisAref.magFactor or 1), rep)
+
+    def writeOasis(self):
+        self.writeStart()
+        self.writeCellNames()
+        for structureName in self.layoutObject.structures:
+            self.writeNextStructure(structureName)
+        self.writeEnd()
+
+    def writeToFile(self,fileName):
+        with compressed.open_output(fileName,"wb") as self.fileHandle:
+            self.writeOasis()
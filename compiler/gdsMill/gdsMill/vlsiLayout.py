@@ -1,6 +1,5 @@
 from .gdsPrimitives import *
 from datetime import *
-import numpy as np
 import math
 from . import gdsPrimitives
 import debug
@@ -184,6 +183,8 @@ class VlsiLayout:
 
     def traverseTheHierarchy(self, startingStructureName=None, delegateFunction=None, 
                              transformPath=[], rotateAngle=0, transFlags=(0, 0, 0), coordinates=(0, 0)):
+        # numpy is only needed to traverse (not to read or write) a layout
+        import numpy as np
         #since this is a recursive function, must deal with the default
         #parameters explicitly        
         if startingStructureName == None:
@@ -243,6 +244,7 @@ class VlsiLayout:
         self.populateCoordinateMap()    
     
     def populateCoordinateMap(self):
+        import numpy as np
         def addToXyTree(startingStructureName = None,transformPath = None):
         #print"populateCoordinateMap"            
             uVector = np.array([[1.0],[0.0],[0.0]])  #start with normal basis vectors
@@ -0,0 +1,88 @@
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA. (See LICENSE for licensing information)
+
+
+""" Build the SRAM (and BIST) selected by the options and save all the
+output files. This is the body of AMC.py and it is shared with the compiler
+daemon (AMC_daemon.py) which runs it once per compile job. """
+
+import debug
+import profiler
+from globals import OPTS
+
+
+def build(kind="sram", **params):
+    """ Build one top-level design: "sram", "sync_sram", "power_gate_sram" or
+        "bist". Parameters that are not given come from OPTS. """
+
+    def default(*names):
+        for name in names:
+            if name not in params:
+                params[name] = getattr(OPTS, name)
+
+    if kind == "bist":
+        import bist
+        if "data_size" not in params:
+            params["data_size"] = OPTS.word_size
+        if "delay" not in params:
+            params["delay"] = OPTS.bist_delay
+        return bist.bist(**params)
+
+    default("word_size", "words_per_row", "num_rows", "num_subanks", 
+            "branch_factors", "bank_orientations", "name")
+    if kind == "sync_sram":
+        import sync_sram
+        return sync_sram.sync_sram(**params)
+
+    default("mask")
+    if kind == "power_gate_sram":
+        import power_gate_sram
+        return power_gate_sram.power_gate_sram(**params)
+    if kind == "sram":
+        import sram
+        default("power_gate")
+        return sram.sram(**params)
+
+    debug.error("Unknown design {0}, use sram, sync_sram, power_gate_sram or bist.".format(kind), -1)
+
+
+def generate():
+    """ Generate the SRAM (and the optional BIST) described by OPTS and
+        save their outputs. Returns the list of the generated designs. """
+
+    if OPTS.profile:
+        profiler.start()
+
+    if OPTS.add_sync_interface:
+        s = build("sync_sram")
+    else:
+        s = build("sram")
+    with profiler.section("save_output"):
+        s.save_output()
+    designs = [s]
+
+    if OPTS.create_bist:
+        # The BIST of the synchronous SRAM has no ring oscillator
+        b = build("bist", addr_size=s.addr_size, 
+                  delay=0 if OPTS.add_sync_interface else OPTS.bist_delay,
+                  async_bist=not OPTS.add_sync_interface)
+        with profiler.section("save_output"):
+            b.save_output()
+        designs.append(b)
+
+    if OPTS.profile:
+        profiler.stop().write(OPTS.output_path + s.name)
+
+    return designs
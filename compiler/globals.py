@@ -55,7 +55,28 @@ def parse_args():
                              help="Perform characterization to calculate delays"),
         optparse.make_option("-d", "--dontpurge", 
                              action="store_false", dest="purge_temp",
-                             help="Don't purge the contents of the temp directory after a successful run")
+                             help="Don't purge the contents of the temp directory after a successful run"),
+        optparse.make_option("-j", "--jobs", 
+                             type="int", dest="daemon_jobs",
+                             help="Number of concurrent compile jobs in the compiler daemon"),
+        optparse.make_option("--socket", 
+                             dest="daemon_socket", metavar="FILE",
+                             help="Unix domain socket of the compiler daemon"),
+        optparse.make_option("--profile", 
+                             action="store_true", dest="profile",
+                             help="Profile the construction of the modules (<output>.profile.json/.folded)"),
+        optparse.make_option("--layout", 
+                             dest="layout_format", choices=["gds", "oasis", "both"],
+                             help="Layout output format: gds, oasis or both"),
+        optparse.make_option("--compress", 
+                             dest="output_compression", choices=["gz", "zst"],
+                             help="Compress the spice, layout and LEF outputs (gz or zst)"),
+        optparse.make_option("--merge_masters", 
+                             action="store_true", dest="merge_masters",
+                             help="Merge the identical masters before the output"),
+        optparse.make_option("--verilog", 
+                             dest="verilog_model", choices=["dense", "sparse"],
+                             help="Behavioral Verilog model: dense or sparse (for large memories)")
         # -h --help is implicit.
     }
 
@@ -167,7 +188,16 @@ def read_config(config_file, is_unit_test=True):
     except:
         debug.error("Unable to read configuration file: {0}".format(config_file),2)
 
-    for k,v in list(config.__dict__.items()):
+    apply_config(config.__dict__, is_unit_test)
+
+
+def apply_config(config, is_unit_test=True):
+    """ Apply a dictionary of configuration options (the contents of a config
+    file) on top of the options that were given on the command line. """
+    
+    global OPTS
+    
+    for k,v in list(config.items()):
         # The command line will over-ride the config file
         # except in the case of the tech name! This is because the tech name
         # is sometimes used to specify the config file itself (e.g. unit tests)
@@ -295,10 +325,18 @@ def import_tech():
         debug.error("Nonexistent technology_setup_file: {0}.py".format(filename))
         sys.exit(1)
 
+    set_tech_defaults()
+
+
+def set_tech_defaults():
+    """ Set the default options that are based on the technology. """
+    
+    global OPTS
+    
     import tech
     # Set some default options now based on the technology...
     if (OPTS.process_corners == ""):
-        OPTS.process_corners = list(tech.spice["fet_models"].keys())
+        OPTS.process_corners = list(tech.spice.get("fet_models", {"TT": None}).keys())
     if (OPTS.supply_voltages == ""):
         OPTS.supply_voltages = tech.spice["supply_voltages"]
     if (OPTS.temperatures == ""):
@@ -21,8 +21,9 @@ class bitcell(design.design):
     the layout and netlist should be available in the technology library.
     """
     pin_names = ["bl", "br", "wl", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("cell_6t", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "cell_6t", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("cell_6t", pin_names)
+    # Pins that can be swapped without changing the circuit (the cell is symmetric)
+    equivalent_pins = [("bl", "br")]
     
 
     def __init__(self):
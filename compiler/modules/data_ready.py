@@ -33,8 +33,7 @@ from tech import GDS,layer
 class data_ready(design.design):
 
     pin_names = ["bl", "br", "sen", "dr", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("data_ready", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "data_ready", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("data_ready", pin_names)
     
 
     def __init__(self):
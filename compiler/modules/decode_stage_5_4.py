@@ -34,8 +34,7 @@ class decode_stage_5_4(design.design):
     """
 
     pin_names = ["in0", "in1", "in2", "in3", "in4", "out0", "out1", "out2", "out3", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("decode_stage_5_4", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "decode_stage_5_4", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("decode_stage_5_4", pin_names)
     
 
     def __init__(self):
@@ -31,8 +31,7 @@ from tech import GDS,layer
 
 class endcell1(design.design):
     pin_names = ["gnds", "vdds", "nmost", "bl", "pmost"]
-    (width,height) = utils.get_libcell_size("sp28_0152_SW_strap_logic", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "sp28_0152_SW_strap_logic", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("sp28_0152_SW_strap_logic", pin_names)
     def __init__(self):
         design.design.__init__(self, "sp28_0152_SW_strap_logic")
         debug.info(2, "Create sp28_0152_SW_strap_logic")
@@ -42,8 +41,7 @@ class endcell1(design.design):
 
 class endcell2(design.design):
     pin_names = ["in", "vdds", "gnds", "nmost"]
-    (width,height) = utils.get_libcell_size("sp28_0152_SW_strap_logic_endcell_flip", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "sp28_0152_SW_strap_logic_endcell_flip", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("sp28_0152_SW_strap_logic_endcell_flip", pin_names)
     def __init__(self):
         design.design.__init__(self, "sp28_0152_SW_strap_logic_endcell_flip")
         debug.info(2, "Create sp28_0152_SW_strap_logic_endcell_flip")
@@ -53,8 +51,7 @@ class endcell2(design.design):
 
 class endcell3(design.design):
     pin_names = ["wl", "bld", "gnd"]
-    (width,height) = utils.get_libcell_size("sp28_0152_SW_wl_endcell", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "sp28_0152_SW_wl_endcell", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("sp28_0152_SW_wl_endcell", pin_names)
     def __init__(self):
         design.design.__init__(self, "sp28_0152_SW_wl_endcell")
         debug.info(2, "Create sp28_0152_SW_wl_endcell")
@@ -64,8 +61,7 @@ class endcell3(design.design):
 
 class endcell4(design.design):
     pin_names = ["wl", "pd", "bld", "gnd"]
-    (width,height) = utils.get_libcell_size("sp28_0152_SW_wl_endcell_prog", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "sp28_0152_SW_wl_endcell_prog", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("sp28_0152_SW_wl_endcell_prog", pin_names)
     def __init__(self):
         design.design.__init__(self, "sp28_0152_SW_wl_endcell_prog")
         debug.info(2, "Create sp28_0152_SW_wl_endcell_prog")
@@ -76,8 +72,7 @@ class endcell4(design.design):
 
 class endcell5(design.design):
     pin_names = ["in", "vdds", "gnds", "nmost"]
-    (width,height) = utils.get_libcell_size("sp28_0152_SW_corner_endcell_flip", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "sp28_0152_SW_corner_endcell_flip", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("sp28_0152_SW_corner_endcell_flip", pin_names)
     def __init__(self):
         design.design.__init__(self, "sp28_0152_SW_corner_endcell_flip")
         debug.info(2, "Create sp28_0152_SW_corner_endcell_flip")
@@ -87,8 +82,7 @@ class endcell5(design.design):
 
 class endcell6(design.design):
     pin_names = ["gnds", "vdds", "nmost", "bl", "pmost"]
-    (width,height) = utils.get_libcell_size("sp28_0152_SW_bl_endcell", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "sp28_0152_SW_bl_endcell", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("sp28_0152_SW_bl_endcell", pin_names)
     def __init__(self):
         design.design.__init__(self, "sp28_0152_SW_bl_endcell")
         debug.info(2, "Create sp28_0152_SW_bl_endcell")
@@ -34,8 +34,7 @@ class merge(design.design):
     """
 
     pin_names = ["D", "Q", "en1_M", "en2_M", "reset", "M", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("merge", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "merge", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("merge", pin_names)
 
     def __init__(self):
         design.design.__init__(self, "merge")
@@ -33,8 +33,7 @@ class nand2(design.design):
     """
 
     pin_names = ["A", "B", "Z", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("nand2", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "nand2", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("nand2", pin_names)
     
 
     def __init__(self):
@@ -33,8 +33,7 @@ class nand3(design.design):
     """
 
     pin_names = ["A", "B", "C", "Z", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("nand3", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "nand3", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("nand3", pin_names)
     
 
     def __init__(self):
@@ -33,8 +33,7 @@ class nor2(design.design):
     """
 
     pin_names = ["A", "B", "Z", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("nor2", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "nor2", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("nor2", pin_names)
     
 
     def __init__(self):
@@ -33,8 +33,7 @@ class nor3(design.design):
     """
 
     pin_names = ["A", "B", "C", "Z", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("nor3", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "nor3", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("nor3", pin_names)
     
 
     def __init__(self):
@@ -25,8 +25,10 @@ class pinv(design.design):
        (relative to minimum NMOS) and a beta value for choosing the pmos size. The inverter's cell
         height is the same as the nand3 (nand2, nor2, nor3) cell. """
     
-    def __init__(self, size=1, beta=parameter["beta"], height=nand3.height):
+    def __init__(self, size=1, beta=parameter["beta"], height=None):
         
+        if height == None:
+            height = nand3.height
         name = "pinv_{}".format(size)
         design.design.__init__(self, name)
         debug.info(2, "create inverter with size of {0}".format(size))
@@ -32,8 +32,7 @@ from tech import GDS,layer
 class power_gate_cell(design.design):
 
     pin_names = ["sleep", "vvdd", "vdd"]
-    (width,height) = utils.get_libcell_size("power_gate_cell", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "power_gate_cell", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("power_gate_cell", pin_names)
 
     def __init__(self):
         design.design.__init__(self, "power_gate_cell")
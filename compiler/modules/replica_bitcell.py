@@ -25,8 +25,7 @@ class replica_bitcell(design.design):
     """
 
     pin_names = ["bl", "br", "wl", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("replica_cell_6t", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "replica_cell_6t", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("replica_cell_6t", pin_names)
 
     def __init__(self):
         design.design.__init__(self, "replica_cell_6t")
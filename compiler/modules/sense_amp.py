@@ -23,8 +23,7 @@ class sense_amp(design.design):
     """
 
     pin_names = ["bl", "br", "dout", "dout_bar", "dout1", "en", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("sense_amp", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "sense_amp", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("sense_amp", pin_names)
 
     def __init__(self):
         design.design.__init__(self, "sense_amp")
@@ -33,8 +33,7 @@ class single_driver(design.design):
     """
 
     pin_names = ["in0", "in1", "in2", "in3", "out0", "out1", "out2", "out3", "en", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("single_driver", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "single_driver", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("single_driver", pin_names)
     
 
     def __init__(self):
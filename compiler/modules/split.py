@@ -35,8 +35,7 @@ class split(design.design):
     """
 
     pin_names = ["D", "Q", "en1_S", "en2_S", "reset", "S", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("split", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "split", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("split", pin_names)
 
     def __init__(self):
         design.design.__init__(self, "split")
@@ -55,8 +54,7 @@ class split2(design.design):
     """
 
     pin_names = ["D", "Q", "bm_in", "bm_out", "en1_S", "en2_S", "reset", "S", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("split2", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "split2", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("split2", pin_names)
 
     def __init__(self):
         design.design.__init__(self, "split2")
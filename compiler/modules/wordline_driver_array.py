@@ -65,8 +65,12 @@ class wordline_driver_array(design.design):
             if i%2:
                 mirror = "MX"
                 y_offset = y_offset + self.wordline_driver.height
-                pin_list=["in[{0}]".format(4*i+3), "in[{0}]".format(4*i+2),
-                          "in[{0}]".format(4*i+1), "in[{0}]".format(4*i),
+                # The decoder has decode[4*i] on the top row of the odd groups
+                # and the bank routes it straight to in[4*i], which lands on in0
+                # of the flipped cell: its top row, driving out[4*i+3]. So the
+                # address 4*i+j selects the row 4*i+3-j here (see trim_spice).
+                pin_list=["in[{0}]".format(4*i), "in[{0}]".format(4*i+1),
+                          "in[{0}]".format(4*i+2), "in[{0}]".format(4*i+3),
                           "out[{0}]".format(4*i+3), "out[{0}]".format(4*i+2),
                           "out[{0}]".format(4*i+1),"out[{0}]".format(4*i),
                           "en", "vdd", "gnd"]
@@ -34,8 +34,9 @@ class write_complete(design.design):
     """
 
     pin_names = ["bl", "br", "en", "bm", "write_complete", "vdd", "gnd"]
-    (width,height) = utils.get_libcell_size("write_complete", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "write_complete", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("write_complete", pin_names)
+    # Pins that can be swapped without changing the circuit
+    equivalent_pins = [("bl", "br")]
 
     def __init__(self):
         design.design.__init__(self, "write_complete")
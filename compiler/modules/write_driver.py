@@ -24,8 +24,7 @@ class write_driver(design.design):
     """
 
     pin_names = ["din", "bm", "bl", "br", "en", "pchg", "gnd", "vdd"]
-    (width,height) = utils.get_libcell_size("write_driver", GDS["unit"], layer["boundary"])
-    pin_map = utils.get_libcell_pins(pin_names, "write_driver", GDS["unit"])
+    (width, height, pin_map) = utils.lazy_libcell("write_driver", pin_names)
 
     def __init__(self):
         design.design.__init__(self, "write_driver")
@@ -30,7 +30,8 @@ class options(optparse.Values):
     # This determines whether  LVS and DRC is checked for each submodule.
     check_lvsdrc = True
     
-    # Variable to select the variant of spice
+    # Variable to select the variant of spice: "finesim" (co-simulation with VCS),
+    # or "ngspice" or "Xyce" (SPICE only, see characterizer/spice_test.py)
     spice_name = "finesim"
     
     # Should we print out the banner at startup
@@ -54,12 +55,93 @@ class options(optparse.Values):
     # Define the output file base name
     output_name = ""
     
+    # Format of the layout output: "gds", "oasis" or "both"
+    layout_format = "gds"
+    
+    # Compression of the spice, layout and LEF outputs: "", "gz" or "zst"
+    output_compression = ""
+    
+    # Merge the identical masters (same shapes, references and subckt) before the output
+    merge_masters = False
+    
+    # Behavioral Verilog model: "dense" or "sparse" (only the written words are
+    # stored, reset by generation, logging with AMC_LOG, characterized delays)
+    verilog_model = "dense"
+    
     # Purge the temp directory after a successful run (doesn't purge on errors, anyhow)
     purge_temp = True
     
     #run the charactrizer
     characterize = False
     
+    # Number of characterization simulations that run at the same time
+    char_jobs = os.cpu_count() or 1
+    
+    # Write 7x7 tables, simulating only the points the interpolation needs
+    adaptive_lut = True
+    
+    # Largest estimated relative error of the interpolated table values
+    lut_tolerance = 0.02
+    
+    # Simulate all the slew/load points of a corner in one deck (with .alter)
+    char_batch = False
+    
+    # Seconds after which a characterization simulation is killed
+    char_timeout = 3600
+    
+    # Persistent store of the characterization results ("" to always simulate)
+    char_cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "AMC", "char")
+    
+    # "spice" simulates the tables, "analytical" estimates them from the netlist
+    char_backend = "spice"
+    
+    # Fit the analytical estimates of the technology to the simulated tables
+    char_calibrate = False
+    
+    # Number of DRC/LVS/PEX runs at the same time
+    verify_jobs = os.cpu_count() or 1
+    
+    # Seconds after which a DRC/LVS/PEX run is killed
+    verify_timeout = 3600
+    
+    # Persistent store of the DRC/LVS results ("" to always check)
+    verify_cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "AMC", "verify")
+    
+    # Verify every master once, with the verified masters black boxed in their parents
+    hierarchical_verify = False
+    
+    # Verify only the structures that changed since the last run (see incremental_verify)
+    incremental_verify = False
+    
+    # Microns around a change where it interacts with its parent (0 for the largest spacing rule)
+    verify_halo = 0
+    
+    # PVT corners for characterization, derived from the technology if not given
+    process_corners = ""
+    supply_voltages = ""
+    temperatures = ""
+    
 
     #Add the synchronous interface
     add_sync_interface = False
+    
+    # Add the bit-mask (write mask) inputs
+    mask = False
+    
+    # Add the power gating (sleep) input
+    power_gate = False
+    
+    # Create the BIST module next to the SRAM
+    create_bist = False
+    
+    # SRAM access time (ns) for the asynchronous BIST only
+    bist_delay = 0
+    
+    # Profile the construction of the modules (time, shapes, memory per class)
+    profile = False
+    
+    # Unix domain socket of the compiler daemon (AMC_daemon.py/AMC_client.py)
+    daemon_socket = "/tmp/AMC_{0}.sock".format(getpass.getuser())
+    
+    # Number of compile jobs the daemon runs concurrently in worker processes
+    daemon_jobs = os.cpu_count() or 1
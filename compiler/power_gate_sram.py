@@ -26,6 +26,7 @@ import getpass
 from globals import OPTS, print_time
 import design
 import debug
+import compressed
 import utils
 import contact
 from vector import vector
@@ -34,7 +35,7 @@ from tech import GDS,layer, drc
 from nor2 import nor2
 from pinv import pinv
 from delay_chain import delay_chain
-from sram import sram
+from sram import sram, save_output
 from power_gate_cell import power_gate_cell
 from utils import ceil as util_ceil
 
@@ -638,7 +639,7 @@ class power_gate_sram(design.design):
 
     def sp_write(self, sp_name):
         """ Write the entire spice of the object to the file """
-        sp = open(sp_name, 'w')
+        sp = compressed.open_output(sp_name)
 
         sp.write("**************************************************\n")
         sp.write("* AMC generated memory\n")
@@ -655,52 +656,4 @@ class power_gate_sram(design.design):
     def save_output(self):
         """ Save all the output files while reporting time to do it as well. """
 
-        # Save the standar spice file
-        start_time = datetime.datetime.now()
-        spname = OPTS.output_path + self.name + ".sp"
-        print("\n SRAM SPICE: Writing to {0}".format(spname))
-        self.sp_write(spname)
-        print_time("SRAM Spice writing", datetime.datetime.now(), start_time)
-
-        # Save the extracted spice file if requested
-        if OPTS.use_pex:
-            start_time = datetime.datetime.now()
-            sp_file = OPTS.output_path + "temp_pex.sp"
-            calibre.run_pex(self.name, gdsname, spname, output=sp_file)
-            print_time("SRAM Extraction", datetime.datetime.now(), start_time)
-        else:
-            # Use generated spice file for characterization
-            sp_file = spname
-        
-        # Write the layout
-        start_time = datetime.datetime.now()
-        gdsname = OPTS.output_path + self.name + ".gds"
-        print("\n SRAM GDS: Writing to {0}".format(gdsname))
-        self.gds_write(gdsname)
-        print_time("SRAM GDS writing", datetime.datetime.now(), start_time)
-
-        # Create a LEF physical model
-        start_time = datetime.datetime.now()
-        lefname = OPTS.output_path + self.name + ".lef"
-        print("\n SRAM LEF: Writing to {0}".format(lefname))
-        self.lef_write(lefname)
-        print_time("SRAM LEF writing", datetime.datetime.now(), start_time)
-
-        # Write a verilog model
-        start_time = datetime.datetime.now()
-        vname = OPTS.output_path + self.name + ".v"
-        print("\n SRAM Verilog: Writing to {0}".format(vname))
-        self.verilog_write(vname)
-        print_time("SRAM Verilog writing", datetime.datetime.now(), start_time)
-        
-        # Characterize the design
-        if OPTS.characterize:
-            start_time = datetime.datetime.now()        
-            from characterizer import lib
-            print("\n LIB: Characterizing... ")
-            if OPTS.spice_name!="":
-                print("Performing simulation-based characterization with {}".format(OPTS.spice_name))
-            if OPTS.trim_netlist:
-                print("Trimming netlist to speed up characterization.")
-            lib.lib(out_dir=OPTS.output_path, sram=self)
-            print_time("Characterization", datetime.datetime.now(), start_time)
+        save_output(self, "SRAM ")
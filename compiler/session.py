@@ -0,0 +1,221 @@
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA. (See LICENSE for licensing information)
+
+
+""" Python API to compile any number of macros in one process.
+
+    import session
+    with session.session("myconfig.py", check_lvsdrc=False) as s:
+        r1 = s.compile("sram", word_size=8, num_rows=32, name="sram8x32")
+        (r2, r3) = s.compile_many([("sram", {"word_size": 16, "name": "sram16"}),
+                                   ("sync_sram", {"name": "sync_sram16"})], jobs=2)
+        print(r1["area"], r1["paths"]["gds"])
+
+A session owns the options it was created with, its own temp directory,
+the output names it has used and a cache of the results it compiled. The
+compiler modules read the global OPTS, so a session installs its options
+in OPTS only while it compiles and restores the previous ones afterwards;
+sessions can be mixed with each other and with the command line flow.
+Concurrent compiles run in worker processes forked from the session.
+"""
+
+import os
+import glob
+import datetime
+import tempfile
+import contextlib
+import multiprocessing
+import concurrent.futures
+import debug
+import globals
+import options
+from globals import OPTS
+
+
+class session():
+    """ A compile session with its own options, temp directory and results. """
+
+    def __init__(self, config_file=None, **opts):
+        """ The keyword options override the config file, as on the command line """
+
+        globals.check_versions()
+        # Output names used in this session: name -> key of the compile
+        self.names = {}
+        # Results of the compiles: key -> result
+        self.results = {}
+
+        # The temp directory of the session is made in the usual temp directory
+        base_temp = opts.pop("AMC_temp", options.options.AMC_temp)
+        os.makedirs(base_temp, 0o750, exist_ok=True)
+        self.options = dict(opts)
+        self.options["AMC_temp"] = tempfile.mkdtemp(prefix="session_", dir=base_temp) + "/"
+
+        with self.activate():
+            globals.setup_paths()
+            if config_file:
+                globals.read_config(config_file, is_unit_test=False)
+            else:
+                globals.apply_config({}, is_unit_test=False)
+            globals.import_tech()
+            self.check_tech()
+            self.options = dict(OPTS.__dict__)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """ Remove the temp directory of the session """
+
+        with self.activate():
+            globals.end_AMC()
+
+    @contextlib.contextmanager
+    def activate(self, **opts):
+        """ Install the options of the session (and extra ones) in OPTS """
+
+        saved = dict(OPTS.__dict__)
+        OPTS.__dict__.clear()
+        OPTS.__dict__.update(self.options)
+        OPTS.__dict__.update(opts)
+        try:
+            yield OPTS
+        finally:
+            OPTS.__dict__.clear()
+            OPTS.__dict__.update(saved)
+
+    def check_tech(self):
+        """ The technology modules are imported once per process """
+
+        import tech
+        if not os.path.abspath(tech.__file__).startswith(OPTS.AMC_tech):
+            debug.error("Technology {0} is already loaded, use one technology per process.".format(
+                        os.path.dirname(tech.__file__)), -1)
+
+    def key(self, kind, params, opts):
+        """ Compiles with the same design, parameters and options give the same result """
+
+        return repr((kind, sorted(params.items()), sorted(opts.items())))
+
+    def register(self, kind, params, opts):
+        """ Check that the output files of a new compile don't overwrite others """
+
+        key = self.key(kind, params, opts)
+        with self.activate(**opts):
+            if kind == "bist":
+                name = "AMC_BIST"
+            elif "name" in params:
+                name = params["name"]
+            else:
+                name = OPTS.name
+            output = os.path.join(OPTS.output_path, name)
+        if self.names.get(output, key) != key:
+            debug.error("{0} is already an output of this session.".format(output), -1)
+        self.names[output] = key
+        return key
+
+    def compile(self, kind="sram", options=None, **params):
+        """ Build and save one design. The parameters are the ones of the design
+            class and default to the session options, options overrides session
+            options for this compile only (e.g. output_path). Returns the result. """
+
+        opts = dict(options or {})
+        key = self.register(kind, params, opts)
+        if key in self.results:
+            debug.info(1, "Using the result of an earlier compile of {0}".format(key))
+            return self.results[key]
+
+        result = self.run(kind, params, opts)
+        self.results[key] = result
+        return result
+
+    def compile_many(self, requests, jobs=1):
+        """ Compile a list of (kind, params) or (kind, params, options) requests,
+            in up to jobs worker processes. Returns the results in order. """
+
+        requests = [(r[0], dict(r[1]), dict(r[2]) if len(r) > 2 else {}) for r in requests]
+        keys = [self.register(kind, params, opts) for (kind, params, opts) in requests]
+
+        todo = {}
+        for (key, request) in zip(keys, requests):
+            if key not in self.results:
+                todo.setdefault(key, request)
+
+        if jobs > 1 and len(todo) > 1:
+            context = multiprocessing.get_context("fork")
+            with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+                futures = {key: pool.submit(self.run, *request) for (key, request) in todo.items()}
+                for (key, future) in futures.items():
+                    self.results[key] = future.result()
+        else:
+            for (key, request) in todo.items():
+                self.results[key] = self.run(*request)
+
+        return [self.results[key] for key in keys]
+
+    def run(self, kind, params, opts):
+        """ Build and save a design with the session options """
+
+        import generate
+        with self.activate(**opts):
+            # Every compile has its own temp directory so concurrent ones don't collide
+            OPTS.AMC_temp = tempfile.mkdtemp(prefix="{0}_".format(kind), dir=self.options["AMC_temp"]) + "/"
+            if not OPTS.output_path.endswith('/'):
+                OPTS.output_path += "/"
+            os.makedirs(OPTS.output_path, 0o750, exist_ok=True)
+
+            start_time = datetime.datetime.now()
+            d = generate.build(kind, **params)
+            build_time = datetime.datetime.now()
+            globals.print_time("{0} {1}".format(kind, d.name), build_time, start_time)
+            d.save_output()
+            end_time = datetime.datetime.now()
+
+            result = {"kind" : kind,
+                      "name" : d.name,
+                      "params" : params,
+                      "paths" : self.output_files(kind, d.name),
+                      "width" : d.width,
+                      "height" : d.height,
+                      "area" : d.width*d.height,
+                      "runtime" : {"build" : (build_time-start_time).total_seconds(),
+                                   "save" : (end_time-build_time).total_seconds()}}
+            if hasattr(d, "addr_size"):
+                result["addr_size"] = d.addr_size
+            globals.cleanup_paths()
+        return result
+
+    def output_files(self, kind, name):
+        """ Output files of a saved design, by the names that save_output writes
+            with the layout format and compression of the options (the BIST
+            always saves as AMC_BIST) """
+
+        if kind == "bist":
+            names = dict((suffix, "{0}AMC_BIST.{1}".format(OPTS.output_path, suffix))
+                         for suffix in ["sp", "gds", "lef"])
+        else:
+            from sram import output_names
+            names = output_names(name)
+        paths = {}
+        for (suffix, filename) in names.items():
+            if os.path.exists(filename):
+                paths[suffix] = filename
+        # One liberty file per characterized PVT corner
+        libs = sorted(glob.glob("{0}{1}_*.lib".format(OPTS.output_path, name)))
+        if libs:
+            paths["lib"] = libs
+        return paths
@@ -25,6 +25,8 @@ import datetime
 import getpass
 import design
 import debug
+import compressed
+from merge_masters import merge_masters
 import contact
 from math import log
 from vector import vector
@@ -34,17 +36,117 @@ from split_merge_control import split_merge_control
 from bitcell import bitcell
 
    
+def output_names(name):
+    """ The output files that save_output writes for a design {suffix : file
+        name}, with the layout format and the compression of the options """
+
+    compression = ""
+    if OPTS.output_compression:
+        compression = "." + OPTS.output_compression
+    suffixes = ["sp"]
+    if OPTS.layout_format in ["gds", "both"]:
+        suffixes.append("gds")
+    if OPTS.layout_format in ["oasis", "both"]:
+        suffixes.append("oas")
+    suffixes.append("lef")
+    names = dict((suffix, OPTS.output_path + name + "." + suffix + compression)
+                 for suffix in suffixes)
+    # The Verilog model is not compressed
+    names["v"] = OPTS.output_path + name + ".v"
+    return names
+
+
+def save_output(sram_design, title=""):
+    """ Save all the output files of an SRAM (sram, sync_sram, power_gate_sram)
+        while reporting time to do it as well, title starts the messages """
+
+    # Merge the identical masters so they are written once
+    if OPTS.merge_masters:
+        start_time = datetime.datetime.now()
+        merge = merge_masters(sram_design)
+        merge.run()
+        merge.report()
+        print_time("Merging masters", datetime.datetime.now(), start_time)
+
+    # The compressed outputs (.gz or .zst) are written by a background thread
+    names = output_names(sram_design.name)
+
+    # Save the standar spice file
+    start_time = datetime.datetime.now()
+    spname = names["sp"]
+    print("\n {0}SP: Writing to {1}".format(title, spname))
+    sram_design.sp_write(spname)
+    print_time(title + "Spice writing", datetime.datetime.now(), start_time)
+
+    # Save the extracted spice file if requested
+    if OPTS.use_pex:
+        start_time = datetime.datetime.now()
+        sp_file = OPTS.output_path + "temp_pex.sp"
+        calibre.run_pex(sram_design.name, gdsname, spname, output=sp_file)
+        print_time(title + "Extraction", datetime.datetime.now(), start_time)
+    else:
+        # Use generated spice file for characterization
+        sp_file = spname
+    
+    # Write the layout
+    if OPTS.layout_format in ["gds", "both"]:
+        start_time = datetime.datetime.now()
+        gdsname = names["gds"]
+        print("\n {0}GDS: Writing to {1}".format(title, gdsname))
+        sram_design.gds_write(gdsname)
+        print_time(title + "GDS", datetime.datetime.now(), start_time)
+    if OPTS.layout_format in ["oasis", "both"]:
+        start_time = datetime.datetime.now()
+        oasisname = names["oas"]
+        print("\n {0}OASIS: Writing to {1}".format(title, oasisname))
+        sram_design.oasis_write(oasisname)
+        print_time(title + "OASIS", datetime.datetime.now(), start_time)
+
+    # Create a LEF physical model
+    start_time = datetime.datetime.now()
+    lefname = names["lef"]
+    print("\n {0}LEF: Writing to {1}".format(title, lefname))
+    sram_design.lef_write(lefname)
+    print_time(title + "LEF", datetime.datetime.now(), start_time)
+
+    # Write a verilog model
+    start_time = datetime.datetime.now()
+    vname = names["v"]
+    print("\n {0}Verilog: Writing to {1}".format(title, vname))
+    sram_design.verilog_write(vname)
+    print_time(title + "Verilog", datetime.datetime.now(), start_time)
+    
+    # Characterize the design
+    if OPTS.characterize:
+        start_time = datetime.datetime.now()        
+        from characterizer import lib
+        print("\n LIB: Characterizing... ")
+        if OPTS.char_backend=="analytical":
+            print("Performing analytical characterization from the netlist")
+        elif OPTS.spice_name!="":
+            print("Performing simulation-based characterization with {}".format(OPTS.spice_name))
+        if OPTS.trim_netlist:
+            print("Trimming netlist to speed up characterization.")
+        characterization = lib.lib(out_dir=OPTS.output_path, sram=sram_design)
+        print_time("Characterization", datetime.datetime.now(), start_time)
+
+        # The sparse Verilog model takes its delays from the characterization
+        if OPTS.verilog_model == "sparse":
+            sram_design.verilog_write(vname, characterization.verilog_timing())
+
+
 class sram(design.design):
     """ Dynamically generated two level multi-bank asynchronous SRAM. """
 
     def __init__(self, word_size, words_per_row, num_rows, num_subanks, 
                  branch_factors, bank_orientations, mask, power_gate, name):
         
-        design.design.name_map=[]
         start_time = datetime.datetime.now()
         design.design.__init__(self, name)
 
         self.w_size = word_size
+        # The characterizer uses the name of the other SRAM classes
+        self.word_size = word_size
         self.w_per_row = words_per_row
         self.num_rows = num_rows
         self.num_sbank = num_subanks
@@ -1330,7 +1432,7 @@ class sram(design.design):
     
     def sp_write(self, sp_name):
         """ Write the entire spice of the object to the file """
-        sp = open(sp_name, 'w')
+        sp = compressed.open_output(sp_name)
 
         sp.write("**************************************************\n")
         sp.write("* AMC generated memory.\n")
@@ -1346,52 +1448,4 @@ class sram(design.design):
     def save_output(self):
         """ Save all the output files while reporting time to do it as well. """
 
-        # Save the standar spice file
-        start_time = datetime.datetime.now()
-        spname = OPTS.output_path + self.name + ".sp"
-        print("\n SP: Writing to {0}".format(spname))
-        self.sp_write(spname)
-        print_time("Spice writing", datetime.datetime.now(), start_time)
-
-        # Save the extracted spice file if requested
-        if OPTS.use_pex:
-            start_time = datetime.datetime.now()
-            sp_file = OPTS.output_path + "temp_pex.sp"
-            calibre.run_pex(self.name, gdsname, spname, output=sp_file)
-            print_time("Extraction", datetime.datetime.now(), start_time)
-        else:
-            # Use generated spice file for characterization
-            sp_file = spname
-        
-        # Write the layout
-        start_time = datetime.datetime.now()
-        gdsname = OPTS.output_path + self.name + ".gds"
-        print("\n GDS: Writing to {0}".format(gdsname))
-        self.gds_write(gdsname)
-        print_time("GDS", datetime.datetime.now(), start_time)
-
-        # Create a LEF physical model
-        start_time = datetime.datetime.now()
-        lefname = OPTS.output_path + self.name + ".lef"
-        print("\n LEF: Writing to {0}".format(lefname))
-        self.lef_write(lefname)
-        print_time("LEF", datetime.datetime.now(), start_time)
-
-        # Write a verilog model
-        start_time = datetime.datetime.now()
-        vname = OPTS.output_path + self.name + ".v"
-        print("\n Verilog: Writing to {0}".format(vname))
-        self.verilog_write(vname)
-        print_time("Verilog", datetime.datetime.now(), start_time)
-        
-        # Characterize the design
-        if OPTS.characterize:
-            start_time = datetime.datetime.now()        
-            from characterizer import lib
-            print("\n LIB: Characterizing... ")
-            if OPTS.spice_name!="":
-                print("Performing simulation-based characterization with {}".format(OPTS.spice_name))
-            if OPTS.trim_netlist:
-                print("Trimming netlist to speed up characterization.")
-            lib.lib(out_dir=OPTS.output_path, sram=self)
-            print_time("Characterization", datetime.datetime.now(), start_time)
+        save_output(self)
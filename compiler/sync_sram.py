@@ -18,6 +18,7 @@ import datetime
 import getpass
 import design
 import debug
+import compressed
 import contact
 from tech import drc
 from vector import vector
@@ -27,7 +28,7 @@ from sync_interface_ctrl import sync_interface_ctrl
 from din_latch import din_latch
 from dout_latch import dout_latch
 from ctrl_latch import ctrl_latch
-from sram import sram
+from sram import sram, save_output
 from utils import ceil
 from bitcell import bitcell
 
@@ -549,7 +550,7 @@ class sync_sram(design.design):
     
     def sp_write(self, sp_name):
         """ Write the entire spice of the object to the file """
-        sp = open(sp_name, 'w')
+        sp = compressed.open_output(sp_name)
 
         sp.write("**************************************************\n")
         sp.write("* AMC generated memory.\n")
@@ -566,52 +567,4 @@ class sync_sram(design.design):
     def save_output(self):
         """ Save all the output files while reporting time to do it as well. """
 
-        # Save the standar spice file
-        start_time = datetime.datetime.now()
-        spname = OPTS.output_path + self.name + ".sp"
-        print("\n SP: Writing to {0}".format(spname))
-        self.sp_write(spname)
-        print_time("Spice writing", datetime.datetime.now(), start_time)
-
-        # Save the extracted spice file if requested
-        if OPTS.use_pex:
-            start_time = datetime.datetime.now()
-            sp_file = OPTS.output_path + "temp_pex.sp"
-            calibre.run_pex(self.name, gdsname, spname, output=sp_file)
-            print_time("Extraction", datetime.datetime.now(), start_time)
-        else:
-            # Use generated spice file for characterization
-            sp_file = spname
-        
-        # Write the layout
-        start_time = datetime.datetime.now()
-        gdsname = OPTS.output_path + self.name + ".gds"
-        print("\n GDS: Writing to {0}".format(gdsname))
-        self.gds_write(gdsname)
-        print_time("GDS", datetime.datetime.now(), start_time)
-
-        # Create a LEF physical model
-        start_time = datetime.datetime.now()
-        lefname = OPTS.output_path + self.name + ".lef"
-        print("\n LEF: Writing to {0}".format(lefname))
-        self.lef_write(lefname)
-        print_time("LEF", datetime.datetime.now(), start_time)
-
-        # Write a verilog model
-        start_time = datetime.datetime.now()
-        vname = OPTS.output_path + self.name + ".v"
-        print("\n Verilog: Writing to {0}".format(vname))
-        self.verilog_write(vname)
-        print_time("Verilog", datetime.datetime.now(), start_time)
-        
-        # Characterize the design
-        if OPTS.characterize:
-            start_time = datetime.datetime.now()        
-            from characterizer import lib
-            print("\n LIB: Characterizing... ")
-            if OPTS.spice_name!="":
-                print("Performing simulation-based characterization with {}".format(OPTS.spice_name))
-            if OPTS.trim_netlist:
-                print("Trimming netlist to speed up characterization.")
-            lib.lib(out_dir=OPTS.output_path, sram=self)
-            print_time("Characterization", datetime.datetime.now(), start_time)
+        save_output(self)
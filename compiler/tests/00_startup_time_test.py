@@ -0,0 +1,89 @@
+"""
+Startup time:
+
+This measures the cold start of the compiler in fresh interpreters.
+"AMC.py -h" must not import the technology or numpy (by "python -X
+importtime"), and importing the generators must not read any library cell
+GDS or build the default contacts (these are done on first use). In the
+same interpreter, the import is timed against the eager one: the import
+followed by the work it used to do (numpy, the library cells and the
+contacts), so that startup regressions fail on any machine.
+"""
+
+import unittest
+from testutils import header,AMC_test
+import sys,os,subprocess
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+# Share of the eager import that importing the technology and all the
+# generators may take, it is about one half (and one when the library
+# cells are read at import time)
+lazy_share = 0.75
+
+import_generators = """
+import sys, time
+start = time.perf_counter()
+import globals
+from globals import OPTS
+OPTS.check_lvsdrc = False
+globals.init_AMC("{0}", is_unit_test=False)
+import sram, sync_sram, power_gate_sram, bist, contact, utils
+lazy = time.perf_counter() - start
+print(len(utils.libcell_layouts), [c for c in contact.default_contacts if c in vars(contact)],
+      "numpy" in sys.modules)
+start = time.perf_counter()
+import numpy
+utils.load_libcells()
+for name in contact.default_contacts:
+    getattr(contact, name)
+print(lazy, lazy + time.perf_counter() - start)
+"""
+
+class startup_time_test(AMC_test):
+
+    def runTest(self):
+        amc_home = os.environ["AMC_HOME"]
+        config = "{0}/tests/config_20_{1}".format(amc_home, OPTS.tech_name)
+
+        (modules, import_time, output) = self.import_time([amc_home + "/AMC.py", "-h"])
+        debug.info(1, "AMC.py -h imports in {0} seconds".format(import_time))
+        self.assertNotIn("numpy", modules)
+        self.assertNotIn("tech", modules)
+
+        output = subprocess.run([sys.executable, "-c", import_generators.format(config)],
+                                cwd=amc_home, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                universal_newlines=True).stdout
+        (lazy, eager) = [float(t) for t in output.split("\n")[-2].split()]
+        debug.info(1, "Generators import in {0} seconds, {1} seconds eagerly".format(lazy, eager))
+        self.assertEqual(output.split("\n")[-3], "0 [] False")
+        self.assertLess(lazy, lazy_share*eager)
+
+        globals.end_AMC()
+
+    def import_time(self, args):
+        """ Run python with args in a new interpreter and return the imported
+            modules, the total import time and the output """
+
+        result = subprocess.run([sys.executable, "-X", "importtime"] + args,
+                                cwd=os.environ["AMC_HOME"], stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, universal_newlines=True)
+        modules = []
+        import_time = 0
+        for line in result.stderr.split("\n"):
+            # import time: self [us] | cumulative | imported package
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            fields = line[len("import time:"):].split("|")
+            import_time += int(fields[0])
+            modules.append(fields[2].strip())
+        return (modules, import_time*1e-6, result.stdout)
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
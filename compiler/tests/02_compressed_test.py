@@ -0,0 +1,85 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the compressed output and input files. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os, gzip
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class compressed_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+
+        import compressed
+        import flat_gds
+        import pinv
+        from characterizer import spice_netlist
+
+        kinds = ["gz"]
+        if compressed.zstandard != None:
+            kinds.append("zst")
+
+        debug.info(1, "Many blocks through the compressor thread")
+        text = "".join("line {0}\n".format(i) for i in range(400000))
+        for kind in kinds:
+            filename = OPTS.AMC_temp + "blocks.txt." + kind
+            with compressed.open_output(filename) as f:
+                for i in range(0, len(text), 1000):
+                    f.write(text[i:i+1000])
+            self.assertEqual(compressed.file_compression(filename),
+                             compressed.compression(filename))
+            with compressed.open_input(filename) as f:
+                self.assertEqual(f.read(), text)
+
+        debug.info(1, "Spice, GDS and LEF of an inverter")
+        a = pinv.pinv(size=1)
+        prefix = OPTS.AMC_temp + a.name
+        a.sp_write(prefix + ".sp")
+        a.gds_write(prefix + ".gds")
+        a.lef_write(prefix + ".lef")
+        plain_gds = flat_gds.flat_gds(prefix + ".gds")
+        for kind in kinds:
+            a.sp_write(prefix + ".sp." + kind)
+            a.gds_write(prefix + ".gds." + kind)
+            a.lef_write(prefix + ".lef." + kind)
+            for extension in [".sp", ".gds", ".lef"]:
+                with open(prefix + extension, "rb") as f:
+                    plain = f.read()
+                with compressed.open_input(prefix + extension + "." + kind, "rb") as f:
+                    self.assertEqual(f.read(), plain)
+            # The GDS reader and the netlist reader decompress
+            self.assertEqual(flat_gds.flat_gds(prefix + ".gds." + kind).rects, plain_gds.rects)
+            netlist = spice_netlist.spice_netlist(prefix + ".sp." + kind)
+            self.assertEqual(netlist.subckts, spice_netlist.spice_netlist(prefix + ".sp").subckts)
+
+        # A gzip file is read as one whatever its name
+        with open(prefix + ".sp", "rb") as f:
+            plain = f.read()
+        with open(prefix + ".copy.sp", "wb") as f:
+            f.write(gzip.compress(plain))
+        with compressed.open_input(prefix + ".copy.sp", "rb") as f:
+            self.assertEqual(f.read(), plain)
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
@@ -0,0 +1,84 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California 
+# and The Board of Regents for the Oklahoma Agricultural and 
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the native DRC. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class drc_lite_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+
+        import drc_lite
+        import design
+        import pinv
+        import tech
+        from vector import vector
+
+        debug.info(1, "Checking a clean inverter")
+        a = pinv.pinv(size=2)
+        tempgds = OPTS.AMC_temp + a.name + ".gds"
+        a.gds_write(tempgds)
+        result = drc_lite.drc_lite(a.name, tempgds).run()
+        self.assertEqual(result["errors"], 0)
+
+        debug.info(1, "Checking width, spacing and enclosure errors")
+        m1_width = tech.drc["minwidth_metal1"]
+        m1_space = tech.drc["metal1_to_metal1"]
+        via_width = tech.drc["minwidth_via1"]
+        w = design.design("drc_lite_errors")
+        # Too narrow
+        w.add_rect(layer="metal1", offset=vector(0, 0), width=0.5*m1_width, height=10*m1_width)
+        # Too close to each other, touching rectangles are one shape
+        w.add_rect(layer="metal1", offset=vector(5*m1_width, 0), width=m1_width, height=5*m1_width)
+        w.add_rect(layer="metal1", offset=vector(5*m1_width, 5*m1_width), width=3*m1_width, height=m1_width)
+        w.add_rect(layer="metal1", offset=vector(6*m1_width + 0.5*m1_space, 0), width=m1_width, height=4*m1_width)
+        # A via1 without metal2
+        w.add_rect(layer="via1", offset=vector(20*m1_width, 0), width=via_width, height=via_width)
+        w.add_rect(layer="metal1", offset=vector(20*m1_width - m1_width, -m1_width),
+                   width=via_width + 2*m1_width, height=via_width + 2*m1_width)
+        # Two gates too close to each other, and field poly as close (no rule)
+        poly_width = tech.drc["minwidth_poly"]
+        poly_space = tech.drc["poly_to_poly"]
+        w.add_rect(layer="active", offset=vector(0, 20*m1_width), width=10*poly_width, height=10*poly_width)
+        for x in [2*poly_width, 3*poly_width + 0.5*poly_space]:
+            w.add_rect(layer="poly", offset=vector(x, 20*m1_width - 2*poly_width),
+                       width=poly_width, height=14*poly_width)
+            w.add_rect(layer="poly", offset=vector(x + 20*poly_width, 20*m1_width),
+                       width=poly_width, height=10*poly_width)
+        tempgds = OPTS.AMC_temp + w.name + ".gds"
+        w.gds_write(tempgds)
+        result = drc_lite.drc_lite(w.name, tempgds).run(num_jobs=2)
+        self.assertEqual(result["rules"], {"metal1.width" : 1,
+                                           "metal1.space" : 1,
+                                           "gate.space" : 1,
+                                           "via1.enclosure.metal2" : 1})
+        
+        # The results and the markers to open over the layout
+        self.assertTrue(os.path.isfile(OPTS.AMC_temp + w.name + ".drc_lite.results"))
+        self.assertTrue(os.path.isfile(OPTS.AMC_temp + w.name + ".drc_lite.gds"))
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
@@ -0,0 +1,101 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the incremental verification. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os, shutil
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class incremental_verify_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+        OPTS.verify_cache_dir = OPTS.AMC_temp + "incremental_cache"
+        shutil.rmtree(OPTS.verify_cache_dir, ignore_errors=True)
+
+        import incremental_verify
+        import design
+        import tech
+        from vector import vector
+
+        m1_width = tech.drc["minwidth_metal1"]
+
+        class leaf(design.design):
+            """ A box of metal1 at x=shift """
+            def __init__(self, shift):
+                design.design.__init__(self, "incremental_leaf")
+                self.add_rect(layer="metal1", offset=vector(shift, 0),
+                              width=3*m1_width, height=3*m1_width)
+                self.width = 20*m1_width
+                self.height = 3*m1_width
+
+        class top(design.design):
+            """ Two leaves and a wire on the left of the first one """
+            def __init__(self, shift):
+                design.design.__init__(self, "incremental_top")
+                cell = leaf(shift)
+                self.add_mod(cell)
+                for (name, x) in [("l0", 0), ("l1", 50*m1_width)]:
+                    self.add_inst(name=name, mod=cell, offset=vector(x, 0))
+                    self.connect_inst([])
+                self.add_rect(layer="metal1", offset=vector(-5*m1_width/3, 0),
+                              width=m1_width, height=3*m1_width)
+
+        def plan(shift):
+            check = incremental_verify.incremental_verify(top(shift))
+            check.plan()
+            return check
+
+        debug.info(1, "Everything is checked the first time")
+        check = plan(10*m1_width)
+        self.assertEqual(check.checked, ["incremental_leaf", "incremental_top"])
+        self.assertEqual(check.windows, None)
+        check.save()
+
+        debug.info(1, "Nothing is checked without a change")
+        check = plan(10*m1_width)
+        self.assertEqual(check.checked, [])
+        self.assertEqual(check.windows, [])
+
+        debug.info(1, "A change away from the wire of the parent")
+        check = plan(12*m1_width)
+        self.assertEqual(check.checked, ["incremental_leaf"])
+        self.assertEqual(check.skipped, ["incremental_top"])
+        self.assertEqual(check.reasons["incremental_top"], "no interaction with incremental_leaf")
+        check.save()
+
+        debug.info(1, "A change next to the wire of the parent")
+        check = incremental_verify.incremental_verify(top(0))
+        # The box of l0 is too close to the wire, only the windows are checked
+        self.assertEqual(check.run(), 1)
+        self.assertEqual(check.checked, ["incremental_leaf", "incremental_top"])
+        self.assertEqual(check.reasons["incremental_top"], "interacts with incremental_leaf")
+        # The old and new boxes in both instances
+        self.assertEqual(len(check.windows), 4)
+
+        debug.info(1, "A failed structure is checked again")
+        check = plan(0)
+        self.assertEqual(check.reasons["incremental_top"], "failed before")
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
@@ -0,0 +1,94 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the native connectivity check. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class lvs_lite_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+
+        import lvs_lite
+        import design
+        import pinv
+        import precharge_array
+        from vector import vector
+
+        debug.info(1, "Checking a clean inverter and precharge array")
+        a = pinv.pinv(size=2)
+        result = lvs_lite.lvs_lite(a).run()
+        self.assertEqual(result["errors"], 0)
+        # The transistors of the precharge are placed in another order than
+        # in its netlist, and bl and br are swapped in every other column
+        a = precharge_array.precharge_array(columns=4)
+        result = lvs_lite.lvs_lite(a).run(num_jobs=2)
+        self.assertEqual(result["errors"], 0)
+
+        debug.info(1, "Checking a short and an open")
+        inv = pinv.pinv(size=1)
+        w = design.design("lvs_lite_errors")
+        w.add_pin_list(["a", "z1", "vdd", "gnd"])
+        w.add_mod(inv)
+        inv0 = w.add_inst(name="inv0", mod=inv, offset=vector(0, 0))
+        w.connect_inst(["a", "z0", "vdd", "gnd"])
+        inv1 = w.add_inst(name="inv1", mod=inv, offset=vector(2*inv.width, 0))
+        w.connect_inst(["z0", "z1", "vdd", "gnd"])
+        for pin_name in ["vdd", "gnd"]:
+            pin = inv0.get_pin(pin_name)
+            w.add_rect(layer="metal1", offset=pin.ll(), width=inv1.rx(), height=pin.height())
+        # inv0.Z is left unconnected from inv1.A, and the input is tied to the output
+        a_pin = inv0.get_pin("A").center()
+        z_pin = inv1.get_pin("Z").center()
+        w.add_via_center(w.m1_stack, a_pin)
+        w.add_via_center(w.m1_stack, z_pin)
+        w.add_path("metal2", [a_pin, vector(z_pin.x, a_pin.y), z_pin])
+        result = lvs_lite.lvs_lite(w).run()
+        self.assertEqual(result["rules"], {"shorts" : 1, "opens" : 1})
+        self.assertTrue(any("short between a, z1" in m for m in result["messages"]))
+        self.assertTrue(any("open net z0" in m for m in result["messages"]))
+
+        debug.info(1, "Checking a merge array with its outputs in the reverse order")
+        import merge_array
+        merge = merge_array.merge_array(word_size=4, words_per_row=1, name="lvs_lite_merge_array")
+        w = design.design("lvs_lite_reversed")
+        w.add_pin_list(["dout[{0}]".format(i) for i in range(4)] + ["vdd", "gnd"])
+        w.add_mod(merge)
+        merge_inst = w.add_inst(name="merge_array", mod=merge, offset=vector(0, 0))
+        conns = []
+        for i in range(4):
+            conns.extend(["dout_merge[{0}]".format(i), "dout[{0}]".format(i)])
+        w.connect_inst(conns + ["en1_M", "en2_M", "reset", "M", "vdd", "gnd"])
+        # The outputs are labeled in the reverse order of the bits and the
+        # inputs are routed by the parent, as in a horizontal multi_bank
+        for i in range(4):
+            w.add_layout_pin(text="dout[{0}]".format(3-i), layer="metal2",
+                             offset=merge_inst.get_pin("Q[{0}]".format(i)).ll(),
+                             width=w.m2_width, height=w.m2_width)
+        result = lvs_lite.lvs_lite(w).run()
+        self.assertEqual(result["errors"], 0)
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
@@ -0,0 +1,105 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the merge of the identical masters. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class merge_masters_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+
+        import merge_masters
+        import design
+        import flat_gds
+        import gdsMill
+        import ptx
+        import tech
+        from vector import vector
+
+        m1_width = tech.drc["minwidth_metal1"]
+        fet = ptx.ptx(tx_type="nmos")
+
+        class leaf(design.design):
+            """ A transistor and a pin at x=shift """
+            def __init__(self, name, shift):
+                design.design.__init__(self, name)
+                self.add_pin_list(["A", "gnd"])
+                self.add_mod(fet)
+                self.add_inst(name="m0", mod=fet, offset=vector(0, 0))
+                self.connect_inst(["A", "A", "gnd", "gnd"])
+                self.add_layout_pin(text="A", layer="metal1", offset=vector(shift, 0),
+                                    width=3*m1_width, height=3*m1_width)
+                self.width = 20*m1_width
+                self.height = 3*m1_width
+
+        class top(design.design):
+            """ Three leaves, the first two are the same under different names """
+            def __init__(self):
+                design.design.__init__(self, "merge_top")
+                self.add_pin_list(["A", "B", "gnd"])
+                cells = [leaf("merge_a", 0), leaf("merge_b", 0), leaf("merge_c", 5*m1_width)]
+                for (i, cell) in enumerate(cells):
+                    self.add_mod(cell)
+                    self.add_inst(name="l{0}".format(i), mod=cell, offset=vector(50*i*m1_width, 0))
+                    self.connect_inst(["A" if i == 0 else "B", "gnd"])
+
+        a = top()
+        prefix = OPTS.AMC_temp + a.name
+        a.gds_write(prefix + "_before.gds")
+        layout_before = gdsMill.VlsiLayout(units=tech.GDS["unit"])
+        gdsMill.Gds2reader(layout_before).loadFromFile(prefix + "_before.gds")
+
+        debug.info(1, "Merge the same leaves")
+        merge = merge_masters.merge_masters(a)
+        self.assertEqual(merge.run(), 1)
+        self.assertEqual(merge.merged, {"merge_b" : "merge_a"})
+        (structures, gds_bytes, sp_bytes) = merge.saved()
+        self.assertEqual(structures, 1)
+        self.assertTrue(gds_bytes > 0 and sp_bytes > 0)
+        self.assertEqual([inst.mod.name for inst in a.insts], ["merge_a", "merge_a", "merge_c"])
+        self.assertEqual([mod.name for mod in a.mods], ["merge_a", "merge_c"])
+
+        debug.info(1, "The merged leaf is written once")
+        a.sp_write(prefix + ".sp")
+        a.gds_write(prefix + ".gds")
+        with open(prefix + ".sp") as f:
+            spice = f.read()
+        self.assertNotIn("merge_b", spice)
+        self.assertEqual(spice.count(".SUBCKT merge_a "), 1)
+        self.assertIn("Xl1 B gnd merge_a", spice)
+        # The transistor and its contacts are kept
+        fet_structures = [name.rstrip("\x00") for name in layout_before.structures
+                          if not name.startswith("merge_")]
+        layout = gdsMill.VlsiLayout(units=tech.GDS["unit"])
+        gdsMill.Gds2reader(layout).loadFromFile(prefix + ".gds")
+        self.assertEqual(sorted(name.rstrip("\x00") for name in layout.structures),
+                         sorted(["merge_a", "merge_c", "merge_top"] + fet_structures))
+        # The same flat shapes
+        self.assertEqual(sorted(flat_gds.flat_gds(prefix + ".gds").rects),
+                         sorted(flat_gds.flat_gds(prefix + "_before.gds").rects))
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
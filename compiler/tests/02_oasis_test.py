@@ -0,0 +1,98 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the OASIS writer and reader. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os, time
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class oasis_test(AMC_test):
+
+    def shapes(self, layout):
+        """ Sorted rectangles by layer and sorted labels of a flattened layout """
+
+        rects = dict((layer, sorted(shapes)) for (layer, shapes) in layout.rects.items())
+        return (rects, sorted(layout.labels))
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+
+        import gdsMill
+        import flat_gds
+        import bitcell_array
+
+        debug.info(1, "Round trip of an array of bitcells")
+        a = bitcell_array.bitcell_array(name="oasis_bitcell_array", cols=16, rows=16)
+        gds_name = OPTS.AMC_temp + a.name + ".gds"
+        oasis_name = OPTS.AMC_temp + a.name + ".oas"
+        start = time.time()
+        a.gds_write(gds_name)
+        gds_time = time.time() - start
+        start = time.time()
+        a.oasis_write(oasis_name)
+        oasis_time = time.time() - start
+        self.assertEqual(self.shapes(flat_gds.flat_gds(oasis_name)),
+                         self.shapes(flat_gds.flat_gds(gds_name)))
+        (gds_size, oasis_size) = (os.path.getsize(gds_name), os.path.getsize(oasis_name))
+        debug.info(1, "GDS {0} bytes in {1:.3f}s, OASIS {2} bytes in {3:.3f}s".format(
+                   gds_size, gds_time, oasis_size, oasis_time))
+        # The bitcells are one placement with a repetition
+        self.assertLess(oasis_size, gds_size)
+
+        debug.info(1, "Polygons, paths and array references")
+        layout = gdsMill.VlsiLayout(name="oasis_leaf")
+        layout.addBox(layerNumber=1, offsetInMicrons=(0, 0), width=1.0, height=2.0)
+        layout.addPath(layerNumber=2, coordinates=[(0, 0), (3, 0), (3, 3)], width=0.6)
+        layout.addText("a", layerNumber=3, offsetInMicrons=(0.5, 0.5))
+        leaf = layout.structures[layout.rootStructureName]
+        l_shape = gdsMill.GdsBoundary()
+        l_shape.drawingLayer = 4
+        l_shape.coordinates = [(0, 0), (2000, 0), (2000, 1000), (1000, 1000),
+                               (1000, 3000), (0, 3000), (0, 0)]
+        leaf.boundaries += [l_shape]
+        top = gdsMill.VlsiLayout(name="oasis_top")
+        top.addInstance(layout, offsetInMicrons=(10, 0), mirror="MX")
+        aref = gdsMill.GdsAref()
+        aref.aName = layout.rootStructureName
+        (aref.columns, aref.rows) = (3, 2)
+        aref.coordinates = [(0, 0), (15000, 0), (0, 8000)]
+        top.structures[top.rootStructureName].arefs += [aref]
+        oasis_name = OPTS.AMC_temp + "oasis_top.oas"
+        gdsMill.OasisWriter(top).writeToFile(oasis_name)
+
+        read = gdsMill.VlsiLayout()
+        gdsMill.OasisReader(read).loadFromFile(oasis_name)
+        self.assertEqual(read.rootStructureName, top.rootStructureName)
+        self.assertEqual(read.units, top.units)
+        read_leaf = read.structures[layout.rootStructureName]
+        self.assertEqual(read_leaf.boundaries[1].coordinates, l_shape.coordinates)
+        self.assertEqual([(p.pathWidth, p.coordinates) for p in read_leaf.paths],
+                         [(600, [(0, 0), (3000, 0), (3000, 3000)])])
+        self.assertEqual(read_leaf.texts[0].textString, "a\x00")
+        srefs = read.structures[read.rootStructureName].srefs
+        self.assertEqual(sorted((s.coordinates, s.transFlags[0]) for s in srefs),
+                         sorted([((10000, 0), True)] +
+                                [((x, y), False) for x in [0, 5000, 10000] for y in [0, 4000]]))
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
@@ -0,0 +1,105 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the parsers of the DRC/LVS/ERC reports and the report of many checks. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os, json
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class verify_results_test(AMC_test):
+
+    def write(self, name, text):
+        filename = OPTS.AMC_temp + name
+        f = open(filename, "w")
+        f.write(text)
+        f.close()
+        return filename
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+
+        import verify_results
+
+        debug.info(1, "DRC summary")
+        summary = self.write("cell.drc.summary",
+                             "RULECHECK poly.1 ............ TOTAL Result Count = 2 (2)\n"
+                             "RULECHECK metal1.2 .......... TOTAL Result Count = 0 (0)\n"
+                             "TOTAL Original Layer Geometries: 106 (157)\n"
+                             "TOTAL DRC RuleChecks Executed:   156\n"
+                             "TOTAL DRC Results Generated:     2 (2)\n")
+        drc = verify_results.parse_drc_summary("cell", summary)
+        self.assertEqual((drc["errors"], drc["rules"], drc["geometries"], drc["checks"]),
+                         (2, {"poly.1" : 2}, 106, 156))
+
+        debug.info(1, "LVS report with its extraction report, ERC database and output")
+        report = self.write("cell.lvs.report",
+                            "#     INCORRECT     #\n"
+                            "  Error:  Different numbers of nets.\n")
+        self.write("cell.lvs.report.ext", "WARNING: Text on an unconnected shape\n")
+        output = self.write("cell.lvs.out", "ERROR: Unable to open a file\n")
+        erc_results = self.write("cell.erc.results",
+                                 "cell 1000\n"
+                                 "erc.floating_gate\n"
+                                 "2 2 1 Jan 1 00:00:00 2020\n"
+                                 "Floating gate\n"
+                                 "p 1 4\n0 0\n0 1000\n1000 1000\n1000 0\n"
+                                 "e 2 2\n0 0 1000 1000\n"
+                                 "erc.supply_short\n"
+                                 "0 0 0 Jan 1 00:00:00 2020\n")
+        lvs = verify_results.parse_lvs_report("cell", report, erc_results, output)
+        self.assertEqual(lvs["status"], "INCORRECT")
+        self.assertEqual(lvs["errors"], 3)
+        self.assertEqual(lvs["rules"]["extraction_warnings"], 1)
+        self.assertEqual(lvs["erc"], {"erc.floating_gate" : 2, "erc.supply_short" : 0})
+        self.assertEqual(len(lvs["messages"]), 2)
+
+        debug.info(1, "Definition line of an extracted netlist")
+        pex = self.write("cell.pex.netlist",
+                         "* PEX netlist\n.subckt cell A B\n+ C\n* \nM1 A B C C n\n.ends\n")
+        sp = self.write("cell.sp", "*FIRST LINE\n.SUBCKT cell a b c vdd gnd\nX0 a b c inv\n.ENDS\n")
+        verify_results.correct_port("cell", pex, sp)
+        with open(pex) as f:
+            self.assertEqual(f.read(), "* PEX netlist\n.SUBCKT cell a b c vdd gnd\n"
+                                       "* \nM1 A B C C n\n.ends\n")
+
+        debug.info(1, "Report of the checks")
+        results = verify_results.verify_report("cell")
+        results.add(drc)
+        results.add(lvs, cached=True)
+        prefix = OPTS.AMC_temp + "cell.verify"
+        if os.path.isfile(prefix + ".history"):
+            os.remove(prefix + ".history")
+        results.write(prefix)
+        results.write(prefix)
+        with open(prefix + ".json") as f:
+            summary = json.load(f)
+        self.assertEqual(summary["errors"], 5)
+        self.assertEqual(summary["failed"], ["cell"])
+        self.assertEqual(summary["rules"]["drc"], {"poly.1" : 2})
+        self.assertEqual(summary["rules"]["erc"], {"erc.floating_gate" : 2})
+        self.assertTrue(os.path.isfile(prefix + ".html"))
+        with open(prefix + ".history") as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
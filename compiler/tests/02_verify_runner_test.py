@@ -0,0 +1,149 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the runner of the DRC/LVS jobs with a stub tool. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os, shutil, struct
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class verify_runner_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+        cache_dir = OPTS.AMC_temp + "verify_runner_cache"
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+        import verify_runner
+        import design
+        import tech
+        from vector import vector
+
+        m1_width = tech.drc["minwidth_metal1"]
+
+        class box(design.design):
+            """ A box of metal1 """
+            def __init__(self):
+                design.design.__init__(self, "verify_runner_box")
+                self.add_rect(layer="metal1", offset=vector(0, 0),
+                              width=3*m1_width, height=3*m1_width)
+                self.width = 3*m1_width
+                self.height = 3*m1_width
+
+        class stub_job(verify_runner.verify_job):
+            """ A check whose tool is a shell script writing its error count """
+            kind = "drc"
+
+            def __init__(self, gds_name, script, options={}):
+                verify_runner.verify_job.__init__(self, "verify_runner_box", gds_name,
+                                                  options=options)
+                self.script = script
+
+            def write_runset(self):
+                with open(self.path("runset"), "w") as f:
+                    f.write(self.gds_name + "\n")
+
+            def command(self):
+                return ["sh", "-c", self.script]
+
+            def parse(self):
+                with open(self.path("report")) as f:
+                    errors = int(f.read())
+                return {"cell" : self.cell_name,
+                        "kind" : self.kind,
+                        "status" : "CLEAN" if errors == 0 else "ERRORS",
+                        "errors" : errors,
+                        "rules" : {},
+                        "messages" : []}
+
+        def redate(gds_name, new_name):
+            """ A copy of a GDS file with other time stamps """
+            with open(gds_name, "rb") as f:
+                data = bytearray(f.read())
+            i = 0
+            while i + 4 <= len(data):
+                (length, record) = struct.unpack(">HB", bytes(data[i:i+3]))
+                if record in verify_runner.gds_dated_records:
+                    data[i+4:i+6] = struct.pack(">H", 1999)
+                i += length
+            with open(new_name, "wb") as f:
+                f.write(data)
+
+        gds_name = OPTS.AMC_temp + "verify_runner_box.gds"
+        box().gds_write(gds_name)
+        redated_name = OPTS.AMC_temp + "verify_runner_box_redated.gds"
+        redate(gds_name, redated_name)
+
+        debug.info(1, "The hash of a GDS ignores its time stamps")
+        self.assertNotEqual(verify_runner.file_hash(gds_name), verify_runner.file_hash(redated_name))
+        self.assertEqual(verify_runner.gds_hash(gds_name), verify_runner.gds_hash(redated_name))
+
+        debug.info(1, "Every job runs in its own directory")
+        cache = verify_runner.verify_cache(cache_dir)
+        jobs = [stub_job(gds_name, "echo 0 > report"),
+                stub_job(gds_name, "echo 3 > report", {"window" : 1})]
+        done = []
+        verify_runner.run_jobs(jobs, 2, done.append, cache)
+        self.assertEqual(len(done), 2)
+        self.assertNotEqual(jobs[0].run_dir, jobs[1].run_dir)
+        for job in jobs:
+            self.assertEqual(os.path.dirname(job.run_dir) + "/", verify_runner.verify_dir())
+            self.assertTrue(os.path.isfile(job.path("runset")))
+            self.assertEqual(job.returncode, 0)
+            self.assertFalse(job.cached)
+        self.assertEqual([job.result["errors"] for job in jobs], [0, 3])
+        self.assertEqual(cache.misses, 2)
+
+        debug.info(1, "The same layout written at another time is a cache hit")
+        job = stub_job(redated_name, "echo 5 > report")
+        verify_runner.run_jobs([job], 1, None, cache)
+        self.assertTrue(job.cached)
+        self.assertEqual(job.run_dir, None)
+        self.assertEqual(job.result["errors"], 0)
+        self.assertEqual(cache.hits, 1)
+
+        debug.info(1, "Other options are a cache miss")
+        job = stub_job(gds_name, "echo 5 > report", {"window" : 2})
+        verify_runner.run_jobs([job], 1, None, cache)
+        self.assertFalse(job.cached)
+        self.assertEqual(job.result["errors"], 5)
+
+        debug.info(1, "A job without its report fails")
+        job = stub_job(gds_name, "exit 2", {"window" : 3})
+        verify_runner.run_jobs([job], 1, None, cache)
+        self.assertEqual(job.returncode, 2)
+        self.assertEqual(job.result["status"], "FAILED")
+        self.assertIn("Unable to read the DRC reports", job.result["messages"][0])
+
+        debug.info(1, "A job over its timeout is stopped and not cached")
+        OPTS.verify_timeout = 1
+        job = stub_job(gds_name, "sleep 30; echo 0 > report", {"window" : 4})
+        verify_runner.run_jobs([job], 1, None, cache)
+        self.assertTrue(job.timed_out)
+        self.assertTrue(job.runtime < 10)
+        self.assertEqual(job.result["status"], "FAILED")
+        self.assertIn("timed out after 1 seconds", job.result["messages"][0])
+        self.assertFalse(os.path.exists(job.path("report")))
+        self.assertEqual(cache.get(job.key()), None)
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
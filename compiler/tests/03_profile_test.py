@@ -0,0 +1,66 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California 
+# and The Board of Regents for the Oklahoma Agricultural and 
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Run a regression test on the construction profiler (--profile). """
+
+import unittest
+from testutils import header,AMC_test
+import sys,os,json
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class profile_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+
+        import pinv
+        import profiler
+
+        debug.info(2, "Profiling a 3x size inverter")
+        profiler.start()
+        tx = pinv.pinv(size=3)
+        with profiler.section("gds_write"):
+            tx.gds_write(OPTS.AMC_temp + "pinv.gds")
+        report = profiler.stop().write(OPTS.AMC_temp + "pinv")
+        
+        stats = report["classes"]
+        self.assertEqual(stats["pinv"]["count"], 1)
+        self.assertGreaterEqual(stats["ptx"]["count"], 2)
+        self.assertEqual(stats["gds_write"]["count"], 1)
+        # The inverter is made of two transistors and its contacts 
+        self.assertEqual(stats["pinv"]["insts"], 2)
+        self.assertGreater(stats["pinv"]["vias"], 0)
+        self.assertEqual(stats["pinv"]["pins"], 4)
+        self.assertGreaterEqual(stats["pinv"]["inclusive"], stats["ptx"]["inclusive"])
+        self.assertLessEqual(stats["pinv"]["exclusive"], stats["pinv"]["inclusive"])
+        self.assertGreater(report["peak_memory"], 0)
+        
+        with open(OPTS.AMC_temp + "pinv.profile.json") as f:
+            self.assertEqual(json.load(f)["classes"]["pinv"]["count"], 1)
+        with open(OPTS.AMC_temp + "pinv.profile.folded") as f:
+            stacks = [line.split()[0] for line in f]
+        self.assertIn("pinv;ptx", stacks)
+        self.assertIsNone(profiler.current)
+
+        # return it back to it's normal state
+        OPTS.check_lvsdrc = True
+        globals.end_AMC()        
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
@@ -47,8 +47,20 @@ class sram_test(AMC_test):
         address2="0"*a.addr_size
         
         reduced_file="{0}{1}".format(OPTS.AMC_temp, "reduced.sp")
-        trim_spice.trim_spice(filename, reduced_file, a.w_size, a.w_per_row, a.num_rows, 
-                              address1, address2)
+        trim = trim_spice.trim_spice(filename, reduced_file, a.w_size, a.w_per_row, a.num_rows, 
+                                     address1, address2)
+        debug.info(1, "Kept {0} of {1} transistors".format(trim.stats["kept_devices"], 
+                                                           trim.stats["devices"]))
+        self.assertTrue(path.exists(reduced_file))
+        self.assertLess(trim.stats["kept_devices"], trim.stats["devices"])
+
+        # The last address is on a row of a mirrored wordline driver, which
+        # drives the rows of its group in reverse order
+        self.assertEqual(trim.rows, [0, a.num_rows-4])
+        kept = set(cell for cells in trim.kept.values() for cell in cells)
+        self.assertIn("Xwordline_driver{0}".format(a.num_rows//4-1), kept)
+        self.assertIn("Xbit_r{0}_c0".format(a.num_rows-4), kept)
+        self.assertNotIn("Xbit_r{0}_c0".format(a.num_rows-1), kept)
         globals.end_AMC()
         
 # instantiate a copy of the class to actually run the test
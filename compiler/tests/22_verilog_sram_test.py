@@ -55,6 +55,22 @@ class verilog_test(AMC_test):
         vname = OPTS.AMC_temp + vfile
         s.verilog_write(vname)
 
+        debug.info(1, "Testing the sparse Verilog model")
+        OPTS.verilog_model = "sparse"
+        vname = OPTS.AMC_temp + s.name + "_sparse.v"
+        s.verilog_write(vname, {"read_delay" : 1.5, "write_delay" : 1.25})
+        with open(vname) as f:
+            lines = f.read().splitlines()
+        self.assertIn("  parameter READ_DELAY = 1.5 ;", lines)
+        self.assertIn("  parameter WRITE_DELAY = 1.25 ;", lines)
+        # A reset doesn't go through the words
+        self.assertFalse(any(l.strip().startswith("for") for l in lines))
+        # Every access is logged only with AMC_LOG
+        for (i, l) in enumerate(lines):
+            if "$display" in l:
+                self.assertEqual(lines[i-1], "`ifdef AMC_LOG")
+        OPTS.verilog_model = "dense"
+
         globals.end_AMC()
         
 # instantiate a copdsay of the class to actually run the test
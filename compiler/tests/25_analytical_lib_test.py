@@ -0,0 +1,72 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the LIB file of an SRAM with the analytical characterization. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os, math
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class analytical_lib_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+        OPTS.adaptive_lut = True
+
+        from characterizer import lib
+        import sram
+
+        debug.info(1, "Estimating the timing of a 4bit, 32words SRAM with 1 bank")
+        s = sram.sram(word_size=4, words_per_row=1, num_rows=32, num_subanks=1,
+                      branch_factors=(1,1), bank_orientations=("H", "H"), mask=False,
+                      power_gate=False, name="sram")
+
+        backend = OPTS.char_backend
+        OPTS.char_backend = "analytical"
+        try:
+            tables = lib.lib(OPTS.AMC_temp, s)
+        finally:
+            OPTS.char_backend = backend
+
+        for lib_file in tables.lib_files:
+            self.assertTrue(os.path.isfile(lib_file))
+
+        (slews, loads) = (len(tables.slews), len(tables.loads))
+        self.assertEqual((slews, loads), (7, 7))
+        delays = [m for m in lib.measures if "delay" in m or "slew" in m]
+        for (corner, results) in tables.corner_results.items():
+            for m in delays:
+                values = results[m]
+                self.assertEqual(len(values), slews*loads)
+                for v in values:
+                    self.assertTrue(math.isfinite(v) and v > 0,
+                                    "{0} of {1} is {2}".format(m, corner, v))
+                # Every row of a table (one slew) increases with the load
+                for i in range(slews):
+                    row = values[i*loads:(i+1)*loads]
+                    self.assertTrue(all(a < b for (a, b) in zip(row, row[1:])),
+                                    "{0} of {1} at slew {2}: {3}".format(m, corner, i, row))
+            for m in ["leakage_power", "read_power", "write_power", "read_write_power"]:
+                self.assertTrue(all(math.isfinite(v) and v > 0 for v in results[m]))
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
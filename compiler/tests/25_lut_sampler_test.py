@@ -0,0 +1,122 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the adaptive sampling of the lookup tables. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class lut_sampler_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+
+        import options
+        from characterizer import lib
+
+        debug.info(1, "The 7x7 tables are sampled by default")
+        self.assertTrue(options.options.adaptive_lut)
+        self.assertEqual(options.options.lut_tolerance, 0.02)
+
+        # The points simulated by the stub scheduler and the function of the tables
+        simulated = []
+        function = [None]
+
+        class stub_scheduler():
+            """ Evaluates the function instead of simulating the points """
+            def __init__(self, sram, netlist):
+                self.points = []
+            def add(self, corner, slew, load):
+                self.points.append((float(slew), float(load)))
+            def run(self):
+                simulated.extend(self.points)
+                return [{m : function[0](slew, load) for m in lib.measures}
+                        for (slew, load) in self.points]
+
+        class stub_sram():
+            name = "lut_sampler_sram"
+
+        netlist = OPTS.AMC_temp + "lut_sampler_sram.sp"
+        with open(netlist, "w") as f:
+            f.write(".SUBCKT lut_sampler_sram a\n.ENDS lut_sampler_sram\n")
+
+        def characterize(f, tolerance=0.02):
+            """ (lib, tables, points simulated, largest relative error) of a corner """
+            del simulated[:]
+            function[0] = f
+            OPTS.lut_tolerance = tolerance
+            tables = lib.lib.__new__(lib.lib)
+            tables.sram = stub_sram()
+            tables.name = tables.sram.name
+            tables.netlist = lambda: netlist
+            tables.prepare_tables()
+            results = tables.simulate_corners([corner])[corner]
+            values = [f(slew, load) for slew in tables.slews for load in tables.loads]
+            error = max(abs(r - v)/v for (r, v) in zip(results["read_delay_lh"], values))
+            return (tables, results, len(simulated), error)
+
+        corner = ("TT", 5.0, 25)
+        lib.corner_cache.clear()
+        scheduler = lib.scheduler
+        lib.scheduler = type("stub", (), {"scheduler" : stub_scheduler})
+        try:
+            # Delays (ns) of the slews (ns) and loads (fF)
+            bilinear = lambda slew, load: 0.2 + 0.3*slew + 0.01*load + 0.002*slew*load
+            curved = lambda slew, load: 0.2 + 0.5*slew + 0.004*load + 0.0001*load**2
+
+            debug.info(1, "A bilinear table is exact from its first 9 points")
+            (tables, results, points, error) = characterize(bilinear)
+            self.assertEqual((len(tables.slews), len(tables.loads)), (7, 7))
+            self.assertEqual(len(results["read_delay_lh"]), 49)
+            self.assertEqual(points, 9)
+            self.assertTrue(error < 1e-9)
+
+            debug.info(1, "The same corner and table are not simulated again")
+            (tables, results, points, error) = characterize(bilinear)
+            self.assertEqual(points, 0)
+            self.assertTrue(error < 1e-9)
+
+            debug.info(1, "A curved table is refined until its estimate is within the tolerance")
+            lib.corner_cache.clear()
+            (tables, results, points_2, error_2) = characterize(curved, 0.02)
+            self.assertTrue(9 < points_2 < 49)
+            # The parabola of the estimate is exact on a quadratic load
+            self.assertTrue(error_2 <= 0.02)
+            (tables, results, points_05, error_05) = characterize(curved, 0.005)
+            self.assertTrue(points_2 < points_05 <= 49)
+            self.assertTrue(error_05 <= 0.005)
+
+            debug.info(1, "Without the sampling all the points of the 3x3 tables are simulated")
+            OPTS.adaptive_lut = False
+            (tables, results, points, error) = characterize(curved)
+            self.assertEqual((len(tables.slews), len(tables.loads)), (3, 3))
+            self.assertEqual(points, 9)
+            self.assertTrue(error < 1e-9)
+        finally:
+            lib.scheduler = scheduler
+            lib.corner_cache.clear()
+            OPTS.adaptive_lut = True
+            OPTS.lut_tolerance = 0.02
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
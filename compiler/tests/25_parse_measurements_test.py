@@ -0,0 +1,119 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the parser of the simulator measurements. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os, math
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class parse_measurements_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+
+        from characterizer import charutils
+
+        def parse(name, text):
+            filename = OPTS.AMC_temp + name
+            with open(filename, "w") as f:
+                f.write(text)
+            return charutils.parse_measurements(filename)
+
+        debug.info(1, "Values with the SPICE unit suffixes")
+        self.assertAlmostEqual(charutils.convert_measure("1.5e-9"), 1.5e-9)
+        self.assertAlmostEqual(charutils.convert_measure("2.5n"), 2.5e-9)
+        self.assertAlmostEqual(charutils.convert_measure("3m"), 3e-3)
+        self.assertAlmostEqual(charutils.convert_measure("3meg"), 3e6)
+        self.assertAlmostEqual(charutils.convert_measure("3MEG"), 3e6)
+        self.assertAlmostEqual(charutils.convert_measure("4mil"), 4*25.4e-6)
+        self.assertAlmostEqual(charutils.convert_measure("-7.5ps"), -7.5e-12)
+        self.assertAlmostEqual(charutils.convert_measure("2.0v"), 2.0)
+
+        debug.info(1, "Failed measurements keep their reason")
+        for text in ["failed", "FAILED", "nan"]:
+            value = charutils.convert_measure(text)
+            self.assertIsInstance(value, charutils.failed_measure)
+            self.assertTrue(math.isnan(value))
+            self.assertEqual(value.reason, "{0} reported by the simulator".format(text))
+        value = charutils.convert_measure("1.2.3n")
+        self.assertTrue(math.isnan(value))
+        self.assertIn("Invalid number: 1.2.3n", value.reason)
+        # A failure propagates through the arithmetic
+        self.assertTrue(math.isnan(value*1e9 + 1))
+
+        debug.info(1, "The table format of a .mt0 file")
+        rows = parse("table.mt0",
+                     "$DATA1 SOURCE='HSPICE' VERSION='2019.06'\n"
+                     ".TITLE '* sram test'\n"
+                     " read_delay       write_delay      slew_hl          temper\n"
+                     " alter#\n"
+                     "  1.2500e-09       2.5n             failed           25.0000\n"
+                     "  1.0000\n")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(sorted(rows[0].keys()), ["alter#", "read_delay", "slew_hl",
+                                                  "temper", "write_delay"])
+        self.assertAlmostEqual(rows[0]["read_delay"], 1.25e-9)
+        self.assertAlmostEqual(rows[0]["write_delay"], 2.5e-9)
+        self.assertTrue(math.isnan(rows[0]["slew_hl"]))
+        self.assertEqual(rows[0]["slew_hl"].reason, "failed reported by the simulator")
+
+        debug.info(1, "One row for every alter")
+        rows = parse("alter.mt0",
+                     "$DATA1 SOURCE='FineSim' VERSION='2019.06'\n"
+                     ".TITLE '* sram test'\n"
+                     "READ_DELAY WRITE_DELAY alter#\n"
+                     "1.0n 2.0n 1\n"
+                     "1.5n 2.5n 2\n"
+                     "2.0n 3.0n 3\n")
+        self.assertEqual(len(rows), 3)
+        self.assertEqual([row["alter#"] for row in rows], [1, 2, 3])
+        for (row, delay) in zip(rows, [1.0e-9, 1.5e-9, 2.0e-9]):
+            self.assertAlmostEqual(row["read_delay"], delay)
+            self.assertAlmostEqual(row["write_delay"], delay + 1e-9)
+
+        debug.info(1, "The name = value lines of ngspice")
+        rows = parse("ngspice.mt0",
+                     "Measurements for Transient Analysis\n"
+                     "\n"
+                     "read_delay          =  1.234000e-09 targ=  6.234000e-09 trig=  5.000000e-09\n"
+                     "leakage_power       =  3.5m\n"
+                     "write_power         =  failed\n"
+                     "read_delay          =  1.5n\n"
+                     "leakage_power       =  2meg\n")
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(sorted(rows[0].keys()), ["leakage_power", "read_delay", "write_power"])
+        self.assertAlmostEqual(rows[0]["read_delay"], 1.234e-9)
+        self.assertAlmostEqual(rows[0]["leakage_power"], 3.5e-3)
+        self.assertIsInstance(rows[0]["write_power"], charutils.failed_measure)
+        # A name seen again starts the next row
+        self.assertAlmostEqual(rows[1]["read_delay"], 1.5e-9)
+        self.assertAlmostEqual(rows[1]["leakage_power"], 2e6)
+
+        debug.info(1, "A measurement missing from the output")
+        self.assertAlmostEqual(charutils.parse_output("table", "READ_DELAY"), 1.25e-9)
+        value = charutils.parse_output("table", "read_power")
+        self.assertTrue(math.isnan(value))
+        self.assertIn("read_power not found", value.reason)
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
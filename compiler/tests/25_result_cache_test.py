@@ -0,0 +1,104 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the store of the characterization results. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os, shutil
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class result_cache_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+
+        from characterizer import result_cache
+
+        cache_dir = OPTS.AMC_temp + "result_cache"
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        work_dir = OPTS.AMC_temp + "result_cache_point/"
+        os.makedirs(work_dir, exist_ok=True)
+
+        def write(name, text):
+            with open(work_dir + name, "w") as f:
+                f.write(text)
+
+        write("sram.sp", ".SUBCKT sram a b\n.ENDS sram\n")
+        write("test.sp", ".meas tran read_delay trig v(a) targ v(b)\n")
+        corner = ("TT", 5.0, 25)
+        result = {"read_delay" : 1.5, "write_delay" : 1.25}
+
+        cache = result_cache.result_cache(cache_dir)
+        key = cache.key(work_dir, "sram.sp", corner, 0.1, 2.0)
+        netlist_hash = result_cache.file_hash(work_dir + "sram.sp")
+
+        debug.info(1, "A new point is a miss, the same one is a hit")
+        self.assertEqual(cache.get(key), None)
+        cache.put(key, result, corner, netlist_hash, 0.1, 2.0)
+        self.assertEqual(cache.key(work_dir, "sram.sp", corner, 0.1, 2.0), key)
+        self.assertEqual(result_cache.result_cache(cache_dir).get(key), result)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        debug.info(1, "Another corner, slew or load is a miss")
+        for point in [(("SS", 5.0, 25), 0.1, 2.0), (("TT", 4.5, 25), 0.1, 2.0),
+                      (corner, 0.2, 2.0), (corner, 0.1, 4.0)]:
+            self.assertNotEqual(cache.key(work_dir, "sram.sp", *point), key)
+
+        debug.info(1, "A changed deck or netlist is a miss")
+        write("test.sp", ".meas tran read_delay trig v(a) targ v(b) td=1n\n")
+        deck_key = cache.key(work_dir, "sram.sp", corner, 0.1, 2.0)
+        self.assertNotEqual(deck_key, key)
+        self.assertEqual(cache.get(deck_key), None)
+        write("test.sp", ".meas tran read_delay trig v(a) targ v(b)\n")
+        self.assertEqual(cache.key(work_dir, "sram.sp", corner, 0.1, 2.0), key)
+        write("sram.sp", ".SUBCKT sram a b\nR0 a b 1k\n.ENDS sram\n")
+        self.assertNotEqual(cache.key(work_dir, "sram.sp", corner, 0.1, 2.0), key)
+
+        debug.info(1, "Failed measurements are not stored")
+        nan_key = cache.key(work_dir, "sram.sp", corner, 0.2, 2.0)
+        cache.put(nan_key, {"read_delay" : float("nan")}, corner, netlist_hash, 0.2, 2.0)
+        self.assertEqual(cache.get(nan_key), None)
+
+        debug.info(1, "The entries are removed by corner and by netlist")
+        other = ("SS", 4.5, 125)
+        new_hash = result_cache.file_hash(work_dir + "sram.sp")
+        cache.put("a"*40, result, other, netlist_hash, 0.1, 2.0)
+        cache.put("b"*40, result, other, new_hash, 0.1, 2.0)
+        cache.put("c"*40, result, corner, new_hash, 0.1, 2.0)
+        self.assertEqual(cache.invalidate(corner=("FF", 5.0, 25)), 0)
+        self.assertEqual(cache.invalidate(corner=other, netlist=netlist_hash), 1)
+        self.assertEqual(cache.get("a"*40), None)
+        # The netlist is given by its file
+        self.assertEqual(cache.invalidate(netlist=work_dir + "sram.sp"), 2)
+        self.assertEqual(cache.get("b"*40), None)
+        self.assertEqual(cache.get(key), result)
+        self.assertEqual(cache.invalidate(), 1)
+        self.assertEqual(os.listdir(cache_dir), [])
+
+        debug.info(1, "An empty directory turns the cache off")
+        off = result_cache.result_cache("")
+        off.put(key, result, corner, netlist_hash, 0.1, 2.0)
+        self.assertEqual(off.get(key), None)
+        self.assertEqual(off.invalidate(), 0)
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
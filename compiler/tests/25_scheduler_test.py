@@ -0,0 +1,83 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the scheduler of the characterization simulations. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os, math, types
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class scheduler_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+        OPTS.char_batch = False
+
+        from characterizer import scheduler, sim_runner, result_cache, lib
+
+        parsed = []
+        class point_test():
+            """ The simulation of a point by a shell job """
+            def __init__(self, point):
+                self.point = point
+                self.work_dir = OPTS.AMC_temp + "scheduler_{0}/".format(point)
+                os.makedirs(self.work_dir, exist_ok=True)
+                self.sweep = None
+            def sim_job(self):
+                return sim_runner.sim_job(["sh", "-c", "true"], self.work_dir)
+            def parse_results(self):
+                parsed.append(self.point)
+                if self.point == 1:
+                    raise ValueError("broken output")
+                if self.point == 2:
+                    debug.error("Simulation in {0} finished without writing test.mt0".format(self.work_dir), -1)
+                return {"read_delay_lh" : 1.0}
+
+        netlist = OPTS.AMC_temp + "scheduler.sp"
+        with open(netlist, "w") as f:
+            f.write(".SUBCKT sram a b\n.ENDS sram\n")
+        # Without the simulator lookup of the constructor
+        runs = scheduler.scheduler.__new__(scheduler.scheduler)
+        runs.sram = types.SimpleNamespace(name="sram")
+        runs.netlist = netlist
+        runs.cache = result_cache.result_cache("")
+        runs.num_jobs = 2
+        runs.points = []
+        loads = [1.0, 2.0, 4.0, 8.0]
+        runs.prepare = lambda corner, slew, load: point_test(loads.index(load))
+        for load in loads:
+            runs.add(("TT", 5.0, 25), 0.1, load)
+
+        debug.info(1, "An output that can't be parsed fails its simulation only")
+        with self.assertRaises(AssertionError):
+            runs.run()
+        self.assertEqual(sorted(parsed), [0, 1, 2, 3])
+
+        debug.info(1, "The measurements of the failed points keep the reason")
+        results = scheduler.failed_results("could not parse the measurements: broken output")
+        self.assertEqual(sorted(results.keys()), sorted(lib.measures))
+        for value in results.values():
+            self.assertTrue(math.isnan(value))
+            self.assertIn("broken output", value.reason)
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
@@ -0,0 +1,77 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the runner of the simulator processes with shell jobs. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class sim_runner_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+
+        from characterizer import sim_runner
+
+        def job(name, script, timeout=None):
+            work_dir = OPTS.AMC_temp + "sim_runner_{0}/".format(name)
+            os.makedirs(work_dir, exist_ok=True)
+            return sim_runner.sim_job(["sh", "-c", script], work_dir, timeout)
+
+        debug.info(1, "Exit codes and logs of the jobs")
+        jobs = [job("ok", "echo measured; echo warned >&2"),
+                job("exit", "echo broken >&2; exit 3")]
+        done = []
+        sim_runner.run_jobs(jobs, 2, lambda index, job: done.append(index))
+        self.assertEqual(sorted(done), [0, 1])
+        self.assertTrue(jobs[0].ok())
+        with open(jobs[0].stdout_log) as f:
+            self.assertEqual(f.read(), "measured\n")
+        with open(jobs[0].stderr_log) as f:
+            self.assertEqual(f.read(), "warned\n")
+        self.assertFalse(jobs[1].ok())
+        self.assertEqual(jobs[1].returncode, 3)
+        self.assertIn("returned 3", jobs[1].error_message())
+        self.assertIn("broken", jobs[1].error_message())
+
+        debug.info(1, "A job over its timeout is killed with its children")
+        slow = job("timeout", "sleep 30 & sleep 30; echo done > done", 1)
+        sim_runner.run_jobs([slow], 1)
+        self.assertTrue(slow.timed_out)
+        self.assertFalse(slow.ok())
+        self.assertTrue(slow.runtime < 10)
+        self.assertFalse(os.path.exists(slow.work_dir + "done"))
+        self.assertIn("timed out after 1 seconds", slow.error_message())
+
+        debug.info(1, "A missing simulator fails its job only")
+        jobs = [job("missing", "true"), job("after", "true")]
+        jobs[0].command = ["amc_no_such_simulator"]
+        sim_runner.run_jobs(jobs, 1)
+        self.assertFalse(jobs[0].ok())
+        self.assertIn("could not start amc_no_such_simulator", jobs[0].error_message())
+        with open(jobs[0].stderr_log) as f:
+            self.assertIn("amc_no_such_simulator", f.read())
+        self.assertTrue(jobs[1].ok())
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
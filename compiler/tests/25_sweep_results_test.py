@@ -0,0 +1,94 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+"Run a regresion test on the results of a swept simulation deck. "
+
+import unittest
+from testutils import header,AMC_test
+import sys, os, math, shutil
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class sweep_results_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+
+        from characterizer import functional_test
+
+        names = ["write_delay", "read_delay", "read_write_delay", "slew_hl", "slew_lh",
+                 "leakage_power", "write_power", "read_power", "read_write_power"]
+
+        def measures(point):
+            """ name = value lines of a point, its delays are point+1 ns """
+            return "".join("{0} = {1}{2}\n".format(name, point+1, "n" if "power" not in name else "m")
+                           for name in names)
+
+        def sweep_test(name, points, files):
+            """ A test of the points whose simulation wrote the files """
+            work_dir = OPTS.AMC_temp + name + "/"
+            shutil.rmtree(work_dir, ignore_errors=True)
+            os.makedirs(work_dir)
+            for (i, text) in enumerate(files):
+                with open("{0}test.mt{1}".format(work_dir, i), "w") as f:
+                    f.write(text)
+            test = functional_test.functional_test.__new__(functional_test.functional_test)
+            test.work_dir = work_dir
+            test.sweep = [(0.1*(p+1), 2.0) for p in range(points)]
+            return test
+
+        debug.info(1, "One measurement file per point")
+        test = sweep_test("sweep_files", 3, [measures(0), measures(1), measures(2),
+                                             # A file of an earlier, longer sweep
+                                             measures(3)])
+        results = test.parse_sweep_results()
+        self.assertEqual(len(results), 3)
+        for (point, result) in enumerate(results):
+            self.assertAlmostEqual(result["read_delay_lh"], point+1)
+            self.assertAlmostEqual(result["read_delay_hl"], point+1)
+            self.assertAlmostEqual(result["slew_lh"], point+1)
+            self.assertAlmostEqual(result["write_power"], point+1)
+
+        debug.info(1, "One row per point in test.mt0")
+        test = sweep_test("sweep_rows", 2, [measures(0) + measures(1)])
+        results = test.parse_sweep_results()
+        self.assertEqual([round(r["write_delay_lh"], 6) for r in results], [1.0, 2.0])
+        self.assertEqual([round(r["read_write_power"], 6) for r in results], [1.0, 2.0])
+
+        debug.info(1, "Rows of several files are in the order of the files")
+        test = sweep_test("sweep_mixed", 3, [measures(0) + measures(1), measures(2)])
+        results = test.parse_sweep_results()
+        self.assertEqual([round(r["read_delay_lh"], 6) for r in results], [1.0, 2.0, 3.0])
+
+        debug.info(1, "A failed measurement fails its point only")
+        test = sweep_test("sweep_failed", 2, [measures(0).replace("read_delay = 1n", "read_delay = failed"),
+                                              measures(1)])
+        results = test.parse_sweep_results()
+        self.assertTrue(math.isnan(results[0]["read_delay_lh"]))
+        self.assertAlmostEqual(results[0]["write_delay_lh"], 1.0)
+        self.assertAlmostEqual(results[1]["read_delay_lh"], 2.0)
+
+        debug.info(1, "A point without results is an error")
+        test = sweep_test("sweep_missing", 3, [measures(0), measures(1)])
+        with self.assertRaises(AssertionError):
+            test.parse_sweep_results()
+
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
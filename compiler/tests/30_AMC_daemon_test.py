@@ -0,0 +1,72 @@
+"""
+AMC daemon:
+
+This sends two compile jobs to a warm compiler daemon and checks that
+each one generates the output files (.sp, .gds, .lef, .v) in its own
+output path. It DOES NOT check that these files are right.
+"""
+
+import unittest
+from testutils import header,AMC_test
+import sys,os,threading
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class AMC_daemon_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        OPTS.check_lvsdrc = False
+
+        import daemon
+        socket_name = OPTS.AMC_temp + "daemon.sock"
+        server = daemon.daemon(socket_name=socket_name, num_jobs=2)
+        server.warm_up()
+        server_thread = threading.Thread(target=server.serve, daemon=True)
+        server_thread.start()
+        while daemon.connect(socket_name) == None:
+            pass
+
+        config = {"word_size" : 8, "words_per_row" : 1, "num_rows" : 32,
+                  "num_subanks" : 1, "branch_factors" : (1,1),
+                  "bank_orientations" : ("H", "H"), "name" : "sram",
+                  "tech_name" : OPTS.tech_name, "check_lvsdrc" : False}
+
+        clients = []
+        for job in range(2):
+            config["output_path"] = OPTS.AMC_temp + "job{0}".format(job)
+            conn = daemon.connect(socket_name)
+            daemon.send_message(conn, {"command" : "job", "cwd" : os.getcwd(),
+                                       "options" : {}, "config" : dict(config)})
+            clients.append(conn)
+
+        for (job, conn) in enumerate(clients):
+            conn_file = conn.makefile("rb")
+            exit_code = None
+            while True:
+                message = daemon.read_message(conn_file)
+                if message == None:
+                    break
+                if "exit" in message:
+                    exit_code = message["exit"]
+            conn.close()
+            self.assertEqual(exit_code, 0)
+            for suffix in [".sp", ".gds", ".lef", ".v"]:
+                filename = OPTS.AMC_temp + "job{0}/sram{1}".format(job, suffix)
+                self.assertTrue(os.path.exists(filename), filename)
+
+        server.shutdown()
+        server_thread.join()
+
+        # return it back to it's normal state
+        OPTS.check_lvsdrc = True
+        globals.end_AMC()
+
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Compile session:
+
+This compiles several SRAMs in one process with a compile session, one
+after the other and concurrently, and checks the results (paths, area)
+and the result cache. It DOES NOT check that the output files are right.
+"""
+
+import unittest
+from testutils import header,AMC_test
+import sys,os
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+import debug
+
+class session_test(AMC_test):
+
+    def runTest(self):
+        globals.init_AMC("config_20_{0}".format(OPTS.tech_name))
+        output_path = OPTS.AMC_temp + "session/"
+
+        import session
+        with session.session(tech_name=OPTS.tech_name, check_lvsdrc=False,
+                             output_path=output_path, word_size=8, words_per_row=1, 
+                             num_rows=32, num_subanks=1, branch_factors=(1,1), 
+                             bank_orientations=("H", "H")) as s:
+            
+            # The same modules are built again for the second SRAM of the process
+            r1 = s.compile("sram", name="sram1")
+            r2 = s.compile("sram", name="sram2", num_rows=16)
+            self.assertLess(r2["area"], r1["area"])
+            self.assertIs(s.compile("sram", name="sram1"), r1)
+            
+            results = s.compile_many([("sram", {"name": "sram3", "word_size": 4}),
+                                      ("sram", {"name": "sram1"}),
+                                      ("bist", {"addr_size": 5}, {"output_path": output_path + "bist"})], 
+                                     jobs=2)
+            self.assertIs(results[1], r1)
+            
+            for r in [r1, r2] + results:
+                self.assertGreater(r["area"], 0)
+                for suffix in ["sp", "gds", "lef"]:
+                    self.assertTrue(os.path.exists(r["paths"][suffix]))
+            self.assertEqual(results[2]["paths"]["gds"], output_path + "bist/AMC_BIST.gds")
+
+            # The paths follow the layout format and compression of the outputs
+            r4 = s.compile("sram", {"layout_format" : "both", "output_compression" : "gz"}, 
+                           name="sram4")
+            for suffix in ["sp", "gds", "oas", "lef"]:
+                self.assertEqual(r4["paths"][suffix], output_path + "sram4." + suffix + ".gz")
+                self.assertTrue(os.path.exists(r4["paths"][suffix]))
+            self.assertEqual(r4["paths"]["v"], output_path + "sram4.v")
+            r5 = s.compile("sram", {"layout_format" : "oasis"}, name="sram5")
+            self.assertEqual(sorted(r5["paths"].keys()), ["lef", "oas", "sp", "v"])
+            
+            # Output files of a compile can't be overwritten by a different one
+            with self.assertRaises(AssertionError):
+                s.compile("sram", name="sram1", num_rows=64)
+        
+        # The options of the session are not left behind
+        self.assertNotEqual(OPTS.output_path, output_path)
+        self.assertTrue(OPTS.check_lvsdrc)
+        globals.end_AMC()
+        
+# instantiate a copy of the class to actually run the test
+if __name__ == "__main__":
+    (OPTS, args) = globals.parse_args()
+    del sys.argv[1:]
+    header(__file__, OPTS.tech_name)
+    unittest.main()
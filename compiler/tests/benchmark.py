@@ -0,0 +1,306 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Scaling benchmark of the compiler throughput and memory.
+
+This builds bitcell_array, hierarchical_decoder, bank, multi_bank and sram
+over a grid of sizes with check_lvsdrc off. Each grid point is one sweep
+of a single parameter from a base configuration, so the points of a sweep
+tell how a module scales with that parameter. For every point it records
+the wall time of each phase (construction, SP, GDS, LEF, Verilog), the
+peak RSS and the sizes of the output files. Every point runs in its own
+forked process so the memory of a point is not left to the next one.
+
+The results are written as JSON to compare between commits. The time
+exponent of each sweep (slope of log(time) over log(bits)) is reported,
+and sweeps that grow faster than the threshold are flagged as super-linear.
+
+    python benchmark.py -g quick -o bench.json
+    python benchmark.py -g full -o new.json --compare bench.json
+"""
+
+import sys, os, json, math, time, optparse, datetime, resource, traceback
+import multiprocessing
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+
+
+# module -> (base parameters, {swept parameter: values})
+grids = {
+    "quick" : {
+        "bitcell_array" : ({"cols" : 16, "rows" : 32},
+                           {"rows" : [32, 64, 128]}),
+        "hierarchical_decoder" : ({"rows" : 32},
+                                  {"rows" : [32, 64, 128]}),
+        "bank" : ({"word_size" : 8, "words_per_row" : 1, "num_rows" : 32, "num_subanks" : 1},
+                  {"num_rows" : [32, 64, 128]}),
+        "multi_bank" : ({"word_size" : 8, "words_per_row" : 1, "num_rows" : 32,
+                         "num_subanks" : 1, "num_banks" : 1},
+                        {"num_banks" : [1, 2]}),
+        "sram" : ({"word_size" : 8, "words_per_row" : 1, "num_rows" : 32,
+                   "num_subanks" : 1, "branch_factors" : (1,1)},
+                  {"word_size" : [8, 16, 32]}),
+    },
+    "full" : {
+        "bitcell_array" : ({"cols" : 32, "rows" : 64},
+                           {"rows" : [32, 64, 128, 256, 512],
+                            "cols" : [8, 16, 32, 64, 128]}),
+        "hierarchical_decoder" : ({"rows" : 64},
+                                  {"rows" : [32, 64, 128, 256, 512]}),
+        "bank" : ({"word_size" : 16, "words_per_row" : 1, "num_rows" : 64, "num_subanks" : 1},
+                  {"num_rows" : [32, 64, 128, 256, 512],
+                   "word_size" : [8, 16, 32, 64, 128],
+                   "num_subanks" : [1, 2, 4, 8]}),
+        "multi_bank" : ({"word_size" : 16, "words_per_row" : 1, "num_rows" : 64,
+                         "num_subanks" : 1, "num_banks" : 1},
+                        {"num_banks" : [1, 2, 4]}),
+        "sram" : ({"word_size" : 16, "words_per_row" : 1, "num_rows" : 64,
+                   "num_subanks" : 1, "branch_factors" : (1,1)},
+                  {"num_rows" : [32, 64, 128, 256, 512],
+                   "word_size" : [8, 16, 32, 64, 128],
+                   "num_subanks" : [1, 2, 4, 8],
+                   "branch_factors" : [(1,1), (1,2), (1,4), (2,4), (4,4)]}),
+    },
+}
+
+
+def grid_points(grid, modules):
+    """ List of (module, swept parameter, parameters) of a grid """
+
+    points = []
+    for module in modules:
+        (base, sweeps) = grids[grid][module]
+        for (param, values) in sweeps.items():
+            for value in values:
+                params = dict(base)
+                params[param] = value
+                points.append((module, param, params))
+    return points
+
+
+def point_id(module, params):
+    """ Key of a grid point to compare runs """
+
+    return module + "(" + ", ".join("{0}={1}".format(k, params[k]) for k in sorted(params)) + ")"
+
+
+def num_bits(module, params):
+    """ Number of bitcells (rows for a decoder), the size the time should scale with """
+
+    if module == "bitcell_array":
+        return params["cols"]*params["rows"]
+    if module == "hierarchical_decoder":
+        return params["rows"]
+    bits = params["word_size"]*params["words_per_row"]*params["num_rows"]*params["num_subanks"]
+    if module == "multi_bank":
+        bits *= params["num_banks"]
+    if module == "sram":
+        bits *= params["branch_factors"][0]*params["branch_factors"][1]
+    return bits
+
+
+def build(module, params):
+    """ Construct a module of the grid """
+
+    if module == "bitcell_array":
+        import bitcell_array
+        return bitcell_array.bitcell_array(name="bitcell_array", **params)
+    if module == "hierarchical_decoder":
+        import hierarchical_decoder
+        return hierarchical_decoder.hierarchical_decoder(name="hierarchical_decoder", **params)
+    if module == "bank":
+        import bank
+        return bank.bank(two_level_bank=False, mask=False, power_gate=False, name="bank", **params)
+    if module == "multi_bank":
+        import multi_bank
+        return multi_bank.multi_bank(orientation="H", two_level_bank=False, mask=False,
+                                     power_gate=False, name="multi_bank", **params)
+    import sram
+    return sram.sram(bank_orientations=("H", "H"), mask=False, power_gate=False,
+                     name="sram", **params)
+
+
+def run_point(module, params, conn):
+    """ Body of the process of one grid point """
+
+    try:
+        OPTS.AMC_temp = "{0}bench_{1}/".format(OPTS.AMC_temp, os.getpid())
+        os.makedirs(OPTS.AMC_temp)
+        phases = {}
+        start_time = time.perf_counter()
+        d = build(module, params)
+        phases["construction"] = time.perf_counter() - start_time
+
+        base_name = OPTS.AMC_temp + d.name
+        writers = [("sp", d.sp_write), ("gds", d.gds_write), ("lef", d.lef_write)]
+        if module == "sram":
+            writers.append(("v", d.verilog_write))
+        sizes = {}
+        for (suffix, writer) in writers:
+            phase_time = time.perf_counter()
+            writer("{0}.{1}".format(base_name, suffix))
+            phases[suffix] = time.perf_counter() - phase_time
+            sizes[suffix] = os.path.getsize("{0}.{1}".format(base_name, suffix))
+
+        conn.send({"time" : time.perf_counter() - start_time,
+                   "phases" : phases,
+                   "file_sizes" : sizes,
+                   # ru_maxrss is in kilobytes on Linux
+                   "peak_rss" : resource.getrusage(resource.RUSAGE_SELF).ru_maxrss*1024,
+                   "width" : d.width,
+                   "height" : d.height})
+    except BaseException:
+        conn.send({"error" : traceback.format_exc()})
+    finally:
+        globals.cleanup_paths()
+        conn.close()
+
+
+def measure(module, params):
+    """ Measure a grid point in a process forked from the warm benchmark """
+
+    context = multiprocessing.get_context("fork")
+    (receiver, sender) = context.Pipe(duplex=False)
+    worker = context.Process(target=run_point, args=(module, params, sender))
+    worker.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = {"error" : "Process of the point died"}
+    worker.join()
+    return result
+
+
+def scaling(results, threshold):
+    """ Time exponent over the bits of each sweep, least squares fit in log-log """
+
+    sweeps = {}
+    for r in results:
+        if "error" not in r and r["time"] > 0:
+            sweeps.setdefault((r["module"], r["sweep"]), []).append((r["bits"], r["time"]))
+
+    report = []
+    for ((module, sweep), points) in sorted(sweeps.items()):
+        points = sorted(set(points))
+        xs = [math.log(bits) for (bits, t) in points]
+        ys = [math.log(t) for (bits, t) in points]
+        if len(points) < 3 or max(xs) == min(xs):
+            continue
+        x_mean = sum(xs)/len(xs)
+        y_mean = sum(ys)/len(ys)
+        exponent = sum((x-x_mean)*(y-y_mean) for (x,y) in zip(xs, ys)) / \
+                   sum((x-x_mean)**2 for x in xs)
+        report.append({"module" : module,
+                       "sweep" : sweep,
+                       "exponent" : exponent,
+                       "super_linear" : exponent > threshold})
+    return report
+
+
+def compare(results, old_file, tolerance):
+    """ Compare the times with an earlier run, returns the slower points """
+
+    with open(old_file) as f:
+        old = {r["id"] : r for r in json.load(f)["results"] if "error" not in r}
+    slower = []
+    for r in results:
+        if "error" in r or r["id"] not in old:
+            continue
+        ratio = r["time"]/old[r["id"]]["time"]
+        print("{0:<100} {1:>8.2f}x".format(r["id"], ratio))
+        if ratio > tolerance:
+            slower.append((r["id"], ratio))
+    return slower
+
+
+def main():
+    parser = optparse.OptionParser(usage="usage: benchmark.py [options]",
+                                   description="Scaling benchmark of the compiler.")
+    parser.add_option("-t", "--tech", dest="tech_name", default=OPTS.tech_name,
+                      help="Technology name")
+    parser.add_option("-g", "--grid", dest="grid", default="quick",
+                      help="Grid of sizes: {0}".format(", ".join(sorted(grids))))
+    parser.add_option("-m", "--modules", dest="modules", default="",
+                      help="Comma separated modules to run (default all)")
+    parser.add_option("-o", "--output", dest="output", default="benchmark.json", metavar="FILE",
+                      help="JSON file of the results")
+    parser.add_option("--compare", dest="compare", metavar="FILE",
+                      help="JSON file of an earlier run to compare the times with")
+    parser.add_option("--threshold", dest="threshold", type="float", default=1.2,
+                      help="Time exponent above which a sweep is super-linear")
+    parser.add_option("--tolerance", dest="tolerance", type="float", default=1.25,
+                      help="Slow down ratio reported when comparing runs")
+    (options, args) = parser.parse_args()
+
+    if options.grid not in grids:
+        parser.error("Unknown grid {0}".format(options.grid))
+    modules = [m for m in options.modules.split(",") if m] or list(grids[options.grid])
+    for module in modules:
+        if module not in grids[options.grid]:
+            parser.error("Unknown module {0}".format(module))
+
+    OPTS.tech_name = options.tech_name
+    OPTS.check_lvsdrc = False
+    globals.init_AMC("config_20_{0}".format(OPTS.tech_name), is_unit_test=False)
+    # Import the technology and the modules once, before forking the points
+    import contact, utils
+    for module in modules:
+        __import__(module)
+    utils.load_libcells()
+    for name in contact.default_contacts:
+        getattr(contact, name)
+
+    results = []
+    for (module, sweep, params) in grid_points(options.grid, modules):
+        result = {"id" : point_id(module, params),
+                  "module" : module,
+                  "sweep" : sweep,
+                  "params" : params,
+                  "bits" : num_bits(module, params)}
+        result.update(measure(module, params))
+        results.append(result)
+        if "error" in result:
+            print("{0:<100} FAILED\n{1}".format(result["id"], result["error"]))
+        else:
+            print("{0:<100} {1:>8.2f} s {2:>8.1f} MB".format(result["id"], result["time"],
+                                                           result["peak_rss"]/2**20))
+
+    report = scaling(results, options.threshold)
+    print("\nTime exponent of each sweep (time ~ bits^exponent):")
+    for r in report:
+        print("{0:<25} {1:<20} {2:>6.2f} {3}".format(r["module"], r["sweep"], r["exponent"],
+                                                     "SUPER-LINEAR" if r["super_linear"] else ""))
+
+    with open(options.output, "w") as f:
+        json.dump({"date" : datetime.datetime.now().isoformat(),
+                   "tech_name" : OPTS.tech_name,
+                   "grid" : options.grid,
+                   "results" : results,
+                   "scaling" : report}, f, indent=2)
+    print("\nResults written to {0}".format(options.output))
+
+    failed = [r for r in results if "error" in r]
+    flagged = [r for r in report if r["super_linear"]]
+    slower = []
+    if options.compare:
+        print("\nTime ratio to {0}:".format(options.compare))
+        slower = compare(results, options.compare, options.tolerance)
+        for (name, ratio) in slower:
+            print("SLOWER {0} {1:.2f}x".format(name, ratio))
+
+    globals.end_AMC()
+    sys.exit(1 if failed or flagged or slower else 0)
+
+
+if __name__ == "__main__":
+    main()
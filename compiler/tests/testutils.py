@@ -23,12 +23,11 @@ class AMC_test(unittest.TestCase):
     def local_drc_check(self, w):
         """ check only DRC rules for the layout"""
 
-        tempgds = OPTS.AMC_temp + "temp.gds"
+        tempgds = OPTS.AMC_temp + w.name + ".gds"
         w.gds_write(tempgds)
         
-        import calibre
         try:
-            self.assertTrue(calibre.run_drc(w.name, tempgds)==0)
+            self.assertTrue(self.run_drc(w.name, tempgds)==0)
         except:
             self.reset()
             # removing density and ESD drc errors for unit tests only
@@ -38,24 +37,55 @@ class AMC_test(unittest.TestCase):
         if OPTS.purge_temp:
             self.cleanup()
     
+    def run_drc(self, name, gds_name):
+        """ DRC with Calibre, or with the native DRC where it isn't installed """
+
+        if globals.find_exe("calibre") == None:
+            import drc_lite
+            return drc_lite.run_drc(name, gds_name)
+        import calibre
+        return calibre.run_drc(name, gds_name)
+
+    def run_checks(self, a, gds_name, sp_name, final_verification=False):
+        """ LVS and DRC at the same time with Calibre, or the native
+            connectivity check and DRC where it isn't installed """
+
+        if globals.find_exe("calibre") == None:
+            import lvs_lite
+            import drc_lite
+            return (lvs_lite.run_lvs(a, final_verification, gds_name),
+                    drc_lite.run_drc(a.name, gds_name))
+        import calibre
+        return calibre.run_checks([calibre.lvs_job(a.name, gds_name, sp_name, final_verification),
+                                   calibre.drc_job(a.name, gds_name)])
+
     def local_check(self, a, final_verification=False):
         """ check both LVS and DRC rules for the layout"""
 
+        if OPTS.hierarchical_verify or OPTS.incremental_verify:
+            self.hierarchical_check(a, final_verification)
+            return
+
         tempspice = OPTS.AMC_temp + a.name+ ".sp"
         tempgds = OPTS.AMC_temp + a.name +".gds"
         a.sp_write(tempspice)
         a.gds_write(tempgds)
         
-        import calibre
         try:
-            self.assertTrue(calibre.run_lvs(a.name, tempgds, tempspice, final_verification)==0)
+            (lvs_errors, drc_errors) = self.run_checks(a, tempgds, tempspice, final_verification)
+        except:
+            self.reset()
+            self.fail("LVS/DRC failed to run: {}".format(a.name))
+
+        try:
+            self.assertTrue(lvs_errors==0)
         except:
             self.reset()
             self.fail("LVS mismatch: {}".format(a.name))
 
         self.reset()
         try:
-            self.assertTrue(calibre.run_drc(a.name, tempgds)==0)
+            self.assertTrue(drc_errors==0)
         except:
             self.reset()
             test=os.listdir(OPTS.AMC_temp)
@@ -64,6 +94,30 @@ class AMC_test(unittest.TestCase):
         if OPTS.purge_temp:
             self.cleanup()
 
+    def hierarchical_check(self, a, final_verification=False):
+        """ check LVS and DRC of every master of the layout once, or only
+            of the ones that changed since the last run """
+
+        import hier_verify
+        import incremental_verify
+        try:
+            if OPTS.incremental_verify:
+                errors = incremental_verify.incremental_verify(a, final_verification).run()
+            else:
+                errors = hier_verify.hier_verify(a, final_verification).run()
+        except:
+            self.reset()
+            self.fail("LVS/DRC failed to run: {}".format(a.name))
+
+        self.reset()
+        try:
+            self.assertTrue(errors==0)
+        except:
+            self.fail("LVS/DRC failed: {}".format(a.name))
+
+        if OPTS.purge_temp:
+            self.cleanup()
+
     def cleanup(self):
         """ Reset the duplicate checker and cleanup files. """
         
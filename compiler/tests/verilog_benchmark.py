@@ -0,0 +1,246 @@
+############################################################################
+#
+# BSD 3-Clause License (See LICENSE.OR for licensing information)
+# Copyright (c) 2016-2019 Regents of the University of California
+# and The Board of Regents for the Oklahoma Agricultural and
+# Mechanical College (acting for and on behalf of Oklahoma State University)
+# All rights reserved.
+#
+############################################################################
+
+
+""" Simulation benchmark of the behavioral Verilog models.
+
+This writes the dense and the sparse Verilog models of SRAMs over a range
+of address sizes and simulates each one with the same testbench: resets,
+writes of words spread over the whole address space, reads of them back
+and a read after every reset that must return zero. For every model and
+simulator it records the compile time, the simulation time, the peak RSS
+of the simulation and the number of mismatches, and writes them as JSON.
+
+The simulators are Icarus Verilog (iverilog/vvp) and Verilator (5.x, with
+--timing), the ones found in the PATH are used. When a simulator has no
+associative arrays the sparse model is compiled with AMC_DENSE.
+
+    python verilog_benchmark.py -a 10,16,20 -n 2000 -o verilog.json
+"""
+
+import sys, os, json, time, optparse, datetime, shutil, subprocess
+sys.path.append(os.path.join(sys.path[0],".."))
+import globals
+from globals import OPTS
+
+
+testbench_template = """`timescale 1ns/1ps
+
+module bench;
+  parameter DATA_WIDTH = {word_size};
+  parameter ADDR_WIDTH = {addr_size};
+
+  reg [DATA_WIDTH-1:0] data_in;
+  wire [DATA_WIDTH-1:0] data_out;
+  reg [ADDR_WIDTH-1:0] addr;
+  reg reset, r, w, rw, rreq, wreq;
+  wire ack, rack, wack;
+  reg [DATA_WIDTH-1:0] word;
+  integer i, round, errors;
+
+  {name} dut(.data_in(data_in), .data_out(data_out), .addr(addr), .reset(reset),
+             .r(r), .w(w), .rw(rw), .rreq(rreq), .wreq(wreq),
+             .ack(ack), .rack(rack), .wack(wack));
+
+  // Accesses spread over the whole address space
+  function [ADDR_WIDTH-1:0] address;
+    input integer n;
+    address = n * 40503 + 7;
+  endfunction
+
+  function [DATA_WIDTH-1:0] pattern;
+    input [ADDR_WIDTH-1:0] a;
+    input integer round;
+    pattern = a * 32'h9e3779b1 + round;
+  endfunction
+
+  task write_word;
+    input [ADDR_WIDTH-1:0] a;
+    input [DATA_WIDTH-1:0] d;
+    begin
+      addr = a; data_in = d; w = 1; wreq = 1;
+      @(posedge ack); w = 0; wreq = 0;
+      @(negedge ack);
+    end
+  endtask
+
+  task read_word;
+    input [ADDR_WIDTH-1:0] a;
+    output [DATA_WIDTH-1:0] d;
+    begin
+      addr = a; r = 1; rreq = 1;
+      @(posedge ack); d = data_out; r = 0; rreq = 0;
+      @(negedge ack);
+    end
+  endtask
+
+  initial begin
+    errors = 0;
+    {{r, w, rw, rreq, wreq}} = 0;
+    for (round = 0; round < {resets}; round = round + 1) begin
+      reset = 1; #10; reset = 0; #10;
+      read_word(address(round), word);
+      if (word !== 0) errors = errors + 1;
+      for (i = 0; i < {accesses}; i = i + 1)
+        write_word(address(i), pattern(address(i), round));
+      for (i = 0; i < {accesses}; i = i + 1) begin
+        read_word(address(i), word);
+        if (word !== pattern(address(i), round)) errors = errors + 1;
+      end
+    end
+    $display("errors=%0d", errors);
+    $finish;
+  end
+endmodule
+"""
+
+
+def write_model(kind, name, addr_size, word_size, verilog_name):
+    """ Write the dense or sparse model of an SRAM without building it """
+
+    import verilog
+
+    class model(verilog.verilog):
+        """ The parameters of an SRAM the Verilog models use """
+        def __init__(self):
+            self.name = name
+            self.addr_size = addr_size
+            self.w_size = word_size
+            self.mask = False
+            self.power_gate = False
+
+    OPTS.verilog_model = kind
+    model().verilog_write(verilog_name)
+
+
+def run(command, cwd):
+    """ (wall time, peak RSS in bytes, output) of a command """
+
+    start_time = time.perf_counter()
+    process = subprocess.Popen(command, cwd=cwd, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, universal_newlines=True)
+    output = process.stdout.read()
+    (pid, status, usage) = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - start_time
+    if process.returncode != 0:
+        raise RuntimeError("{0} failed:\n{1}".format(" ".join(command), output))
+    # ru_maxrss is in kilobytes on Linux
+    return (elapsed, usage.ru_maxrss*1024, output)
+
+
+def compile_commands(simulator, files, defines):
+    """ Commands to compile a testbench and to run it """
+
+    flags = ["-D{0}".format(d) for d in defines]
+    if simulator == "iverilog":
+        return (["iverilog", "-g2012", "-o", "bench.vvp"] + flags + files,
+                ["vvp", "-n", "bench.vvp"])
+    # The dense model has no timescale
+    return (["verilator", "--binary", "--timing", "-Wno-fatal", "-O3", "--top-module", "bench",
+             "--timescale", "1ns/1ps",
+             "--Mdir", "obj_dir", "-o", "bench"] + flags + files,
+            ["obj_dir/bench"])
+
+
+def simulate(simulator, kind, directory):
+    """ Compile and simulate a model, falling back to AMC_DENSE for a sparse
+        model the simulator can't compile """
+
+    files = [kind + ".v", "bench.v"]
+    attempts = [[]]
+    if kind == "sparse":
+        attempts.append(["AMC_DENSE"])
+    for defines in attempts:
+        (compile_command, run_command) = compile_commands(simulator, files, defines)
+        try:
+            (compile_time, compile_rss, output) = run(compile_command, directory)
+        except RuntimeError as e:
+            error = str(e)
+            continue
+        try:
+            (run_time, run_rss, output) = run(run_command, directory)
+        except RuntimeError as e:
+            return {"error" : str(e)}
+        errors = [int(l.split("=")[1]) for l in output.splitlines() if l.startswith("errors=")]
+        return {"defines" : defines,
+                "compile_time" : compile_time,
+                "run_time" : run_time,
+                "peak_rss" : run_rss,
+                "errors" : errors[0] if errors else None}
+    return {"error" : error}
+
+
+def main():
+    parser = optparse.OptionParser(usage="usage: verilog_benchmark.py [options]",
+                                   description="Simulation benchmark of the Verilog models.")
+    parser.add_option("-a", "--addr_sizes", dest="addr_sizes", default="10,16,20",
+                      help="Comma separated address sizes")
+    parser.add_option("-w", "--word_size", dest="word_size", type="int", default=32,
+                      help="Word size")
+    parser.add_option("-n", "--accesses", dest="accesses", type="int", default=2000,
+                      help="Words written and read back after each reset")
+    parser.add_option("-r", "--resets", dest="resets", type="int", default=4,
+                      help="Number of resets")
+    parser.add_option("-s", "--simulators", dest="simulators", default="iverilog,verilator",
+                      help="Comma separated simulators (the ones found are used)")
+    parser.add_option("-o", "--output", dest="output", default="verilog_benchmark.json",
+                      metavar="FILE", help="JSON file of the results")
+    (options, args) = parser.parse_args()
+
+    simulators = [s for s in options.simulators.split(",") if s and shutil.which(s)]
+    if not simulators:
+        print("None of the simulators {0} is in the PATH".format(options.simulators))
+        sys.exit(1)
+
+    OPTS.check_lvsdrc = False
+    globals.init_AMC("config_20_{0}".format(OPTS.tech_name), is_unit_test=False)
+
+    results = []
+    for addr_size in [int(a) for a in options.addr_sizes.split(",")]:
+        directory = OPTS.AMC_temp + "verilog_bench_{0}/".format(addr_size)
+        os.makedirs(directory, exist_ok=True)
+        with open(directory + "bench.v", "w") as f:
+            f.write(testbench_template.format(name="sram", addr_size=addr_size,
+                                              word_size=options.word_size,
+                                              accesses=options.accesses,
+                                              resets=options.resets))
+        for kind in ["dense", "sparse"]:
+            write_model(kind, "sram", addr_size, options.word_size, directory + kind + ".v")
+            for simulator in simulators:
+                result = {"addr_size" : addr_size,
+                          "word_size" : options.word_size,
+                          "model" : kind,
+                          "simulator" : simulator}
+                result.update(simulate(simulator, kind, directory))
+                results.append(result)
+                if "error" in result:
+                    print("{0:<10} {1:<7} addr={2:<3} FAILED\n{3}".format(simulator, kind, addr_size,
+                                                                         result["error"]))
+                else:
+                    print("{0:<10} {1:<7} addr={2:<3} compile {3:>8.2f} s run {4:>8.2f} s "
+                          "{5:>8.1f} MB errors={6} {7}".format(simulator, kind, addr_size,
+                          result["compile_time"], result["run_time"], result["peak_rss"]/2**20,
+                          result["errors"], " ".join(result["defines"])))
+
+    with open(options.output, "w") as f:
+        json.dump({"date" : datetime.datetime.now().isoformat(),
+                   "accesses" : options.accesses,
+                   "resets" : options.resets,
+                   "results" : results}, f, indent=2)
+    print("\nResults written to {0}".format(options.output))
+
+    globals.end_AMC()
+    failed = [r for r in results if "error" in r or r["errors"] != 0]
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
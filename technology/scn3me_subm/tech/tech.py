@@ -324,6 +324,14 @@ spice["rise_time"] = 0.05                   # Rise time in [ns]
 spice["fall_time"] = 0.05                   # Fall time in [ns]
 spice["temperatures"] = [0, 25, 100]        # Temperature corners (oC)
 spice["nom_temperature"] = 25               # Nominal temperature (oC)
+spice["gate_cap"] = 2.5                     # Gate capacitance per area for netlist trimming [fF/um^2]
+spice["drain_cap"] = 1.0                    # Drain/source capacitance per width for netlist trimming [fF/um]
+spice["nmos_res"] = 10000                   # Effective resistance of a 1um wide, minimum length nmos [ohm*um]
+spice["pmos_res"] = 25000                   # Effective resistance of a 1um wide, minimum length pmos [ohm*um]
+spice["vth"] = 0.7                          # Threshold voltage [V]
+spice["wire_cap"] = 0.2                     # Wordline/bitline wire capacitance [fF/um]
+spice["wire_res"] = 0.1                     # Wordline/bitline wire resistance [ohm/um]
+spice["leakage_current"] = 1e-12            # Off current per transistor width [A/um]
 
 #sram signal names
 spice["vdd_name"] = "vdd"